@@ -0,0 +1,158 @@
+"""Bulk analysis routes (many videos as one job)"""
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+import time
+import logging
+
+from app.api.v1.schemas.bulk import BulkAnalyzeRequest, BulkJobResponse
+from app.core.config import settings
+from app.services.analysis_service import analyze_and_store, analysis_failed, sse_event
+from app.services.bulk_service import BulkJob, bulk_jobs
+from app.services.flight_service import flight_key
+from app.services.profile_service import resolve_profile
+from app.services.progress_service import AnalysisCancelled
+from app.db.database import get_db, SessionLocal
+from app.db import crud
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+def _get_job(batch_id: str) -> BulkJob:
+    job = bulk_jobs.get(batch_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Bulk job not found")
+    return job
+
+
+async def _analyze_one(job: BulkJob, video_id: str) -> dict:
+    """Analyse and store one video of ``job`` on its shared detector, LSTM and threads."""
+    db = SessionLocal()
+    try:
+        long_video = job.long_video
+        if long_video is None and job.profile.long_video is not None:
+            long_video = job.profile.long_video
+        # Same key as /analyze: a bulk video and a single request for it share one run
+        key = None
+        if settings.ANALYSIS_SINGLE_FLIGHT:
+            key = flight_key(
+                video_id,
+                long_video=settings.LONG_VIDEO_MODE if long_video is None else long_video,
+                two_pass=settings.TWO_PASS_MODE if job.two_pass is None else job.two_pass,
+                roi_id=None, start_frame=None, end_frame=None, profile=job.profile.name,
+            )
+        try:
+            response = await analyze_and_store(
+                db, video_id, key=key, long_video=long_video, two_pass=job.two_pass, profile=job.profile,
+                detector=job.video_detector(), lstm_detector=job.lstm_detector, executor=job.executor,
+            )
+        except Exception as e:
+            error = analysis_failed(db, video_id, e)
+            if isinstance(e, AnalysisCancelled):
+                raise
+            raise RuntimeError(error.detail)
+        return response.model_dump()
+    finally:
+        db.close()
+
+
+@router.post("/analyze/bulk", response_model=BulkJobResponse, status_code=202)
+async def analyze_bulk(request: BulkAnalyzeRequest, db: Session = Depends(get_db)):
+    """
+    Analyse many videos as one job.
+
+    Select the videos by ``video_ids`` or by ``status`` (e.g. every
+    ``pending`` upload, oldest first, up to ``limit``).  The job runs in
+    the background, BULK_CONCURRENCY videos at a time on one shared
+    detector whose calls are batched across those videos; follow it with
+    ``GET /analyze/bulk/{batchId}`` or its ``/events`` stream.  Each video
+    is stored like a single ``/analyze`` (and shows up in ``/jobs``).
+    """
+    try:
+        profile = resolve_profile(request.profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    limit = min(request.limit or settings.BULK_MAX_VIDEOS, settings.BULK_MAX_VIDEOS)
+    if request.video_ids is not None:
+        video_ids = list(dict.fromkeys(request.video_ids))
+        if len(video_ids) > limit:
+            raise HTTPException(status_code=400, detail=f"At most {limit} videos per bulk job")
+        missing = [video_id for video_id in video_ids if crud.get_video(db, video_id) is None]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Videos not found in database: {', '.join(missing[:10])}")
+    else:
+        video_ids = [video.id for video in crud.get_videos(db, status=request.status, limit=limit)]
+        if not video_ids:
+            raise HTTPException(status_code=404, detail=f"No videos with status {request.status!r}")
+
+    job = bulk_jobs.submit(
+        BulkJob(video_ids, profile, long_video=request.long_video, two_pass=request.two_pass),
+        _analyze_one,
+    )
+    return BulkJobResponse(**job.snapshot())
+
+
+@router.get("/analyze/bulk/{batch_id}", response_model=BulkJobResponse)
+async def get_bulk_job(batch_id: str):
+    """Aggregate progress of a bulk job and the outcome of every finished video"""
+    return BulkJobResponse(**_get_job(batch_id).snapshot())
+
+
+async def _bulk_events(request: Request, job: BulkJob):
+    """Server-sent events for a bulk job: per-video results and aggregate progress."""
+    sent, version, last_sent = 0, None, time.monotonic()
+    while not await request.is_disconnected():
+        # Read before sending results: every result precedes the end of the job
+        finished = job.finished
+        for item in job.results_since(sent):
+            sent += 1
+            yield sse_event("result", item)
+        current = job.progress_version()
+        if current != version or finished:
+            version = current
+            snapshot = job.snapshot(results=False)
+            yield sse_event(snapshot["status"] if finished else "progress", snapshot)
+            if finished:
+                return
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= settings.PROGRESS_KEEPALIVE:
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+        await asyncio.sleep(settings.PROGRESS_POLL_INTERVAL)
+
+
+@router.get("/analyze/bulk/{batch_id}/events")
+async def bulk_job_events(batch_id: str, request: Request):
+    """
+    Stream a bulk job as server-sent events.
+
+    A ``result`` event is sent as each video finishes: its outcome and,
+    if it completed, the full analysis response.  ``progress`` events carry
+    the aggregate counts, ETA and the stage of each video being analysed.
+    The stream ends with a ``completed``, ``cancelled`` or ``failed`` event.
+    Results of videos finished before subscribing are sent first.
+    """
+    job = _get_job(batch_id)
+    return StreamingResponse(
+        _bulk_events(request, job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.delete("/analyze/bulk/{batch_id}", response_model=BulkJobResponse, status_code=202)
+async def cancel_bulk_job(batch_id: str):
+    """
+    Cancel a bulk job.
+
+    Videos not started yet are skipped and the running ones stop at their
+    next frame; results already stored are kept.
+    """
+    job = _get_job(batch_id)
+    if not job.cancel("Bulk job cancelled"):
+        raise HTTPException(status_code=409, detail=f"Bulk job already {job.status}")
+    logger.info(f"Cancelling bulk job {batch_id}")
+    return BulkJobResponse(**job.snapshot())
@@ -0,0 +1,138 @@
+"""Accident evidence file routes (stills and clips, rendered on demand)"""
+from pathlib import Path
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Optional, Tuple
+import os
+import re
+import logging
+
+from app.core.config import settings
+from app.services.evidence_service import evidence_service
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+_CLIP_SUFFIX = "_accident.mp4"
+_MEDIA_TYPES = {
+    ".webp": "image/webp",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".mp4": "video/mp4",
+    ".json": "application/json",
+}
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_CHUNK_SIZE = 64 * 1024
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) of a single ``bytes=`` range.
+
+    Returns None for a header that is malformed or asks for several ranges,
+    which is then ignored and the whole file served.
+
+    Raises:
+        ValueError: If the range lies entirely past the end of the file
+    """
+    match = _RANGE.match(header.strip())
+    if match is None or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Range starts past the end of the file")
+    return start, end
+
+
+def _file_slice(path: Path, start: int, end: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _evidence_response(request: Request, path: Path) -> Response:
+    """
+    File response with long-lived caching.
+
+    Evidence URLs are stable and their bytes only change on re-analysis,
+    which also changes the ETag (mtime + size), so clients cache for
+    EVIDENCE_HTTP_MAX_AGE and revalidate cheaply with If-None-Match.
+    A single byte range (clip seeking) is answered with 206 and an
+    unsatisfiable one with 416; If-Range falls back to the whole file
+    when the client's copy is stale.
+    """
+    stat = os.stat(path)
+    media_type = _MEDIA_TYPES.get(path.suffix.lower())
+    response = FileResponse(path, stat_result=stat, media_type=media_type)
+    response.headers["Cache-Control"] = f"public, max-age={settings.EVIDENCE_HTTP_MAX_AGE}"
+    response.headers["Accept-Ranges"] = "bytes"
+    etag = response.headers["etag"]
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(
+            status_code=304,
+            headers={"ETag": etag, "Cache-Control": response.headers["Cache-Control"]},
+        )
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header is None or (if_range is not None and if_range.strip() != etag):
+        return response
+    try:
+        byte_range = _parse_range(range_header, stat.st_size)
+    except ValueError:
+        return Response(
+            status_code=416,
+            headers={"Content-Range": f"bytes */{stat.st_size}", "Accept-Ranges": "bytes"},
+        )
+    if byte_range is None:
+        return response
+    start, end = byte_range
+    headers = {
+        name: response.headers[name]
+        for name in ("etag", "last-modified", "cache-control", "accept-ranges")
+        if name in response.headers
+    }
+    headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _file_slice(path, start, end), status_code=206, media_type=media_type, headers=headers
+    )
+
+
+@router.get("/frames/{video_id}/{filename}")
+async def get_evidence_frame(video_id: str, filename: str, request: Request):
+    """Annotated accident still, thumbnail or contact sheet (rendered on first request)"""
+    path = await run_in_threadpool(evidence_service.resolve, video_id, filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Frame not found")
+    return _evidence_response(request, path)
+
+
+@router.get("/clips/{filename}")
+async def get_evidence_clip(filename: str, request: Request):
+    """Annotated accident clip (rendered on first request, seekable via Range)"""
+    if not filename.endswith(_CLIP_SUFFIX):
+        raise HTTPException(status_code=404, detail="Clip not found")
+    video_id = filename[: -len(_CLIP_SUFFIX)]
+    path = await run_in_threadpool(evidence_service.resolve, video_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Clip not found")
+    return _evidence_response(request, path)
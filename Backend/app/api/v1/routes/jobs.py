@@ -0,0 +1,45 @@
+"""Analysis job routes (status and cancellation of running analyses)"""
+from fastapi import APIRouter, HTTPException
+import logging
+
+from app.api.v1.schemas.job import JobStatusResponse, JobListResponse
+from app.services.progress_service import progress_tracker
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+def _get_run(job_id: str):
+    run = progress_tracker.get(job_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return run
+
+
+@router.get("/jobs", response_model=JobListResponse)
+async def list_jobs():
+    """Running and recently finished analyses, oldest first"""
+    jobs = [JobStatusResponse(**run.snapshot()) for run in progress_tracker.runs()]
+    return JobListResponse(jobs=jobs, count=len(jobs))
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    """Get the status of the latest analysis of a video (job id = video id)"""
+    return JobStatusResponse(**_get_run(job_id).snapshot())
+
+
+@router.delete("/jobs/{job_id}", response_model=JobStatusResponse, status_code=202)
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running analysis.
+
+    The analysis stops at its next frame and its request fails with 409;
+    the worker immediately takes the next queued analysis.
+    """
+    run = _get_run(job_id)
+    if run.finished:
+        raise HTTPException(status_code=409, detail=f"Job already {run.status}")
+    logger.info(f"Cancelling analysis job {job_id}")
+    run.cancel("Cancelled by request")
+    return JobStatusResponse(**run.snapshot())
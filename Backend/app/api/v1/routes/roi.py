@@ -0,0 +1,56 @@
+"""Region-of-interest routes"""
+from fastapi import APIRouter, HTTPException, Depends
+from typing import List, Optional
+import uuid
+import logging
+
+from app.api.v1.schemas.roi import ROICreateRequest, ROIResponse
+from app.db.database import get_db
+from app.db import crud
+from app.ml.pipeline.roi import RegionMask
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+def load_region_mask(db: Session, roi_id: Optional[str]) -> Optional[RegionMask]:
+    """RegionMask for a stored ROI (None when no id is given)."""
+    if roi_id is None:
+        return None
+    db_roi = crud.get_roi(db, roi_id)
+    if not db_roi:
+        raise HTTPException(status_code=404, detail="ROI not found")
+    return RegionMask(db_roi.polygons, name=db_roi.name, roi_id=db_roi.id)
+
+
+@router.post("/rois", response_model=ROIResponse)
+async def create_roi(request: ROICreateRequest, db: Session = Depends(get_db)):
+    """Store a named detection region for a source"""
+    db_roi = crud.create_roi(
+        db, str(uuid.uuid4()), request.source, request.name, request.polygons
+    )
+    return ROIResponse.model_validate(db_roi)
+
+
+@router.get("/rois", response_model=List[ROIResponse])
+async def list_rois(source: Optional[str] = None, db: Session = Depends(get_db)):
+    """List stored regions, optionally for one source"""
+    return [ROIResponse.model_validate(r) for r in crud.get_rois(db, source)]
+
+
+@router.get("/rois/{roi_id}", response_model=ROIResponse)
+async def get_roi(roi_id: str, db: Session = Depends(get_db)):
+    """Get one stored region"""
+    db_roi = crud.get_roi(db, roi_id)
+    if not db_roi:
+        raise HTTPException(status_code=404, detail="ROI not found")
+    return ROIResponse.model_validate(db_roi)
+
+
+@router.delete("/rois/{roi_id}")
+async def delete_roi(roi_id: str, db: Session = Depends(get_db)):
+    """Delete a stored region"""
+    if not crud.delete_roi(db, roi_id):
+        raise HTTPException(status_code=404, detail="ROI not found")
+    return {"roi_id": roi_id, "deleted": True}
@@ -0,0 +1,72 @@
+"""Live stream ingestion routes"""
+from fastapi import APIRouter, HTTPException, Depends
+from typing import List
+import logging
+
+from app.api.v1.schemas.stream import (
+    StreamStartRequest, StreamStatusResponse, StreamEventsResponse, SchedulerStatsResponse,
+)
+from app.api.v1.routes.roi import load_region_mask
+from app.db.database import get_db
+from app.services.stream_service import stream_scheduler
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+def _get_monitor(stream_id: str):
+    monitor = stream_scheduler.get(stream_id)
+    if monitor is None:
+        raise HTTPException(status_code=404, detail="Stream not found")
+    return monitor
+
+
+@router.post("/streams", response_model=StreamStatusResponse)
+async def start_stream(request: StreamStartRequest, db: Session = Depends(get_db)):
+    """Add a camera feed to the shared-detector scheduler"""
+    try:
+        logger.info(f"Stream start request: {request.source}")
+        roi = load_region_mask(db, request.roi_id)
+        monitor = stream_scheduler.start_stream(
+            request.source, name=request.name, realtime=request.realtime, roi=roi
+        )
+        return StreamStatusResponse(**monitor.stats())
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to start stream: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to start stream: {str(e)}")
+
+
+@router.get("/streams", response_model=List[StreamStatusResponse])
+async def list_streams():
+    """List monitored streams with throughput and lag"""
+    return [StreamStatusResponse(**m.stats()) for m in stream_scheduler.list()]
+
+
+@router.get("/streams/scheduler", response_model=SchedulerStatsResponse)
+async def get_scheduler_stats():
+    """Shared-detector batching and throughput stats"""
+    return SchedulerStatsResponse(**stream_scheduler.stats())
+
+
+@router.get("/streams/{stream_id}", response_model=StreamStatusResponse)
+async def get_stream(stream_id: str):
+    """Get throughput / lag stats for one stream"""
+    return StreamStatusResponse(**_get_monitor(stream_id).stats())
+
+
+@router.get("/streams/{stream_id}/events", response_model=StreamEventsResponse)
+async def get_stream_events(stream_id: str):
+    """Get recent accident events raised on a stream"""
+    events = list(_get_monitor(stream_id).events)
+    return StreamEventsResponse(stream_id=stream_id, events=events, count=len(events))
+
+
+@router.delete("/streams/{stream_id}")
+async def stop_stream(stream_id: str):
+    """Remove a camera feed from the scheduler"""
+    if not stream_scheduler.stop_stream(stream_id):
+        raise HTTPException(status_code=404, detail="Stream not found")
+    return {"stream_id": stream_id, "stopped": True}
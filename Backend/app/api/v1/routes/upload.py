@@ -0,0 +1,116 @@
+"""Chunked, resumable upload routes"""
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+import uuid
+import logging
+
+from app.api.v1.schemas.upload import UploadInitRequest, UploadStatusResponse
+from app.api.v1.schemas.video import VideoUploadResponse
+from app.core.config import settings
+from app.services.upload_service import chunked_uploads, UploadOffsetError, UploadSizeError
+from app.services.video_service import run_upload_io
+from app.db.database import get_db
+from app.db import crud
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+def _get_session(upload_id: str):
+    session = chunked_uploads.get(upload_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+
+def _status(session) -> UploadStatusResponse:
+    return UploadStatusResponse(
+        upload_id=session.upload_id,
+        filename=session.filename,
+        size=session.size,
+        offset=session.offset,
+        complete=session.complete,
+        chunk_size=settings.UPLOAD_CHUNK_SIZE,
+    )
+
+
+@router.post("/uploads", response_model=UploadStatusResponse, status_code=201)
+async def init_upload(request: UploadInitRequest):
+    """Start a resumable upload (then PUT chunks, then POST .../complete)"""
+    try:
+        session = await run_in_threadpool(
+            chunked_uploads.create, str(uuid.uuid4()), request.filename, request.size, request.sha256
+        )
+    except UploadSizeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _status(session)
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadStatusResponse)
+async def get_upload(upload_id: str):
+    """Upload progress — after a dropped connection, resume from ``offset``"""
+    return _status(_get_session(upload_id))
+
+
+@router.put("/uploads/{upload_id}", response_model=UploadStatusResponse)
+async def put_chunk(upload_id: str, request: Request, offset: int = Query(..., ge=0)):
+    """
+    Append the raw request body at ``offset``.
+
+    A chunk for the wrong offset gets 409 with the current offset; one that
+    runs past the declared size gets 413 before the excess is written.
+    """
+    session = _get_session(upload_id)
+    try:
+        await chunked_uploads.receive(session, offset, request.stream())
+    except UploadOffsetError as e:
+        return JSONResponse(
+            status_code=409,
+            content={"detail": str(e), "offset": e.offset},
+        )
+    except UploadSizeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ClientDisconnect:
+        logger.info(f"Upload {upload_id} interrupted at offset {session.offset}")
+        raise HTTPException(status_code=400, detail="Client disconnected")
+    return _status(session)
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=VideoUploadResponse)
+async def complete_upload(upload_id: str, db: Session = Depends(get_db)):
+    """Verify the received bytes and register the video (off the event loop)"""
+    session = _get_session(upload_id)
+    if session.lock.locked():
+        raise HTTPException(status_code=409, detail="A chunk is still being received")
+    try:
+        filepath = await run_upload_io(chunked_uploads.complete, session)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    await run_in_threadpool(
+        crud.create_video,
+        db=db,
+        video_id=upload_id,
+        filename=session.filename,
+        filepath=str(filepath),
+        size=session.size
+    )
+    return VideoUploadResponse(
+        video_id=upload_id,
+        message="Video uploaded successfully",
+        filename=session.filename,
+        size=session.size
+    )
+
+
+@router.delete("/uploads/{upload_id}")
+async def abort_upload(upload_id: str):
+    """Discard an unfinished upload"""
+    if not await run_in_threadpool(chunked_uploads.abort, upload_id):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return {"message": "Upload aborted", "upload_id": upload_id}
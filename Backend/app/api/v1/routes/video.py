@@ -1,8 +1,13 @@
 """Video upload and analysis routes"""
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from collections import OrderedDict
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from typing import Optional
 from datetime import datetime
 from pathlib import Path
+import asyncio
+import time
 import uuid
 import logging
 
@@ -10,8 +15,18 @@ from app.api.v1.schemas.video import VideoUploadResponse, VideoAnalyzeRequest, V
 from app.api.v1.schemas.response import ErrorResponse, ExplanationResponse
 from app.core.config import settings
 from app.utils.file_utils import validate_video_file
-from app.services.video_service import save_uploaded_video
-from app.services.inference_service import analyze_video_file
+from app.services.video_service import save_uploaded_video, get_video_path, run_upload_io
+from app.services.upload_service import chunked_uploads, UploadSizeError
+from app.services.upload_analysis_service import UploadTail
+from app.services.progress_service import progress_tracker
+from app.services.flight_service import flight_key
+from app.services.analysis_service import analyze_and_store, analysis_failed, results_cache, sse_event
+from app.services.profile_service import resolve_profile
+from app.ml.pipeline.frame_extractor import FrameExtractor
+from app.services.inference_service import LSTM_SEQUENCE_LENGTH
+from app.ml.models.memo_detector import MemoDetector
+from app.ml.models.roi_detector import ROIDetector
+from app.api.v1.routes.roi import load_region_mask
 from app.db.database import get_db
 from app.db.models import AnalysisResult
 from app.db import crud
@@ -20,27 +35,15 @@ from sqlalchemy.orm import Session
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# In-memory LRU cache for fast explanation lookups (DB is the source of truth)
-_CACHE_MAX_SIZE = 100
-results_cache: OrderedDict = OrderedDict()
-
-
-def _cache_put(key: str, value: dict):
-    """Add to cache with LRU eviction."""
-    results_cache[key] = value
-    results_cache.move_to_end(key)
-    while len(results_cache) > _CACHE_MAX_SIZE:
-        results_cache.popitem(last=False)
-
 
 @router.post("/upload", response_model=VideoUploadResponse)
 async def upload_video(video: UploadFile = File(...), db: Session = Depends(get_db)):
-    """Upload video file"""
+    """Upload video file (disk and DB writes run off the event loop)"""
     try:
         logger.info(f"Upload request received: {video.filename}")
 
-        # Validate file
-        validation = validate_video_file(video.filename, video.size)
+        # Validate file (size may be unknown until the body is saved)
+        validation = validate_video_file(video.filename, video.size or 0)
         if not validation["valid"]:
             logger.warning(f"Validation failed: {validation['error']}")
             raise HTTPException(status_code=400, detail=validation["error"])
@@ -51,22 +54,30 @@ async def upload_video(video: UploadFile = File(...), db: Session = Depends(get_
 
         # Save file to disk
         filepath = await save_uploaded_video(video, video_id)
+        size = filepath.stat().st_size
+        if size > settings.MAX_UPLOAD_SIZE:
+            filepath.unlink(missing_ok=True)
+            raise HTTPException(
+                status_code=413,
+                detail=f"File size exceeds {settings.MAX_UPLOAD_SIZE / (1024 * 1024):.0f}MB limit"
+            )
         logger.info(f"Video saved successfully: {filepath}")
 
         # Save video record to database
-        crud.create_video(
+        await run_in_threadpool(
+            crud.create_video,
             db=db,
             video_id=video_id,
             filename=video.filename,
             filepath=str(filepath),
-            size=video.size
+            size=size
         )
 
         return VideoUploadResponse(
             video_id=video_id,
             message="Video uploaded successfully",
             filename=video.filename,
-            size=video.size
+            size=size
         )
     except HTTPException:
         raise
@@ -76,8 +87,13 @@ async def upload_video(video: UploadFile = File(...), db: Session = Depends(get_
 
 
 @router.post("/analyze", response_model=VideoAnalyzeResponse)
-async def analyze_video(request: VideoAnalyzeRequest, db: Session = Depends(get_db)):
-    """Analyze uploaded video"""
+async def analyze_video(request: VideoAnalyzeRequest, http_request: Request, db: Session = Depends(get_db)):
+    """
+    Analyze uploaded video.
+
+    Identical concurrent requests share one run, which is cancelled once all
+    their clients have disconnected (or via DELETE /jobs/{video_id}).
+    """
     try:
         logger.info(f"Analysis request received for video: {request.video_id}")
 
@@ -86,71 +102,201 @@ async def analyze_video(request: VideoAnalyzeRequest, db: Session = Depends(get_
         if not db_video:
             raise HTTPException(status_code=404, detail="Video not found in database")
 
-        # Update status to processing
-        crud.update_video_status(db, request.video_id, "processing")
+        # Resolve an optional time/frame range to raw frame bounds
+        start_frame = end_frame = None
+        if request.has_range:
+            try:
+                start_frame, end_frame = FrameExtractor().resolve_range(
+                    get_video_path(request.video_id),
+                    start_seconds=request.start_seconds,
+                    end_seconds=request.end_seconds,
+                    start_frame=request.start_frame,
+                    end_frame=request.end_frame,
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
 
-        result = await analyze_video_file(request.video_id, db)
+        roi = load_region_mask(db, request.roi_id)
+        try:
+            profile = resolve_profile(request.profile)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        long_video = request.long_video
+        if long_video is None and profile.long_video is not None:
+            long_video = profile.long_video
 
-        # Save analysis result to database
-        crud.create_analysis_result(db, result)
-        
-        # Save accident frames to database if any
-        if result["status"] == "accident" and result.get("details", {}).get("accidentFrameUrls"):
-            frame_urls = result["details"]["accidentFrameUrls"]
-            frames_data = [
-                {
-                    'index': int(url.split('_')[-1].split('.')[0]),  # Extract frame index from URL
-                    'path': url,
-                    'confidence': 1.0
-                }
-                for url in frame_urls
-            ]
-            if frames_data:
-                crud.create_accident_frames(db, request.video_id, result["id"], frames_data)
-
-        # Save detected events to database
-        event_frames = result.get("details", {}).get("eventFrames", [])
-        if event_frames:
-            crud.create_accident_events(db, request.video_id, result["id"], event_frames)
-
-        # Update video status
-        crud.update_video_status(db, request.video_id, "completed")
-
-        # Cache result for fast explanation lookups (LRU-evicted)
-        _cache_put(result["id"], result)
-        logger.info(f"Analysis complete. Result saved: {result['id']}")
-
-        return VideoAnalyzeResponse(
-            id=result["id"],
-            status=result["status"],
-            confidence=result["confidence"],
-            timestamp=result["timestamp"],
-            details=result["details"],
-            inference_time=result.get("inference_time"),
-            isAccident=result.get("isAccident", False),
-            accidentType=result.get("accidentType"),
-            severity=result.get("severity", "none"),
-            frameEvidence=result.get("frameEvidence", ""),
-            reasoning=result.get("reasoning", ""),
+        # Identical requests in flight (double-click, two dispatchers) share one
+        # run; the latency budget is left out, so a joiner accepts its tier
+        key = None
+        if settings.ANALYSIS_SINGLE_FLIGHT:
+            key = flight_key(
+                request.video_id,
+                long_video=settings.LONG_VIDEO_MODE if long_video is None else long_video,
+                two_pass=settings.TWO_PASS_MODE if request.two_pass is None else request.two_pass,
+                roi_id=request.roi_id, start_frame=start_frame, end_frame=end_frame, profile=profile.name,
+            )
+
+        return await analyze_and_store(
+            db, request.video_id, http_request, key, long_video=long_video,
+            start_frame=start_frame, end_frame=end_frame, two_pass=request.two_pass,
+            roi=roi, latency_budget=request.latency_budget, profile=profile,
         )
     except HTTPException:
         raise
-    except FileNotFoundError:
-        logger.error(f"Video file not found: {request.video_id}")
-        crud.update_video_status(db, request.video_id, "failed")
-        raise HTTPException(status_code=404, detail="Video file not found on disk")
-    except TimeoutError as e:
-        logger.error(f"Analysis timed out: {request.video_id}")
-        crud.update_video_status(db, request.video_id, "failed")
-        raise HTTPException(status_code=504, detail=f"Analysis timed out: {str(e)}")
-    except RuntimeError as e:
-        logger.error(f"Analysis runtime error: {str(e)}")
-        crud.update_video_status(db, request.video_id, "failed")
-        raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
-        logger.error(f"Analysis failed: {str(e)}", exc_info=True)
-        crud.update_video_status(db, request.video_id, "failed")
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+        raise analysis_failed(db, request.video_id, e)
+
+
+@router.post("/analyze/upload", response_model=VideoAnalyzeResponse)
+async def upload_and_analyze(
+    request: Request,
+    filename: str = Query(...),
+    size: Optional[int] = Query(None, gt=0),
+    sha256: Optional[str] = Query(None),
+    long_video: Optional[bool] = Query(None),
+    two_pass: Optional[bool] = Query(None),
+    roi_id: Optional[str] = Query(None),
+    profile: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """
+    Upload a video as the raw request body and analyze it in one request.
+
+    The body is written straight to disk while a background pass decodes
+    the frames received so far and runs detection on them, so most of the
+    detector time is spent during the transfer; the analysis that follows
+    the upload reuses those detections (see ``UploadTail``).  ``size``
+    defaults to the Content-Length header; ``profile`` is an ANALYSIS_PROFILES
+    name, as for ``/analyze``.
+    """
+    size = size or int(request.headers.get("content-length") or 0)
+    if not size:
+        raise HTTPException(status_code=411, detail="Give the upload size (size= or Content-Length)")
+    try:
+        analysis_profile = resolve_profile(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    video_id = str(uuid.uuid4())
+    logger.info(f"Upload-and-analyze request: {filename} ({size} bytes) as {video_id}")
+    try:
+        session = await run_in_threadpool(chunked_uploads.create, video_id, filename, size, sha256)
+    except UploadSizeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        try:
+            roi = load_region_mask(db, roi_id)
+            detector = MemoDetector(analysis_profile.create_detector())
+            tail_detector = ROIDetector(detector, roi) if roi is not None else detector
+            if long_video is None:
+                long_video = analysis_profile.long_video
+            if long_video is None:
+                long_video = settings.LONG_VIDEO_MODE
+            if two_pass is None:
+                two_pass = settings.TWO_PASS_MODE
+            # Default analysis scores the first LSTM sequence; long-video and
+            # two-pass scans (a subset of the same grid) may use every sample
+            tail = UploadTail(
+                chunked_uploads.partial_path(session), lambda: session.offset, tail_detector,
+                max_samples=None if long_video or two_pass else min(
+                    analysis_profile.max_frames or LSTM_SEQUENCE_LENGTH, LSTM_SEQUENCE_LENGTH
+                ),
+                frame_extractor=analysis_profile.frame_extractor(),
+                conf_threshold=analysis_profile.conf_threshold,
+            ).start()
+            try:
+                await chunked_uploads.receive(session, 0, request.stream())
+            finally:
+                await run_in_threadpool(tail.stop)
+            if not session.complete:
+                raise HTTPException(
+                    status_code=400, detail=f"Upload ended at {session.offset} of {session.size} bytes"
+                )
+            filepath = await run_upload_io(chunked_uploads.complete, session)
+        except BaseException:
+            # Whatever went wrong, the partial upload is of no further use
+            chunked_uploads.abort(video_id)
+            raise
+    except UploadSizeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ClientDisconnect:
+        raise HTTPException(status_code=400, detail="Client disconnected")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(f"Upload received; tail pre-detected: {tail.stats()}")
+    await run_in_threadpool(
+        crud.create_video,
+        db=db,
+        video_id=video_id,
+        filename=filename,
+        filepath=str(filepath),
+        size=session.size
+    )
+
+    try:
+        return await analyze_and_store(
+            db, video_id, request, long_video=long_video, two_pass=two_pass, roi=roi, detector=detector,
+            profile=analysis_profile,
+        )
+    except Exception as e:
+        raise analysis_failed(db, video_id, e)
+
+
+async def _progress_events(request: Request, video_id: str):
+    """Server-sent events for the video's current (or next) analysis."""
+    run = progress_tracker.get(video_id)
+    # A finished run belongs to an earlier analysis: give the one the client
+    # is about to start (it usually subscribes first) a moment to appear
+    waited = 0.0
+    while (run is None or run.finished) and waited < settings.PROGRESS_WAIT_START:
+        await asyncio.sleep(settings.PROGRESS_POLL_INTERVAL)
+        waited += settings.PROGRESS_POLL_INTERVAL
+        latest = progress_tracker.get(video_id)
+        if latest is not None and latest is not run:
+            run = latest
+    if run is None:
+        yield sse_event("idle", {"videoId": video_id, "status": "idle"})
+        return
+
+    version, last_sent = None, time.monotonic()
+    while not await request.is_disconnected():
+        if run.version != version:
+            version = run.version
+            snapshot = run.snapshot()
+            finished = snapshot["status"] != "running"
+            yield sse_event(snapshot["status"] if finished else "progress", snapshot)
+            if finished:
+                return
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= settings.PROGRESS_KEEPALIVE:
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+        await asyncio.sleep(settings.PROGRESS_POLL_INTERVAL)
+
+
+@router.get("/analyze/{video_id}/progress")
+async def analysis_progress(video_id: str, request: Request, db: Session = Depends(get_db)):
+    """
+    Stream analysis progress as server-sent events.
+
+    ``progress`` events carry the stage (decode → detect → physics → lstm →
+    render → persist), frames done / total within it, elapsed seconds and
+    the stage ETA; the stream ends with a ``completed`` (with ``resultId``),
+    ``failed`` or ``cancelled`` event.  Subscribing just before ``POST /analyze`` is fine:
+    the stream waits briefly for the analysis to start and otherwise sends
+    ``idle``.
+    """
+    if progress_tracker.get(video_id) is None and not crud.get_video(db, video_id):
+        raise HTTPException(status_code=404, detail="Video not found")
+    return StreamingResponse(
+        _progress_events(request, video_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/explanation/{result_id}", response_model=ExplanationResponse)
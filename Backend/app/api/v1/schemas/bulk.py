@@ -0,0 +1,61 @@
+"""Bulk analysis schemas"""
+from pydantic import BaseModel, Field, model_validator
+from typing import Literal, Optional, List
+
+
+class BulkAnalyzeRequest(BaseModel):
+    # The videos — listed, or every video with a status (oldest first)
+    video_ids: Optional[List[str]] = None
+    status: Optional[Literal["pending", "processing", "completed", "failed", "cancelled"]] = None
+    limit: Optional[int] = Field(None, gt=0)  # Select at most this many (None → settings.BULK_MAX_VIDEOS)
+    long_video: Optional[bool] = None      # None → the profile's, else settings.LONG_VIDEO_MODE
+    two_pass: Optional[bool] = None        # None → settings.TWO_PASS_MODE
+    profile: Optional[str] = None          # ANALYSIS_PROFILES name; None → settings.ANALYSIS_PROFILE
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if (self.video_ids is None) == (self.status is None):
+            raise ValueError("Give either video_ids or a status filter")
+        if self.video_ids is not None and not self.video_ids:
+            raise ValueError("video_ids is empty")
+        return self
+
+
+class BulkVideoResult(BaseModel):
+    videoId: str
+    status: str                            # completed / failed / cancelled
+    resultId: Optional[str] = None
+    isAccident: Optional[bool] = None
+    confidence: Optional[int] = None
+    severity: Optional[str] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
+class BulkActiveVideo(BaseModel):
+    videoId: str
+    stage: str
+    done: int
+    total: Optional[int] = None
+    elapsed: float
+
+
+class BulkJobResponse(BaseModel):
+    batchId: str
+    status: str                            # queued / running / completed / cancelled / failed
+    profile: str
+    total: int
+    done: int                              # completed + failed + cancelled
+    completed: int
+    failed: int
+    cancelled: int
+    running: int
+    pending: int
+    percent: float
+    elapsed: float
+    eta: Optional[float] = None
+    active: List[BulkActiveVideo] = []
+    detector: Optional[dict] = None        # Batching stats per shared model ("model", or "light" and "heavy")
+    error: Optional[str] = None
+    cancelRequested: bool = False
+    results: List[BulkVideoResult] = []
@@ -0,0 +1,24 @@
+"""Analysis job schemas"""
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+class JobStatusResponse(BaseModel):
+    videoId: str                           # Jobs are keyed by the analysed video
+    status: str                            # running / completed / failed / cancelled
+    stage: str                             # queued, then decode ... persist
+    stageIndex: int
+    stageCount: int
+    detail: str = ""
+    done: int
+    total: Optional[int] = None
+    elapsed: float
+    stageEta: Optional[float] = None
+    resultId: Optional[str] = None
+    error: Optional[str] = None
+    cancelRequested: bool = False
+
+
+class JobListResponse(BaseModel):
+    jobs: List[JobStatusResponse]
+    count: int
@@ -0,0 +1,27 @@
+"""Region-of-interest schemas"""
+from datetime import datetime
+from pydantic import BaseModel, Field, model_validator
+from typing import List
+
+from app.ml.pipeline.roi import RegionMask
+
+
+class ROICreateRequest(BaseModel):
+    source: str = Field(..., min_length=1)  # Camera name, stream URL or any source key
+    name: str = Field(..., min_length=1, max_length=100)
+    polygons: List[List[List[float]]]      # [[[x, y], ...], ...] normalised to 0.0-1.0
+
+    @model_validator(mode="after")
+    def check_polygons(self):
+        RegionMask(self.polygons)          # Raises ValueError → 422
+        return self
+
+
+class ROIResponse(BaseModel):
+    id: str
+    source: str
+    name: str
+    polygons: List[List[List[float]]]
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
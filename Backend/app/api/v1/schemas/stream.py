@@ -0,0 +1,47 @@
+"""Live stream schemas"""
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+class StreamStartRequest(BaseModel):
+    source: str                            # RTSP/HTTP URL, device index ("0") or file path
+    name: Optional[str] = None
+    realtime: bool = False                 # Pace file sources at native speed
+    roi_id: Optional[str] = None           # Stored region of interest to detect in
+
+
+class StreamStatusResponse(BaseModel):
+    stream_id: str
+    name: str
+    source: str
+    roi: Optional[str] = None              # Name of the applied region of interest
+    status: str                            # running / stopped / finished / error
+    error: Optional[str] = None
+    target_fps: float
+    throughput_fps: float
+    frames_read: int
+    frames_processed: int
+    frames_skipped: int
+    frames_dropped: int = 0
+    lag_seconds: float
+    max_lag_seconds: float
+    last_event_latency: Optional[float] = None
+    event_count: int
+    uptime_seconds: float
+
+
+class StreamEventsResponse(BaseModel):
+    stream_id: str
+    events: List[dict]
+    count: int
+
+
+class SchedulerStatsResponse(BaseModel):
+    active_streams: int
+    total_streams: int
+    batch_size: int
+    batches: int
+    frames_detected: int
+    avg_batch_size: float
+    detector_fps: float
+    device: str
@@ -0,0 +1,18 @@
+"""Chunked upload schemas"""
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class UploadInitRequest(BaseModel):
+    filename: str
+    size: int = Field(..., gt=0)             # Total bytes the client will send
+    sha256: Optional[str] = None           # Hex digest verified on completion
+
+
+class UploadStatusResponse(BaseModel):
+    upload_id: str
+    filename: str
+    size: int
+    offset: int                            # Bytes received so far; the next chunk starts here
+    complete: bool
+    chunk_size: int                        # Suggested chunk size in bytes
@@ -1,5 +1,5 @@
 """Video schemas"""
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional
 
 
@@ -12,6 +12,36 @@ class VideoUploadResponse(BaseModel):
 
 class VideoAnalyzeRequest(BaseModel):
     video_id: str
+    long_video: Optional[bool] = None      # None → settings.LONG_VIDEO_MODE
+    two_pass: Optional[bool] = None        # None → settings.TWO_PASS_MODE
+    roi_id: Optional[str] = None           # Stored region of interest to detect in
+    latency_budget: Optional[float] = Field(None, gt=0)  # Seconds incl. queueing; None → settings.ANALYSIS_LATENCY_BUDGET
+    profile: Optional[str] = None          # ANALYSIS_PROFILES name; None → settings.ANALYSIS_PROFILE
+    # Optional analysis range — seconds or raw frame numbers, not both
+    start_seconds: Optional[float] = Field(None, ge=0)
+    end_seconds: Optional[float] = Field(None, gt=0)
+    start_frame: Optional[int] = Field(None, ge=0)
+    end_frame: Optional[int] = Field(None, gt=0)
+
+    @model_validator(mode="after")
+    def check_range(self):
+        uses_seconds = self.start_seconds is not None or self.end_seconds is not None
+        uses_frames = self.start_frame is not None or self.end_frame is not None
+        if uses_seconds and uses_frames:
+            raise ValueError("Give the range in seconds or in frames, not both")
+        if (self.start_seconds is not None and self.end_seconds is not None
+                and self.end_seconds <= self.start_seconds):
+            raise ValueError("end_seconds must be greater than start_seconds")
+        if (self.start_frame is not None and self.end_frame is not None
+                and self.end_frame <= self.start_frame):
+            raise ValueError("end_frame must be greater than start_frame")
+        return self
+
+    @property
+    def has_range(self) -> bool:
+        return any(v is not None for v in (
+            self.start_seconds, self.end_seconds, self.start_frame, self.end_frame
+        ))
 
 
 class VideoAnalyzeResponse(BaseModel):
@@ -1,6 +1,6 @@
 """Application configuration"""
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -30,6 +30,106 @@ class Settings(BaseSettings):
     TARGET_FPS: int = 10
     MAX_VIDEO_DURATION: int = 600
     
+    # Motion-adaptive detection: near-duplicate frames reuse earlier detections
+    ADAPTIVE_SAMPLING: bool = False
+    SAMPLING_DIFF_THRESHOLD: float = 0.02  # Mean abs diff (0-1, 64x36 gray) below which a frame is reused
+    SAMPLING_MAX_REUSE: int = 4            # Max consecutive reused frames before re-detecting
+    SAMPLING_INTERPOLATE: bool = True      # Blend boxes across reused runs instead of copying
+    FRAME_POOL_MAX_MB: int = 1024          # Idle decoded-frame buffers kept for reuse (0 = no pooling)
+    
+    # Decoded-frame disk cache for repeat analyses (memory-mapped .npy)
+    FRAME_CACHE_ENABLED: bool = False
+    FRAME_CACHE_DIR: str = "./storage/frame_cache"
+    FRAME_CACHE_MAX_MB: int = 4096         # LRU-evicted beyond this
+    
+    # Accident evidence rendering
+    EVIDENCE_RENDER_WORKERS: int = 4      # Threads encoding stills alongside the clip writer
+    EVIDENCE_RENDER_QUEUE: int = 8        # Annotated frames in flight between drawing and the clip writer
+    EVIDENCE_LAZY: bool = True            # Render evidence on first request instead of inside /analyze
+    EVIDENCE_PRERENDER: bool = False      # Also render lazy evidence on a low-priority background thread
+    EVIDENCE_DIR: str = "./storage/evidence"  # Render manifests (window, detections, peak) for lazy evidence
+    EVIDENCE_CACHE_MAX_MB: int = 2048     # Re-renderable stills + clips kept; LRU-evicted beyond this
+    EVIDENCE_STILL_FORMAT: str = "webp"   # webp | jpg
+    EVIDENCE_STILL_QUALITY: int = 85      # Encoder quality (0-100) for stills and thumbnails
+    EVIDENCE_THUMB_WIDTH: int = 320       # Thumbnail width in px (aspect preserved)
+    EVIDENCE_CLIP_CODECS: str = "avc1,vp09,mp4v"  # FourCCs tried in order; first the OpenCV build can encode wins
+    EVIDENCE_HTTP_MAX_AGE: int = 604800   # Cache-Control max-age (s) for evidence responses
+    EVIDENCE_SPRITE_SCOPE: str = "window" # Contact sheet covers: window (clip ±3s) | all (every sampled frame)
+    EVIDENCE_SPRITE_MAX_TILES: int = 60   # Frames are strided around the peak to fit
+    EVIDENCE_SPRITE_TILE_WIDTH: int = 160
+    EVIDENCE_SPRITE_COLUMNS: int = 10
+    
+    # Uploads (plain and chunked/resumable)
+    UPLOAD_CHUNK_SIZE: int = 8_388_608    # Chunk size suggested to clients (bytes)
+    UPLOAD_WRITE_BUFFER: int = 1_048_576  # Bytes buffered from the request before each disk write
+    UPLOAD_WRITE_WORKERS: int = 4         # Upload disk writes in flight at once (off the event loop)
+    UPLOAD_SESSION_TTL: int = 86400       # Seconds an unfinished upload is kept for resuming
+    UPLOAD_TAIL_STEP: int = 4_194_304     # Upload-and-analyze: new bytes that trigger a detect pass on the partial file
+    UPLOAD_TAIL_POLL: float = 0.5         # Seconds between upload progress checks while tailing
+    
+    # Analysis execution and progress streaming
+    ANALYSIS_WORKERS: int = 1             # Analyses run at once (off the event loop); more queue
+    ANALYSIS_ISOLATION: str = "thread"    # thread | process (a cancelled or overdue process is killed)
+    ANALYSIS_CANCEL_GRACE: float = 5.0    # Seconds a cancelled process analysis gets to stop before it is killed
+    PROGRESS_POLL_INTERVAL: float = 0.25  # Seconds between progress checks of an SSE stream
+    PROGRESS_KEEPALIVE: float = 15.0      # Seconds of silence before an SSE keep-alive comment
+    PROGRESS_WAIT_START: float = 2.0      # Seconds a stream waits for an analysis that has not started yet
+    PROGRESS_RETENTION: int = 600         # Seconds a finished analysis' progress stays readable
+    
+    # Deadline-aware quality (coarser tiers when a latency budget would be missed)
+    ANALYSIS_LATENCY_BUDGET: float = 0.0  # Default seconds per /analyze request incl. queueing (0 = always full quality)
+    QUALITY_FRAME_COST: float = 0.05      # Assumed seconds per full-quality frame until timings are observed
+    
+    # Analysis profiles (selectable per request; fields left out keep the settings above)
+    DETECTION_CONF_THRESHOLD: float = 0.25
+    ANALYSIS_PROFILE: str = "balanced"    # Profile of requests that name none
+    ANALYSIS_PROFILES: Dict[str, dict] = {
+        # fps, detector (configured|yolo|light|cascade), imgsz, conf, batch_size,
+        # max_frames (≤ 150), evidence, long_video
+        "fast": {"fps": 5, "detector": "light", "imgsz": 480, "batch_size": 32, "evidence": False},
+        "balanced": {},
+        "accurate": {"detector": "yolo", "imgsz": 960, "conf": 0.2, "batch_size": 8, "long_video": True},
+    }
+    
+    # Single-flight analyses (concurrent identical /analyze requests share one run, across workers)
+    ANALYSIS_SINGLE_FLIGHT: bool = True
+    ANALYSIS_FLIGHT_LEASE: float = 30.0   # Seconds a worker's claim on a run lasts without renewal
+    ANALYSIS_FLIGHT_POLL: float = 0.5     # Seconds between checks of a run owned by another worker
+    
+    # Bulk analysis (POST /analyze/bulk: many videos as one job)
+    BULK_CONCURRENCY: int = 4             # Videos of a bulk job analysed at once (own threads, not ANALYSIS_WORKERS)
+    BULK_DETECT_BATCH: int = 32           # Max frames per shared-detector call across the job's videos
+    BULK_MAX_VIDEOS: int = 1000           # Videos one bulk job may select
+    
+    # Live stream ingestion
+    STREAM_WINDOW_FRAMES: int = 150       # Rolling LSTM window (matches training length)
+    STREAM_EVAL_STRIDE: int = 10          # Re-score the window every N sampled frames
+    STREAM_EVIDENCE_FRAMES: int = 50      # Raw frames kept for evidence rendering
+    STREAM_EVIDENCE_WORKERS: int = 1      # Threads rendering event stills off the detection path
+    STREAM_EVENT_COOLDOWN: float = 10.0   # Seconds before the same stream can alert again
+    STREAM_RECONNECT_DELAY: float = 2.0
+    STREAM_MAX_EVENTS: int = 50           # Recent events kept in memory per stream
+    STREAM_BATCH_SIZE: int = 8            # Max frames per shared-detector call
+    STREAM_MAX_LAG: float = 2.0           # Seconds of lag before a feed's sampling is reduced
+    STREAM_MIN_FPS: float = 1.0           # Floor for adaptive per-feed sampling
+    
+    # Long-video (full-length) analysis
+    LONG_VIDEO_MODE: bool = False         # Analyse every window instead of the first 150 frames
+    LONG_VIDEO_WINDOW_STRIDE: int = 75    # Sampled frames between window starts (50% overlap)
+    LONG_VIDEO_WORKERS: int = 4           # Parallel decode segments
+    LONG_VIDEO_BATCH_SIZE: int = 16       # Frames per shared-detector call
+    
+    # Two-pass (coarse-to-fine) analysis
+    TWO_PASS_MODE: bool = False           # Sparse scan, then dense windows around candidates
+    TWO_PASS_COARSE_FPS: int = 2          # Sampling rate of the first (scan) pass
+    TWO_PASS_CANDIDATES: int = 2          # Candidate peaks refined at TARGET_FPS
+    
+    # Detector cascade (nano model screens, YOLO_MODEL_PATH confirms)
+    DETECTOR_CASCADE: bool = False
+    CASCADE_LIGHT_MODEL_PATH: str = "./yolo11n.pt"
+    CASCADE_PHYSICS_THRESHOLD: float = 0.15   # Per-frame physics that escalates to the heavy model
+    CASCADE_OVERLAP_MARGIN: float = 0.10      # Box growth for the near-overlap escalation test
+    
     ALLOWED_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
     
     GROQ_API_KEY: str = ""
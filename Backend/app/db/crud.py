@@ -1,7 +1,9 @@
 """Database CRUD operations"""
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app.db.models import Video, AnalysisResult, AccidentEvent
-from datetime import datetime
+from app.db.models import Video, AnalysisResult, AccidentEvent, RegionOfInterest, AnalysisFlight
+from datetime import datetime, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -45,6 +47,17 @@ def get_video(db: Session, video_id: str) -> Video | None:
     return db.query(Video).filter(Video.id == video_id).first()
 
 
+def get_videos(db: Session, status: str = None, limit: int = None) -> list[Video]:
+    """List videos oldest first, optionally only those with one status"""
+    query = db.query(Video)
+    if status is not None:
+        query = query.filter(Video.status == status)
+    query = query.order_by(Video.uploaded_at)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
 def create_analysis_result(db: Session, result: dict) -> AnalysisResult:
     """Save analysis result to database"""
     details = result.get("details", {})
@@ -162,3 +175,93 @@ def get_accident_frames_by_video(db: Session, video_id: str):
             self.confidence = event.confidence
 
     return [FrameProxy(e, video_id) for e in events]
+
+
+def create_roi(db: Session, roi_id: str, source: str, name: str, polygons: list) -> RegionOfInterest:
+    """Store a named region of interest for a source"""
+    db_roi = RegionOfInterest(id=roi_id, source=source, name=name, polygons=polygons)
+    db.add(db_roi)
+    db.commit()
+    db.refresh(db_roi)
+    logger.info(f"ROI created: {roi_id} ({source} / {name})")
+    return db_roi
+
+
+def get_roi(db: Session, roi_id: str) -> RegionOfInterest | None:
+    """Get region of interest by ID"""
+    return db.query(RegionOfInterest).filter(RegionOfInterest.id == roi_id).first()
+
+
+def get_rois(db: Session, source: str = None) -> list[RegionOfInterest]:
+    """List regions of interest, optionally only those of one source"""
+    query = db.query(RegionOfInterest)
+    if source is not None:
+        query = query.filter(RegionOfInterest.source == source)
+    return query.order_by(RegionOfInterest.created_at).all()
+
+
+def delete_roi(db: Session, roi_id: str) -> bool:
+    """Delete a region of interest. Returns False if it does not exist."""
+    db_roi = get_roi(db, roi_id)
+    if not db_roi:
+        return False
+    db.delete(db_roi)
+    db.commit()
+    logger.info(f"ROI deleted: {roi_id}")
+    return True
+
+
+def claim_analysis_flight(db: Session, key: str, video_id: str, owner: str, lease: float) -> bool:
+    """
+    Claim analysis ``key`` for run ``owner`` for ``lease`` seconds.
+
+    Succeeds if nobody holds it or the previous run finished or let its
+    lease lapse; the conditional update / insert makes concurrent claims
+    from several workers settle on one winner.
+    """
+    now = datetime.utcnow()
+    values = dict(
+        video_id=video_id, owner=owner, status="running", response=None, error_message=None,
+        started_at=now, lease_until=now + timedelta(seconds=lease),
+    )
+    try:
+        claimed = db.query(AnalysisFlight).filter(
+            AnalysisFlight.key == key,
+            or_(AnalysisFlight.status != "running", AnalysisFlight.lease_until < now),
+        ).update(values, synchronize_session=False)
+        if not claimed:
+            if db.query(AnalysisFlight.key).filter(AnalysisFlight.key == key).first() is not None:
+                db.rollback()
+                return False
+            db.add(AnalysisFlight(key=key, **values))
+        db.commit()
+    except IntegrityError:
+        # Another worker inserted the claim first
+        db.rollback()
+        return False
+    logger.info(f"Analysis flight claimed: {key}")
+    return True
+
+
+def renew_analysis_flight(db: Session, key: str, owner: str, lease: float) -> bool:
+    """Extend ``owner``'s claim on ``key``. Returns False if it no longer holds it."""
+    renewed = db.query(AnalysisFlight).filter(
+        AnalysisFlight.key == key, AnalysisFlight.owner == owner,
+    ).update({"lease_until": datetime.utcnow() + timedelta(seconds=lease)}, synchronize_session=False)
+    db.commit()
+    return bool(renewed)
+
+
+def finish_analysis_flight(db: Session, key: str, owner: str, status: str,
+                           response: dict = None, error_message: str = None):
+    """Release ``owner``'s claim as completed (with the response) or failed"""
+    db.query(AnalysisFlight).filter(
+        AnalysisFlight.key == key, AnalysisFlight.owner == owner,
+    ).update({"status": status, "response": response, "error_message": error_message},
+             synchronize_session=False)
+    db.commit()
+
+
+def get_analysis_flight(db: Session, key: str) -> AnalysisFlight | None:
+    """Current state of analysis ``key`` (re-read from the database)"""
+    return db.query(AnalysisFlight).filter(AnalysisFlight.key == key).populate_existing().first()
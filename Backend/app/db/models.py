@@ -19,7 +19,7 @@ class Video(Base):
     duration = Column(Float, nullable=True, comment="Video duration in seconds")
     fps = Column(Float, nullable=True, comment="Frames per second")
     resolution = Column(String(20), nullable=True, comment="Video resolution (e.g., 1920x1080)")
-    status = Column(String(20), default="pending", nullable=False, comment="pending|processing|completed|failed")
+    status = Column(String(20), default="pending", nullable=False, comment="pending|processing|completed|failed|cancelled")
     uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     processed_at = Column(DateTime, nullable=True, comment="When analysis completed")
     
@@ -88,3 +88,34 @@ class AccidentEvent(Base):
         Index('idx_events_video_id', 'video_id'),
         Index('idx_events_result_id', 'result_id'),
     )
+
+
+class RegionOfInterest(Base):
+    """Named detection region for a camera / video source"""
+    __tablename__ = "regions_of_interest"
+
+    id = Column(String(36), primary_key=True, comment="UUID")
+    source = Column(String(500), nullable=False, comment="Camera name, stream URL or other source key")
+    name = Column(String(100), nullable=False, comment="Region label")
+    polygons = Column(JSON, nullable=False, comment="Normalised [[x, y], ...] polygons (0.0-1.0)")
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index('idx_roi_source', 'source'),
+    )
+
+
+class AnalysisFlight(Base):
+    """Claim on a running analysis, shared by all API workers (single-flight lock)"""
+    __tablename__ = "analysis_flights"
+
+    key = Column(String(100), primary_key=True, comment="{video_id}:{parameter hash}")
+    video_id = Column(String(36), ForeignKey('videos.id'), nullable=False, index=True)
+    owner = Column(String(36), nullable=False, comment="UUID of the run holding the claim")
+    status = Column(String(20), nullable=False, comment="running|completed|failed")
+    response = Column(JSON, nullable=True, comment="Analysis response, for requests that waited on the run")
+    error_message = Column(Text, nullable=True, comment="Error message if failed")
+
+    started_at = Column(DateTime, nullable=False)
+    lease_until = Column(DateTime, nullable=False, comment="Claim is abandoned unless renewed by then")
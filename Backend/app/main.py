@@ -6,13 +6,12 @@ from datetime import datetime
 from pathlib import Path
 from fastapi import FastAPI, Query, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.logging_config import setup_logging
-from app.api.v1.routes import video
+from app.api.v1.routes import video, stream, roi, evidence, upload, jobs, bulk
 from app.db.database import init_db, get_db
 
 # ── Structured logging (replaces basicConfig) ──
@@ -46,14 +45,17 @@ async def lifespan(app):
     if not lstm_path.exists():
         logger.warning("LSTM model not found at %s", lstm_path)
 
-    # Ensure upload, frames, clips directories exist
+    # Ensure upload, frames, clips, evidence directories exist
     Path(settings.UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
     Path(settings.FRAMES_DIR).mkdir(parents=True, exist_ok=True)
     Path(settings.CLIPS_DIR).mkdir(parents=True, exist_ok=True)
+    Path(settings.EVIDENCE_DIR).mkdir(parents=True, exist_ok=True)
 
     yield  # Application runs here
 
     logger.info("Shutting down %s", settings.APP_NAME)
+    from app.services.stream_service import stream_scheduler
+    stream_scheduler.stop_all()
 
 
 app = FastAPI(
@@ -68,21 +70,20 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["GET", "POST"],
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["*"],
 )
 
 # Include routers
 app.include_router(video.router, prefix="/api", tags=["video"])
-
-# Mount static directories (directories are created by lifespan before any requests)
-Path("./storage/frames").mkdir(parents=True, exist_ok=True)
-Path("./storage/clips").mkdir(parents=True, exist_ok=True)
-try:
-    app.mount("/frames", StaticFiles(directory="./storage/frames"), name="frames")
-    app.mount("/clips",  StaticFiles(directory="./storage/clips"),  name="clips")
-except Exception as _e:
-    logging.getLogger(__name__).warning("Static mount skipped: %s", _e)
+app.include_router(upload.router, prefix="/api", tags=["upload"])
+app.include_router(jobs.router, prefix="/api", tags=["jobs"])
+app.include_router(bulk.router, prefix="/api", tags=["bulk"])
+app.include_router(stream.router, prefix="/api", tags=["stream"])
+app.include_router(roi.router, prefix="/api", tags=["roi"])
+
+# Evidence stills / clips (served from disk, rendered on first request)
+app.include_router(evidence.router, tags=["evidence"])
 
 
 @app.get("/")
@@ -0,0 +1,135 @@
+"""Detector wrapper that merges concurrent callers' frames into shared batches"""
+from collections import deque
+from typing import Deque, Dict, List, Optional
+import threading
+import time
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """Frames of one ``detect_batch`` call waiting for a model batch."""
+
+    def __init__(self, frames: List[np.ndarray], conf_threshold: float):
+        self.frames = frames
+        self.conf_threshold = conf_threshold
+        self.detections: Optional[List[List[Dict]]] = None
+        self.error: Optional[Exception] = None
+
+    @property
+    def done(self) -> bool:
+        return self.detections is not None or self.error is not None
+
+
+class BatchingDetector:
+    """
+    Drop-in replacement for ``YOLODetector`` shared by analyses running on
+    several threads.  Wrap stateless models only: a ``CascadeDetector``
+    gates on each video's motion, so wrap its light and heavy models and
+    give every video its own cascade.
+
+    Calls that arrive while the wrapped model is busy queue up; whichever
+    caller finds the model idle takes every queued call with the same
+    confidence threshold (up to ``max_batch`` frames, never splitting a
+    call) and runs them as one ``detect_batch``.  Per-frame analyses of N
+    videos thus reach the model as batches of up to N frames, and only one
+    thread ever touches the model.
+    """
+
+    def __init__(self, detector, max_batch: int = 32):
+        """
+        Args:
+            detector: Wrapped detector (anything with ``detect_batch``)
+            max_batch: Frames per model call (a larger single call still runs whole)
+        """
+        self.detector = detector
+        self.max_batch = max(1, max_batch)
+        self._queue: Deque[_Call] = deque()
+        self._busy = False
+        self._cond = threading.Condition()
+
+        self.batches = 0
+        self.calls = 0
+        self.frames_detected = 0
+        self.busy_seconds = 0.0
+
+    def detect(self, frame: np.ndarray, conf_threshold: float = 0.25) -> List[Dict]:
+        """Detect objects in one frame (see ``detect_batch``)."""
+        return self.detect_batch([frame], conf_threshold)[0]
+
+    def detect_batch(self, frames: List[np.ndarray], conf_threshold: float = 0.25) -> List[List[Dict]]:
+        """
+        Detect ``frames``, batched with whatever other callers have queued.
+
+        Raises:
+            RuntimeError: If the wrapped detector fails on the shared batch
+        """
+        call = _Call(frames, conf_threshold)
+        with self._cond:
+            self._queue.append(call)
+            while not call.done:
+                if self._busy:
+                    self._cond.wait()
+                    continue
+                batch = self._take()
+                self._busy = True
+                self._cond.release()
+                try:
+                    self._run(batch)
+                finally:
+                    self._cond.acquire()
+                    self._busy = False
+                    self._cond.notify_all()
+        if call.error is not None:
+            raise call.error
+        return call.detections
+
+    def _take(self) -> List[_Call]:
+        """Queued calls for the next model batch (condition held)."""
+        batch = [self._queue.popleft()]
+        size = len(batch[0].frames)
+        for call in list(self._queue):
+            if size + len(call.frames) > self.max_batch:
+                break
+            if call.conf_threshold == batch[0].conf_threshold:
+                self._queue.remove(call)
+                batch.append(call)
+                size += len(call.frames)
+        return batch
+
+    def _run(self, batch: List[_Call]):
+        frames = [frame for call in batch for frame in call.frames]
+        started = time.time()
+        try:
+            detections = self.detector.detect_batch(frames, batch[0].conf_threshold)
+        except Exception as e:
+            for call in batch:
+                call.error = e
+            return
+        offset = 0
+        for call in batch:
+            call.detections = detections[offset:offset + len(call.frames)]
+            offset += len(call.frames)
+        self.busy_seconds += time.time() - started
+        self.batches += 1
+        self.calls += len(batch)
+        self.frames_detected += len(frames)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "framesDetected": self.frames_detected,
+            "avgBatchSize": round(self.frames_detected / self.batches, 2) if self.batches else 0.0,
+            "callsPerBatch": round(self.calls / self.batches, 2) if self.batches else 0.0,
+            "detectorFps": round(self.frames_detected / self.busy_seconds, 2) if self.busy_seconds > 0 else 0.0,
+        }
+
+    def get_device(self) -> str:
+        """Get current device being used"""
+        return self.detector.get_device()
+
+    def cleanup(self):
+        """Release GPU memory"""
+        self.detector.cleanup()
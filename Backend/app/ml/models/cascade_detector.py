@@ -0,0 +1,172 @@
+"""Two-stage detector cascade: nano model screens, heavy model confirms"""
+import threading
+import time
+from typing import List, Dict
+import numpy as np
+import logging
+
+from app.core.config import settings
+from app.ml.models.batching_detector import BatchingDetector
+from app.ml.models.memo_detector import MemoDetector
+from app.ml.models.roi_detector import ROIDetector
+from app.ml.models.yolo_detector import YOLODetector
+from app.services.physics_service import PhysicsScorer, filter_vehicles
+
+logger = logging.getLogger(__name__)
+
+
+def _near_overlap(vehicles: List[Dict], margin: float) -> bool:
+    """True if any two vehicle boxes intersect once grown by ``margin`` of their size."""
+    boxes = []
+    for v in vehicles:
+        x1, y1, x2, y2 = v['bbox']
+        dx, dy = (x2 - x1) * margin, (y2 - y1) * margin
+        boxes.append((x1 - dx, y1 - dy, x2 + dx, y2 + dy))
+    for i in range(len(boxes)):
+        for j in range(i + 1, len(boxes)):
+            a, b = boxes[i], boxes[j]
+            if min(a[2], b[2]) > max(a[0], b[0]) and min(a[3], b[3]) > max(a[1], b[1]):
+                return True
+    return False
+
+
+class CascadeDetector:
+    """
+    Drop-in replacement for ``YOLODetector`` that runs a light model on
+    every frame and the heavy model only where it matters.
+
+    A frame is escalated to the heavy model when the light model's vehicles
+    (nearly) overlap or the frame's physics score — overlap, motion and size
+    change against the previous screened frame — reaches
+    ``CASCADE_PHYSICS_THRESHOLD``.  Escalated frames take the heavy model's
+    detections; all others keep the light model's, so callers still get one
+    detections-per-frame list.  Hard-gate statistics (vehicle presence) are
+    therefore computed from light detections on quiet frames.
+
+    Motion is measured between consecutive calls from the same thread, so
+    each thread's frames should arrive in temporal order; out-of-order
+    frames only cause extra escalations.  Threads feeding different parts
+    of a video (``long_video_service.detect_video`` segments) therefore
+    never compare frames across segments; call ``reset_motion`` when a
+    thread moves on to unrelated frames.
+    """
+
+    def __init__(
+        self,
+        light: YOLODetector = None,
+        heavy: YOLODetector = None,
+        physics_threshold: float = None,
+        overlap_margin: float = None,
+    ):
+        """
+        Args:
+            light: Screening detector (defaults to CASCADE_LIGHT_MODEL_PATH / yolo11n)
+            heavy: Confirming detector (defaults to YOLO_MODEL_PATH)
+            physics_threshold: Per-frame physics score that escalates a frame
+            overlap_margin: Box growth (fraction of size) for the near-overlap test
+        """
+        self.light = light or YOLODetector(settings.CASCADE_LIGHT_MODEL_PATH, fallback_weights='yolo11n.pt')
+        self.heavy = heavy or YOLODetector()
+        self.physics_threshold = (
+            physics_threshold if physics_threshold is not None else settings.CASCADE_PHYSICS_THRESHOLD
+        )
+        self.overlap_margin = (
+            overlap_margin if overlap_margin is not None else settings.CASCADE_OVERLAP_MARGIN
+        )
+
+        self._motion = threading.local()   # Per calling thread: .scorer, .frame_size
+
+        self.frames_screened = 0
+        self.frames_escalated = 0
+        self.light_seconds = 0.0
+        self.heavy_seconds = 0.0
+
+    def reset(self):
+        """Forget the calling thread's motion history (call between unrelated videos)."""
+        self._motion.scorer = None
+        self._motion.frame_size = None
+
+    def _needs_heavy(self, frame: np.ndarray, light_dets: List[Dict]) -> bool:
+        frame_size = frame.shape[:2]
+        scorer = getattr(self._motion, 'scorer', None)
+        if scorer is None or frame_size != self._motion.frame_size:
+            # history=2: only the previous frame matters for per-frame physics
+            scorer = self._motion.scorer = PhysicsScorer(frame_size=frame_size, history=2)
+            self._motion.frame_size = frame_size
+
+        vehicles = filter_vehicles(light_dets)
+        step = scorer.push(vehicles)
+        if len(vehicles) >= 2 and _near_overlap(vehicles, self.overlap_margin):
+            return True
+        return step['physics'] >= self.physics_threshold
+
+    def detect(self, frame: np.ndarray, conf_threshold: float = 0.25) -> List[Dict]:
+        """Detect objects in one frame (see ``detect_batch``)."""
+        return self.detect_batch([frame], conf_threshold)[0]
+
+    def detect_batch(self, frames: List[np.ndarray], conf_threshold: float = 0.25) -> List[List[Dict]]:
+        """
+        Screen all frames with the light model, re-detect escalated frames
+        with the heavy model in one batch, and merge.
+
+        Raises:
+            RuntimeError: If either model fails
+        """
+        started = time.time()
+        detections = self.light.detect_batch(frames, conf_threshold)
+        self.light_seconds += time.time() - started
+
+        escalate = [
+            i for i, (frame, dets) in enumerate(zip(frames, detections))
+            if frame is not None and frame.size > 0 and self._needs_heavy(frame, dets)
+        ]
+        self.frames_screened += len(frames)
+
+        if escalate:
+            started = time.time()
+            heavy_dets = self.heavy.detect_batch([frames[i] for i in escalate], conf_threshold)
+            self.heavy_seconds += time.time() - started
+            for i, dets in zip(escalate, heavy_dets):
+                detections[i] = dets
+            self.frames_escalated += len(escalate)
+
+        return detections
+
+    @property
+    def escalation_rate(self) -> float:
+        return self.frames_escalated / self.frames_screened if self.frames_screened else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "frames_screened": self.frames_screened,
+            "frames_escalated": self.frames_escalated,
+            "escalation_rate": round(self.escalation_rate, 3),
+            "light_seconds": round(self.light_seconds, 3),
+            "heavy_seconds": round(self.heavy_seconds, 3),
+        }
+
+    def get_device(self) -> str:
+        """Get current device being used"""
+        return self.heavy.get_device() if self.heavy.model is not None else self.light.get_device()
+
+    def cleanup(self):
+        """Release GPU memory"""
+        self.light.cleanup()
+        self.heavy.cleanup()
+
+
+def reset_motion(detector):
+    """
+    ``reset`` the cascade inside ``detector`` (which may be wrapped, e.g. in
+    an ``ROIDetector`` or ``MemoDetector``) for the calling thread; a no-op
+    for other detectors.
+    """
+    while isinstance(detector, (BatchingDetector, MemoDetector, ROIDetector)):
+        detector = detector.detector
+    if isinstance(detector, CascadeDetector):
+        detector.reset()
+
+
+def create_detector():
+    """Detector for video analysis: the cascade when DETECTOR_CASCADE is on."""
+    return CascadeDetector() if settings.DETECTOR_CASCADE else YOLODetector()
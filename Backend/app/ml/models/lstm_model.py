@@ -123,6 +123,48 @@ class LSTMDetector:
             if torch.cuda.is_available():
                 torch.cuda.empty_cache()
 
+    def predict_batch(self, features):
+        """
+        Predict accident probabilities for many sequences in one forward pass
+
+        Args:
+            features: numpy array of shape (batch, sequence_length, feature_dim)
+
+        Returns:
+            list: One accident probability (0-1) per sequence
+
+        Raises:
+            RuntimeError: If model is not loaded or prediction fails
+        """
+        if self.model is None:
+            raise RuntimeError("LSTM model not loaded. Cannot make predictions.")
+
+        features = np.asarray(features, dtype=np.float32)
+        if len(features) == 0:
+            return []
+
+        try:
+            features_tensor = torch.from_numpy(features).to(self.device)
+
+            with torch.no_grad():
+                output = self.model(features_tensor)
+
+            return [float(c) for c in output.view(-1).cpu().numpy()]
+
+        except torch.cuda.OutOfMemoryError:
+            logger.warning("GPU OOM during batched LSTM prediction, falling back to CPU")
+            torch.cuda.empty_cache()
+            self.device = torch.device('cpu')
+            self.model.to(self.device)
+            return self.predict_batch(features)
+        except RuntimeError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"LSTM batch prediction failed: {e}")
+        finally:
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+
     def predict_sequence(self, features):
         """
         Predict frame-by-frame confidences for temporal aggregation
@@ -0,0 +1,83 @@
+"""Detector wrapper that remembers detections by exact frame content"""
+from typing import Dict, List
+import hashlib
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MemoDetector:
+    """
+    Drop-in replacement for ``YOLODetector`` / ``CascadeDetector`` that
+    returns stored detections for frames it has already seen.
+
+    Frames are keyed by a digest of their pixels, so a frame decoded twice
+    (e.g. once from a partially uploaded file and again from the finished
+    one) is only detected once, while any frame that decodes differently
+    is simply a miss — results are always those of the wrapped detector.
+    Not thread-safe: use it from one thread at a time.
+    """
+
+    def __init__(self, detector):
+        """
+        Args:
+            detector: Wrapped detector (anything with ``detect_batch``)
+        """
+        self.detector = detector
+        self._memo: Dict[bytes, List[Dict]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(frame: np.ndarray, conf_threshold: float) -> bytes:
+        digest = hashlib.sha1(usedforsecurity=False)
+        digest.update(f"{frame.shape}|{frame.dtype}|{conf_threshold}".encode())
+        digest.update(np.ascontiguousarray(frame).data)
+        return digest.digest()
+
+    def __len__(self) -> int:
+        return len(self._memo)
+
+    def detect(self, frame: np.ndarray, conf_threshold: float = 0.25) -> List[Dict]:
+        """Detect objects in one frame (see ``detect_batch``)."""
+        return self.detect_batch([frame], conf_threshold)[0]
+
+    def detect_batch(self, frames: List[np.ndarray], conf_threshold: float = 0.25) -> List[List[Dict]]:
+        """
+        Detect only frames not seen before, in one batch, and merge.
+
+        Raises:
+            RuntimeError: If the wrapped detector fails
+        """
+        keys = [
+            self._key(f, conf_threshold) if f is not None and f.size > 0 else None
+            for f in frames
+        ]
+        missing = [i for i, key in enumerate(keys) if key is None or key not in self._memo]
+        self.hits += len(frames) - len(missing)
+        self.misses += len(missing)
+
+        fresh = self.detector.detect_batch([frames[i] for i in missing], conf_threshold) if missing else []
+        detections = [self._memo.get(key) if key is not None else None for key in keys]
+        for i, dets in zip(missing, fresh):
+            detections[i] = dets
+            if keys[i] is not None:
+                self._memo[keys[i]] = dets
+        # Callers may mutate detections (e.g. track ids): hand out copies
+        return [[dict(d) for d in dets] for dets in detections]
+
+    def stats(self) -> dict:
+        return {
+            "frames_memoized": len(self._memo),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def get_device(self) -> str:
+        """Get current device being used"""
+        return self.detector.get_device()
+
+    def cleanup(self):
+        """Release GPU memory"""
+        self.detector.cleanup()
@@ -13,11 +13,23 @@ logger = logging.getLogger(__name__)
 class YOLODetector:
     """YOLOv11 object detector for vehicle detection"""
 
-    def __init__(self):
+    def __init__(self, model_path: str = None, fallback_weights: str = 'yolo11m.pt', imgsz: int = None):
+        """
+        Args:
+            model_path: Local weights (defaults to settings.YOLO_MODEL_PATH)
+            fallback_weights: Ultralytics weights downloaded when model_path is missing
+            imgsz: Inference input size in px (None = the model's own, 640)
+        """
         self.model = None
-        self.model_path = Path(settings.YOLO_MODEL_PATH)
+        self.model_path = Path(model_path or settings.YOLO_MODEL_PATH)
+        self.fallback_weights = fallback_weights
+        self.imgsz = imgsz
         self._device = None
 
+    @property
+    def _predict_args(self) -> dict:
+        return {"imgsz": self.imgsz} if self.imgsz else {}
+
     def load_model(self):
         """Load YOLOv8 model"""
         try:
@@ -36,8 +48,8 @@ class YOLODetector:
 
             try:
                 if not self.model_path.exists():
-                    logger.info("YOLO model not found locally — downloading YOLOv11m (~40 MB)...")
-                    self.model = YOLO('yolo11m.pt')   # YOLOv11 medium — best speed/accuracy balance
+                    logger.info(f"YOLO model not found locally — downloading {self.fallback_weights}...")
+                    self.model = YOLO(self.fallback_weights)   # yolo11m — best speed/accuracy balance
                 else:
                     self.model = YOLO(str(self.model_path))
             finally:
@@ -52,7 +64,7 @@ class YOLODetector:
                 logger.info("Using CPU for inference")
             
             self.model.to(self._device)
-            logger.info(f"YOLOv11m loaded successfully on {self._device}")
+            logger.info(f"YOLO model {self.model_path.name} loaded successfully on {self._device}")
         except ImportError:
             logger.error("ultralytics package not installed")
             raise RuntimeError("ultralytics package required. Install with: pip install ultralytics")
@@ -75,19 +87,11 @@ class YOLODetector:
             return []
 
         try:
-            results = self.model(frame, conf=conf_threshold, verbose=False)
+            results = self.model(frame, conf=conf_threshold, verbose=False, **self._predict_args)
 
             detections = []
             for result in results:
-                boxes = result.boxes
-                for box in boxes:
-                    detection = {
-                        "bbox": box.xyxy[0].cpu().numpy().tolist(),
-                        "confidence": float(box.conf[0]),
-                        "class_id": int(box.cls[0]),
-                        "class_name": result.names[int(box.cls[0])]
-                    }
-                    detections.append(detection)
+                detections.extend(self._parse_result(result))
 
             return detections
 
@@ -103,6 +107,52 @@ class YOLODetector:
             logger.error(f"Detection failed: {str(e)}")
             raise RuntimeError(f"YOLO detection failed: {str(e)}")
 
+    def detect_batch(self, frames: List[np.ndarray], conf_threshold: float = 0.25) -> List[List[Dict]]:
+        """
+        Detect objects in several frames with a single model call.
+
+        Empty / None frames get an empty detection list.
+
+        Raises:
+            RuntimeError: If detection fails critically
+        """
+        if self.model is None:
+            self.load_model()
+
+        detections = [[] for _ in frames]
+        valid = [i for i, f in enumerate(frames) if f is not None and f.size > 0]
+        if not valid:
+            return detections
+
+        try:
+            results = self.model([frames[i] for i in valid], conf=conf_threshold, verbose=False, **self._predict_args)
+            for i, result in zip(valid, results):
+                detections[i] = self._parse_result(result)
+            return detections
+
+        except Exception as e:
+            import torch
+            if isinstance(e, torch.cuda.OutOfMemoryError):
+                logger.warning("GPU OOM during batched YOLO detection, falling back to per-frame")
+                torch.cuda.empty_cache()
+                return [self.detect(f, conf_threshold) for f in frames]
+
+            logger.error(f"Batch detection failed: {str(e)}")
+            raise RuntimeError(f"YOLO detection failed: {str(e)}")
+
+    @staticmethod
+    def _parse_result(result) -> List[Dict]:
+        """Convert one Ultralytics result into detection dicts."""
+        detections = []
+        for box in result.boxes:
+            detections.append({
+                "bbox": box.xyxy[0].cpu().numpy().tolist(),
+                "confidence": float(box.conf[0]),
+                "class_id": int(box.cls[0]),
+                "class_name": result.names[int(box.cls[0])]
+            })
+        return detections
+
     def get_device(self) -> str:
         """Get current device being used"""
         return self._device if self._device else "not loaded"
@@ -0,0 +1,180 @@
+"""Disk cache of decoded, sampled frames as memory-mapped .npy files"""
+from pathlib import Path
+from typing import List, Optional, Sequence
+import hashlib
+import os
+import threading
+import uuid
+import numpy as np
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class FrameCache:
+    """
+    Size-bounded LRU cache of sampled frames, one ``.npy`` file per key.
+
+    Entries are named ``{video_id}__{digest}.npy`` where the video id is the
+    upload's file stem and the digest covers the source file's size and
+    mtime plus the sampling parameters, so a re-uploaded file or a
+    different FPS / range never hits a stale entry.  Hits are opened with
+    ``mmap_mode='r'``: frames are read-only views paged in by the OS, with
+    no decode and no copy.  A hit touches the file's mtime, which is the
+    LRU order used when the directory grows past ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        """
+        Args:
+            cache_dir: Directory for cache files (defaults to FRAME_CACHE_DIR)
+            max_bytes: Total size bound (defaults to FRAME_CACHE_MAX_MB)
+        """
+        self.cache_dir = Path(cache_dir or settings.FRAME_CACHE_DIR)
+        self.max_bytes = (
+            max_bytes if max_bytes is not None else settings.FRAME_CACHE_MAX_MB * 1024 * 1024
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(video_path: Path, *params) -> str:
+        """Cache key for a source video and its sampling parameters."""
+        path = Path(video_path)
+        stat = path.stat()
+        raw = "|".join(str(p) for p in (path.resolve(), stat.st_size, stat.st_mtime_ns, *params))
+        return f"{path.stem}__{hashlib.sha1(raw.encode()).hexdigest()[:16]}"
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.npy"
+
+    def get(self, key: str) -> Optional[List[np.ndarray]]:
+        """Read-only frame views for ``key``, or None on a miss."""
+        path = self._path(key)
+        try:
+            frames = np.asarray(np.load(path, mmap_mode='r'))
+            os.utime(path)
+        except (FileNotFoundError, ValueError, OSError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        logger.info(f"Frame cache hit: {path.name} ({len(frames)} frames)")
+        return list(frames)
+
+    def put(self, key: str, frames: Sequence[np.ndarray]) -> bool:
+        """
+        Store same-shaped frames under ``key`` (atomically; concurrent
+        writers of the same key are harmless).
+
+        Returns:
+            bool: False if the frames could not or should not be cached
+        """
+        if not frames or any(f.shape != frames[0].shape for f in frames):
+            return False
+        nbytes = len(frames) * frames[0].nbytes
+        if nbytes > self.max_bytes:
+            return False
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_dir / f".{key}.{uuid.uuid4().hex}.tmp"
+        try:
+            out = np.lib.format.open_memmap(
+                tmp, mode='w+', dtype=frames[0].dtype, shape=(len(frames),) + frames[0].shape
+            )
+            for i, frame in enumerate(frames):
+                out[i] = frame
+            out.flush()
+            del out
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            logger.warning(f"Frame cache write failed for {key}: {e}")
+            tmp.unlink(missing_ok=True)
+            return False
+
+        self.evict(keep=key)
+        return True
+
+    def entries(self) -> List[Path]:
+        """Cache files, least recently used first."""
+        if not self.cache_dir.exists():
+            return []
+        files = []
+        for path in self.cache_dir.glob("*.npy"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        return [p for _, p in sorted(files)]
+
+    def size_bytes(self) -> int:
+        total = 0
+        for path in self.entries():
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                continue
+        return total
+
+    def evict(self, keep: str = None) -> int:
+        """
+        Delete least-recently-used entries until the cache fits ``max_bytes``.
+
+        Returns:
+            int: Bytes freed
+        """
+        freed = 0
+        with self._lock:
+            sized = []
+            for path in self.entries():
+                try:
+                    sized.append((path, path.stat().st_size))
+                except FileNotFoundError:
+                    continue
+            total = sum(size for _, size in sized)
+            for path, size in sized:
+                if total <= self.max_bytes:
+                    break
+                if keep and path.stem == keep:
+                    continue
+                freed += self._remove(path)
+                total -= size
+        return freed
+
+    def evict_video(self, video_id: str) -> int:
+        """Delete every entry of one video. Returns bytes freed."""
+        if not self.cache_dir.exists():
+            return 0
+        return sum(self._remove(p) for p in self.cache_dir.glob(f"{video_id}__*.npy"))
+
+    def clear(self) -> int:
+        """Delete every entry. Returns bytes freed."""
+        return sum(self._remove(p) for p in self.entries())
+
+    @staticmethod
+    def _remove(path: Path) -> int:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+            logger.info(f"Evicted frame cache entry {path.name}")
+            return size
+        except FileNotFoundError:
+            return 0
+        except OSError as e:
+            # Still mapped by a running analysis on platforms that lock it
+            logger.warning(f"Could not evict {path.name}: {e}")
+            return 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.entries()),
+            "size_mb": round(self.size_bytes() / (1024 * 1024), 1),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Global instance
+frame_cache = FrameCache()
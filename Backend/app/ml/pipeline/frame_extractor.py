@@ -1,94 +1,195 @@
 """Frame extraction from video with error handling and memory efficiency"""
 import cv2
 from pathlib import Path
-from typing import List, Generator
+from typing import List, Generator, Tuple
 import numpy as np
 import logging
 
 from app.core.config import settings
+from app.ml.pipeline.frame_pool import FramePool, frame_pool
+from app.ml.pipeline.frame_cache import FrameCache, frame_cache
 
 logger = logging.getLogger(__name__)
 
+SIGNATURE_SIZE = (64, 36)  # (w, h) thumbnail used for frame differencing
+
+
+def frame_signature(frame: np.ndarray) -> np.ndarray:
+    """Tiny grayscale thumbnail of a frame — cheap input for frame differencing."""
+    small = cv2.resize(frame, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return small.astype(np.float32)
+
+
+def frame_difference(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Mean absolute difference between two signatures, 0 (identical) – 1."""
+    return float(np.mean(np.abs(sig_a - sig_b))) / 255.0
+
 
 class FrameExtractor:
     """Extract frames from video at target FPS with robust error handling"""
 
-    def __init__(self, target_fps: int = None):
+    def __init__(self, target_fps: int = None, pool: FramePool = None, cache: FrameCache = None):
+        """
+        Args:
+            target_fps: Sampling rate (defaults to settings.TARGET_FPS)
+            pool: Buffer pool ``extract_frames`` decodes into (defaults to the shared pool)
+            cache: Decoded-frame cache (defaults to the shared cache when
+                   FRAME_CACHE_ENABLED, otherwise none)
+        """
         self.target_fps = target_fps or settings.TARGET_FPS
+        self.pool = pool if pool is not None else frame_pool
+        if cache is None and settings.FRAME_CACHE_ENABLED:
+            cache = frame_cache
+        self.cache = cache
 
-    def extract_frames(self, video_path: Path) -> List[np.ndarray]:
+    def sampling_interval(self, original_fps: float) -> int:
+        """Raw frames between two sampled frames at the target FPS."""
+        return max(1, int(original_fps / self.target_fps))
+
+    def _open_validated(self, video_path: Path):
         """
-        Extract frames from video with error handling.
+        Open a video and validate FPS, duration and frame count.
+
+        Returns:
+            tuple: (cap, original_fps, total_frames) — caller must release cap
 
         Raises:
             ValueError: If video cannot be opened, has no frames, or exceeds duration limit.
-            RuntimeError: If an unexpected error occurs during extraction.
         """
-        try:
-            # Convert Path to string with proper OS separators
-            video_path_str = str(Path(video_path).resolve())
-            logger.info(f"Opening video file: {video_path_str}")
-            logger.info(f"File exists check: {Path(video_path_str).exists()}")
-            cap = cv2.VideoCapture(video_path_str)
+        # Convert Path to string with proper OS separators
+        video_path_str = str(Path(video_path).resolve())
+        logger.info(f"Opening video file: {video_path_str}")
+        logger.info(f"File exists check: {Path(video_path_str).exists()}")
+        cap = cv2.VideoCapture(video_path_str)
 
-            if not cap.isOpened():
-                raise ValueError(f"Cannot open video file: {video_path_str}. File may be corrupted or use an unsupported codec.")
+        if not cap.isOpened():
+            raise ValueError(f"Cannot open video file: {video_path_str}. File may be corrupted or use an unsupported codec.")
 
-            original_fps = cap.get(cv2.CAP_PROP_FPS)
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        original_fps = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+        # Validate FPS
+        if original_fps <= 0:
+            cap.release()
+            raise ValueError(f"Invalid video FPS ({original_fps}). File may be corrupted.")
 
-            # Validate FPS
-            if original_fps <= 0:
-                cap.release()
-                raise ValueError(f"Invalid video FPS ({original_fps}). File may be corrupted.")
+        # Validate duration
+        duration = total_frames / original_fps
+        if duration <= 0:
+            cap.release()
+            raise ValueError("Video has zero duration.")
 
-            # Validate duration
-            duration = total_frames / original_fps
-            if duration <= 0:
-                cap.release()
-                raise ValueError("Video has zero duration.")
+        max_duration = getattr(settings, 'MAX_VIDEO_DURATION', 300)
+        if duration > max_duration:
+            cap.release()
+            raise ValueError(
+                f"Video duration ({duration:.1f}s) exceeds maximum allowed ({max_duration}s)."
+            )
 
-            max_duration = getattr(settings, 'MAX_VIDEO_DURATION', 300)
-            if duration > max_duration:
-                cap.release()
-                raise ValueError(
-                    f"Video duration ({duration:.1f}s) exceeds maximum allowed ({max_duration}s)."
-                )
+        # Validate frame count
+        if total_frames <= 0:
+            cap.release()
+            raise ValueError("Video contains no frames.")
+
+        return cap, original_fps, total_frames
+
+    def extract_frames(
+        self,
+        video_path: Path,
+        max_frames: int = 150,
+        start_frame: int = 0,
+        end_frame: int = None,
+    ) -> List[np.ndarray]:
+        """
+        Extract frames from video with error handling.
+
+        Args:
+            video_path: Path to the video
+            max_frames: Stop after this many sampled frames
+                        (150 must match training — extract_features.py uses 150)
+            start_frame: First raw frame to consider; the decoder seeks
+                         straight there (rounded up to the sampling grid)
+            end_frame: Raw frame index to stop before (None = end of video)
+
+        Sampled frames are decoded in place into one contiguous block from
+        the buffer pool (skipped frames are only grabbed, never converted);
+        the returned frames are views of that block and should be handed
+        back with ``pool.release(frames)`` once the caller is done.
 
-            # Validate frame count
-            if total_frames <= 0:
-                cap.release()
-                raise ValueError("Video contains no frames.")
+        With a frame cache, a repeat call for the same file and parameters
+        returns read-only memory-mapped frames without decoding; a miss
+        decodes as usual and stores the result.
+
+        Raises:
+            ValueError: If video cannot be opened, has no frames, or exceeds duration limit.
+            RuntimeError: If an unexpected error occurs during extraction.
+        """
+        try:
+            cap, original_fps, total_frames = self._open_validated(video_path)
+            frame_interval = self.sampling_interval(original_fps)
 
-            frame_interval = max(1, int(original_fps / self.target_fps))
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.key(video_path, self.target_fps, max_frames, start_frame, end_frame)
+                cached = self.cache.get(cache_key)
+                if cached:
+                    cap.release()
+                    return cached
 
             frames = []
             frame_count = 0
             extracted = 0
-            max_frames = 150  # Must match training (extract_features.py uses 150)
 
-            while extracted < max_frames:
-                ret, frame = cap.read()
+            if start_frame > 0:
+                frame_count = -(-start_frame // frame_interval) * frame_interval
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_count)
+
+            # One pooled block sized to the geometry and expected sample count
+            stop = total_frames if end_frame is None else min(end_frame, total_frames)
+            expected = min(max_frames, -(-(stop - frame_count) // frame_interval))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            block = None
+            if self.pool.enabled and expected > 0 and height > 0 and width > 0:
+                block = self.pool.acquire((height, width, 3), expected)
+
+            while extracted < max_frames and (end_frame is None or frame_count < end_frame):
+                if frame_count % frame_interval != 0:
+                    if not cap.grab():
+                        break
+                    frame_count += 1
+                    continue
+
+                buf = block[extracted] if block is not None and extracted < len(block) else None
+                ret, frame = cap.read(buf) if buf is not None else cap.read()
                 if not ret:
                     break
 
-                if frame_count % frame_interval == 0:
-                    if frame is not None and frame.size > 0:
-                        frames.append(frame)
-                        extracted += 1
+                if frame is not None and frame.size > 0:
+                    if buf is not None and frame.ctypes.data != buf.ctypes.data:
+                        # Decoded geometry differs from the container's: stop pooling
+                        frames = [f.copy() for f in frames]
+                        self.pool.release(block)
+                        block = None
+                    frames.append(buf if block is not None and buf is not None else frame)
+                    extracted += 1
 
                 frame_count += 1
 
             cap.release()
 
             if not frames:
+                if block is not None:
+                    self.pool.release(block)
                 raise ValueError(
                     f"No valid frames could be extracted from video (read {frame_count} raw frames)."
                 )
 
             logger.info(f"Extracted {extracted} frames from {frame_count} total (interval={frame_interval})")
+            if cache_key is not None:
+                self.cache.put(cache_key, frames)
             return frames
 
         except ValueError:
@@ -98,6 +199,103 @@ class FrameExtractor:
         except Exception as e:
             raise RuntimeError(f"Unexpected error extracting frames: {str(e)}")
 
+    def probe(self, video_path: Path) -> dict:
+        """
+        Validate a video and describe its sampling grid without decoding it.
+
+        Returns:
+            dict: fps, frame_count, interval (raw frames per sample),
+                  sample_count (sampled frames in the whole video)
+
+        Raises:
+            ValueError: Same validation as ``extract_frames``.
+        """
+        cap, original_fps, total_frames = self._open_validated(video_path)
+        cap.release()
+        interval = self.sampling_interval(original_fps)
+        return {
+            "fps": original_fps,
+            "frame_count": total_frames,
+            "interval": interval,
+            "sample_count": -(-total_frames // interval),
+        }
+
+    def iter_frames(
+        self,
+        video_path: Path,
+        start_frame: int = 0,
+        end_frame: int = None,
+    ) -> Generator[Tuple[int, np.ndarray], None, None]:
+        """
+        Yield (raw_frame_index, frame) for sampled frames in [start_frame, end_frame).
+
+        Seeks straight to ``start_frame`` (rounded up to the sampling grid, so
+        the samples are the same ones a sequential read would produce) and
+        holds only one frame at a time.
+
+        Raises:
+            ValueError: If the video cannot be opened.
+            RuntimeError: On OpenCV errors while decoding.
+        """
+        video_path_str = str(Path(video_path).resolve())
+        cap = cv2.VideoCapture(video_path_str)
+        if not cap.isOpened():
+            raise ValueError(f"Cannot open video file: {video_path_str}")
+
+        try:
+            interval = self.sampling_interval(cap.get(cv2.CAP_PROP_FPS))
+            frame_idx = -(-max(start_frame, 0) // interval) * interval
+            if frame_idx > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+
+            while end_frame is None or frame_idx < end_frame:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if frame_idx % interval == 0 and frame is not None and frame.size > 0:
+                    yield frame_idx, frame
+                frame_idx += 1
+        except cv2.error as e:
+            raise RuntimeError(f"OpenCV error processing video: {str(e)}")
+        finally:
+            cap.release()
+
+    def resolve_range(
+        self,
+        video_path: Path,
+        start_seconds: float = None,
+        end_seconds: float = None,
+        start_frame: int = None,
+        end_frame: int = None,
+    ) -> Tuple[int, int]:
+        """
+        Convert a requested time or frame range into raw frame bounds.
+
+        Returns:
+            tuple: (start_frame, end_frame) — end exclusive, clamped to the video
+
+        Raises:
+            ValueError: If the range is empty or starts past the end of the video.
+        """
+        info = self.get_video_info(video_path)
+        fps, frame_count = info["fps"], info["frame_count"]
+
+        if start_seconds is not None:
+            start_frame = int(start_seconds * fps)
+        if end_seconds is not None:
+            end_frame = int(round(end_seconds * fps))
+
+        start = max(0, start_frame or 0)
+        end = frame_count if end_frame is None else min(end_frame, frame_count)
+
+        if start >= frame_count:
+            raise ValueError(
+                f"Range starts at frame {start}, past the end of the video ({frame_count} frames)."
+            )
+        if end <= start:
+            raise ValueError(f"Empty analysis range: frames {start}-{end}.")
+        return start, end
+
     def get_video_info(self, video_path: Path) -> dict:
         """Get video metadata with error handling"""
         try:
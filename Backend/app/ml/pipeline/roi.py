@@ -0,0 +1,94 @@
+"""Region-of-interest masks for fixed cameras"""
+from typing import Dict, List, Sequence, Tuple
+import cv2
+import numpy as np
+
+
+class RegionMask:
+    """
+    Union of polygons marking where relevant traffic can appear.
+
+    Polygons are given in normalised (x, y) coordinates in [0, 1] so one
+    mask fits every resolution a camera is recorded at; the pixel mask and
+    its bounding rectangle are rasterised once per frame size and cached.
+
+    ``crop`` returns the bounding rectangle of the mask as a view (no copy)
+    for the detector, ``restore`` shifts the detector's boxes back to frame
+    coordinates and drops those whose centre falls outside the polygons.
+    """
+
+    def __init__(self, polygons: Sequence[Sequence[Sequence[float]]], name: str = None, roi_id: str = None):
+        """
+        Args:
+            polygons: List of polygons, each a list of >= 3 normalised [x, y] points
+            name: Label reported in analysis details
+            roi_id: Id of the stored ROI this mask was loaded from
+
+        Raises:
+            ValueError: If a polygon has fewer than 3 points or leaves [0, 1]
+        """
+        if not polygons:
+            raise ValueError("ROI needs at least one polygon")
+        self.polygons = []
+        for polygon in polygons:
+            points = np.asarray(polygon, dtype=np.float64)
+            if points.ndim != 2 or points.shape[1] != 2 or len(points) < 3:
+                raise ValueError("Each ROI polygon needs at least 3 [x, y] points")
+            if points.min() < 0.0 or points.max() > 1.0:
+                raise ValueError("ROI coordinates must be normalised to [0, 1]")
+            self.polygons.append(points)
+        self.name = name
+        self.roi_id = roi_id
+        self._cache: Dict[Tuple[int, int], Tuple[np.ndarray, Tuple[int, int, int, int]]] = {}
+
+    def _rasterise(self, frame_size: Tuple[int, int]):
+        cached = self._cache.get(frame_size)
+        if cached is None:
+            h, w = frame_size
+            mask = np.zeros((h, w), dtype=np.uint8)
+            scale = np.array([w - 1, h - 1], dtype=np.float64)
+            pixel_polys = [np.round(p * scale).astype(np.int32) for p in self.polygons]
+            cv2.fillPoly(mask, pixel_polys, 1)
+            ys, xs = np.nonzero(mask)
+            if len(xs) == 0:
+                bounds = (0, 0, w, h)
+            else:
+                bounds = (int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
+            cached = self._cache[frame_size] = (mask, bounds)
+        return cached
+
+    def mask(self, frame_size: Tuple[int, int]) -> np.ndarray:
+        """Binary (h, w) mask, 1 inside the polygons."""
+        return self._rasterise(tuple(frame_size))[0]
+
+    def bounds(self, frame_size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        """Pixel bounding rectangle (x1, y1, x2, y2) of the mask."""
+        return self._rasterise(tuple(frame_size))[1]
+
+    def coverage(self, frame_size: Tuple[int, int]) -> float:
+        """Fraction of the frame the detector still sees after cropping."""
+        x1, y1, x2, y2 = self.bounds(frame_size)
+        h, w = frame_size
+        return (x2 - x1) * (y2 - y1) / float(h * w)
+
+    def crop(self, frame: np.ndarray) -> np.ndarray:
+        """Bounding-rectangle view of ``frame`` (shares memory with it)."""
+        x1, y1, x2, y2 = self.bounds(frame.shape[:2])
+        return frame[y1:y2, x1:x2]
+
+    def restore(self, detections: List[Dict], frame_size: Tuple[int, int]) -> List[Dict]:
+        """
+        Map detections on the crop back to frame coordinates and keep only
+        those whose box centre lies inside the polygons.
+        """
+        mask, (x1, y1, _, _) = self._rasterise(tuple(frame_size))
+        h, w = mask.shape
+        kept = []
+        for det in detections:
+            bx1, by1, bx2, by2 = det['bbox']
+            bbox = [bx1 + x1, by1 + y1, bx2 + x1, by2 + y1]
+            cx = min(max(int((bbox[0] + bbox[2]) / 2), 0), w - 1)
+            cy = min(max(int((bbox[1] + bbox[3]) / 2), 0), h - 1)
+            if mask[cy, cx]:
+                kept.append({**det, 'bbox': bbox})
+        return kept
@@ -0,0 +1,191 @@
+"""Continuous frame reader for live camera feeds and file stand-ins"""
+import cv2
+import threading
+import time
+from typing import Generator, Tuple, Union
+import numpy as np
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LIVE_PREFIXES = ("rtsp://", "rtsps://", "rtmp://", "http://", "https://", "udp://", "tcp://")
+
+
+def parse_source(source: Union[str, int]) -> Union[str, int]:
+    """Device indices ("0", "1", ...) become ints; URLs / paths pass through."""
+    if isinstance(source, int):
+        return source
+    source = str(source).strip()
+    return int(source) if source.isdigit() else source
+
+
+def is_live_source(source: Union[str, int]) -> bool:
+    """Camera devices and network URLs are live; anything else is a file."""
+    source = parse_source(source)
+    return isinstance(source, int) or source.lower().startswith(LIVE_PREFIXES)
+
+
+class StreamReader:
+    """
+    Read frames from a URL, device or file, sampled at target FPS.
+
+    Live sources are drained by a background grabber thread that only keeps
+    the newest frame, so a slow consumer drops frames instead of building
+    up decoder backlog (lag stays bounded).  File sources are read
+    sequentially — optionally paced at native speed to stand in for a
+    real camera in tests.
+    """
+
+    def __init__(
+        self,
+        source: Union[str, int],
+        target_fps: float = None,
+        realtime: bool = False,
+        reconnect_delay: float = None,
+    ):
+        """
+        Args:
+            source: RTSP/HTTP URL, device index or local file path
+            target_fps: Sampling rate (defaults to settings.TARGET_FPS)
+            realtime: Pace file sources at their native frame rate
+            reconnect_delay: Seconds to wait before reopening a dropped live feed
+        """
+        self.source = parse_source(source)
+        self.live = is_live_source(self.source)
+        self.target_fps = target_fps or settings.TARGET_FPS
+        self.realtime = realtime
+        self.reconnect_delay = (
+            reconnect_delay if reconnect_delay is not None else settings.STREAM_RECONNECT_DELAY
+        )
+
+        self.frames_read = 0
+        self.frames_sampled = 0
+        self.source_fps = 0.0
+
+        self._stop = threading.Event()
+        self._latest: Tuple[float, np.ndarray] | None = None
+        self._latest_lock = threading.Condition()
+        self._grabber: threading.Thread | None = None
+
+    def _open(self) -> cv2.VideoCapture:
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            cap.release()
+            raise ValueError(f"Cannot open stream source: {self.source}")
+        self.source_fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        return cap
+
+    def stop(self):
+        """Signal the reader (and grabber thread) to stop."""
+        self._stop.set()
+        with self._latest_lock:
+            self._latest_lock.notify_all()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    @property
+    def frames_skipped(self) -> int:
+        """Frames read from the source but never handed to the consumer."""
+        return max(self.frames_read - self.frames_sampled, 0)
+
+    def set_target_fps(self, target_fps: float):
+        """Change the sampling rate of a running reader."""
+        self.target_fps = max(float(target_fps), 0.1)
+
+    def frames(self) -> Generator[Tuple[float, np.ndarray], None, None]:
+        """
+        Yield (capture_timestamp, frame) tuples until the source ends or
+        ``stop()`` is called.
+
+        capture_timestamp is wall-clock time (``time.time()``) at which the
+        frame was read, so consumers can measure end-to-end lag.
+
+        Raises:
+            ValueError: If the source cannot be opened initially
+        """
+        if self.live:
+            yield from self._live_frames()
+        else:
+            yield from self._file_frames()
+
+    # ── File sources ─────────────────────────────────────────────────
+
+    def _file_frames(self):
+        cap = self._open()
+        native_fps = self.source_fps if self.source_fps > 0 else float(self.target_fps)
+        frame_count = 0
+        next_sample = 0.0
+        started = time.time()
+        try:
+            while not self._stop.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                self.frames_read += 1
+                position = frame_count / native_fps
+                frame_count += 1
+
+                if position + 1e-9 < next_sample:
+                    continue
+                next_sample += 1.0 / self.target_fps
+                if frame is None or frame.size == 0:
+                    continue
+
+                if self.realtime:
+                    delay = started + position - time.time()
+                    if delay > 0:
+                        self._stop.wait(delay)
+
+                self.frames_sampled += 1
+                yield time.time(), frame
+        finally:
+            cap.release()
+
+    # ── Live sources ─────────────────────────────────────────────────
+
+    def _grab_loop(self, cap: cv2.VideoCapture):
+        """Continuously read the feed, keeping only the newest frame."""
+        while not self._stop.is_set():
+            ret, frame = cap.read()
+            if not ret or frame is None:
+                cap.release()
+                logger.warning(f"Stream {self.source} dropped — reconnecting in {self.reconnect_delay}s")
+                while not self._stop.wait(self.reconnect_delay):
+                    try:
+                        cap = self._open()
+                        break
+                    except ValueError:
+                        logger.warning(f"Reconnect to {self.source} failed")
+                continue
+
+            self.frames_read += 1
+            with self._latest_lock:
+                self._latest = (time.time(), frame)
+                self._latest_lock.notify_all()
+        cap.release()
+
+    def _live_frames(self):
+        cap = self._open()
+        self._grabber = threading.Thread(
+            target=self._grab_loop, args=(cap,), name=f"stream-grab-{self.source}", daemon=True
+        )
+        self._grabber.start()
+
+        next_due = time.time()
+        while not self._stop.is_set():
+            wait = next_due - time.time()
+            if wait > 0 and self._stop.wait(wait):
+                break
+            with self._latest_lock:
+                while self._latest is None and not self._stop.is_set():
+                    self._latest_lock.wait(timeout=1.0)
+                if self._stop.is_set():
+                    break
+                item, self._latest = self._latest, None
+            next_due = max(next_due + 1.0 / self.target_fps, time.time())
+            self.frames_sampled += 1
+            yield item
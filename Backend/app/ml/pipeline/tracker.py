@@ -0,0 +1,224 @@
+"""Lightweight IoU / centroid multi-object tracker"""
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+try:  # scipy ships with scikit-learn; greedy matching is the fallback
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # pragma: no cover - depends on environment
+    linear_sum_assignment = None
+
+# Cost assigned to pairs that may not be matched
+_NO_MATCH = 1e6
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise IoU of two box arrays.
+
+    Args:
+        a: (N, 4) boxes [x1, y1, x2, y2]
+        b: (M, 4) boxes
+
+    Returns:
+        np.ndarray: (N, M) IoU values
+    """
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return inter / np.maximum(union, 1)
+
+
+def match(cost: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Minimum-cost one-to-one assignment, ignoring pairs at ``_NO_MATCH``.
+
+    Uses the Hungarian algorithm when scipy is available, otherwise a
+    greedy lowest-cost-first pass (optimal whenever each detection has a
+    single plausible track, which is the common case at 10 fps).
+    """
+    if cost.size == 0:
+        return []
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(cost)
+        pairs = zip(rows.tolist(), cols.tolist())
+    else:
+        order = np.argsort(cost, axis=None, kind='stable')
+        used_r, used_c, pairs = set(), set(), []
+        for flat in order.tolist():
+            r, c = divmod(flat, cost.shape[1])
+            if r in used_r or c in used_c:
+                continue
+            used_r.add(r)
+            used_c.add(c)
+            pairs.append((r, c))
+    return [(r, c) for r, c in pairs if cost[r, c] < _NO_MATCH]
+
+
+class Track:
+    """One tracked object: last box plus bounded center / area history."""
+
+    def __init__(self, track_id: int, bbox, class_name: str = None, history: int = 30):
+        self.track_id = track_id
+        self.class_name = class_name
+        self.bbox = [float(v) for v in bbox]
+        self.centers: deque = deque([_center(self.bbox)], maxlen=history)
+        self.areas: deque = deque([_area(self.bbox)], maxlen=history)
+        self.hits = 1
+        self.missed = 0
+
+    def update(self, bbox) -> Tuple[float, float]:
+        """Move to ``bbox``; returns (displacement per frame in px, relative area change)."""
+        gap = self.missed + 1
+        prev_center, prev_area = self.centers[-1], self.areas[-1]
+        self.bbox = [float(v) for v in bbox]
+        center, area = _center(self.bbox), _area(self.bbox)
+        self.centers.append(center)
+        self.areas.append(area)
+        self.hits += 1
+        self.missed = 0
+        displacement = ((center[0] - prev_center[0]) ** 2 + (center[1] - prev_center[1]) ** 2) ** 0.5
+        return displacement / gap, abs(area - prev_area) / max(prev_area, 1)
+
+    @property
+    def velocities(self) -> np.ndarray:
+        """(K-1, 2) per-step center displacement in pixels."""
+        centers = np.array(self.centers)
+        return np.diff(centers, axis=0) if len(centers) > 1 else np.zeros((0, 2))
+
+    @property
+    def area_changes(self) -> np.ndarray:
+        """(K-1,) per-step relative area change."""
+        areas = np.array(self.areas)
+        return np.abs(np.diff(areas)) / np.maximum(areas[:-1], 1) if len(areas) > 1 else np.zeros(0)
+
+
+class IoUTracker:
+    """
+    Associates detections frame to frame and keeps stable track ids.
+
+    Each frame the live tracks are matched to the new boxes on a cost of
+    ``1 - IoU``; pairs below ``iou_threshold`` may still match on centroid
+    distance (within ``max_distance`` of the frame diagonal) at a cost
+    worse than any IoU match, which keeps fast-moving or sparsely sampled
+    vehicles on their track.  Tracks unmatched for more than ``max_missed``
+    frames are dropped.
+
+    ``update`` returns one record per input box, so motion and size-change
+    can be measured per object instead of by list position.
+    """
+
+    def __init__(
+        self,
+        frame_size: Tuple[int, int] = (480, 640),
+        iou_threshold: float = 0.3,
+        max_distance: float = 0.1,
+        max_missed: int = 2,
+        history: int = 30,
+    ):
+        """
+        Args:
+            frame_size: (height, width) of the frames being tracked
+            iou_threshold: Minimum IoU for an overlap match
+            max_distance: Centroid gate for non-overlapping matches (fraction of diagonal)
+            max_missed: Frames a track survives without a match
+            history: Centers / areas kept per track
+        """
+        frame_h, frame_w = frame_size
+        self.frame_diag = (frame_w**2 + frame_h**2) ** 0.5
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.history = history
+        self.reset()
+
+    def reset(self):
+        """Forget all tracks (call between unrelated videos)."""
+        self.tracks: List[Track] = []
+        self._next_id = 1
+
+    def _cost(self, boxes: np.ndarray) -> np.ndarray:
+        prev = np.array([t.bbox for t in self.tracks])
+        iou = iou_matrix(prev, boxes)
+        prev_c = (prev[:, :2] + prev[:, 2:]) / 2
+        cur_c = (boxes[:, :2] + boxes[:, 2:]) / 2
+        dist = np.linalg.norm(prev_c[:, None, :] - cur_c[None, :, :], axis=2) / self.frame_diag
+
+        gate = max(self.max_distance, 1e-9)
+        cost = np.full(iou.shape, _NO_MATCH)
+        near = dist <= gate
+        cost[near] = 1.0 + dist[near] / gate
+        overlap = iou >= self.iou_threshold
+        cost[overlap] = 1.0 - iou[overlap]
+        return cost
+
+    def update(self, detections: List[Dict]) -> List[Dict]:
+        """
+        Advance the tracker by one frame.
+
+        Args:
+            detections: Detection dicts with ``bbox`` (normally vehicles only)
+
+        Returns:
+            list: Per detection (same order) ``{'track_id', 'continued',
+                  'speed', 'area_change'}``; speed is the per-frame center
+                  displacement over the frame diagonal, both signals are
+                  0.0 for new tracks
+        """
+        boxes = np.array([d['bbox'] for d in detections], dtype=np.float64).reshape(-1, 4)
+        records: List[Optional[Dict]] = [None] * len(detections)
+
+        pairs = match(self._cost(boxes)) if self.tracks and len(boxes) else []
+        matched_tracks = set()
+        for t_idx, d_idx in pairs:
+            track = self.tracks[t_idx]
+            displacement, area_change = track.update(boxes[d_idx])
+            matched_tracks.add(t_idx)
+            records[d_idx] = {
+                'track_id': track.track_id,
+                'continued': True,
+                'speed': displacement / self.frame_diag,
+                'area_change': area_change,
+            }
+
+        survivors = []
+        for t_idx, track in enumerate(self.tracks):
+            if t_idx not in matched_tracks:
+                track.missed += 1
+                if track.missed > self.max_missed:
+                    continue
+            survivors.append(track)
+        self.tracks = survivors
+
+        for d_idx, record in enumerate(records):
+            if record is None:
+                track = Track(
+                    self._next_id, boxes[d_idx], detections[d_idx].get('class_name'), self.history
+                )
+                self._next_id += 1
+                self.tracks.append(track)
+                records[d_idx] = {
+                    'track_id': track.track_id, 'continued': False, 'speed': 0.0, 'area_change': 0.0,
+                }
+        return records
+
+    def get(self, track_id: int) -> Optional[Track]:
+        for track in self.tracks:
+            if track.track_id == track_id:
+                return track
+        return None
+
+
+def _center(bbox) -> Tuple[float, float]:
+    return ((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
+
+
+def _area(bbox) -> float:
+    return (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
@@ -0,0 +1,140 @@
+"""Analyse-and-store shared by the single, upload and bulk analysis routes"""
+from collections import OrderedDict
+import json
+import logging
+
+from fastapi import HTTPException, Request
+from sqlalchemy.orm import Session
+
+from app.api.v1.schemas.video import VideoAnalyzeResponse
+from app.core.config import settings
+from app.db import crud
+from app.services.flight_service import analysis_flights
+from app.services.inference_service import analyze_video_file
+from app.services.progress_service import AnalysisCancelled, AnalysisProgress
+
+logger = logging.getLogger(__name__)
+
+# In-memory LRU cache for fast explanation lookups (DB is the source of truth)
+_CACHE_MAX_SIZE = 100
+results_cache: OrderedDict = OrderedDict()
+
+
+def cache_result(key: str, value: dict):
+    """Add to cache with LRU eviction."""
+    results_cache[key] = value
+    results_cache.move_to_end(key)
+    while len(results_cache) > _CACHE_MAX_SIZE:
+        results_cache.popitem(last=False)
+
+
+async def analyze_and_store(
+    db: Session, video_id: str, request: Request = None, key: str = None, **options
+) -> VideoAnalyzeResponse:
+    """
+    Run the analysis, persist result, frames and events, and cache the result.
+
+    The run is tracked as job ``video_id`` (see ``/jobs``).  Concurrent
+    calls with the same ``key`` (``flight_key``) share one run, in this
+    worker or another; it is cancelled once every client that asked for it
+    (``request``) has disconnected.
+    """
+    response = await analysis_flights.run(
+        db, key, video_id, lambda progress: _run_and_store(db, video_id, progress, **options), request,
+    )
+    return VideoAnalyzeResponse(**response)
+
+
+async def _run_and_store(db: Session, video_id: str, progress: AnalysisProgress, **options) -> dict:
+    """Body of ``analyze_and_store`` for the request that owns the run (returns the JSON response)."""
+    try:
+        # Update status to processing
+        crud.update_video_status(db, video_id, "processing")
+
+        result = await analyze_video_file(video_id, db, progress=progress, **options)
+
+        # Save analysis result to database
+        progress.stage("persist")
+        crud.create_analysis_result(db, result)
+    
+        # Save accident frames to database if any
+        if result["status"] == "accident" and result.get("details", {}).get("accidentFrameUrls"):
+            frame_urls = result["details"]["accidentFrameUrls"]
+            frames_data = [
+                {
+                    'index': int(url.split('_')[-1].split('.')[0]),  # Extract frame index from URL
+                    'path': url,
+                    'confidence': 1.0
+                }
+                for url in frame_urls
+            ]
+            if frames_data:
+                crud.create_accident_frames(db, video_id, result["id"], frames_data)
+
+        # Save detected events to database (frames are absolute sample indices,
+        # so times use the rate the run actually sampled at: details.sampleFps
+        # is the source fps over the whole-frame interval, after any quality
+        # downgrade; the profile's nominal rate is only a fallback)
+        event_frames = result.get("details", {}).get("eventFrames", [])
+        if event_frames:
+            details = result["details"]
+            sample_fps = (
+                details.get("sampleFps")
+                or details.get("analysisRange", {}).get("sampleFps")
+                or details.get("profile", {}).get("sampleFps")
+                or settings.TARGET_FPS
+            )
+            crud.create_accident_events(db, video_id, result["id"], event_frames, fps=sample_fps)
+
+        # Update video status
+        crud.update_video_status(db, video_id, "completed")
+
+        # Cache result for fast explanation lookups (LRU-evicted)
+        cache_result(result["id"], result)
+        logger.info(f"Analysis complete. Result saved: {result['id']}")
+    except Exception as e:
+        progress.fail(str(e))
+        raise
+    progress.finish(result["id"])
+
+    return VideoAnalyzeResponse(
+        id=result["id"],
+        status=result["status"],
+        confidence=result["confidence"],
+        timestamp=result["timestamp"],
+        details=result["details"],
+        inference_time=result.get("inference_time"),
+        isAccident=result.get("isAccident", False),
+        accidentType=result.get("accidentType"),
+        severity=result.get("severity", "none"),
+        frameEvidence=result.get("frameEvidence", ""),
+        reasoning=result.get("reasoning", ""),
+    ).model_dump()
+
+
+def analysis_failed(db: Session, video_id: str, e: Exception) -> HTTPException:
+    """Mark the video failed and map the analysis error to an HTTP error."""
+    if isinstance(e, FileNotFoundError):
+        logger.error(f"Video file not found: {video_id}")
+        crud.update_video_status(db, video_id, "failed")
+        return HTTPException(status_code=404, detail="Video file not found on disk")
+    if isinstance(e, TimeoutError):
+        logger.error(f"Analysis timed out: {video_id}")
+        crud.update_video_status(db, video_id, "failed")
+        return HTTPException(status_code=504, detail=f"Analysis timed out: {str(e)}")
+    if isinstance(e, AnalysisCancelled):
+        logger.info(f"Analysis cancelled: {video_id} ({e})")
+        crud.update_video_status(db, video_id, "cancelled")
+        return HTTPException(status_code=409, detail=f"Analysis cancelled: {str(e)}")
+    if isinstance(e, RuntimeError):
+        logger.error(f"Analysis runtime error: {str(e)}")
+        crud.update_video_status(db, video_id, "failed")
+        return HTTPException(status_code=500, detail=str(e))
+    logger.error(f"Analysis failed: {str(e)}", exc_info=True)
+    crud.update_video_status(db, video_id, "failed")
+    return HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+
+def sse_event(event: str, data: dict) -> str:
+    """One server-sent event (``event`` name plus JSON ``data``)."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,314 @@
+"""Bulk analysis: many videos as one job sharing detector, LSTM and worker threads"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+import threading
+import time
+import uuid
+import logging
+
+from app.core.config import settings
+from app.ml.models.batching_detector import BatchingDetector
+from app.ml.models.cascade_detector import CascadeDetector
+from app.services.profile_service import AnalysisProfile
+from app.services.progress_service import AnalysisCancelled, progress_tracker
+from app.services.stream_service import get_shared_lstm
+
+logger = logging.getLogger(__name__)
+
+
+class BulkJob:
+    """
+    One bulk analysis: the videos, how far it got, and what it shares.
+
+    Videos run BULK_CONCURRENCY at a time on the job's own threads, so a
+    large batch does not hold the ANALYSIS_WORKERS pool that interactive
+    ``/analyze`` requests queue on.  They share the detector's models —
+    each wrapped in a ``BatchingDetector``, so frames of videos analysed at
+    the same time reach a model as one batch — and one LSTM.  A cascade's
+    motion gating is per-video state, so every video gets its own
+    ``CascadeDetector`` over the shared light and heavy models and is gated
+    exactly as a single ``/analyze`` would be.  Each video is still an
+    ordinary analysis (job ``video_id`` in ``/jobs``, stored result).
+    """
+
+    def __init__(
+        self,
+        video_ids: List[str],
+        profile: AnalysisProfile,
+        long_video: bool = None,
+        two_pass: bool = None,
+        concurrency: int = None,
+    ):
+        """
+        Args:
+            video_ids: Videos to analyse, in order (duplicates are dropped)
+            profile: Analysis profile of every video
+            long_video: As for ``/analyze`` (None = the profile's, else LONG_VIDEO_MODE)
+            two_pass: As for ``/analyze`` (None = TWO_PASS_MODE)
+            concurrency: Videos analysed at once (defaults to BULK_CONCURRENCY)
+        """
+        self.id = str(uuid.uuid4())
+        self.video_ids = list(dict.fromkeys(video_ids))
+        self.profile = profile
+        self.long_video = long_video
+        self.two_pass = two_pass
+        self.concurrency = max(1, min(concurrency or settings.BULK_CONCURRENCY, len(self.video_ids) or 1))
+        self.status = "queued"            # queued | running | completed | cancelled | failed
+        self.error: Optional[str] = None
+        self.cancel_reason: Optional[str] = None
+        self.results: List[dict] = []     # Per-video outcomes in completion order
+        self.running: Dict[str, float] = {}   # video_id -> start time
+        self.version = 0
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+        self.models: Dict[str, BatchingDetector] = {}   # Shared, batched: "model" or "light" + "heavy"
+        self._cascade: Optional[CascadeDetector] = None
+        self.lstm_detector = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def open(self):
+        """Load the shared models and start the job's threads (blocking)."""
+        detector = self.profile.create_detector()
+        if isinstance(detector, CascadeDetector):
+            self._cascade = detector
+            models = {"light": detector.light, "heavy": detector.heavy}
+        else:
+            models = {"model": detector}
+        self.models = {role: BatchingDetector(model, settings.BULK_DETECT_BATCH) for role, model in models.items()}
+        self.lstm_detector = get_shared_lstm()
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=f"bulk-{self.id[:8]}")
+
+    def video_detector(self):
+        """Detector for one video: the shared model, or a fresh cascade over the shared models."""
+        if self._cascade is None:
+            return self.models["model"]
+        return CascadeDetector(
+            light=self.models["light"], heavy=self.models["heavy"],
+            physics_threshold=self._cascade.physics_threshold, overlap_margin=self._cascade.overlap_margin,
+        )
+
+    def detector_stats(self) -> Optional[dict]:
+        """Batching statistics of each shared model (None before ``open``)."""
+        return {role: model.stats() for role, model in self.models.items()} or None
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+
+    def take(self) -> Optional[str]:
+        """Next video to analyse and mark it running; None when none is left."""
+        with self._lock:
+            if self.cancelled or self._next >= len(self.video_ids):
+                return None
+            video_id = self.video_ids[self._next]
+            self._next += 1
+            self.running[video_id] = time.time()
+            self.version += 1
+            return video_id
+
+    def record(self, video_id: str, status: str, response: dict = None, error: str = None):
+        """Outcome of one video (completed | failed | cancelled)."""
+        with self._lock:
+            started = self.running.pop(video_id, None)
+            self.results.append({
+                "videoId": video_id,
+                "status": status,
+                "result": response,
+                "error": error,
+                "elapsed": round(time.time() - started, 2) if started is not None else 0.0,
+            })
+            self.version += 1
+
+    def finish(self, status: str = None, error: str = None):
+        with self._lock:
+            # Videos never started count as cancelled
+            for video_id in self.video_ids[self._next:]:
+                self.results.append({"videoId": video_id, "status": "cancelled", "result": None,
+                                     "error": self.cancel_reason, "elapsed": 0.0})
+            self._next = len(self.video_ids)
+            self.status = status or ("cancelled" if self.cancelled else "completed")
+            self.error = error
+            self.finished_at = time.time()
+            self.version += 1
+
+    def cancel(self, reason: str = "Cancelled") -> bool:
+        """Skip the videos not started yet and cancel the running ones; False once finished."""
+        with self._lock:
+            if self.finished or self.cancelled:
+                return False
+            self.cancel_reason = reason
+            running = list(self.running)
+            self.version += 1
+        for video_id in running:
+            progress_tracker.cancel(video_id, reason)
+        return True
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_reason is not None
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def results_since(self, start: int) -> List[dict]:
+        """Per-video outcomes from index ``start`` on (summary plus the full response)."""
+        with self._lock:
+            return [dict(_summary(item), result=item["result"]) for item in self.results[start:]]
+
+    def progress_version(self) -> tuple:
+        """Changes whenever the job or one of its running videos progresses."""
+        runs = [progress_tracker.get(video_id) for video_id in list(self.running)]
+        return (self.version, tuple(run.version if run is not None else -1 for run in runs))
+
+    def snapshot(self, results: bool = True) -> dict:
+        """Aggregate state as sent to clients (``results``: include the per-video summaries)."""
+        with self._lock:
+            counts = {status: 0 for status in ("completed", "failed", "cancelled")}
+            for item in self.results:
+                counts[item["status"]] += 1
+            done = len(self.results)
+            total = len(self.video_ids)
+            running = list(self.running)
+            now = self.finished_at or time.time()
+            elapsed = now - self.created_at
+            eta = None
+            if 0 < done < total and not self.finished:
+                eta = round(elapsed / done * (total - done), 1)
+            summaries = [_summary(item) for item in self.results] if results else None
+
+        # Progress of the videos being analysed right now
+        active = []
+        for video_id in running:
+            run = progress_tracker.get(video_id)
+            if run is not None:
+                snapshot = run.snapshot()
+                active.append({key: snapshot[key] for key in ("videoId", "stage", "done", "total", "elapsed")})
+        snapshot = {
+            "batchId": self.id,
+            "status": self.status,
+            "profile": self.profile.name,
+            "total": total,
+            "done": done,
+            **counts,
+            "running": len(running),
+            "pending": total - done - len(running),
+            "percent": round(100.0 * done / total, 1) if total else 100.0,
+            "elapsed": round(elapsed, 1),
+            "eta": eta,
+            "active": active,
+            "detector": self.detector_stats(),
+            "error": self.error,
+            "cancelRequested": self.cancelled,
+        }
+        if summaries is not None:
+            snapshot["results"] = summaries
+        return snapshot
+
+
+def _summary(item: dict) -> dict:
+    """Per-video outcome without the full analysis response."""
+    response = item["result"] or {}
+    return {
+        "videoId": item["videoId"],
+        "status": item["status"],
+        "resultId": response.get("id"),
+        "isAccident": response.get("isAccident"),
+        "confidence": response.get("confidence"),
+        "severity": response.get("severity"),
+        "error": item["error"],
+        "elapsed": item["elapsed"],
+    }
+
+
+class BulkTracker:
+    """Bulk jobs of this worker (finished ones stay readable for PROGRESS_RETENTION)."""
+
+    def __init__(self, retention: float = None):
+        """
+        Args:
+            retention: Seconds a finished job stays readable (defaults to PROGRESS_RETENTION)
+        """
+        self.retention = retention if retention is not None else settings.PROGRESS_RETENTION
+        self._jobs: Dict[str, BulkJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, job: BulkJob, analyze: Callable[[BulkJob, str], Awaitable[dict]]) -> BulkJob:
+        """
+        Start ``job`` on the running event loop.
+
+        Args:
+            job: Job to run
+            analyze: Analyses and stores one video of the job, returns its
+                     JSON response; raises ``AnalysisCancelled`` or another
+                     exception (whose message is the video's error)
+        """
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        task = asyncio.create_task(self._run(job, analyze))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        return job
+
+    def get(self, batch_id: str) -> Optional[BulkJob]:
+        with self._lock:
+            return self._jobs.get(batch_id)
+
+    async def _run(self, job: BulkJob, analyze):
+        logger.info(f"Bulk job {job.id}: {len(job.video_ids)} videos, {job.concurrency} at a time")
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, job.open)
+        except Exception as e:
+            logger.error(f"Bulk job {job.id} could not load its models: {e}", exc_info=True)
+            job.finish("failed", str(e))
+            return
+        job.status = "running"
+        status = error = None
+        try:
+            await asyncio.gather(*[self._worker(job, analyze) for _ in range(job.concurrency)])
+        except asyncio.CancelledError:
+            status, error = "cancelled", job.cancel_reason or "Cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Bulk job {job.id} failed: {e}", exc_info=True)
+            status, error = "failed", str(e)
+            # Stop the videos the other workers are still analysing
+            job.cancel(f"Bulk job failed: {e}")
+        finally:
+            job.close()
+            job.finish(status, error)
+        logger.info(f"Bulk job {job.id} {job.status}: {job.detector_stats()}")
+
+    async def _worker(self, job: BulkJob, analyze):
+        while True:
+            video_id = job.take()
+            if video_id is None:
+                return
+            try:
+                response = await analyze(job, video_id)
+            except AnalysisCancelled as e:
+                job.record(video_id, "cancelled", error=str(e))
+            except asyncio.CancelledError:
+                job.record(video_id, "cancelled", error="Cancelled")
+                raise
+            except Exception as e:
+                logger.warning(f"Bulk job {job.id}: {video_id} failed: {e}")
+                job.record(video_id, "failed", error=str(e))
+            else:
+                job.record(video_id, "completed", response)
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        for batch_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and job.finished_at < cutoff:
+                del self._jobs[batch_id]
+
+
+# Global instance
+bulk_jobs = BulkTracker()
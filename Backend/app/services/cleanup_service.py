@@ -7,6 +7,9 @@ from pathlib import Path
 from app.core.config import settings
 from app.db.database import SessionLocal
 from app.db.models import Video
+from app.ml.pipeline.frame_cache import frame_cache
+from app.services.evidence_service import evidence_service
+from app.services.upload_service import chunked_uploads
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +19,10 @@ def cleanup_old_videos(retention_days: int = 7, dry_run: bool = False) -> dict:
     Delete uploaded videos older than retention_days.
 
     Videos with status 'processing' are skipped to avoid interrupting
-    in-flight analysis.
+    in-flight analysis.  Decoded-frame cache entries and lazy evidence of
+    deleted videos go with them, and both caches are trimmed back to
+    FRAME_CACHE_MAX_MB / EVIDENCE_CACHE_MAX_MB.  Chunked uploads left
+    unfinished for longer than UPLOAD_SESSION_TTL are discarded.
 
     Args:
         retention_days: Keep videos newer than this many days.
@@ -53,6 +59,8 @@ def cleanup_old_videos(retention_days: int = 7, dry_run: bool = False) -> dict:
                     filepath.unlink()
                     stats["freed_bytes"] += size
                     logger.info("Deleted file: %s", filepath)
+                stats["freed_bytes"] += frame_cache.evict_video(video.id)
+                stats["freed_bytes"] += evidence_service.evict_video(video.id)
 
                 # Remove DB record
                 db.delete(video)
@@ -62,6 +70,10 @@ def cleanup_old_videos(retention_days: int = 7, dry_run: bool = False) -> dict:
                 stats["errors"] += 1
 
         db.commit()
+        if not dry_run:
+            stats["freed_bytes"] += frame_cache.evict()
+            stats["freed_bytes"] += evidence_service.evict()
+            stats["freed_bytes"] += chunked_uploads.expire()
 
     except Exception as e:
         logger.error("Cleanup failed: %s", e)
@@ -90,6 +102,8 @@ def get_storage_usage() -> dict:
 
     return {
         "upload_dir_mb": round(total_size / (1024 * 1024), 1),
+        "frame_cache_mb": round(frame_cache.size_bytes() / (1024 * 1024), 1),
+        "evidence_cache_mb": round(evidence_service.size_bytes() / (1024 * 1024), 1),
         "disk_free_gb": round(disk.free / (1024 ** 3), 1),
         "disk_total_gb": round(disk.total / (1024 ** 3), 1),
     }
@@ -0,0 +1,258 @@
+"""Two-pass (coarse-to-fine) analysis: sparse scan, dense refinement around candidates"""
+import time
+import logging
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from app.core.config import settings
+from app.ml.pipeline.frame_extractor import FrameExtractor
+from app.services.physics_service import PhysicsScorer, filter_vehicles
+from app.services.inference_service import (
+    LSTM_SEQUENCE_LENGTH,
+    compute_frame_features,
+    pad_sequence,
+)
+from app.services.long_video_service import detect_video, load_frame_range
+from app.services.progress_service import AnalysisProgress
+
+logger = logging.getLogger(__name__)
+
+
+def find_candidates(
+    coarse_steps: List[dict],
+    max_candidates: int,
+    min_separation: int,
+) -> List[int]:
+    """
+    Pick coarse frame indices where the overlap signal jumps.
+
+    Coarse frames are far apart, so a single-step rise in overlap is the
+    spike.  Per-frame physics breaks ties and is the fallback when overlap
+    never rises.  Candidates are kept ``min_separation`` coarse frames
+    apart so their dense windows don't duplicate work.
+
+    Args:
+        coarse_steps: ``PhysicsScorer.push()`` outputs of the coarse pass
+        max_candidates: Upper bound on returned candidates
+        min_separation: Minimum distance between candidates (coarse frames)
+
+    Returns:
+        list: Coarse frame indices, strongest first
+    """
+    if not coarse_steps:
+        return []
+    overlap = np.array([s['overlap'] for s in coarse_steps])
+    physics = np.array([s['physics'] for s in coarse_steps])
+    rise = np.maximum(np.diff(overlap, prepend=overlap[0]), 0.0)
+    score = rise + physics * 0.01
+
+    candidates = []
+    for idx in np.argsort(-score, kind='stable'):
+        if len(candidates) >= max_candidates:
+            break
+        if rise[idx] <= 0 and candidates:
+            break
+        if all(abs(int(idx) - c) >= min_separation for c in candidates):
+            candidates.append(int(idx))
+    return candidates
+
+
+def analyze_coarse_to_fine(
+    video_path: Path,
+    frame_extractor: FrameExtractor,
+    detector,
+    lstm_detector,
+    confidence_aggregator,
+    deadline: float = None,
+    start_frame: int = 0,
+    end_frame: int = None,
+    progress: AnalysisProgress = None,
+    batch_size: int = None,
+    conf_threshold: float = None,
+) -> dict:
+    """
+    Scan the video sparsely, then analyse densely only around collisions.
+
+    Pass 1 detects at ``TWO_PASS_COARSE_FPS`` over the whole video (or
+    range) and applies the presence gate — a video without vehicles stops
+    here.  Candidate peaks of the overlap signal are then each refined with
+    a 150-frame window at ``frame_extractor``'s full target FPS; every
+    refined window goes through the usual physics gates and all of them are
+    scored by the LSTM in one batched call.  The best window is the result.
+    ``batch_size`` and ``conf_threshold`` are passed to ``detect_video``.
+
+    Returns:
+        dict: Analysis state consumed by ``analyze_video_file``; indices are
+              relative to the refined window, whose absolute sampled-frame
+              position is ``sample_offset``
+    """
+    window = LSTM_SEQUENCE_LENGTH
+    coarse_extractor = FrameExtractor(target_fps=settings.TWO_PASS_COARSE_FPS)
+
+    progress = progress or AnalysisProgress()
+
+    # ── Pass 1: sparse scan ───────────────────────────────────────
+    progress.stage("detect", detail="coarse scan")
+    coarse_dets, frame_size, coarse_meta = detect_video(
+        video_path, coarse_extractor, detector, batch_size=batch_size, deadline=deadline,
+        start_frame=start_frame, end_frame=end_frame, progress=progress, conf_threshold=conf_threshold,
+    )
+    coarse_scorer = PhysicsScorer(frame_size=frame_size)
+    coarse_steps = [coarse_scorer.push(filter_vehicles(d)) for d in coarse_dets]
+
+    fps = coarse_meta['fps']
+    coarse_interval = coarse_meta['interval']
+    dense_interval = frame_extractor.sampling_interval(fps)
+    range_end = coarse_meta['frame_count'] if end_frame is None else min(end_frame, coarse_meta['frame_count'])
+    first_dense = -(-max(start_frame, 0) // dense_interval)
+    last_dense = -(-range_end // dense_interval)
+    full_scan_frames = last_dense - first_dense
+
+    details = {
+        "analysisMode": "two_pass",
+        "coarseFps": round(fps / coarse_interval, 3),
+        "coarseFrames": len(coarse_dets),
+        "fullScanFrames": int(full_scan_frames),
+    }
+    if not coarse_scorer.passes_presence_gate():
+        logger.info("Two-pass: coarse scan failed the presence gate → NO ACCIDENT")
+        raw_confidence = max(0.01, coarse_scorer.avg_vehicles_per_frame * 0.2)
+        details["detectorFrames"] = len(coarse_dets) - coarse_meta['frames_reused']
+        return {
+            'frames': [],
+            'frame_offset': 0,
+            'total_frames': len(coarse_dets),
+            'detections_per_frame': coarse_dets,
+            'per_frame_physics': [s['physics'] for s in coarse_steps],
+            'overlap_scores': [s['overlap'] for s in coarse_steps],
+            'total_vehicles': coarse_scorer.total_vehicles,
+            'is_accident': False,
+            'raw_confidence': raw_confidence,
+            'aggregation_result': _gated_out(raw_confidence),
+            'peak_idx': None,
+            'details': details,
+        }
+
+    # Coarse frames per dense window, used to keep candidates apart
+    coarse_per_window = max(1, (window * dense_interval) // coarse_interval)
+    candidates = find_candidates(
+        coarse_steps, settings.TWO_PASS_CANDIDATES, max(1, coarse_per_window // 2)
+    )
+
+    # ── Pass 2: dense refinement around each candidate ────────────
+    refined = []
+    for n_candidate, c in enumerate(candidates, 1):
+        center = ((coarse_meta['first_sample'] + c) * coarse_interval) // dense_interval
+        first = max(first_dense, min(center - window // 2, last_dense - window))
+        last = min(first + window, last_dense)
+        # Windows clamped at the video edges can collapse onto each other
+        if any(abs(first - r['first']) < window // 2 for r in refined):
+            continue
+        progress.stage("detect", detail=f"candidate {n_candidate} of {len(candidates)}")
+        dets, _, dense_meta = detect_video(
+            video_path, frame_extractor, detector, batch_size=batch_size, deadline=deadline,
+            start_frame=first * dense_interval, end_frame=last * dense_interval, progress=progress,
+            conf_threshold=conf_threshold,
+        )
+        vehicles = [filter_vehicles(d) for d in dets]
+        scorer = PhysicsScorer(frame_size=frame_size)
+        steps = [scorer.push(v) for v in vehicles]
+        presence = scorer.passes_presence_gate()
+        physics = scorer.summary()
+        refined.append({
+            'coarse_index': c,
+            'first': dense_meta['first_sample'],
+            'reused': dense_meta['frames_reused'],
+            'detections': dets,
+            'scorer': scorer,
+            'per_frame_physics': [s['physics'] for s in steps],
+            'physics': physics,
+            'presence': presence,
+            'gated': presence and PhysicsScorer.passes_signal_gate(physics),
+            'features': pad_sequence([compute_frame_features(v) for v in vehicles]),
+        })
+
+    if deadline and time.time() > deadline:
+        raise TimeoutError("Inference timed out during dense refinement")
+
+    progress.stage("lstm")
+    scores = lstm_detector.predict_batch(np.stack([r['features'] for r in refined]))
+    for r, score in zip(refined, scores):
+        r['lstm'] = float(score)
+
+    details["refinedFrames"] = sum(len(r['detections']) for r in refined)
+    # Frames skipped by adaptive sampling never reached the detector
+    details["detectorFrames"] = (
+        len(coarse_dets) - coarse_meta['frames_reused']
+        + sum(len(r['detections']) - r['reused'] for r in refined)
+    )
+    details["detectorSavings"] = round(1.0 - details["detectorFrames"] / max(full_scan_frames, 1), 3)
+    details["candidates"] = [
+        {
+            "frame": int(r['first'] + len(r['detections']) // 2),
+            "time": round((r['first'] + len(r['detections']) // 2) * dense_interval / fps, 2),
+            "overlapRise": round(float(
+                coarse_steps[r['coarse_index']]['overlap']
+                - coarse_steps[max(r['coarse_index'] - 1, 0)]['overlap']
+            ), 4),
+            "lstm": round(r['lstm'], 4),
+            "gated": bool(r['gated']),
+        }
+        for r in refined
+    ]
+    logger.info(
+        f"Two-pass: {len(coarse_dets)} coarse + {details['refinedFrames']} dense detector frames "
+        f"(full scan: {full_scan_frames}), {len(refined)} candidate(s)"
+    )
+
+    gated = [r for r in refined if r['gated']]
+    if gated:
+        best = max(gated, key=lambda r: r['lstm'])
+        raw_confidence = best['lstm']
+        aggregation_result = confidence_aggregator.aggregate([best['lstm']] * window)
+    else:
+        best = max(refined, key=lambda r: r['physics']['physics_score'])
+        if best['presence']:
+            raw_confidence = best['physics']['physics_score'] * 0.5
+        else:
+            raw_confidence = max(0.01, best['scorer'].avg_vehicles_per_frame * 0.2)
+        aggregation_result = _gated_out(raw_confidence)
+
+    is_accident = bool(gated) and raw_confidence >= 0.5
+    n = len(best['detections'])
+    frames = []
+    if is_accident:
+        frames = load_frame_range(
+            video_path, frame_extractor, dense_interval, best['first'], best['first'] + n
+        )
+
+    return {
+        'frames': frames,
+        'frame_offset': 0,
+        'sample_offset': best['first'],
+        'total_frames': n,
+        'detections_per_frame': best['detections'],
+        'per_frame_physics': best['per_frame_physics'],
+        'overlap_scores': best['physics']['overlap_scores'],
+        'total_vehicles': best['scorer'].total_vehicles,
+        'is_accident': is_accident,
+        'raw_confidence': raw_confidence,
+        'aggregation_result': aggregation_result,
+        'peak_idx': None,
+        'details': details,
+    }
+
+
+def _gated_out(raw_confidence: float) -> dict:
+    """Aggregation result used when a hard gate decides the outcome."""
+    return {
+        'final_confidence': raw_confidence,
+        'is_accident': False,
+        'temporal_stability': 0.0,
+        'spike_filtered': False,
+        'event_frames': [],
+        'max_confidence': raw_confidence,
+        'mean_confidence': raw_confidence,
+    }
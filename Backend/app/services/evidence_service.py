@@ -0,0 +1,398 @@
+"""Lazy accident evidence: render stills and clips on first request"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+import re
+import shutil
+import threading
+import logging
+import numpy as np
+
+from app.core.config import settings
+from app.ml.pipeline.frame_extractor import FrameExtractor
+from app.ml.pipeline.frame_pool import frame_pool
+from app.services.frame_service import AccidentFrameService, accident_frame_service, _find_collision_peak
+from app.services.physics_service import assign_track_ids
+
+logger = logging.getLogger(__name__)
+
+# Evidence file and video names are plain file names (no separators / dot-files)
+_SAFE_NAME = re.compile(r"^[\w\-][\w\-.]*$")
+
+
+class EvidenceService:
+    """
+    Defers evidence rendering from ``/analyze`` to the first request.
+
+    ``register`` runs at the end of an analysis: it computes the collision
+    peak, tracks vehicles over the evidence slice and writes a small JSON
+    manifest (sampling interval, clip window, detections, physics and peak)
+    to ``EVIDENCE_DIR``.  Stills and clip URLs are known up front and are
+    returned immediately; the files are produced by ``ensure_rendered``
+    when ``/frames/...`` or ``/clips/...`` is first requested (or on a
+    single low-priority background thread with EVIDENCE_PRERENDER), by
+    re-decoding only the clip window from the uploaded video.
+
+    Rendered evidence that has a manifest is a cache: it is trimmed to
+    EVIDENCE_CACHE_MAX_MB least-recently-served first and simply rendered
+    again when requested.  Stream event evidence cannot be rendered again
+    (its frames are gone) but is put under the same budget with ``retain``;
+    evicting it deletes it for good.  Evidence written eagerly with
+    EVIDENCE_LAZY off has no manifest and is never evicted.
+    """
+
+    def __init__(self, manifest_dir: str = None, max_bytes: int = None,
+                 frame_service: AccidentFrameService = None):
+        """
+        Args:
+            manifest_dir: Directory for render manifests (defaults to EVIDENCE_DIR)
+            max_bytes: Rendered evidence kept on disk (defaults to EVIDENCE_CACHE_MAX_MB)
+            frame_service: Renderer and output directories (defaults to the global one)
+        """
+        self.manifest_dir = Path(manifest_dir or settings.EVIDENCE_DIR)
+        self.max_bytes = (
+            max_bytes if max_bytes is not None else settings.EVIDENCE_CACHE_MAX_MB * 1024 * 1024
+        )
+        self.frame_service = frame_service or accident_frame_service
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._prerender = None
+        self.renders = 0
+
+    # ── Registration (request path) ────────────────────────────────
+    def _manifest_path(self, video_id: str) -> Path:
+        return self.manifest_dir / f"{video_id}.json"
+
+    def has_manifest(self, video_id: str) -> bool:
+        return _SAFE_NAME.match(video_id) is not None and self._manifest_path(video_id).exists()
+
+    def register(
+        self,
+        video_id: str,
+        video_path: Path,
+        frames: List[np.ndarray],
+        event_frames: List[Tuple[int, int]],
+        interval: int,
+        fps: float = 10.0,
+        detections_per_frame: List[List] = None,
+        per_frame_physics: List[float] = None,
+        frame_offset: int = 0,
+        peak_idx: int = None,
+        sample_fps: float = None,
+    ) -> dict:
+        """
+        Record what ``AccidentFrameService.render_evidence`` needs and
+        return its result without rendering.
+
+        Arguments match ``render_evidence``; ``interval`` is the raw frames
+        per sample used by the analysis, so sample ``frame_offset + i`` is
+        raw frame ``(frame_offset + i) * interval`` of ``video_path``.
+
+        Returns:
+            dict: ``render_evidence``'s result with the still indices and
+                  clip path the render will produce
+        """
+        result = {'total_count': 0, 'saved_frames': [], 'frame_dir': '', 'clip_path': '', 'sprite_path': ''}
+        if not frames:
+            return result
+
+        if peak_idx is None:
+            peak_idx = _find_collision_peak(
+                frames, detections_per_frame or [], per_frame_physics or [], event_frames
+            )
+        window = int(fps * 3)
+        start = max(0, peak_idx - window)
+        end = min(len(frames) - 1, peak_idx + window)
+        stills = [
+            peak_idx + o for o in AccidentFrameService.STILL_OFFSETS if 0 <= peak_idx + o < len(frames)
+        ]
+        start, end = min([start] + stills), max([end] + stills)
+        if settings.EVIDENCE_SPRITE_SCOPE == "all":
+            # The contact sheet spans the whole slice
+            start, end = 0, len(frames) - 1
+
+        # Track ids over the whole slice, as an eager render would
+        tracked = assign_track_ids(detections_per_frame, frames[0].shape[:2]) if detections_per_frame else []
+        manifest = {
+            'video_id': video_id,
+            'video_path': str(Path(video_path).resolve()),
+            'interval': int(interval),
+            'fps': float(fps),
+            'sample_fps': float(sample_fps) if sample_fps else None,
+            'first_sample': frame_offset + start,
+            'frame_count': end - start + 1,
+            'peak_idx': peak_idx - start,
+            'event_frames': [
+                [max(s, start) - start, min(e, end) - start]
+                for s, e in event_frames if e >= start and s <= end
+            ],
+            'detections_per_frame': tracked[start:end + 1],
+            'per_frame_physics': [float(p) for p in (per_frame_physics or [])[start:end + 1]],
+        }
+
+        self._write_manifest(video_id, manifest)
+        # A re-analysis replaces whatever was rendered for the previous one
+        self._remove_rendered(video_id)
+        logger.info(f"Registered lazy evidence for {video_id} (peak={peak_idx + frame_offset})")
+
+        if settings.EVIDENCE_PRERENDER:
+            self._schedule(video_id)
+
+        result.update({
+            'total_count': len(stills),
+            'saved_frames': [i + frame_offset for i in stills],
+            'frame_dir': str(self.frame_service.frames_dir / video_id),
+            'peak_frame': peak_idx + frame_offset,
+            'clip_path': str(self._clip_path(video_id)),
+            'sprite_path': str(self.frame_service.frames_dir / video_id / "sprite.json"),
+        })
+        return result
+
+    def retain(self, video_id: str):
+        """
+        Count already rendered, non-reproducible evidence (stream events)
+        against the cache budget.  Its manifest has no source video.
+        """
+        if not _SAFE_NAME.match(video_id):
+            return
+        self._write_manifest(video_id, {'video_id': video_id, 'video_path': None, 'rendered': True, 'clip': None})
+        self.evict(keep=video_id)
+
+    def _write_manifest(self, video_id: str, manifest: dict):
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self._manifest_path(video_id).with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(manifest))
+        os.replace(tmp, self._manifest_path(video_id))
+
+    def _read_manifest(self, video_id: str) -> dict:
+        return json.loads(self._manifest_path(video_id).read_text())
+
+    def get_clip_url(self, video_id: str) -> str:
+        """Clip URL, also while the clip is registered but not yet rendered."""
+        if self.has_manifest(video_id):
+            try:
+                manifest = self._read_manifest(video_id)
+            except (OSError, ValueError):
+                manifest = {}
+            if manifest.get('rendered') and manifest.get('clip') is None:
+                return ""
+            return f"/clips/{video_id}_accident.mp4"
+        return self.frame_service.get_clip_url(video_id)
+
+    def _schedule(self, video_id: str):
+        if self._prerender is None:
+            # One worker: pre-rendering never competes with analyses for more than a core
+            self._prerender = ThreadPoolExecutor(max_workers=1, thread_name_prefix="evidence-prerender")
+        self._prerender.submit(self._prerender_one, video_id)
+
+    def _prerender_one(self, video_id: str):
+        try:
+            self.ensure_rendered(video_id)
+        except Exception as e:
+            logger.warning(f"Background evidence render failed for {video_id}: {e}")
+
+    # ── Rendering (first request) ──────────────────────────────────
+    def _clip_path(self, video_id: str) -> Path:
+        return self.frame_service.clips_dir / f"{video_id}_accident.mp4"
+
+    def _lock(self, video_id: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(video_id, threading.Lock())
+
+    def is_rendered(self, video_id: str) -> bool:
+        """
+        True once the manifest records a render whose files are still on
+        disk.  A clip that no codec could encode is recorded as ``clip:
+        null``, so its stills are not re-rendered on every request.
+        """
+        if not (self.frame_service.frames_dir / video_id).is_dir():
+            return False
+        try:
+            manifest = self._read_manifest(video_id)
+        except (OSError, ValueError):
+            manifest = {}
+        if not manifest.get('rendered'):
+            return False
+        return manifest.get('clip') is None or self._clip_path(video_id).exists()
+
+    def ensure_rendered(self, video_id: str) -> bool:
+        """
+        Render registered evidence unless it is already on disk.
+
+        Concurrent callers for the same video wait for a single render.
+
+        Returns:
+            bool: True if rendered evidence is available
+        """
+        if not self.has_manifest(video_id):
+            return False
+        with self._lock(video_id):
+            if self.is_rendered(video_id):
+                return True
+            manifest = self._read_manifest(video_id)
+            if manifest.get('video_path') is None:
+                # Retained stream evidence: whatever is on disk is all there is
+                return (self.frame_service.frames_dir / video_id).is_dir()
+            frames = self._load_frames(manifest)
+            try:
+                result = self.frame_service.render_evidence(
+                    video_id, frames, [tuple(e) for e in manifest['event_frames']],
+                    fps=manifest['fps'],
+                    detections_per_frame=manifest['detections_per_frame'],
+                    per_frame_physics=manifest['per_frame_physics'],
+                    frame_offset=manifest['first_sample'],
+                    peak_idx=manifest['peak_idx'],
+                    sample_fps=manifest.get('sample_fps'),
+                )
+            finally:
+                frame_pool.release(frames)
+            if not result['clip_path']:
+                # A writer that failed may still have left an unplayable file behind
+                self._clip_path(video_id).unlink(missing_ok=True)
+            manifest.update(rendered=True, clip=result['clip_path'] or None)
+            self._write_manifest(video_id, manifest)
+            self.renders += 1
+            logger.info(f"Rendered lazy evidence for {video_id}: {result['total_count']} stills")
+        self.evict(keep=video_id)
+        return self.is_rendered(video_id)
+
+    @staticmethod
+    def _load_frames(manifest: dict) -> List[np.ndarray]:
+        """Re-decode the clip window of the source video."""
+        from app.services.long_video_service import load_frame_range
+        video_path = Path(manifest['video_path'])
+        if not video_path.exists():
+            raise FileNotFoundError(f"Source video for evidence is gone: {video_path}")
+        first = manifest['first_sample']
+        frames = load_frame_range(
+            video_path, FrameExtractor(), manifest['interval'], first, first + manifest['frame_count']
+        )
+        if len(frames) != manifest['frame_count']:
+            logger.warning(
+                f"Evidence window decoded {len(frames)} of {manifest['frame_count']} frames "
+                f"from {video_path.name}"
+            )
+        return frames
+
+    def resolve(self, video_id: str, filename: str = None) -> Optional[Path]:
+        """
+        Path of an evidence file, rendering it first if needed.
+
+        Args:
+            video_id: Video (or stream event) id
+            filename: Still file name, or None for the accident clip
+
+        Returns:
+            Path or None if the file does not exist and cannot be rendered
+        """
+        if not _SAFE_NAME.match(video_id) or (filename is not None and not _SAFE_NAME.match(filename)):
+            return None
+        frames_dir = self.frame_service.frames_dir / video_id
+        path = frames_dir / filename if filename is not None else self._clip_path(video_id)
+
+        if not path.exists():
+            try:
+                self.ensure_rendered(video_id)
+            except (FileNotFoundError, ValueError, RuntimeError) as e:
+                logger.warning(f"Could not render evidence for {video_id}: {e}")
+                return None
+            if not path.exists():
+                return None
+
+        if self.has_manifest(video_id):
+            # Served evidence is recently used (the render cache's LRU order)
+            try:
+                os.utime(frames_dir)
+            except OSError:
+                pass
+        return path
+
+    # ── Render cache ───────────────────────────────────────────────
+    def _rendered_size(self, video_id: str) -> int:
+        total = 0
+        frames_dir = self.frame_service.frames_dir / video_id
+        if frames_dir.is_dir():
+            total += sum(f.stat().st_size for f in frames_dir.iterdir() if f.is_file())
+        clip = self._clip_path(video_id)
+        if clip.exists():
+            total += clip.stat().st_size
+        return total
+
+    def _remove_rendered(self, video_id: str) -> int:
+        freed = self._rendered_size(video_id)
+        shutil.rmtree(self.frame_service.frames_dir / video_id, ignore_errors=True)
+        self._clip_path(video_id).unlink(missing_ok=True)
+        return freed
+
+    def cached(self) -> List[Tuple[str, int]]:
+        """(video_id, bytes) of re-renderable evidence, least recently served first."""
+        if not self.manifest_dir.exists():
+            return []
+        entries = []
+        for manifest in self.manifest_dir.glob("*.json"):
+            video_id = manifest.stem
+            frames_dir = self.frame_service.frames_dir / video_id
+            if not frames_dir.is_dir():
+                continue
+            try:
+                entries.append((frames_dir.stat().st_mtime, video_id, self._rendered_size(video_id)))
+            except FileNotFoundError:
+                continue
+        return [(video_id, size) for _, video_id, size in sorted(entries)]
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size in self.cached())
+
+    def evict(self, keep: str = None) -> int:
+        """
+        Delete rendered evidence (manifests stay) until the cache fits
+        ``max_bytes``, least recently served first.
+
+        Returns:
+            int: Bytes freed
+        """
+        entries = self.cached()
+        total = sum(size for _, size in entries)
+        freed = 0
+        for video_id, size in entries:
+            if total <= self.max_bytes:
+                break
+            if video_id == keep:
+                continue
+            with self._lock(video_id):
+                try:
+                    rerenderable = self._read_manifest(video_id).get('video_path') is not None
+                except (OSError, ValueError):
+                    rerenderable = True
+                if rerenderable:
+                    freed += self._remove_rendered(video_id)
+                else:
+                    freed += self.evict_video(video_id)
+            total -= size
+            logger.info(f"Evicted rendered evidence for {video_id}")
+        return freed
+
+    def evict_video(self, video_id: str) -> int:
+        """Forget a video's evidence entirely (manifest and rendered files). Returns bytes freed."""
+        if not _SAFE_NAME.match(video_id):
+            return 0
+        freed = 0
+        manifest = self._manifest_path(video_id)
+        if manifest.exists():
+            freed += manifest.stat().st_size + self._remove_rendered(video_id)
+            manifest.unlink(missing_ok=True)
+        return freed
+
+    def stats(self) -> dict:
+        return {
+            "registered": len(list(self.manifest_dir.glob("*.json"))) if self.manifest_dir.exists() else 0,
+            "rendered": len(self.cached()),
+            "size_mb": round(self.size_bytes() / (1024 * 1024), 1),
+            "renders": self.renders,
+        }
+
+
+# Global instance
+evidence_service = EvidenceService()
@@ -0,0 +1,172 @@
+"""Single-flight analyses: concurrent requests for the same analysis share one run"""
+from typing import Awaitable, Callable, Dict, Optional
+from datetime import datetime
+import asyncio
+import hashlib
+import json
+import uuid
+import logging
+
+from fastapi import Request
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import crud
+from app.services.progress_service import AnalysisCancelled, AnalysisProgress, progress_tracker
+
+logger = logging.getLogger(__name__)
+
+
+def flight_key(video_id: str, **params) -> str:
+    """Key of an analysis: the video plus a hash of the parameters that change its result."""
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    return f"{video_id}:{digest[:16]}"
+
+
+class _Flight:
+    """One run and the requests waiting for it."""
+
+    def __init__(self, key: Optional[str]):
+        self.key = key
+        self.task: Optional[asyncio.Task] = None
+        self.progress: Optional[AnalysisProgress] = None
+        self.waiters = 0
+        self.cancel_reason: Optional[str] = None
+
+
+class AnalysisFlights:
+    """
+    Coalesce concurrent analyses of the same video with the same parameters.
+
+    Within a worker the first request starts the run as a task and later
+    ones await that task.  Across workers the run is claimed in the
+    ``analysis_flights`` table: a worker that finds a live claim waits for
+    it and returns the response the owner stored — or, if that run failed
+    or its lease lapsed (owner died), claims the analysis and runs it
+    itself.  The owner renews its lease while the run is going.
+
+    Every request is a waiter.  A waiter whose client disconnects stops
+    counting, and the run is cancelled once no waiter is left.  Waiters
+    stay until the run ends, so the owner's database session outlives it.
+    """
+
+    def __init__(self, lease: float = None, poll: float = None):
+        """
+        Args:
+            lease: Seconds a claim lasts without renewal (defaults to ANALYSIS_FLIGHT_LEASE)
+            poll: Seconds between checks of another worker's run (defaults to ANALYSIS_FLIGHT_POLL)
+        """
+        self.lease = lease if lease is not None else settings.ANALYSIS_FLIGHT_LEASE
+        self.poll = poll if poll is not None else settings.ANALYSIS_FLIGHT_POLL
+        self._flights: Dict[str, _Flight] = {}
+
+    async def run(
+        self,
+        db: Session,
+        key: Optional[str],
+        video_id: str,
+        compute: Callable[[AnalysisProgress], Awaitable[dict]],
+        request: Request = None,
+    ) -> dict:
+        """
+        Run ``compute`` for analysis ``key`` or join the run already going.
+
+        Args:
+            db: Session of the request (used for the claim while it owns the run)
+            key: From ``flight_key``; None runs alone (nobody else can ask for it)
+            video_id: Video analysed; the run is tracked as its job
+            compute: Performs the analysis with the run's progress; returns the JSON response
+            request: Client whose disconnect withdraws this waiter
+
+        Returns:
+            dict: The response ``compute`` returned (for every waiter)
+        """
+        flight = self._flights.get(key) if key is not None else None
+        if flight is None:
+            flight = _Flight(key)
+            flight.task = asyncio.create_task(self._lead(db, flight, video_id, compute))
+            if key is not None:
+                self._flights[key] = flight
+                flight.task.add_done_callback(lambda _: self._forget(flight))
+        else:
+            logger.info(f"Joining in-flight analysis {key}")
+        flight.waiters += 1
+
+        watcher = asyncio.create_task(self._watch(request, flight)) if request is not None else None
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            self._leave(flight, "Request cancelled")
+            raise
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+    def _forget(self, flight: _Flight):
+        if self._flights.get(flight.key) is flight:
+            del self._flights[flight.key]
+
+    async def _watch(self, request: Request, flight: _Flight):
+        """Withdraw the waiter once its client goes away."""
+        while not flight.task.done():
+            if await request.is_disconnected():
+                logger.info(f"Client disconnected from analysis of {flight.key or 'upload'}")
+                self._leave(flight, "Client disconnected")
+                return
+            await asyncio.sleep(settings.PROGRESS_POLL_INTERVAL)
+
+    def _leave(self, flight: _Flight, reason: str):
+        flight.waiters -= 1
+        if flight.waiters <= 0 and not flight.task.done():
+            flight.cancel_reason = reason
+            if flight.progress is not None:
+                flight.progress.cancel(reason)
+
+    async def _lead(self, db: Session, flight: _Flight, video_id: str, compute) -> dict:
+        owner = str(uuid.uuid4())
+        if flight.key is not None:
+            while not crud.claim_analysis_flight(db, flight.key, video_id, owner, self.lease):
+                response = await self._await_remote(db, flight)
+                if response is not None:
+                    return response
+
+        flight.progress = progress_tracker.start(video_id)
+        if flight.cancel_reason is not None:
+            flight.progress.cancel(flight.cancel_reason)
+        renewer = asyncio.create_task(self._renew(db, flight.key, owner)) if flight.key is not None else None
+        try:
+            response = await compute(flight.progress)
+        except Exception as e:
+            if renewer is not None:
+                renewer.cancel()
+                db.rollback()   # The run may have failed part-way through a transaction
+                crud.finish_analysis_flight(db, flight.key, owner, "failed", error_message=str(e))
+            raise
+        if renewer is not None:
+            renewer.cancel()
+            crud.finish_analysis_flight(db, flight.key, owner, "completed", response=response)
+        return response
+
+    async def _await_remote(self, db: Session, flight: _Flight) -> Optional[dict]:
+        """Wait for another worker's run; its response, or None to try claiming again."""
+        logger.info(f"Analysis {flight.key} runs in another worker; waiting for it")
+        while True:
+            if flight.cancel_reason is not None:
+                raise AnalysisCancelled(flight.cancel_reason)
+            await asyncio.sleep(self.poll)
+            row = crud.get_analysis_flight(db, flight.key)
+            if row is None or row.status == "failed" or row.lease_until < datetime.utcnow():
+                return None
+            if row.status == "completed":
+                return row.response
+
+    async def _renew(self, db: Session, key: str, owner: str):
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            if not crud.renew_analysis_flight(db, key, owner, self.lease):
+                logger.warning(f"Lost the claim on analysis {key}")
+                return
+
+
+# Global instance
+analysis_flights = AnalysisFlights()
@@ -1,11 +1,17 @@
 """Frame extraction and accident clip generation service"""
 import cv2
+import json
 import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Tuple, Dict
 import numpy as np
 
 from app.core.config import settings
+from app.services.physics_service import assign_track_ids
+from app.utils.mp4_utils import faststart
 
 logger = logging.getLogger(__name__)
 
@@ -72,6 +78,7 @@ def _draw_annotated_frame(
     detections: list,
     is_impact: bool,
     frame_label: str = "",
+    out: np.ndarray = None,
 ) -> np.ndarray:
     """
     Draw bounding boxes on a frame with collision-aware colour coding.
@@ -81,17 +88,35 @@ def _draw_annotated_frame(
       AMBER (#FFA000) — vehicles involved in high-motion event (impact frame)
       GREEN (#00C853) — other detected vehicles (context)
 
-    Labels show vehicle class + detection confidence.
+    Labels show vehicle class + detection confidence, prefixed with the
+    track id (``#3``) when detections carry one.
+
+    ``frame`` is never modified: annotations are drawn on ``out`` (a
+    reusable canvas, overwritten) or on a fresh copy if it doesn't fit.
+    """
+    if out is None or out.shape != frame.shape:
+        out = frame.copy()
+    else:
+        np.copyto(out, frame)
+    has_vehicles = _draw_vehicle_boxes(out, detections, is_impact)
+    _stamp_context_label(out, frame_label, has_vehicles)
+    return out
+
+
+def _draw_vehicle_boxes(out: np.ndarray, detections: list, is_impact: bool) -> bool:
+    """
+    Draw the vehicle boxes of ``_draw_annotated_frame`` in place, without
+    the frame context label.
+
+    Returns:
+        bool: True if any vehicle was drawn
     """
     vehicle_classes = {'car', 'truck', 'bus', 'motorcycle'}
-    out = frame.copy()
     h, w = out.shape[:2]
 
     vehicles = [d for d in detections if d['class_name'] in vehicle_classes]
     if not vehicles:
-        # Still stamp a label overlay
-        _stamp_frame_label(out, frame_label, color=(200, 200, 200))
-        return out
+        return False
 
     # Clamp and sort bounding box coordinates to frame bounds
     bboxes = []
@@ -119,22 +144,23 @@ def _draw_annotated_frame(
         x1, y1, x2, y2 = bbox  # already clamped ints
         conf  = det.get('confidence', 0)
         label = det['class_name'].capitalize()
+        track = f"#{det['track_id']} " if det.get('track_id') is not None else ""
 
         if idx in collision_set:
             # Colliding — RED with thick border
             color      = (0, 60, 255)     # BGR red
             thickness  = 4
-            tag        = f"COLLISION  {conf:.0%}"
+            tag        = f"{track}COLLISION  {conf:.0%}"
         elif is_impact:
             # Impact frame, not directly colliding — AMBER
             color      = (0, 160, 255)    # BGR amber
             thickness  = 3
-            tag        = f"{label}  {conf:.0%}"
+            tag        = f"{track}{label}  {conf:.0%}"
         else:
             # Context vehicle — GREEN
             color      = (50, 200, 80)    # BGR green
             thickness  = 2
-            tag        = f"{label}  {conf:.0%}"
+            tag        = f"{track}{label}  {conf:.0%}"
 
         # Draw box
         cv2.rectangle(out, (x1, y1), (x2, y2), color, thickness)
@@ -148,11 +174,16 @@ def _draw_annotated_frame(
         cv2.rectangle(out, (x1, pill_y1), (min(x1 + tw + 8, w - 1), pill_y2), color, -1)
         cv2.putText(out, tag, (x1 + 4, pill_y2 - 4), font, font_scale, (255, 255, 255), 2, cv2.LINE_AA)
 
-    # ── Stamp frame context label (e.g. "-1s", "IMPACT", "+1s") ───
-    if frame_label:
-        _stamp_frame_label(out, frame_label, color=(0, 60, 255) if frame_label == "IMPACT" else (255, 255, 255))
+    return True
 
-    return out
+
+def _stamp_context_label(frame: np.ndarray, frame_label: str, has_vehicles: bool):
+    """Stamp the frame context label (e.g. "-1s", "IMPACT", "+1s")."""
+    if not has_vehicles:
+        # Still stamp a label overlay
+        _stamp_frame_label(frame, frame_label, color=(200, 200, 200))
+    elif frame_label:
+        _stamp_frame_label(frame, frame_label, color=(0, 60, 255) if frame_label == "IMPACT" else (255, 255, 255))
 
 
 def _stamp_frame_label(frame: np.ndarray, label: str, color=(255, 255, 255)):
@@ -166,143 +197,442 @@ def _stamp_frame_label(frame: np.ndarray, label: str, color=(255, 255, 255)):
     cv2.putText(frame, label, (x, y), font, scale, color, 2, cv2.LINE_AA)
 
 
+def _still_params(fmt: str) -> list:
+    if fmt == "webp":
+        return [cv2.IMWRITE_WEBP_QUALITY, settings.EVIDENCE_STILL_QUALITY]
+    return [cv2.IMWRITE_JPEG_QUALITY, settings.EVIDENCE_STILL_QUALITY]
+
+
+def _write_still(path: Path, image: np.ndarray, thumb_path: Path = None) -> bool:
+    """
+    Encode one evidence still, plus its thumbnail when ``thumb_path`` is
+    given (runs on the encoder pool; OpenCV releases the GIL).
+
+    Returns:
+        bool: True if the full-size still was written
+    """
+    params = _still_params(path.suffix.lstrip("."))
+    if not cv2.imwrite(str(path), image, params):
+        return False
+    if thumb_path is not None:
+        h, w = image.shape[:2]
+        tw = min(settings.EVIDENCE_THUMB_WIDTH, w)
+        thumb = cv2.resize(image, (tw, max(1, round(h * tw / w))), interpolation=cv2.INTER_AREA)
+        if not cv2.imwrite(str(thumb_path), thumb, params):
+            logger.warning(f"Failed to write thumbnail {thumb_path.name}")
+    return True
+
+
+# FourCCs this OpenCV build failed to open (not retried)
+_unavailable_codecs = set()
+
+
+def _open_clip_writer(path: Path, fps: float, size: Tuple[int, int]):
+    """
+    ``VideoWriter`` for the first codec in EVIDENCE_CLIP_CODECS that this
+    OpenCV build can encode (H.264 needs an FFmpeg with an encoder for it).
+    """
+    codecs = [c.strip() for c in settings.EVIDENCE_CLIP_CODECS.split(",") if c.strip()]
+    for codec in codecs:
+        if codec in _unavailable_codecs:
+            continue
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*codec), fps, size)
+        if writer.isOpened():
+            return writer, codec
+        writer.release()
+        _unavailable_codecs.add(codec)
+        logger.info(f"Clip codec {codec} unavailable, trying the next one")
+    # Last resort: the codec every OpenCV build ships
+    return cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), fps, size), 'mp4v'
+
+
+class _ClipWriter:
+    """
+    Background MP4 writer fed through a bounded queue.
+
+    ``put`` hands over an annotated canvas together with the queue it must
+    be returned to once written; ``close`` drains the queue, releases the
+    ``VideoWriter``, moves the index to the front of the file for
+    progressive playback and returns the number of frames written (0 on
+    failure).
+    """
+
+    def __init__(self, path: Path, fps: float, frame_shape: Tuple[int, ...]):
+        h, w = frame_shape[:2]
+        self.path = path
+        self._writer, self.codec = _open_clip_writer(path, fps, (w, h))
+        self._queue = queue.Queue()
+        self.written = 0
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name="evidence-clip", daemon=True)
+        self._thread.start()
+
+    def put(self, canvas: np.ndarray, recycle: queue.Queue):
+        self._queue.put((canvas, recycle))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            canvas, recycle = item
+            try:
+                if self.error is None:
+                    self._writer.write(canvas)
+                    self.written += 1
+            except Exception as e:
+                self.error = e
+            finally:
+                recycle.put(canvas)
+
+    def close(self) -> int:
+        self._queue.put(None)
+        self._thread.join()
+        self._writer.release()
+        if self.error is not None:
+            logger.error(f"Failed to generate accident clip: {self.error}")
+            return 0
+        if self.written:
+            try:
+                faststart(self.path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Clip left without faststart ({self.path.name}): {e}")
+        return self.written
+
+
+class _SpriteSheet:
+    """
+    Contact sheet: downscaled annotated frames tiled row-major into one
+    image, plus the JSON index a timeline scrubber needs to address them.
+    """
+
+    def __init__(self, indices: List[int], frame_shape: Tuple[int, ...]):
+        h, w = frame_shape[:2]
+        self.indices = list(indices)
+        self._positions = {idx: i for i, idx in enumerate(self.indices)}
+        self.tile_w = min(settings.EVIDENCE_SPRITE_TILE_WIDTH, w)
+        self.tile_h = max(1, round(h * self.tile_w / w))
+        self.columns = max(1, min(settings.EVIDENCE_SPRITE_COLUMNS, len(self.indices)))
+        self.rows = -(-len(self.indices) // self.columns)
+        self.image = np.zeros((self.rows * self.tile_h, self.columns * self.tile_w, 3), dtype=np.uint8)
+
+    def __contains__(self, idx: int) -> bool:
+        return idx in self._positions
+
+    def _origin(self, idx: int) -> Tuple[int, int]:
+        pos = self._positions[idx]
+        return (pos % self.columns) * self.tile_w, (pos // self.columns) * self.tile_h
+
+    def add(self, idx: int, frame: np.ndarray):
+        x, y = self._origin(idx)
+        self.image[y:y + self.tile_h, x:x + self.tile_w] = cv2.resize(
+            frame, (self.tile_w, self.tile_h), interpolation=cv2.INTER_AREA
+        )
+
+    def index(self, image_url: str, frame_offset: int, peak_idx: int, sample_fps: float = None) -> dict:
+        tiles = []
+        for idx in self.indices:
+            x, y = self._origin(idx)
+            tiles.append({
+                "frame": idx + frame_offset,
+                "time": round((idx + frame_offset) / sample_fps, 3) if sample_fps else None,
+                "x": x,
+                "y": y,
+                "peak": idx == peak_idx,
+            })
+        return {
+            "image": image_url,
+            "tileWidth": self.tile_w,
+            "tileHeight": self.tile_h,
+            "columns": self.columns,
+            "rows": self.rows,
+            "peakFrame": peak_idx + frame_offset,
+            "tiles": tiles,
+        }
+
+
+def _sprite_indices(candidates: List[int], peak_idx: int, max_tiles: int) -> List[int]:
+    """Evenly strided subset of ``candidates`` (at most ``max_tiles``) that keeps the peak."""
+    step = max(1, -(-len(candidates) // max(max_tiles, 1)))
+    picked = [i for i in candidates if (i - peak_idx) % step == 0]
+    while len(picked) > max(max_tiles, 1):
+        # Alignment to the peak can leave one tile too many: trim the far end
+        picked.pop(0 if peak_idx - picked[0] > picked[-1] - peak_idx else -1)
+    return picked
+
+
 class AccidentFrameService:
     """Service for extracting and saving accident-detected frames"""
 
+    # Still sequence around the peak: -2s, -1s, IMPACT, +1s, +2s
+    STILL_OFFSETS = [-2, -1, 0, 1, 2]
+    STILL_LABELS  = ["-2s", "-1s", "IMPACT", "+1s", "+2s"]
+
     def __init__(self):
         self.frames_dir = Path("./storage/frames")
         self.clips_dir  = Path("./storage/clips")
         self.frames_dir.mkdir(parents=True, exist_ok=True)
         self.clips_dir.mkdir(parents=True, exist_ok=True)
+        self._encoder = ThreadPoolExecutor(
+            max_workers=settings.EVIDENCE_RENDER_WORKERS, thread_name_prefix="evidence-still"
+        )
 
-    def save_accident_frames(
+    def render_evidence(
         self,
         video_id: str,
         frames: List[np.ndarray],
         event_frames: List[Tuple[int, int]],
+        fps: float = 10.0,
         detections_per_frame: List[List] = None,
         per_frame_physics: List[float] = None,
+        frame_offset: int = 0,
+        peak_idx: int = None,
+        stills: bool = True,
+        clip: bool = True,
+        sprite: bool = True,
+        sample_fps: float = None,
     ) -> dict:
         """
-        Save the 5-frame accident sequence centred on the physics peak.
-
-        Frame selection:
-          [-2s]  [-1s]  [IMPACT]  [+1s]  [+2s]
-          relative to the frame with highest collision signal.
-
-        Bounding boxes:
-          RED   — vehicles with detected overlap (collision pair)
-          AMBER — other vehicles in the impact frame
-          GREEN — vehicles in context frames
+        Render the accident stills, clip and contact sheet in a single pass.
+
+        The collision peak and track ids are computed once and every frame
+        in the clip window is annotated once.  Still frames are copied off
+        the annotated canvas, labelled and encoded (full size and
+        thumbnail, EVIDENCE_STILL_FORMAT) on a thread pool while a writer
+        thread encodes the MP4 from a bounded queue, so drawing, still and
+        video encoding overlap instead of running back to back.
+
+        With ``sprite`` a contact sheet of downscaled annotated frames
+        (``sprite.<fmt>``) and its index (``sprite.json``: tile offsets,
+        frame indices and, given ``sample_fps``, timestamps) are written
+        next to the stills, so a timeline needs one request instead of
+        one per frame.  It covers the clip window, or every frame with
+        EVIDENCE_SPRITE_SCOPE "all", strided to EVIDENCE_SPRITE_MAX_TILES.
+
+        ``frames`` may be a slice of a longer video: ``frame_offset`` is the
+        video frame index of ``frames[0]`` and is used for still file names
+        and the returned indices.  ``peak_idx`` (relative to ``frames``)
+        skips the peak search when the caller already knows it.
+
+        Returns:
+            dict: ``total_count``, ``saved_frames``, ``frame_dir`` and
+                  ``peak_frame`` of the stills plus ``clip_path`` and
+                  ``sprite_path`` (the index; '' when not written)
         """
-        if not event_frames and not per_frame_physics:
+        result = {'total_count': 0, 'saved_frames': [], 'frame_dir': '', 'clip_path': '', 'sprite_path': ''}
+        if stills and not event_frames and not per_frame_physics:
             logger.info(f"No accident frames to save for video {video_id}")
-            return {'total_count': 0, 'saved_frames': [], 'frame_dir': ''}
-
-        video_frames_dir = self.frames_dir / video_id
-        video_frames_dir.mkdir(parents=True, exist_ok=True)
+            stills = False
+        if not frames or not (stills or clip or sprite):
+            return result
 
         # ── Find exact collision peak ──────────────────────────────
-        peak_idx = _find_collision_peak(
-            frames, detections_per_frame or [], per_frame_physics or [], event_frames
-        )
-        logger.info(f"Collision peak at frame {peak_idx} (of {len(frames)} total)")
+        if peak_idx is None:
+            peak_idx = _find_collision_peak(
+                frames, detections_per_frame or [], per_frame_physics or [], event_frames
+            )
+        logger.info(f"Collision peak at frame {peak_idx + frame_offset} (of {len(frames)} total)")
+
+        # Stable ids across the sequence (tracked over the whole slice,
+        # unless the caller already did, e.g. a lazy-render manifest)
+        if detections_per_frame and not any('track_id' in d for dets in detections_per_frame for d in dets):
+            detections_per_frame = assign_track_ids(detections_per_frame, frames[0].shape[:2])
+
+        still_labels = {}
+        if stills:
+            for offset, lbl in zip(self.STILL_OFFSETS, self.STILL_LABELS):
+                idx = peak_idx + offset
+                if 0 <= idx < len(frames):
+                    still_labels[idx] = lbl
+
+        # ±3 seconds around peak
+        window = int(fps * 3)
+        window_indices = set(range(max(0, peak_idx - window), min(len(frames) - 1, peak_idx + window) + 1))
+        clip_indices = window_indices if clip else set()
+
+        sheet = None
+        if sprite:
+            if settings.EVIDENCE_SPRITE_SCOPE == "all":
+                candidates = list(range(len(frames)))
+            else:
+                candidates = sorted(window_indices | set(still_labels))
+            sheet = _SpriteSheet(
+                _sprite_indices(candidates, peak_idx, settings.EVIDENCE_SPRITE_MAX_TILES), frames[0].shape
+            )
 
-        # ── Build 5-frame sequence around peak ─────────────────────
-        # Labels: -2s, -1s, IMPACT, +1s, +2s
-        offsets = [-2, -1, 0, 1, 2]
-        labels  = ["-2s", "-1s", "IMPACT", "+1s", "+2s"]
+        video_frames_dir = self.frames_dir / video_id
+        if still_labels or sheet is not None:
+            video_frames_dir.mkdir(parents=True, exist_ok=True)
+        if still_labels:
+            result['frame_dir'] = str(video_frames_dir)
+            result['peak_frame'] = peak_idx + frame_offset
 
-        selected = []
-        for offset, lbl in zip(offsets, labels):
-            idx = peak_idx + offset
-            if 0 <= idx < len(frames):
-                selected.append((idx, lbl))
+        clip_path = self.clips_dir / f"{video_id}_accident.mp4"
+        writer = _ClipWriter(clip_path, fps, frames[0].shape) if clip_indices else None
 
-        saved_frames = []
-        for idx, lbl in selected:
-            frame = frames[idx].copy()
-            is_impact = (lbl == "IMPACT")
+        # Canvases cycle between the drawing loop and the clip writer
+        free = queue.Queue()
+        for _ in range(max(settings.EVIDENCE_RENDER_QUEUE, 1) if writer else 1):
+            free.put(np.empty_like(frames[0]))
 
-            dets = detections_per_frame[idx] if (detections_per_frame and idx < len(detections_per_frame)) else []
-            annotated = _draw_annotated_frame(frame, dets, is_impact=is_impact, frame_label=lbl)
+        jobs = []
+        try:
+            for idx in sorted(clip_indices | set(still_labels) | set(sheet.indices if sheet else [])):
+                canvas = free.get()
+                if canvas.shape != frames[idx].shape:
+                    canvas = np.empty_like(frames[idx])
+                np.copyto(canvas, frames[idx])
+                dets = detections_per_frame[idx] if (detections_per_frame and idx < len(detections_per_frame)) else []
+                has_vehicles = _draw_vehicle_boxes(canvas, dets, is_impact=(idx == peak_idx))
+                if sheet is not None and idx in sheet:
+                    sheet.add(idx, canvas)
+
+                if idx in still_labels:
+                    still = canvas.copy()
+                    _stamp_context_label(still, still_labels[idx], has_vehicles)
+                    jobs.append((idx, self._encoder.submit(
+                        _write_still, video_frames_dir / self.still_name(idx + frame_offset),
+                        still, video_frames_dir / self.still_name(idx + frame_offset, thumb=True),
+                    )))
+
+                if writer is not None and idx in clip_indices:
+                    lbl = "IMPACT" if idx == peak_idx else (f"-{peak_idx-idx}f" if idx < peak_idx else f"+{idx-peak_idx}f")
+                    _stamp_context_label(canvas, lbl, has_vehicles)
+                    writer.put(canvas, free)
+                else:
+                    free.put(canvas)
+        finally:
+            if writer is not None:
+                written = writer.close()
+                if written:
+                    result['clip_path'] = str(clip_path)
+                    logger.info(
+                        f"Generated accident clip ({written} frames, {writer.codec}, peak={peak_idx}): {clip_path}"
+                    )
+
+        sprite_job = None
+        if sheet is not None:
+            sprite_job = self._encoder.submit(_write_still, video_frames_dir / self.sprite_name(), sheet.image)
 
-            frame_path = video_frames_dir / f"frame_{idx:04d}.jpg"
+        saved_frames = []
+        for idx, job in jobs:
             try:
-                cv2.imwrite(str(frame_path), annotated, [cv2.IMWRITE_JPEG_QUALITY, 95])
-                saved_frames.append(idx)
-                logger.debug(f"Saved {'IMPACT' if is_impact else 'context'} frame {idx} → {frame_path.name}")
+                if job.result():
+                    saved_frames.append(idx + frame_offset)
+                else:
+                    logger.error(f"Failed to save frame {idx}: encoder returned no image")
             except Exception as e:
                 logger.error(f"Failed to save frame {idx}: {e}")
+        result['saved_frames'] = saved_frames
+        result['total_count'] = len(saved_frames)
 
-        logger.info(f"Saved {len(saved_frames)} accident frames for video {video_id} (peak={peak_idx})")
-        return {
-            'total_count': len(saved_frames),
-            'saved_frames': saved_frames,
-            'frame_dir': str(video_frames_dir),
-            'peak_frame': peak_idx,
-        }
+        if sprite_job is not None:
+            try:
+                written = sprite_job.result()
+            except Exception as e:
+                logger.error(f"Failed to save contact sheet: {e}")
+                written = False
+            if written:
+                index_path = video_frames_dir / "sprite.json"
+                index = sheet.index(
+                    f"/frames/{video_id}/{self.sprite_name()}", frame_offset, peak_idx, sample_fps
+                )
+                index_path.write_text(json.dumps(index))
+                result['sprite_path'] = str(index_path)
+                logger.info(f"Saved contact sheet for video {video_id} ({len(sheet.indices)} tiles)")
+
+        if still_labels:
+            logger.info(
+                f"Saved {len(saved_frames)} accident frames for video {video_id} "
+                f"(peak={peak_idx + frame_offset})"
+            )
+        return result
 
-    def generate_accident_clip(
+    def save_accident_frames(
         self,
         video_id: str,
         frames: List[np.ndarray],
         event_frames: List[Tuple[int, int]],
-        fps: float = 10.0,
         detections_per_frame: List[List] = None,
         per_frame_physics: List[float] = None,
-    ) -> str:
-        """
-        Generate a short clip (±3s around collision peak) with annotated bounding boxes.
+        frame_offset: int = 0,
+        peak_idx: int = None,
+    ) -> dict:
         """
-        if not frames:
-            return ""
-
-        peak_idx = _find_collision_peak(
-            frames, detections_per_frame or [], per_frame_physics or [], event_frames
-        )
-
-        # ±3 seconds around peak
-        window = int(fps * 3)
-        start  = max(0, peak_idx - window)
-        end    = min(len(frames) - 1, peak_idx + window)
-        clip_indices = list(range(start, end + 1))
-
-        if not clip_indices:
-            return ""
+        Save the 5-frame accident sequence centred on the physics peak.
 
-        h, w = frames[0].shape[:2]
-        clip_path = self.clips_dir / f"{video_id}_accident.mp4"
+        Frame selection:
+          [-2s]  [-1s]  [IMPACT]  [+1s]  [+2s]
+          relative to the frame with highest collision signal.
 
-        try:
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out_writer = cv2.VideoWriter(str(clip_path), fourcc, fps, (w, h))
+        Bounding boxes:
+          RED   — vehicles with detected overlap (collision pair)
+          AMBER — other vehicles in the impact frame
+          GREEN — vehicles in context frames
 
-            for idx in clip_indices:
-                frame = frames[idx].copy()
-                dets  = detections_per_frame[idx] if (detections_per_frame and idx < len(detections_per_frame)) else []
-                is_impact = (idx == peak_idx)
-                lbl = "IMPACT" if is_impact else (f"-{peak_idx-idx}f" if idx < peak_idx else f"+{idx-peak_idx}f")
-                annotated = _draw_annotated_frame(frame, dets, is_impact=is_impact, frame_label=lbl)
-                out_writer.write(annotated)
+        See ``render_evidence`` for ``frame_offset`` and ``peak_idx``.
+        """
+        result = self.render_evidence(
+            video_id, frames, event_frames,
+            detections_per_frame=detections_per_frame,
+            per_frame_physics=per_frame_physics,
+            frame_offset=frame_offset,
+            peak_idx=peak_idx,
+            clip=False,
+            sprite=False,
+        )
+        result.pop('clip_path')
+        result.pop('sprite_path')
+        return result
 
-            out_writer.release()
-            logger.info(f"Generated accident clip ({len(clip_indices)} frames, peak={peak_idx}): {clip_path}")
-            return str(clip_path)
+    def generate_accident_clip(
+        self,
+        video_id: str,
+        frames: List[np.ndarray],
+        event_frames: List[Tuple[int, int]],
+        fps: float = 10.0,
+        detections_per_frame: List[List] = None,
+        per_frame_physics: List[float] = None,
+        peak_idx: int = None,
+    ) -> str:
+        """
+        Generate a short clip (±3s around collision peak) with annotated bounding boxes.
 
-        except Exception as e:
-            logger.error(f"Failed to generate accident clip: {e}")
-            return ""
+        ``peak_idx`` (relative to ``frames``) skips the peak search when the
+        caller already knows it.
+        """
+        return self.render_evidence(
+            video_id, frames, event_frames, fps=fps,
+            detections_per_frame=detections_per_frame,
+            per_frame_physics=per_frame_physics,
+            peak_idx=peak_idx,
+            stills=False,
+            sprite=False,
+        )['clip_path']
+
+    @staticmethod
+    def still_name(index: int, thumb: bool = False) -> str:
+        """File name of a still (or its thumbnail) for video frame ``index``."""
+        return f"{'thumb' if thumb else 'frame'}_{index:04d}.{settings.EVIDENCE_STILL_FORMAT}"
+
+    @staticmethod
+    def sprite_name() -> str:
+        return f"sprite.{settings.EVIDENCE_STILL_FORMAT}"
+
+    def get_sprite_url(self, video_id: str) -> str:
+        """URL of the contact-sheet index (``sprite.json``)."""
+        return f"/frames/{video_id}/sprite.json"
 
     def get_frame_urls(
         self,
         video_id: str,
         saved_frames: List[int],
         limit: int = 5,
+        thumb: bool = False,
     ) -> List[str]:
-        """Return relative URL paths for saved frames, in chronological order."""
+        """Return relative URL paths for saved frames (or their thumbnails), in chronological order."""
         return [
-            f"/frames/{video_id}/frame_{idx:04d}.jpg"
+            f"/frames/{video_id}/{self.still_name(idx, thumb)}"
             for idx in sorted(saved_frames)[:limit]
         ]
 
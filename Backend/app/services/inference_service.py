@@ -2,23 +2,86 @@
 from datetime import datetime
 from pathlib import Path
 import numpy as np
+import asyncio
+import functools
 import logging
+import multiprocessing
 import time
+from concurrent.futures import Executor, ThreadPoolExecutor
 
 INFERENCE_TIMEOUT_SECONDS = 1800  # Abort analysis after 30 minutes
 
 
 from app.services.video_service import get_video_path
 from app.ml.models.yolo_detector import YOLODetector
+from app.ml.models.cascade_detector import CascadeDetector
+from app.ml.models.roi_detector import ROIDetector
+from app.ml.models.memo_detector import MemoDetector
 from app.ml.models.lstm_model import LSTMDetector
 from app.ml.pipeline.frame_extractor import FrameExtractor
+from app.ml.pipeline.frame_pool import frame_pool
+from app.ml.pipeline.roi import RegionMask
 # FramePreprocessor removed — not used in the current pipeline
 from app.services.confidence_service import TemporalConfidenceAggregator
+from app.services.physics_service import PhysicsScorer, filter_vehicles
+from app.services.sampling_service import AdaptiveSampler, ReuseFiller
 from app.services.frame_service import accident_frame_service
+from app.services.evidence_service import evidence_service
+from app.services.progress_service import AnalysisCancelled, AnalysisProgress, RelayedProgress
+from app.services.quality_service import QualityTier, TIERS, planned_frames, quality_planner, queued_analyses
+from app.services.profile_service import AnalysisProfile, resolve_profile
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Analyses run here so the event loop keeps serving requests (and progress streams)
+_analysis_pool = ThreadPoolExecutor(max_workers=settings.ANALYSIS_WORKERS, thread_name_prefix="analysis")
+
+
+# ═════════════════════════════════════════════════════════════════════
+# LSTM FEATURES — Must match scripts/extract_features.py
+# ═════════════════════════════════════════════════════════════════════
+
+LSTM_SEQUENCE_LENGTH = 150  # Training sequence length (extract_features.py)
+
+# Z-score normalization — identical constants to extract_features.py
+V_MEAN, V_STD = 2.5, 3.0
+C_MEAN, C_STD = 0.4, 0.25
+B_MEAN, B_STD = 50000.0, 150000.0
+
+
+def compute_frame_features(vehicles: list) -> list:
+    """
+    Normalised [vehicle_count, avg_confidence, bbox_variance] for one frame.
+
+    Args:
+        vehicles: Vehicle detections for the frame
+
+    Returns:
+        list: 3 z-scored features
+    """
+    if vehicles:
+        num_v     = len(vehicles)
+        avg_conf  = float(np.mean([d['confidence'] for d in vehicles]))
+        bboxes    = np.array([d['bbox'] for d in vehicles])
+        bbox_var  = float(np.var(bboxes))
+    else:
+        num_v, avg_conf, bbox_var = 0, 0.0, 0.0
+
+    return [
+        (num_v    - V_MEAN) / V_STD,
+        (avg_conf - C_MEAN) / C_STD,
+        (bbox_var - B_MEAN) / B_STD,
+    ]
+
+
+def pad_sequence(features: list, length: int = LSTM_SEQUENCE_LENGTH) -> np.ndarray:
+    """Truncate or zero-pad a feature sequence to the LSTM input length."""
+    features = list(features)
+    if len(features) >= length:
+        return np.array(features[:length])
+    return np.array(features + [[0, 0, 0]] * (length - len(features)))
+
 
 # ═════════════════════════════════════════════════════════════════════
 # CONFIDENCE RESCALING — Enforced ranges: Accident 91-100, Safe 0-49
@@ -144,102 +207,110 @@ def generate_reasoning(
     )
 
 
-async def analyze_video_file(video_id: str, db=None) -> dict:
+def _analyze_clip(
+    video_path: Path,
+    frame_extractor: FrameExtractor,
+    yolo_detector: YOLODetector,
+    lstm_detector: LSTMDetector,
+    confidence_aggregator: TemporalConfidenceAggregator,
+    start_time: float,
+    start_frame: int = 0,
+    end_frame: int = None,
+    progress: AnalysisProgress = None,
+    max_frames: int = LSTM_SEQUENCE_LENGTH,
+    conf_threshold: float = None,
+) -> dict:
     """
-    Hybrid physics-based + LSTM accident detector.
+    Default analysis: the first 150 (``max_frames``) sampled frames (of the
+    video, or of the raw frame range [start_frame, end_frame)) scored as one
+    sequence, padded to the LSTM length.  ``conf_threshold`` defaults to
+    settings.DETECTION_CONF_THRESHOLD.
 
-    Decision hierarchy (in order of priority):
-      1. HARD GATE  — No vehicles detected  → NO ACCIDENT (non-dashcam video)
-      2. HARD GATE  — Very few vehicles across entire video  → NO ACCIDENT
-      3. PHYSICS    — Bounding box overlap, motion velocity, size change
-      4. LSTM       — Temporal pattern confirmation (only if physics signal > 0)
-      5. FINAL      — Weighted combination of physics + LSTM scores
+    Returns:
+        dict: Analysis state consumed by ``analyze_video_file`` (same keys as
+              ``long_video_service.analyze_long_video``)
     """
-    start_time = time.time()
+    progress = progress or AnalysisProgress()
+    if conf_threshold is None:
+        conf_threshold = settings.DETECTION_CONF_THRESHOLD
+
+    # ── Extract frames ────────────────────────────────────────────
+    logger.info("Extracting frames...")
+    progress.stage("decode")
+    frames = frame_extractor.extract_frames(
+        video_path, max_frames=max_frames, start_frame=start_frame, end_frame=end_frame,
+    )
+    logger.info(f"Extracted {len(frames)} frames from video")
+    if not frames:
+        raise ValueError("No frames extracted from video")
 
+    # The frames are the caller's once returned; on any failure they go back to the pool here
     try:
-        logger.info(f"Starting analysis for video: {video_id}")
-        video_path = get_video_path(video_id)
-        logger.info(f"Video path: {video_path}")
-
-        # Initialize components
-        frame_extractor = FrameExtractor()
-        yolo_detector   = YOLODetector()
-        lstm_detector   = LSTMDetector(settings.LSTM_MODEL_PATH)
-        confidence_aggregator = TemporalConfidenceAggregator(
-            window_size=settings.CONFIDENCE_WINDOW_SIZE,
-            spike_threshold=0.3,
-            consistency_threshold=0.65,
-        )
-
-        # ── Extract frames ────────────────────────────────────────────
-        logger.info("Extracting frames...")
-        frames = frame_extractor.extract_frames(video_path)
-        video_info = frame_extractor.get_video_info(video_path)
-        logger.info(f"Extracted {len(frames)} frames from video")
-        if not frames:
-            raise ValueError("No frames extracted from video")
-
         elapsed = time.time() - start_time
         if elapsed > INFERENCE_TIMEOUT_SECONDS:
             raise TimeoutError(f"Inference timed out during frame extraction")
 
-        # ── Step 1: YOLO Detection ────────────────────────────────────
+        # ── Step 1: YOLO Detection ────────────────────────────────
         logger.info("Running YOLOv8 detection...")
-        detections_per_frame = []
         lstm_features = []
-        vehicle_classes = {'car', 'truck', 'bus', 'motorcycle'}
+
+        # Physics signals are accumulated frame-by-frame alongside detection
+        frame_h, frame_w = frames[0].shape[:2]
+        physics_scorer = PhysicsScorer(frame_size=(frame_h, frame_w))
+
+        # Near-duplicate frames skip the detector; the sequence stays 1:1 with
+        # frames.  Each frame reaches the scorer as soon as its detections exist
+        # (reused frames held for interpolation wait for the next detection).
+        sampler = AdaptiveSampler() if settings.ADAPTIVE_SAMPLING else None
+        filler = ReuseFiller() if sampler else None
+        progress.stage("detect", total=len(frames))
+        detections_per_frame = []
+
+        def score(filled):
+            for dets in filled:
+                detections_per_frame.append(dets)
+                vehicles = filter_vehicles(dets)
+                physics_scorer.push(vehicles)
+                lstm_features.append(compute_frame_features(vehicles))
 
         for frame in frames:
-            dets = yolo_detector.detect(frame)
-            detections_per_frame.append(dets)
-            vehicles = [d for d in dets if d['class_name'] in vehicle_classes]
-
-            if vehicles:
-                num_v     = len(vehicles)
-                avg_conf  = float(np.mean([d['confidence'] for d in vehicles]))
-                bboxes    = np.array([d['bbox'] for d in vehicles])
-                bbox_var  = float(np.var(bboxes))
+            progress.check()
+            if sampler and not sampler.should_detect(frame):
+                score(filler.add(None))
             else:
-                num_v, avg_conf, bbox_var = 0, 0.0, 0.0
-
-            # Z-score normalization — identical constants to extract_features.py
-            V_MEAN, V_STD = 2.5, 3.0
-            C_MEAN, C_STD = 0.4, 0.25
-            B_MEAN, B_STD = 50000.0, 150000.0
-            lstm_features.append([
-                (num_v    - V_MEAN) / V_STD,
-                (avg_conf - C_MEAN) / C_STD,
-                (bbox_var - B_MEAN) / B_STD,
-            ])
+                dets = yolo_detector.detect(frame, conf_threshold)
+                score(filler.add(dets) if filler else [dets])
+            progress.advance()
+        if filler:
+            score(filler.flush())
 
         logger.info(f"YOLO detection complete: {len(lstm_features)} frames")
+        if sampler:
+            logger.info(f"Adaptive sampling: {sampler.stats()}")
         elapsed = time.time() - start_time
         if elapsed > INFERENCE_TIMEOUT_SECONDS:
             raise TimeoutError(f"Inference timed out during YOLO detection")
 
-        # ── Step 2: Physics-Based Accident Scoring ────────────────────
+        # ── Step 2: Physics-Based Accident Scoring ────────────────
         # Derived entirely from YOLO bounding boxes — no ML needed.
         logger.info("Computing physics-based accident score...")
 
-        per_frame_vehicles = [
-            [d for d in dets if d['class_name'] in vehicle_classes]
-            for dets in detections_per_frame
-        ]
+        # Stay empty when a hard gate fires before physics is summarised
+        per_frame_physics = []
+        overlap_scores    = []
 
-        # Gate 1: overall vehicle presence
-        total_vehicles    = sum(len(v) for v in per_frame_vehicles)
-        frames_with_vehicles = sum(1 for v in per_frame_vehicles if len(v) > 0)
-        vehicle_coverage  = frames_with_vehicles / max(len(frames), 1)  # 0–1
-        avg_vehicles_per_frame = total_vehicles / max(len(frames), 1)
+        # Gate 1: overall vehicle presence (accumulated during detection)
+        total_vehicles    = physics_scorer.total_vehicles
+        vehicle_coverage  = physics_scorer.vehicle_coverage  # 0–1
+        avg_vehicles_per_frame = physics_scorer.avg_vehicles_per_frame
 
         logger.info(
             f"Vehicle stats: total={total_vehicles}, coverage={vehicle_coverage:.2f}, "
             f"avg_per_frame={avg_vehicles_per_frame:.2f}"
         )
 
-        # ── HARD GATE 1: Not a driving video ──────────────────────────
-        if vehicle_coverage < 0.20 or avg_vehicles_per_frame < 0.3:
+        # ── HARD GATE 1: Not a driving video ──────────────────────
+        if not physics_scorer.passes_presence_gate():
             logger.info(
                 f"HARD GATE triggered: vehicle_coverage={vehicle_coverage:.2f} < 0.20 "
                 f"or avg_vehicles={avg_vehicles_per_frame:.2f} < 0.3 → NO ACCIDENT"
@@ -257,108 +328,17 @@ async def analyze_video_file(video_id: str, db=None) -> dict:
             }
 
         else:
-            # ── Physics Score: measure real accident indicators ────────
-            # FIX #1: Use OVERLAP SPIKE (sudden increase) not absolute max
-            # FIX #5: Normalize motion by frame dimensions
-            overlap_scores     = []   # per-frame max IoU between vehicle pairs
-            motion_scores      = []   # frame-to-frame center displacement
-            size_change_scores = []   # frame-to-frame area % change
-
-            prev_centers = []
-            prev_areas   = []
-
-            # Get frame dimensions for motion normalization
-            frame_h, frame_w = frames[0].shape[:2] if frames else (480, 640)
-            frame_diag = (frame_w**2 + frame_h**2) ** 0.5  # diagonal for normalization
-
-            for vehicles in per_frame_vehicles:
-                bboxes  = [v['bbox'] for v in vehicles]  # [x1,y1,x2,y2]
-                areas   = [(b[2]-b[0])*(b[3]-b[1]) for b in bboxes]
-                centers = [((b[0]+b[2])/2, (b[1]+b[3])/2) for b in bboxes]
-
-                # Overlap: max IoU between any two vehicles in this frame
-                frame_overlap = 0.0
-                for i in range(len(bboxes)):
-                    for j in range(i+1, len(bboxes)):
-                        b1, b2 = bboxes[i], bboxes[j]
-                        ix1 = max(b1[0], b2[0]); iy1 = max(b1[1], b2[1])
-                        ix2 = min(b1[2], b2[2]); iy2 = min(b1[3], b2[3])
-                        if ix2 > ix1 and iy2 > iy1:
-                            inter = (ix2-ix1) * (iy2-iy1)
-                            union = areas[i] + areas[j] - inter
-                            frame_overlap = max(frame_overlap, inter / max(union, 1))
-                overlap_scores.append(frame_overlap)
-
-                # Motion: compare centers with previous frame (normalized by frame diagonal)
-                if prev_centers and centers:
-                    dists = []
-                    for c in centers:
-                        nearest = min(prev_centers, key=lambda p: (p[0]-c[0])**2+(p[1]-c[1])**2)
-                        d = ((nearest[0]-c[0])**2 + (nearest[1]-c[1])**2) ** 0.5
-                        dists.append(d / frame_diag)  # FIX #5: normalize
-                    motion_scores.append(float(np.mean(dists)))
-
-                # Area change: sudden size change = crash indicator
-                if prev_areas and areas:
-                    min_len = min(len(prev_areas), len(areas))
-                    pct_changes = [
-                        abs(areas[k] - prev_areas[k]) / max(prev_areas[k], 1)
-                        for k in range(min_len)
-                    ]
-                    size_change_scores.append(float(np.mean(pct_changes)))
-
-                prev_centers = centers
-                prev_areas   = areas
-
-            # ─────────────────────────────────────────────────────────
-            # FIX #1: OVERLAP SPIKE — not absolute max
-            # Normal traffic has sustained overlap; accidents have SUDDEN overlap
-            overlap_arr = np.array(overlap_scores) if overlap_scores else np.array([0.0])
-
-            if len(overlap_arr) > 5:
-                # Smooth with 5-frame rolling average, then find biggest jump
-                kernel = np.ones(5) / 5
-                smoothed = np.convolve(overlap_arr, kernel, mode='valid')
-                overlap_deltas = np.diff(smoothed)
-                # Max positive spike = sudden collision
-                overlap_spike = float(np.max(overlap_deltas)) if len(overlap_deltas) > 0 else 0.0
-                # Also track absolute max (but weight spike much higher)
-                abs_max_overlap = float(np.max(overlap_arr))
-                # STRICTER: Spike score: 0.50 spike = score 1.0 (was 0.35)
-                spike_score = min(max(overlap_spike, 0.0) / 0.50, 1.0)
-                # Combined: 90% spike + 10% absolute (spike dominates)
-                overlap_score = spike_score * 0.90 + min(abs_max_overlap, 1.0) * 0.10
-            else:
-                abs_max_overlap = float(np.max(overlap_arr)) if len(overlap_arr) > 0 else 0.0
-                overlap_score = abs_max_overlap
-                overlap_spike = 0.0
-
-            # Motion: use normalized values (FIX #5 already applied above)
-            motion_arr = np.array(motion_scores) if motion_scores else np.array([0.0])
-            motion_p90 = float(np.percentile(motion_arr, 90)) if len(motion_arr) > 0 else 0.0
-            motion_score = min(motion_p90 / 0.15, 1.0)  # 15% of diagonal = max (STRICTER)
-
-            size_arr = np.array(size_change_scores) if size_change_scores else np.array([0.0])
-            size_p90 = float(np.percentile(size_arr, 90)) if len(size_arr) > 0 else 0.0
-            size_score = min(size_p90 / 1.5, 1.0)  # Require 150% size change (down-weighted)
-
-            # Per-frame combined physics score (for frame selection later)
-            n = len(per_frame_vehicles)
-            motion_padded = [0.0] + motion_scores + [0.0] * max(0, n - len(motion_scores) - 1)
-            size_padded   = [0.0] + size_change_scores + [0.0] * max(0, n - len(size_change_scores) - 1)
-            per_frame_physics = [
-                overlap_scores[i] * 0.55 +
-                min(motion_padded[i] / 0.10, 1.0) * 0.30 +
-                min(size_padded[i]   / 1.5,  1.0) * 0.15
-                for i in range(min(n, len(overlap_scores)))
-            ]
-
-            # Final physics score: weighted combination
-            physics_score = (
-                overlap_score  * 0.70 +   # HEAVILY favor spike-based overlap (increased)
-                motion_score   * 0.20 +   # sudden movement (decreased)
-                size_score     * 0.10     # bbox size change (unreliable, downweighted)
-            )
+            # ── Physics Score: measure real accident indicators ────
+            # Spike-based overlap (sudden increase, not absolute max) and
+            # motion normalised by frame diagonal — see PhysicsScorer.
+            physics = physics_scorer.summary()
+            physics_score     = physics['physics_score']
+            overlap_spike     = physics['overlap_spike']
+            overlap_score     = physics['overlap_score']
+            motion_score      = physics['motion_score']
+            size_score        = physics['size_score']
+            per_frame_physics = physics['per_frame_physics']
+            overlap_scores    = physics['overlap_scores']
 
             logger.info(
                 f"Physics score: {physics_score:.3f} "
@@ -366,8 +346,8 @@ async def analyze_video_file(video_id: str, db=None) -> dict:
                 f"motion={motion_score:.3f}, size={size_score:.3f})"
             )
 
-            # ── HARD GATE 2: No physics signal = no accident ──────────
-            if physics_score < 0.20 and overlap_spike < 0.05:
+            # ── HARD GATE 2: No physics signal = no accident ──────
+            if not physics_scorer.passes_signal_gate(physics):
                 logger.info(
                     f"HARD GATE 2: physics={physics_score:.3f}, "
                     f"overlap_spike={overlap_spike:.3f} → NO ACCIDENT"
@@ -385,12 +365,11 @@ async def analyze_video_file(video_id: str, db=None) -> dict:
                 }
 
             else:
-                # ── Step 3: LSTM Analysis ─────────────────────────────
+                # ── Step 3: LSTM Analysis ─────────────────────────
                 # Single prediction on full sequence — matches how model was trained
                 logger.info("Running LSTM analysis...")
-                max_frames = 150
-                padded = np.array(lstm_features[:max_frames] if len(lstm_features) >= max_frames
-                                  else lstm_features + [[0,0,0]]*(max_frames - len(lstm_features)))
+                progress.stage("lstm")
+                padded = pad_sequence(lstm_features)
                 lstm_confidence = lstm_detector.predict(padded)
                 # Fill frame_confidences for aggregator compatibility
                 frame_confidences = [lstm_confidence] * len(padded)
@@ -408,7 +387,7 @@ async def analyze_video_file(video_id: str, db=None) -> dict:
                     f"temporal_stability: {aggregation_result['temporal_stability']:.3f}"
                 )
 
-                # ── Step 5: LSTM-Only Decision ────────────────────────
+                # ── Step 5: LSTM-Only Decision ────────────────────
                 # Server logs show physics scores are identical for normal
                 # driving (0.33-0.53) and accidents (0.37-0.60) — physics
                 # CANNOT distinguish them.  Only LSTM reliably separates:
@@ -424,31 +403,348 @@ async def analyze_video_file(video_id: str, db=None) -> dict:
                     f"raw_confidence={raw_confidence:.3f} is_accident={is_accident}"
                 )
 
-        status = "accident" if is_accident else "no_accident"
+        return {
+            'frames': frames,
+            'frame_offset': 0,
+            'total_frames': len(frames),
+            'detections_per_frame': detections_per_frame,
+            'per_frame_physics': per_frame_physics,
+            'overlap_scores': overlap_scores,
+            'total_vehicles': total_vehicles,
+            'is_accident': is_accident,
+            'raw_confidence': raw_confidence,
+            'aggregation_result': aggregation_result,
+            'peak_idx': None,
+            'details': {"adaptiveSampling": sampler.stats()} if sampler else {},
+        }
+    except BaseException:
+        frame_pool.release(frames)
+        raise
+
+
+async def analyze_video_file(
+    video_id: str,
+    db=None,
+    long_video: bool = None,
+    start_frame: int = None,
+    end_frame: int = None,
+    two_pass: bool = None,
+    roi: RegionMask = None,
+    detector=None,
+    progress: AnalysisProgress = None,
+    latency_budget: float = None,
+    profile: AnalysisProfile = None,
+    lstm_detector: LSTMDetector = None,
+    executor: Executor = None,
+) -> dict:
+    """
+    Hybrid physics-based + LSTM accident detector.
+
+    Decision hierarchy (in order of priority):
+      1. HARD GATE  — No vehicles detected  → NO ACCIDENT (non-dashcam video)
+      2. HARD GATE  — Very few vehicles across entire video  → NO ACCIDENT
+      3. PHYSICS    — Bounding box overlap, motion velocity, size change
+      4. LSTM       — Temporal pattern confirmation (only if physics signal > 0)
+      5. FINAL      — Weighted combination of physics + LSTM scores
+
+    With ``long_video`` (default: settings.LONG_VIDEO_MODE) the same gates
+    and LSTM run on every overlapping 150-frame window of the full video
+    instead of only the first 150 sampled frames.  ``two_pass`` (default:
+    settings.TWO_PASS_MODE, takes precedence) scans the video at low FPS
+    and runs the dense analysis only on windows around overlap spikes.
+
+    ``start_frame``/``end_frame`` (raw frame bounds, see
+    ``FrameExtractor.resolve_range``) restrict analysis to part of the
+    video.  Event frames, evidence file names and timestamps are then
+    reported in absolute video position, and ``details.analysisRange``
+    records the range and the sampling rate that maps frames to seconds.
+
+    ``roi`` restricts detection to a camera's region of interest in every
+    mode: the detector sees only the mask's bounding rectangle and
+    detections outside the mask are dropped before physics scoring.
+
+    ``detector`` replaces the configured detector, e.g. a ``MemoDetector``
+    that already scored frames while the video was uploading, and
+    ``lstm_detector`` a loaded LSTM to reuse (both may be shared by runs on
+    other threads, as in a bulk job).  ``executor`` replaces the
+    ANALYSIS_WORKERS pool the analysis runs on.
+
+    The analysis runs on a worker thread (ANALYSIS_WORKERS) and reports
+    its stages and frame counts to ``progress``; ``progress.cancel()`` stops
+    it at the next frame.  With ANALYSIS_ISOLATION="process" it runs in a
+    child process that is killed if it ignores the cancellation (or the
+    timeout) for ANALYSIS_CANCEL_GRACE seconds — except with a custom
+    ``detector``, which lives in this process.
+
+    ``latency_budget`` (seconds including queueing; default
+    settings.ANALYSIS_LATENCY_BUDGET, 0 = none) lets the analysis drop to
+    a coarser quality tier (see ``quality_service``) when the queue and
+    recent timings say full quality would miss it; the tier is reported in
+    ``details.quality``.  Not applied with a custom ``detector``.
+
+    ``profile`` (default: settings.ANALYSIS_PROFILE) sets sampling rate,
+    detector, confidence threshold, batch size, frame cap, evidence
+    rendering and long-video mode; a quality tier degrades it further.
+    The profile the run used and its per-stage seconds are reported in
+    ``details.profile``.
+    """
+    if latency_budget is None:
+        latency_budget = settings.ANALYSIS_LATENCY_BUDGET
+    options = dict(
+        long_video=long_video, start_frame=start_frame, end_frame=end_frame,
+        two_pass=two_pass, roi=roi, profile=profile or resolve_profile(), lstm_detector=lstm_detector,
+    )
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor or _analysis_pool, functools.partial(
+        _run_analysis, video_id, progress or AnalysisProgress(video_id), detector, latency_budget, options,
+    ))
+
+
+def _plan_quality(video_id: str, progress: AnalysisProgress, budget: float, options: dict):
+    """Quality tier for a run that just got a worker (full quality if it cannot be planned)."""
+    profile = options['profile']
+    two_pass = settings.TWO_PASS_MODE if options['two_pass'] is None else options['two_pass']
+    long_video = _resolve_long_video(options['long_video'], profile)
+    try:
+        meta = FrameExtractor().probe(get_video_path(video_id))
+    except Exception as e:
+        # The analysis reports the problem with its usual error
+        logger.warning(f"Quality planning skipped for {video_id}: {e}")
+        return TIERS[0], None
+    tier, plan = quality_planner.plan(
+        budget,
+        lambda t: planned_frames(
+            meta, profile.with_quality(t), _frame_cap(profile),
+            long_video=long_video and not two_pass, two_pass=two_pass,
+            start_frame=options['start_frame'], end_frame=options['end_frame'],
+        ),
+        waited=time.time() - progress.started_at,
+        queued=queued_analyses(progress),
+        scope=profile.name,
+    )
+    logger.info(f"Quality plan for {video_id}: {plan}")
+    return tier, plan
+
+
+def _run_analysis(video_id: str, progress: AnalysisProgress, detector, latency_budget: float, options: dict) -> dict:
+    """Worker-thread body of ``analyze_video_file``: plan, analyse, learn the run's timings."""
+    tier, plan = TIERS[0], None
+    if latency_budget and detector is None:
+        progress.check()
+        tier, plan = _plan_quality(video_id, progress, latency_budget, options)
+    quality = tier if plan is not None else None
+
+    if settings.ANALYSIS_ISOLATION == "process" and detector is None:
+        # The child loads its own LSTM
+        result = _analyze_in_subprocess(video_id, progress, dict(options, quality=quality, lstm_detector=None))
+    else:
+        result = _analyze_video_file(video_id, detector=detector, progress=progress, quality=quality, **options)
+
+    # Pre-computed detections (upload overlap) would understate the cost
+    profile = options['profile']
+    if detector is None:
+        quality_planner.observe(tier, progress, scope=profile.name)
+    if plan is not None:
+        result["details"]["quality"] = plan
+    result["details"]["profile"] = {
+        **profile.with_quality(quality).describe(),
+        "longVideo": _resolve_long_video(options['long_video'], profile),
+        "stageTimes": {stage: round(seconds, 3) for stage, (seconds, _) in progress.stage_times().items()},
+    }
+    return result
+
+
+def _resolve_long_video(long_video: bool, profile: AnalysisProfile) -> bool:
+    """Request value, else the profile's, else settings.LONG_VIDEO_MODE."""
+    if long_video is not None:
+        return long_video
+    return profile.long_video if profile.long_video is not None else settings.LONG_VIDEO_MODE
+
+
+def _frame_cap(profile: AnalysisProfile) -> int:
+    """Sampled frames the default analysis scores (the LSTM sequence at most)."""
+    return min(profile.max_frames or LSTM_SEQUENCE_LENGTH, LSTM_SEQUENCE_LENGTH)
+
+
+def _subprocess_main(target, video_id: str, conn, cancel_event, options: dict):
+    """Child process entry point: run ``target`` and send back its outcome."""
+    progress = RelayedProgress(video_id, conn, cancel_event)
+    try:
+        result = target(video_id, progress=progress, **options)
+        conn.send(("result", (result,)))
+    except Exception as e:
+        try:
+            conn.send(("error", (e,)))
+        except Exception:
+            # The exception itself could not be pickled
+            conn.send(("error", (RuntimeError(str(e)),)))
+    finally:
+        conn.close()
+
+
+def _analyze_in_subprocess(video_id: str, progress: AnalysisProgress, options: dict, target=None) -> dict:
+    """
+    Run ``target`` (default ``_analyze_video_file``) in a child process,
+    replaying its progress on ``progress``.
+
+    Cancelling ``progress`` is forwarded to the child; a child that has
+    not stopped ANALYSIS_CANCEL_GRACE seconds later — or is still running
+    that long after INFERENCE_TIMEOUT_SECONDS — is killed, so a run stuck
+    inside one decode or detector call still frees its worker.
+    """
+    progress.check()
+    ctx = multiprocessing.get_context("spawn")
+    receiver, sender = ctx.Pipe(duplex=False)
+    cancel_event = ctx.Event()
+    child = ctx.Process(
+        target=_subprocess_main, name=f"analysis-{video_id}", daemon=True,
+        args=(target or _analyze_video_file, video_id, sender, cancel_event, options),
+    )
+    child.start()
+    sender.close()
+
+    hard_deadline = time.time() + INFERENCE_TIMEOUT_SECONDS + settings.ANALYSIS_CANCEL_GRACE
+    cancelled_at = None
+    try:
+        while True:
+            if receiver.poll(settings.PROGRESS_POLL_INTERVAL):
+                try:
+                    method, args = receiver.recv()
+                except EOFError:
+                    child.join()
+                    raise RuntimeError(f"Analysis process exited with code {child.exitcode}")
+                if method == "result":
+                    return args[0]
+                if method == "error":
+                    raise args[0]
+                getattr(progress, method)(*args)
+
+            if progress.cancelled:
+                if cancelled_at is None:
+                    cancel_event.set()
+                    cancelled_at = time.time()
+                elif time.time() - cancelled_at > settings.ANALYSIS_CANCEL_GRACE:
+                    logger.warning(f"Analysis of {video_id} ignored cancellation; killing pid {child.pid}")
+                    raise AnalysisCancelled(progress.cancel_reason)
+            if time.time() > hard_deadline:
+                logger.warning(f"Analysis of {video_id} overran its timeout; killing pid {child.pid}")
+                raise TimeoutError(f"Inference timed out during {progress.stage_name}")
+    finally:
+        receiver.close()
+        if child.is_alive():
+            child.kill()
+        child.join()
+
+
+def _analyze_video_file(
+    video_id: str,
+    long_video: bool = None,
+    start_frame: int = None,
+    end_frame: int = None,
+    two_pass: bool = None,
+    roi: RegionMask = None,
+    detector=None,
+    progress: AnalysisProgress = None,
+    quality: QualityTier = None,
+    profile: AnalysisProfile = None,
+    lstm_detector: LSTMDetector = None,
+) -> dict:
+    """Blocking body of ``analyze_video_file`` (``quality``: tier applied to ``profile``, None = as is)."""
+    progress = progress or AnalysisProgress(video_id)
+    start_time = time.time()
+    progress.deadline = start_time + INFERENCE_TIMEOUT_SECONDS
+    frames = []
+
+    try:
+        # Cancelled while queued: hand the worker straight to the next run
+        progress.check()
+        logger.info(f"Starting analysis for video: {video_id}")
+        video_path = get_video_path(video_id)
+        logger.info(f"Video path: {video_path}")
+
+        # Initialize components
+        profile = (profile or resolve_profile()).with_quality(quality)
+        frame_extractor = profile.frame_extractor()
+        if detector is None:
+            detector = profile.create_detector()
+        yolo_detector   = ROIDetector(detector, roi) if roi is not None else detector
+        lstm_detector   = lstm_detector or LSTMDetector(settings.LSTM_MODEL_PATH)
+        confidence_aggregator = TemporalConfidenceAggregator(
+            window_size=settings.CONFIDENCE_WINDOW_SIZE,
+            spike_threshold=0.3,
+            consistency_threshold=0.65,
+        )
+
+        # ── Detection, physics gates and LSTM scoring ───────────────
+        ranged = start_frame is not None or end_frame is not None
+        start_frame = start_frame or 0
+        if ranged:
+            logger.info(f"Analysing frame range {start_frame}-{end_frame if end_frame is not None else 'end'}")
+
+        if two_pass is None:
+            two_pass = settings.TWO_PASS_MODE
+        long_video = _resolve_long_video(long_video, profile)
+        if two_pass:
+            logger.info("Two-pass mode: coarse scan, dense refinement around candidates")
+            from app.services.coarse_to_fine_service import analyze_coarse_to_fine
+            analysis = analyze_coarse_to_fine(
+                video_path, frame_extractor, yolo_detector, lstm_detector,
+                confidence_aggregator, deadline=start_time + INFERENCE_TIMEOUT_SECONDS,
+                start_frame=start_frame, end_frame=end_frame, progress=progress,
+                batch_size=profile.batch_size, conf_threshold=profile.conf_threshold,
+            )
+        elif long_video:
+            logger.info("Long-video mode: scoring overlapping windows across the full video")
+            from app.services.long_video_service import analyze_long_video
+            analysis = analyze_long_video(
+                video_path, frame_extractor, yolo_detector, lstm_detector,
+                confidence_aggregator, deadline=start_time + INFERENCE_TIMEOUT_SECONDS,
+                start_frame=start_frame, end_frame=end_frame, progress=progress,
+                batch_size=profile.batch_size, conf_threshold=profile.conf_threshold,
+            )
+        else:
+            analysis = _analyze_clip(
+                video_path, frame_extractor, yolo_detector, lstm_detector,
+                confidence_aggregator, start_time,
+                start_frame=start_frame, end_frame=end_frame, progress=progress,
+                max_frames=_frame_cap(profile), conf_threshold=profile.conf_threshold,
+            )
+        video_info = frame_extractor.get_video_info(video_path)
 
-        # Variables may not be set when a hard gate fired — ensure they exist
-        try:    frame_confidences
-        except NameError: frame_confidences = []
-        try:    overlap_scores
-        except NameError: overlap_scores = []
+        # Analysis indices count from the first sampled frame of the range;
+        # everything reported below is shifted back to absolute position.
+        # (Two-pass analysis reports where its refined window starts.)
+        interval      = frame_extractor.sampling_interval(video_info['fps'])
+        sample_offset = analysis.get('sample_offset', -(-start_frame // interval))
+
+        frames               = analysis['frames']
+        frame_offset         = analysis['frame_offset']
+        total_frames         = analysis['total_frames']
+        detections_per_frame = analysis['detections_per_frame']
+        per_frame_physics    = analysis['per_frame_physics']
+        overlap_scores       = analysis['overlap_scores']
+        total_vehicles       = analysis['total_vehicles']
+        is_accident          = analysis['is_accident']
+        raw_confidence       = analysis['raw_confidence']
+        aggregation_result   = analysis['aggregation_result']
+
+        status = "accident" if is_accident else "no_accident"
 
         # Step 6: Save Accident Events
+        progress.stage("render")
         event_frames = aggregation_result.get('event_frames', [])
-        frame_data = {'total_count': 0, 'frame_urls': [], 'clip_url': ''}
+        frame_data = {'total_count': 0, 'frame_urls': [], 'thumbnail_urls': [], 'clip_url': '', 'sprite_url': ''}
 
         # Fallback: If accident detected but no usable event frames,
         # use per-frame physics scores (which vary per frame, unlike LSTM
         # confidence which is constant for all frames).
         if is_accident and not event_frames:
             logger.info("Accident detected but no event frames found. Using top physics frames.")
-            try:
-                scores = np.array(per_frame_physics) if per_frame_physics else np.zeros(len(frames))
-            except NameError:
-                scores = np.zeros(len(frames))
+            scores = np.array(per_frame_physics) if per_frame_physics else np.zeros(total_frames)
 
             # If physics scores are empty/zero, fall back to overlap_scores
             if np.max(scores) == 0 and overlap_scores:
-                scores = np.array(overlap_scores + [0.0] * (len(frames) - len(overlap_scores)))
+                scores = np.array(overlap_scores + [0.0] * (total_frames - len(overlap_scores)))
 
             top_indices = sorted(np.argsort(scores)[-10:].tolist())
             if top_indices:
@@ -463,46 +759,64 @@ async def analyze_video_file(video_id: str, db=None) -> dict:
                         current_end   = top_indices[i]
                 event_frames.append((current_start, current_end))
 
-        if is_accident and event_frames:
+        if is_accident and event_frames and not profile.evidence:
+            logger.info(f"Evidence rendering is off in profile {profile.name!r}")
+        elif is_accident and event_frames:
             logger.info(f"Saving accident frames for video: {video_id}")
 
-            # Get per-frame physics if available (from physics analysis path)
-            _per_frame_physics = per_frame_physics if 'per_frame_physics' in dir() else []
-            try:    _per_frame_physics = per_frame_physics
-            except NameError: _per_frame_physics = []
-
-            # Save frames to disk (uses physics peak for exact frame selection)
-            save_result = accident_frame_service.save_accident_frames(
-                video_id=video_id,
-                frames=frames,
-                event_frames=event_frames,
-                detections_per_frame=detections_per_frame,
-                per_frame_physics=_per_frame_physics,
-            )
+            # Evidence frames may be a slice of the video (long-video mode):
+            # align detections, physics and events to the slice.
+            lo, hi = frame_offset, frame_offset + len(frames)
+            slice_events = [
+                (max(s, lo) - lo, min(e, hi - 1) - lo)
+                for s, e in event_frames if e >= lo and s < hi
+            ]
+            slice_peak = analysis['peak_idx'] - lo if analysis['peak_idx'] is not None else None
 
-            # Generate annotated accident clip around collision peak
-            clip_path = accident_frame_service.generate_accident_clip(
+            evidence_args = dict(
                 video_id=video_id,
                 frames=frames,
-                event_frames=event_frames,
+                event_frames=slice_events,
                 fps=video_info.get('fps', 10.0),
-                detections_per_frame=detections_per_frame,
-                per_frame_physics=_per_frame_physics,
+                detections_per_frame=detections_per_frame[lo:hi],
+                per_frame_physics=per_frame_physics[lo:hi],
+                frame_offset=sample_offset + lo,
+                peak_idx=slice_peak,
+                sample_fps=video_info['fps'] / interval,
             )
+            if settings.EVIDENCE_LAZY:
+                # Stills and clip are rendered when first requested
+                save_result = evidence_service.register(
+                    video_path=video_path, interval=interval, **evidence_args
+                )
+            else:
+                # Stills and clip in one pass (uses physics peak for exact frame selection)
+                evidence_service.evict_video(video_id)
+                save_result = accident_frame_service.render_evidence(**evidence_args)
 
-            # Get URLs
+            # Get URLs (stable before a lazy render)
             frame_urls = accident_frame_service.get_frame_urls(
                 video_id=video_id,
                 saved_frames=save_result['saved_frames'],
                 limit=5
             )
+            thumbnail_urls = accident_frame_service.get_frame_urls(
+                video_id=video_id,
+                saved_frames=save_result['saved_frames'],
+                limit=5,
+                thumb=True,
+            )
 
-            clip_url = accident_frame_service.get_clip_url(video_id)
+            clip_url = evidence_service.get_clip_url(video_id)
 
             frame_data = {
                 'total_count': save_result['total_count'],
                 'frame_urls': frame_urls,
-                'clip_url': clip_url
+                'thumbnail_urls': thumbnail_urls,
+                'clip_url': clip_url,
+                'sprite_url': (
+                    accident_frame_service.get_sprite_url(video_id) if save_result.get('sprite_path') else ''
+                ),
             }
 
             logger.info(
@@ -531,22 +845,25 @@ async def analyze_video_file(video_id: str, db=None) -> dict:
             detections_per_frame, event_frames, total_vehicles
         )
 
+        # Events in absolute video frames (identical unless a range was given)
+        reported_events = [(s + sample_offset, e + sample_offset) for s, e in event_frames]
+
         # Build frame evidence string
         frame_evidence = ""
-        if event_frames:
-            frame_ranges = [f"frames {s}-{e}" for s, e in event_frames]
+        if reported_events:
+            frame_ranges = [f"frames {s}-{e}" for s, e in reported_events]
             frame_evidence = ", ".join(frame_ranges)
         else:
-            frame_evidence = f"No specific event frames (analyzed {len(frames)} total)"
+            frame_evidence = f"No specific event frames (analyzed {total_frames} total)"
 
         # Generate forensic reasoning
         reasoning = generate_reasoning(
             is_accident=is_accident,
             confidence=confidence_score,
-            total_frames=len(frames),
+            total_frames=total_frames,
             total_vehicles=total_vehicles,
             temporal_stability=aggregation_result['temporal_stability'],
-            event_frames=event_frames,
+            event_frames=reported_events,
             accident_type=accident_type,
             severity=severity,
         )
@@ -576,29 +893,54 @@ async def analyze_video_file(video_id: str, db=None) -> dict:
 
             # ── Details (preserved for frontend compatibility) ──
             "details": {
-                "spatialFeatures": f"Detected {len([d for f in detections_per_frame for d in f])} objects across {len(frames)} frames",
+                "spatialFeatures": f"Detected {len([d for f in detections_per_frame for d in f])} objects across {total_frames} frames",
                 "temporalFeatures": f"Temporal stability: {aggregation_result['temporal_stability']:.2f}",
-                "frameCount": int(len(frames)),
+                "frameCount": int(total_frames),
                 "duration": f"{video_info['duration']:.1f} seconds",
                 "temporalStability": round(float(aggregation_result['temporal_stability']), 3),
                 "spikeFiltered": bool(aggregation_result['spike_filtered']),
-                "eventFrames": [[int(start), int(end)] for start, end in aggregation_result['event_frames']],
+                "eventFrames": [[int(start), int(end)] for start, end in reported_events],
+                # Real sampling rate (source fps / whole-frame interval): event frames ÷ this = seconds
+                "sampleFps": round(video_info['fps'] / interval, 4),
                 "maxConfidence": round(float(aggregation_result['max_confidence']), 3),
                 "meanConfidence": round(float(aggregation_result['mean_confidence']), 3),
                 "totalVehicles": total_vehicles,
                 # Accident frame data
                 "accidentFrameCount": int(frame_data['total_count']),
                 "accidentFrameUrls": frame_data['frame_urls'],
+                "accidentThumbnailUrls": frame_data['thumbnail_urls'],
                 "accidentClipUrl": frame_data['clip_url'],
+                "accidentSpriteUrl": frame_data['sprite_url'],
                 # New detailed fields
                 "accidentType": accident_type,
                 "severity": severity,
                 "frameEvidence": frame_evidence,
                 "reasoning": reasoning,
                 "rawConfidence": round(float(raw_confidence), 4),
+                # Long-video mode: per-window timeline and whole-video peak
+                **analysis['details'],
             }
         }
 
+        if isinstance(detector, MemoDetector):
+            result["details"]["uploadOverlap"] = detector.stats()
+            detector = detector.detector
+        if isinstance(detector, CascadeDetector):
+            result["details"]["detectorCascade"] = detector.stats()
+        if isinstance(yolo_detector, ROIDetector):
+            result["details"]["roi"] = yolo_detector.stats()
+
+        if ranged:
+            result["details"]["analysisRange"] = {
+                "startFrame": int(start_frame),
+                "endFrame": int(end_frame if end_frame is not None else video_info['frame_count']),
+                "startSeconds": round(start_frame / video_info['fps'], 2),
+                "endSeconds": round(
+                    (end_frame if end_frame is not None else video_info['frame_count']) / video_info['fps'], 2
+                ),
+                "sampleFps": result["details"]["sampleFps"],
+            }
+
         return result
 
     except FileNotFoundError as e:
@@ -607,10 +949,15 @@ async def analyze_video_file(video_id: str, db=None) -> dict:
     except TimeoutError as e:
         logger.error(f"Inference timeout for video {video_id}: {e}")
         raise
+    except AnalysisCancelled as e:
+        logger.info(f"Analysis of {video_id} cancelled: {e}")
+        raise
     except Exception as e:
         logger.error(f"Analysis failed for video {video_id}: {str(e)}", exc_info=True)
         raise RuntimeError(f"Analysis failed: {str(e)}")
     finally:
+        # Decoded frames go back to the buffer pool on every path (evidence is on disk)
+        frame_pool.release(frames)
         # Cleanup GPU memory
         try:
             import torch
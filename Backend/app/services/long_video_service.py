@@ -0,0 +1,372 @@
+"""Full-length video analysis over overlapping LSTM windows"""
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.ml.models.cascade_detector import reset_motion
+from app.services.physics_service import PhysicsScorer, filter_vehicles
+from app.services.sampling_service import AdaptiveSampler, fill_reused, sampling_details
+from app.services.progress_service import AnalysisProgress
+from app.services.inference_service import (
+    LSTM_SEQUENCE_LENGTH,
+    compute_frame_features,
+    pad_sequence,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def window_starts(n_frames: int, window: int = LSTM_SEQUENCE_LENGTH, stride: int = None) -> List[int]:
+    """
+    Start indices of overlapping windows covering ``n_frames`` sampled frames.
+
+    The last window is aligned to the end of the video so the tail is
+    always scored on a full-length sequence.
+    """
+    stride = max(1, stride or settings.LONG_VIDEO_WINDOW_STRIDE)
+    if n_frames <= window:
+        return [0]
+    starts = list(range(0, n_frames - window + 1, stride))
+    if starts[-1] + window < n_frames:
+        starts.append(n_frames - window)
+    return starts
+
+
+def detect_video(
+    video_path: Path,
+    frame_extractor,
+    detector,
+    workers: int = None,
+    batch_size: int = None,
+    deadline: float = None,
+    start_frame: int = 0,
+    end_frame: int = None,
+    adaptive: bool = None,
+    progress: AnalysisProgress = None,
+    conf_threshold: float = None,
+) -> Tuple[List[List[Dict]], Tuple[int, int], dict]:
+    """
+    Run the detector once on every sampled frame of the video (or of the
+    raw frame range [start_frame, end_frame)).
+
+    The sampling grid is split into contiguous segments decoded by parallel
+    workers (each with its own capture — OpenCV releases the GIL while
+    decoding); their frames are batched through the single shared detector.
+    A cascade gates each segment on its own motion history (segments run
+    on separate threads and each starts fresh), so escalation does not
+    depend on how the segments' batches interleave.
+    With ``adaptive`` (default: settings.ADAPTIVE_SAMPLING) near-duplicate
+    frames skip the detector and reuse the segment's previous detections.
+    Frames done are counted on ``progress`` (whose stage the caller sets).
+    ``conf_threshold`` defaults to settings.DETECTION_CONF_THRESHOLD.
+
+    Returns:
+        tuple: (detections_per_frame, (frame_h, frame_w), video probe dict
+               with ``first_sample`` — the sample index of detections[0] —
+               and ``frames_reused``)
+
+    Raises:
+        ValueError: If the video fails validation or yields no frames
+        TimeoutError: If ``deadline`` (epoch seconds) passes mid-decode
+    """
+    meta = frame_extractor.probe(video_path)
+    interval = meta['interval']
+    first_sample = -(-max(start_frame, 0) // interval)
+    last_sample = meta['sample_count'] if end_frame is None else min(
+        meta['sample_count'], -(-end_frame // interval)
+    )
+    n_samples = max(last_sample - first_sample, 0)
+    if n_samples == 0:
+        raise ValueError("No frames extracted from video")
+    workers = max(1, min(workers or settings.LONG_VIDEO_WORKERS, n_samples))
+    batch_size = max(1, batch_size or settings.LONG_VIDEO_BATCH_SIZE)
+    if conf_threshold is None:
+        conf_threshold = settings.DETECTION_CONF_THRESHOLD
+    progress = progress or AnalysisProgress()
+    progress.expect(n_samples)
+
+    if adaptive is None:
+        adaptive = settings.ADAPTIVE_SAMPLING
+
+    bounds = np.linspace(first_sample, last_sample, workers + 1).astype(int)
+    detections: Dict[int, List[Dict]] = {}
+    reused_counts: List[int] = []
+    shapes: Dict[int, Tuple[int, int]] = {}
+    detector_lock = threading.Lock()
+
+    def flush(indices, frames):
+        with detector_lock:
+            results = detector.detect_batch(frames, conf_threshold)
+        for idx, dets in zip(indices, results):
+            detections[idx] = dets
+        shapes[indices[0]] = frames[0].shape[:2]
+        progress.advance(len(indices))
+
+    def run_segment(seg_start: int, seg_end: int):
+        # A pool thread may have screened another segment's frames before
+        reset_motion(detector)
+        indices, frames = [], []
+        sampler = AdaptiveSampler() if adaptive else None
+        for raw_idx, frame in frame_extractor.iter_frames(
+            video_path, start_frame=seg_start * interval, end_frame=seg_end * interval
+        ):
+            progress.check()
+            idx = raw_idx // interval - first_sample
+            if sampler and not sampler.should_detect(frame):
+                detections[idx] = None   # filled from the segment's previous frame
+                progress.advance()
+                continue
+            indices.append(idx)
+            frames.append(frame)
+            if len(frames) >= batch_size:
+                if deadline and time.time() > deadline:
+                    raise TimeoutError("Inference timed out during YOLO detection")
+                flush(indices, frames)
+                indices, frames = [], []
+        if frames:
+            flush(indices, frames)
+        if sampler:
+            reused_counts.append(sampler.frames_reused)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="long-video") as pool:
+        futures = [
+            pool.submit(run_segment, int(bounds[i]), int(bounds[i + 1]))
+            for i in range(workers) if bounds[i + 1] > bounds[i]
+        ]
+        for future in futures:
+            future.result()
+
+    if not detections:
+        raise ValueError("No frames extracted from video")
+
+    # Metadata frame counts can overshoot what actually decodes
+    total = max(detections) + 1
+    detections_per_frame = [detections.get(i, []) for i in range(total)]
+    if adaptive:
+        detections_per_frame = fill_reused(detections_per_frame)
+    frame_size = shapes[min(shapes)]
+    meta['first_sample'] = first_sample
+    meta['frames_reused'] = sum(reused_counts)
+
+    logger.info(
+        f"Long-video detection: {len(detections)} frames in {len(futures)} segment(s), "
+        f"interval={interval}, reused={meta['frames_reused']}"
+    )
+    return detections_per_frame, frame_size, meta
+
+
+def score_windows(
+    vehicles_per_frame: List[List[Dict]],
+    frame_size: Tuple[int, int],
+    lstm_detector,
+    window: int = LSTM_SEQUENCE_LENGTH,
+    stride: int = None,
+) -> List[dict]:
+    """
+    Gate and score every overlapping window.
+
+    Physics gates come from one rolling ``PhysicsScorer`` (history = window)
+    read off as each window closes, and all window sequences go through
+    the LSTM in a single batched call.
+
+    Returns:
+        list: One dict per window — start, end (inclusive), lstm, physics,
+              overlap_spike, gated (both hard gates passed), positive
+    """
+    n = len(vehicles_per_frame)
+    starts = window_starts(n, window, stride)
+    ends = {min(s + window, n) - 1: s for s in starts}
+
+    rolling = PhysicsScorer(frame_size=frame_size, history=window)
+    features = []
+    gates = {}
+    for i, vehicles in enumerate(vehicles_per_frame):
+        rolling.push(vehicles)
+        features.append(compute_frame_features(vehicles))
+        if i in ends:
+            presence = rolling.passes_presence_gate()
+            physics = rolling.summary() if presence else None
+            gates[ends[i]] = (presence, physics)
+
+    sequences = np.stack([pad_sequence(features[s:s + window], window) for s in starts])
+    lstm_scores = lstm_detector.predict_batch(sequences)
+
+    timeline = []
+    for s, lstm_score in zip(starts, lstm_scores):
+        presence, physics = gates[s]
+        signal = presence and PhysicsScorer.passes_signal_gate(physics)
+        gated = bool(presence and signal)
+        timeline.append({
+            'start': s,
+            'end': min(s + window, n) - 1,
+            'lstm': float(lstm_score),
+            'physics': float(physics['physics_score']) if physics else 0.0,
+            'overlap_spike': float(physics['overlap_spike']) if physics else 0.0,
+            'presence': bool(presence),
+            'gated': gated,
+            'positive': gated and lstm_score >= 0.5,
+        })
+    return timeline
+
+
+def load_frame_range(video_path: Path, frame_extractor, interval: int, start: int, end: int) -> List[np.ndarray]:
+    """
+    Decode sampled frames [start, end) — used to re-read the evidence slice.
+
+    Frames are views of a pooled block (see ``FrameExtractor.extract_frames``).
+    """
+    return frame_extractor.extract_frames(
+        video_path, max_frames=end - start, start_frame=start * interval, end_frame=end * interval
+    )
+
+
+def analyze_long_video(
+    video_path: Path,
+    frame_extractor,
+    detector,
+    lstm_detector,
+    confidence_aggregator,
+    deadline: float = None,
+    start_frame: int = 0,
+    end_frame: int = None,
+    progress: AnalysisProgress = None,
+    batch_size: int = None,
+    conf_threshold: float = None,
+) -> dict:
+    """
+    Analyse an entire video as overlapping 150-frame windows.
+
+    Every sampled frame is detected exactly once; windows share those
+    detections.  A window is positive when it passes both physics gates
+    and its LSTM score is ≥ 0.5.  Per-frame confidence is the best gated
+    window covering the frame, so the aggregator's events are the merged
+    positive windows.  The evidence peak is the per-frame physics maximum
+    inside those events, searched across the whole video.
+
+    ``start_frame``/``end_frame`` restrict the analysis to a raw frame range;
+    analysis indices then count from the first sampled frame of that range,
+    while the timeline and peak in ``details`` are absolute.  ``batch_size``
+    and ``conf_threshold`` are passed to ``detect_video``.
+
+    Returns:
+        dict: Analysis state consumed by ``analyze_video_file`` — frames
+              (evidence slice only), frame_offset, total_frames,
+              detections_per_frame, per_frame_physics, overlap_scores,
+              total_vehicles, is_accident, raw_confidence,
+              aggregation_result, peak_idx, details
+    """
+    progress = progress or AnalysisProgress()
+    progress.stage("detect")
+    detections_per_frame, frame_size, meta = detect_video(
+        video_path, frame_extractor, detector, batch_size=batch_size, deadline=deadline,
+        start_frame=start_frame, end_frame=end_frame, progress=progress, conf_threshold=conf_threshold,
+    )
+    n = len(detections_per_frame)
+    interval, fps = meta['interval'], meta['fps']
+    sample_offset = meta['first_sample']
+
+    # Whole-video physics, causal per frame (no cross-window alignment)
+    progress.stage("physics")
+    vehicles_per_frame = [filter_vehicles(dets) for dets in detections_per_frame]
+    video_scorer = PhysicsScorer(frame_size=frame_size)
+    per_frame_physics = [video_scorer.push(v)['physics'] for v in vehicles_per_frame]
+    overlap_scores = video_scorer.summary()['overlap_scores']
+
+    progress.stage("lstm")
+    timeline = score_windows(vehicles_per_frame, frame_size, lstm_detector)
+    if deadline and time.time() > deadline:
+        raise TimeoutError("Inference timed out during LSTM analysis")
+
+    gated = [w for w in timeline if w['gated']]
+    positive = [w for w in gated if w['positive']]
+    logger.info(
+        f"Long-video windows: {len(timeline)} total, {len(gated)} gated, "
+        f"{len(positive)} positive"
+    )
+
+    if gated:
+        frame_confidences = [0.0] * n
+        for w in gated:
+            for i in range(w['start'], w['end'] + 1):
+                frame_confidences[i] = max(frame_confidences[i], w['lstm'])
+        aggregation_result = confidence_aggregator.aggregate(frame_confidences)
+        raw_confidence = max(w['lstm'] for w in (positive or gated))
+    else:
+        presence = [w for w in timeline if w['presence']]
+        if presence:
+            raw_confidence = max(w['physics'] for w in presence) * 0.5
+        else:
+            raw_confidence = max(0.01, video_scorer.avg_vehicles_per_frame * 0.2)
+        aggregation_result = {
+            'final_confidence': raw_confidence,
+            'is_accident': False,
+            'temporal_stability': 0.0,
+            'spike_filtered': False,
+            'event_frames': [],
+            'max_confidence': raw_confidence,
+            'mean_confidence': raw_confidence,
+        }
+    is_accident = bool(positive)
+
+    # ── Evidence: peak across the whole video, decode only its slice ──
+    frames, frame_offset, peak_idx = [], 0, None
+    if is_accident:
+        in_event = np.zeros(n, dtype=bool)
+        for start, end in aggregation_result['event_frames'] or [(w['start'], w['end']) for w in positive]:
+            in_event[start:end + 1] = True
+        peak_idx = int(np.argmax(np.where(in_event, per_frame_physics, -1.0)))
+
+        # Wide enough for the ±3s clip and the 5-frame sequence
+        reach = max(int(fps * 3), 2)
+        frame_offset = max(0, peak_idx - reach)
+        frames = load_frame_range(
+            video_path, frame_extractor, interval,
+            sample_offset + frame_offset, sample_offset + min(n, peak_idx + reach + 1),
+        )
+
+    # Timeline and peak are reported in absolute video frames / seconds
+    seconds_per_frame = interval / fps
+    details = {
+        "analysisMode": "long",
+        "windowCount": len(timeline),
+        "positiveWindows": len(positive),
+        "timeline": [
+            {
+                "startFrame": w['start'] + sample_offset,
+                "endFrame": w['end'] + sample_offset,
+                "startTime": round((w['start'] + sample_offset) * seconds_per_frame, 2),
+                "endTime": round((w['end'] + sample_offset + 1) * seconds_per_frame, 2),
+                "lstm": round(w['lstm'], 4),
+                "physics": round(w['physics'], 4),
+                "gated": w['gated'],
+                "positive": w['positive'],
+            }
+            for w in timeline
+        ],
+    }
+    if settings.ADAPTIVE_SAMPLING:
+        details["adaptiveSampling"] = sampling_details(n, meta['frames_reused'])
+    if peak_idx is not None:
+        details["peakFrame"] = peak_idx + sample_offset
+        details["peakTime"] = round((peak_idx + sample_offset) * seconds_per_frame, 2)
+
+    return {
+        'frames': frames,
+        'frame_offset': frame_offset,
+        'total_frames': n,
+        'detections_per_frame': detections_per_frame,
+        'per_frame_physics': per_frame_physics,
+        'overlap_scores': overlap_scores,
+        'total_vehicles': video_scorer.total_vehicles,
+        'is_accident': is_accident,
+        'raw_confidence': raw_confidence,
+        'aggregation_result': aggregation_result,
+        'peak_idx': peak_idx,
+        'details': details,
+    }
@@ -0,0 +1,296 @@
+"""Incremental physics-based collision scoring"""
+from collections import deque
+from typing import List, Dict, Tuple
+import numpy as np
+import logging
+
+from app.ml.pipeline.tracker import IoUTracker
+
+logger = logging.getLogger(__name__)
+
+VEHICLE_CLASSES = {'car', 'truck', 'bus', 'motorcycle'}
+
+
+def filter_vehicles(detections: List[Dict]) -> List[Dict]:
+    """Keep only vehicle detections (car / truck / bus / motorcycle)."""
+    return [d for d in detections if d['class_name'] in VEHICLE_CLASSES]
+
+
+def assign_track_ids(
+    detections_per_frame: List[List[Dict]], frame_size: Tuple[int, int]
+) -> List[List[Dict]]:
+    """
+    Copy of ``detections_per_frame`` with a stable ``track_id`` on every
+    vehicle detection (other classes are copied unchanged).
+    """
+    tracker = IoUTracker(frame_size=frame_size)
+    labelled = []
+    for dets in detections_per_frame:
+        ids = iter(r['track_id'] for r in tracker.update(filter_vehicles(dets)))
+        labelled.append([
+            {**d, 'track_id': next(ids)} if d['class_name'] in VEHICLE_CLASSES else dict(d)
+            for d in dets
+        ])
+    return labelled
+
+
+class PhysicsScorer:
+    """
+    Per-frame physics scorer fed one frame of detections at a time.
+
+    Tracks the same three signals the batch pipeline used to compute over
+    the full ``per_frame_vehicles`` list:
+      - overlap      — max IoU between any two vehicles in the frame
+      - motion       — mean per-track center displacement vs. previous frame
+                       (normalised by frame diagonal)
+      - size change  — mean per-track % area change vs. previous frame
+
+    Vehicles are associated across frames by an ``IoUTracker``, so motion
+    and size change compare each vehicle with itself regardless of the order
+    the detector lists boxes in.  Vehicles entering or leaving the frame
+    contribute nothing.
+
+    Overlap spike detection keeps a rolling ``smoothing_window`` buffer and
+    updates the max jump between consecutive smoothed values as frames
+    arrive, so gating can run while frames are still being decoded.
+    ``summary()`` matches the old batch pipeline exactly for the overlap
+    signals (overlap score and spike); motion and size change follow
+    tracked vehicles and match it only where its pairing agrees with the
+    tracker (e.g. a static scene).
+
+    With ``history`` set, only the most recent ``history`` measurements are
+    kept, turning the scorer into a rolling-window scorer for live streams.
+    """
+
+    def __init__(
+        self,
+        frame_size: Tuple[int, int] = (480, 640),
+        smoothing_window: int = 5,
+        history: int = None,
+    ):
+        """
+        Args:
+            frame_size: (height, width) of the frames being scored
+            smoothing_window: Rolling-average length for overlap spike detection
+            history: Keep only the last N measurements (None = whole video)
+        """
+        frame_h, frame_w = frame_size
+        self.frame_diag = (frame_w**2 + frame_h**2) ** 0.5
+        self.tracker = IoUTracker(frame_size=frame_size)
+        self.smoothing_window = smoothing_window
+        self.history = history
+        self._kernel = np.ones(smoothing_window) / smoothing_window
+        self.reset()
+
+    def reset(self):
+        """Clear all per-video state."""
+        self.frame_count = 0
+        self.overlap_scores: deque = deque(maxlen=self.history)
+        self.motion_scores: deque = deque(maxlen=self.history)
+        self.size_change_scores: deque = deque(maxlen=self.history)
+        self._vehicle_counts: deque = deque(maxlen=self.history)
+        self.tracker.reset()
+        self._prev_vehicles = 0
+        self._window: deque = deque(maxlen=self.smoothing_window)
+        self._prev_smoothed = None
+        self._max_delta = None
+        # Smoothed-overlap jumps still inside the rolling history
+        self._deltas: deque = deque(maxlen=max((self.history or 0) - self.smoothing_window, 1))
+
+    # ── Per-frame update ─────────────────────────────────────────────
+
+    def push(self, vehicles: List[Dict]) -> Dict:
+        """
+        Score one frame of vehicle detections.
+
+        Args:
+            vehicles: Vehicle detections for this frame (see ``filter_vehicles``)
+
+        Returns:
+            dict: {
+                'frame_index': int,
+                'overlap': float,
+                'motion': float,         # 0.0 if not measurable this frame
+                'size_change': float,    # 0.0 if not measurable this frame
+                'physics': float,        # combined per-frame score
+                'overlap_spike': float,  # running max smoothed overlap jump
+            }
+        """
+        bboxes  = [v['bbox'] for v in vehicles]  # [x1,y1,x2,y2]
+        areas   = [(b[2]-b[0])*(b[3]-b[1]) for b in bboxes]
+
+        self._vehicle_counts.append(len(vehicles))
+
+        # Overlap: max IoU between any two vehicles in this frame
+        frame_overlap = 0.0
+        for i in range(len(bboxes)):
+            for j in range(i+1, len(bboxes)):
+                b1, b2 = bboxes[i], bboxes[j]
+                ix1 = max(b1[0], b2[0]); iy1 = max(b1[1], b2[1])
+                ix2 = min(b1[2], b2[2]); iy2 = min(b1[3], b2[3])
+                if ix2 > ix1 and iy2 > iy1:
+                    inter = (ix2-ix1) * (iy2-iy1)
+                    union = areas[i] + areas[j] - inter
+                    frame_overlap = max(frame_overlap, inter / max(union, 1))
+        self.overlap_scores.append(frame_overlap)
+
+        # Motion / area change per tracked vehicle (motion normalised by
+        # frame diagonal; sudden size change = crash indicator).  Recorded
+        # whenever this and the previous frame both have vehicles.
+        tracks = [t for t in self.tracker.update(vehicles) if t['continued']]
+        frame_motion = 0.0
+        frame_size_change = 0.0
+        if self._prev_vehicles and vehicles:
+            if tracks:
+                frame_motion = float(np.mean([t['speed'] for t in tracks]))
+                frame_size_change = float(np.mean([t['area_change'] for t in tracks]))
+            self.motion_scores.append(frame_motion)
+            self.size_change_scores.append(frame_size_change)
+        self._prev_vehicles = len(vehicles)
+
+        # Rolling smoothed overlap → running spike
+        self._window.append(frame_overlap)
+        if len(self._window) == self.smoothing_window:
+            smoothed = float(np.convolve(np.array(self._window), self._kernel, mode='valid')[0])
+            if self._prev_smoothed is not None:
+                delta = smoothed - self._prev_smoothed
+                if self.history:
+                    self._deltas.append(delta)
+                elif self._max_delta is None or delta > self._max_delta:
+                    self._max_delta = delta
+            self._prev_smoothed = smoothed
+
+        self.frame_count += 1
+        return {
+            'frame_index': self.frame_count - 1,
+            'overlap': frame_overlap,
+            'motion': frame_motion,
+            'size_change': frame_size_change,
+            'physics': self._combine_frame(frame_overlap, frame_motion, frame_size_change),
+            'overlap_spike': self.overlap_spike,
+        }
+
+    # ── Running aggregates ───────────────────────────────────────────
+
+    @property
+    def overlap_spike(self) -> float:
+        """Largest jump between consecutive smoothed overlaps so far (may be negative)."""
+        if self.window_frames <= self.smoothing_window:
+            return 0.0
+        if self.history:
+            return float(max(self._deltas)) if self._deltas else 0.0
+        return float(self._max_delta) if self._max_delta is not None else 0.0
+
+    @property
+    def window_frames(self) -> int:
+        """Number of frames currently covered (== frame_count without history)."""
+        return len(self._vehicle_counts)
+
+    @property
+    def total_vehicles(self) -> int:
+        return int(sum(self._vehicle_counts))
+
+    @property
+    def frames_with_vehicles(self) -> int:
+        return sum(1 for c in self._vehicle_counts if c > 0)
+
+    @property
+    def vehicle_coverage(self) -> float:
+        """Fraction of frames with at least one vehicle (0–1)."""
+        return self.frames_with_vehicles / max(self.window_frames, 1)
+
+    @property
+    def avg_vehicles_per_frame(self) -> float:
+        return self.total_vehicles / max(self.window_frames, 1)
+
+    # ── Hard gates (shared by batch, long-video and stream modes) ────
+
+    def passes_presence_gate(self) -> bool:
+        """
+        HARD GATE 1 — enough vehicles for this to be driving footage.
+
+        Fails when fewer than 20% of frames contain a vehicle or there are
+        fewer than 0.3 vehicles per frame on average.
+        """
+        return not (self.vehicle_coverage < 0.20 or self.avg_vehicles_per_frame < 0.3)
+
+    @staticmethod
+    def passes_signal_gate(summary: Dict) -> bool:
+        """HARD GATE 2 — some physics signal must exist before running the LSTM."""
+        return not (summary['physics_score'] < 0.20 and summary['overlap_spike'] < 0.05)
+
+    @staticmethod
+    def running_p90(values) -> float:
+        """P90 of the values seen so far (0.0 when empty)."""
+        arr = np.array(values) if len(values) else np.array([0.0])
+        return float(np.percentile(arr, 90))
+
+    @staticmethod
+    def _combine_frame(overlap: float, motion: float, size_change: float) -> float:
+        return (
+            overlap * 0.55 +
+            min(motion / 0.10, 1.0) * 0.30 +
+            min(size_change / 1.5, 1.0) * 0.15
+        )
+
+    def per_frame_physics(self) -> List[float]:
+        """
+        Per-frame combined scores with the batch pipeline's alignment.
+
+        Motion / size entries are only recorded when both the current and
+        previous frame contain vehicles, and the batch pipeline padded those
+        lists (not the frame indices) — kept as-is so collision-peak
+        selection is unchanged.
+        """
+        n = self.window_frames
+        overlap_scores = list(self.overlap_scores)
+        motion_scores = list(self.motion_scores)
+        size_change_scores = list(self.size_change_scores)
+        motion_padded = [0.0] + motion_scores + [0.0] * max(0, n - len(motion_scores) - 1)
+        size_padded   = [0.0] + size_change_scores + [0.0] * max(0, n - len(size_change_scores) - 1)
+        return [
+            self._combine_frame(overlap_scores[i], motion_padded[i], size_padded[i])
+            for i in range(min(n, len(overlap_scores)))
+        ]
+
+    def summary(self) -> Dict:
+        """
+        Video-level physics scores over all frames pushed so far.
+
+        Returns:
+            dict with physics_score, overlap_spike, overlap_score,
+            abs_max_overlap, motion_score, size_score, overlap_scores,
+            per_frame_physics
+        """
+        overlap_arr = np.array(self.overlap_scores) if len(self.overlap_scores) else np.array([0.0])
+        abs_max_overlap = float(np.max(overlap_arr))
+
+        if len(overlap_arr) > self.smoothing_window:
+            # Spike dominates: sustained overlap is normal traffic,
+            # SUDDEN overlap is a collision.  0.50 spike = score 1.0
+            overlap_spike = self.overlap_spike
+            spike_score = min(max(overlap_spike, 0.0) / 0.50, 1.0)
+            overlap_score = spike_score * 0.90 + min(abs_max_overlap, 1.0) * 0.10
+        else:
+            overlap_score = abs_max_overlap
+            overlap_spike = 0.0
+
+        motion_score = min(self.running_p90(self.motion_scores) / 0.15, 1.0)  # 15% of diagonal = max
+        size_score = min(self.running_p90(self.size_change_scores) / 1.5, 1.0)  # 150% size change
+
+        physics_score = (
+            overlap_score  * 0.70 +   # spike-based overlap
+            motion_score   * 0.20 +   # sudden movement
+            size_score     * 0.10     # bbox size change (unreliable, downweighted)
+        )
+
+        return {
+            'physics_score': physics_score,
+            'overlap_spike': overlap_spike,
+            'overlap_score': overlap_score,
+            'abs_max_overlap': abs_max_overlap,
+            'motion_score': motion_score,
+            'size_score': size_score,
+            'overlap_scores': list(self.overlap_scores),
+            'per_frame_physics': self.per_frame_physics(),
+        }
@@ -0,0 +1,142 @@
+"""Named analysis profiles: per-request sampling, detector and output trade-offs"""
+from typing import List, Optional
+import logging
+
+from app.core.config import settings
+from app.ml.models.cascade_detector import CascadeDetector, create_detector
+from app.ml.models.yolo_detector import YOLODetector
+from app.ml.pipeline.frame_extractor import FrameExtractor
+
+logger = logging.getLogger(__name__)
+
+DETECTOR_BACKENDS = ("configured", "yolo", "light", "cascade")
+
+
+class AnalysisProfile:
+    """
+    Settings one analysis runs with.
+
+    Every field left out of the profile's ANALYSIS_PROFILES entry keeps the
+    global setting, so an empty profile is the configured analysis.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fps: int = None,
+        detector: str = "configured",
+        imgsz: int = None,
+        conf: float = None,
+        batch_size: int = None,
+        max_frames: int = None,
+        evidence: bool = True,
+        long_video: bool = None,
+    ):
+        """
+        Args:
+            name: Key in ANALYSIS_PROFILES
+            fps: Sampling rate (None = TARGET_FPS)
+            detector: configured (DETECTOR_CASCADE decides) | yolo | light | cascade
+            imgsz: Detector input size in px (None = the model's own)
+            conf: Detection confidence threshold (None = DETECTION_CONF_THRESHOLD)
+            batch_size: Frames per detector call in long-video / two-pass scans
+                        (None = LONG_VIDEO_BATCH_SIZE)
+            max_frames: Sampled frames scored by the default analysis; the
+                        sequence is padded to the LSTM's 150 (None = 150)
+            evidence: Render accident stills and clip
+            long_video: Analyse the whole video (None = LONG_VIDEO_MODE; a request can override)
+
+        Raises:
+            ValueError: On an unknown detector backend or out-of-range value
+        """
+        if detector not in DETECTOR_BACKENDS:
+            raise ValueError(f"Profile {name!r}: detector must be one of {', '.join(DETECTOR_BACKENDS)}")
+        if conf is not None and not 0 < conf < 1:
+            raise ValueError(f"Profile {name!r}: conf must be between 0 and 1")
+        if max_frames is not None and max_frames < 1:
+            raise ValueError(f"Profile {name!r}: max_frames must be positive")
+        self.name = name
+        self.fps = fps
+        self.detector = detector
+        self.imgsz = imgsz
+        self.conf = conf
+        self.batch_size = batch_size
+        self.max_frames = max_frames
+        self.evidence = evidence
+        self.long_video = long_video
+
+    @property
+    def target_fps(self) -> int:
+        return self.fps or settings.TARGET_FPS
+
+    @property
+    def conf_threshold(self) -> float:
+        return self.conf if self.conf is not None else settings.DETECTION_CONF_THRESHOLD
+
+    def with_quality(self, tier) -> "AnalysisProfile":
+        """This profile degraded to a ``quality_service.QualityTier`` (None = unchanged)."""
+        if tier is None or (not tier.fps and not tier.imgsz and not tier.light):
+            return self
+        fps = min(tier.fps, self.target_fps) if tier.fps else self.fps
+        imgsz = min(tier.imgsz, self.imgsz) if tier.imgsz and self.imgsz else (tier.imgsz or self.imgsz)
+        return AnalysisProfile(
+            self.name, fps=fps, detector="light" if tier.light else self.detector, imgsz=imgsz,
+            conf=self.conf, batch_size=self.batch_size, max_frames=self.max_frames,
+            evidence=self.evidence, long_video=self.long_video,
+        )
+
+    def frame_extractor(self) -> FrameExtractor:
+        return FrameExtractor(target_fps=self.fps)
+
+    def create_detector(self):
+        """Detector for this profile (the configured one by default)."""
+        if self.detector == "configured" and not self.imgsz:
+            return create_detector()
+        if self.detector == "light":
+            return YOLODetector(settings.CASCADE_LIGHT_MODEL_PATH, fallback_weights='yolo11n.pt', imgsz=self.imgsz)
+        if self.detector == "cascade" or (self.detector == "configured" and settings.DETECTOR_CASCADE):
+            return CascadeDetector(
+                light=YOLODetector(settings.CASCADE_LIGHT_MODEL_PATH, fallback_weights='yolo11n.pt', imgsz=self.imgsz),
+                heavy=YOLODetector(imgsz=self.imgsz),
+            )
+        return YOLODetector(imgsz=self.imgsz)
+
+    def describe(self) -> dict:
+        """Resolved settings as recorded in ``details.profile``."""
+        backend = self.detector
+        if backend == "configured":
+            backend = "cascade" if settings.DETECTOR_CASCADE else "yolo"
+        return {
+            "name": self.name,
+            "sampleFps": self.target_fps,
+            "detector": backend,
+            "imageSize": self.imgsz or 640,
+            "confThreshold": self.conf_threshold,
+            "batchSize": self.batch_size or settings.LONG_VIDEO_BATCH_SIZE,
+            "maxFrames": self.max_frames,     # None = the full LSTM sequence
+            "evidence": self.evidence,
+            "longVideo": settings.LONG_VIDEO_MODE if self.long_video is None else self.long_video,
+        }
+
+    def __repr__(self) -> str:
+        return f"AnalysisProfile({self.name!r})"
+
+
+def profile_names() -> List[str]:
+    return list(settings.ANALYSIS_PROFILES)
+
+
+def resolve_profile(name: Optional[str] = None) -> AnalysisProfile:
+    """
+    Profile ``name`` from ANALYSIS_PROFILES (None = ANALYSIS_PROFILE).
+
+    Raises:
+        ValueError: If there is no such profile or its entry is invalid
+    """
+    name = name or settings.ANALYSIS_PROFILE
+    if name not in settings.ANALYSIS_PROFILES:
+        raise ValueError(f"Unknown analysis profile {name!r} (available: {', '.join(profile_names())})")
+    try:
+        return AnalysisProfile(name, **settings.ANALYSIS_PROFILES[name])
+    except TypeError as e:
+        raise ValueError(f"Profile {name!r} is misconfigured: {e}")
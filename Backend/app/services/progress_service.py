@@ -0,0 +1,239 @@
+"""Progress and cancellation of running analyses (stage, frames done, elapsed / ETA)"""
+from typing import Dict, List, Optional, Tuple
+import threading
+import time
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Stages in the order an analysis passes through them (a mode may skip some)
+STAGES = ("decode", "detect", "physics", "lstm", "render", "persist")
+
+
+class AnalysisCancelled(Exception):
+    """Raised inside an analysis that was cancelled (by request or disconnect)."""
+
+
+class AnalysisProgress:
+    """
+    Progress of one analysis, written by the analysis thread and read by
+    progress streams.
+
+    ``stage`` starts a stage (optionally with the number of units — frames —
+    it will process) and ``advance`` counts units done.  Every change bumps
+    ``version`` so readers can tell whether anything happened since they
+    last looked.  A progress object that nobody reads is just a cheap
+    no-op, so analysis code can always report.
+
+    It is also the run's cancellation token: ``cancel`` only sets a flag,
+    and the frame and detection loops call ``check``, which raises
+    ``AnalysisCancelled`` (or ``TimeoutError`` once ``deadline`` passes).
+    """
+
+    def __init__(self, video_id: str = ""):
+        self.video_id = video_id
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.status = "running"           # running | completed | failed | cancelled
+        self.stage_name = "queued"
+        self.detail = ""
+        self.done = 0
+        self.total: Optional[int] = None
+        self.result_id: Optional[str] = None
+        self.error: Optional[str] = None
+        self.version = 0
+        self.deadline: Optional[float] = None   # Epoch seconds; checked by ``check``
+        self.cancel_reason: Optional[str] = None
+        self._stage_started = self.started_at
+        self._stage_log: Dict[str, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def _close_stage(self, now: float):
+        """Add the current stage's time and units to the per-stage totals (lock held)."""
+        seconds, units = self._stage_log.get(self.stage_name, (0.0, 0))
+        self._stage_log[self.stage_name] = (seconds + now - self._stage_started, units + self.done)
+
+    def stage(self, name: str, total: int = None, detail: str = ""):
+        """Enter stage ``name`` expecting ``total`` units (None = unknown)."""
+        with self._lock:
+            now = time.time()
+            self._close_stage(now)
+            self.stage_name = name
+            self.detail = detail
+            self.done = 0
+            self.total = total
+            self._stage_started = now
+            self.version += 1
+
+    def expect(self, total: int):
+        """Set the unit count of the current stage once it is known."""
+        with self._lock:
+            self.total = total
+            self.version += 1
+
+    def advance(self, n: int = 1):
+        with self._lock:
+            self.done += n
+            self.version += 1
+
+    def finish(self, result_id: str):
+        with self._lock:
+            self.status = "completed"
+            self.result_id = result_id
+            self.finished_at = time.time()
+            self._close_stage(self.finished_at)
+            self.version += 1
+
+    def fail(self, error: str):
+        with self._lock:
+            self.status = "cancelled" if self.cancelled else "failed"
+            self.error = error
+            self.finished_at = time.time()
+            self._close_stage(self.finished_at)
+            self.version += 1
+
+    def cancel(self, reason: str = "Cancelled"):
+        """Ask the analysis to stop at its next ``check``."""
+        with self._lock:
+            if self.cancel_reason is None and self.status == "running":
+                self.cancel_reason = reason
+                self.version += 1
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_reason is not None
+
+    def check(self):
+        """
+        Stop point for frame and detection loops.
+
+        Raises:
+            AnalysisCancelled: If the run was cancelled
+            TimeoutError: If ``deadline`` has passed
+        """
+        if self.cancelled:
+            raise AnalysisCancelled(self.cancel_reason or "Cancelled")
+        if self.deadline is not None and time.time() > self.deadline:
+            raise TimeoutError(f"Inference timed out during {self.stage_name}")
+
+    @property
+    def finished(self) -> bool:
+        return self.status != "running"
+
+    def stage_times(self) -> Dict[str, Tuple[float, int]]:
+        """Seconds spent and units done per stage so far (repeated stages add up)."""
+        with self._lock:
+            times = dict(self._stage_log)
+            if not self.finished:
+                seconds, units = times.get(self.stage_name, (0.0, 0))
+                times[self.stage_name] = (seconds + time.time() - self._stage_started, units + self.done)
+            return times
+
+    def snapshot(self) -> dict:
+        """Current state as sent to clients (times in seconds)."""
+        with self._lock:
+            now = self.finished_at or time.time()
+            stage_elapsed = now - self._stage_started
+            eta = None
+            if self.total and 0 < self.done < self.total and not self.finished:
+                eta = round(stage_elapsed / self.done * (self.total - self.done), 1)
+            return {
+                "videoId": self.video_id,
+                "status": self.status,
+                "stage": self.stage_name,
+                "stageIndex": STAGES.index(self.stage_name) if self.stage_name in STAGES else -1,
+                "stageCount": len(STAGES),
+                "detail": self.detail,
+                "done": self.done,
+                "total": self.total,
+                "elapsed": round(now - self.started_at, 1),
+                "stageEta": eta,
+                "resultId": self.result_id,
+                "error": self.error,
+                "cancelRequested": self.cancelled,
+            }
+
+
+class RelayedProgress(AnalysisProgress):
+    """
+    Progress of an analysis running in a subprocess: every change is also
+    sent to the parent over ``conn`` as ``(method, args)``, and the run is
+    cancelled once the parent sets ``cancel_event``.
+    """
+
+    def __init__(self, video_id: str, conn, cancel_event):
+        super().__init__(video_id)
+        self._conn = conn
+        self._cancel_event = cancel_event
+        self._send_lock = threading.Lock()   # Detection workers report concurrently
+
+    def _send(self, method: str, *args):
+        with self._send_lock:
+            self._conn.send((method, args))
+
+    def stage(self, name: str, total: int = None, detail: str = ""):
+        super().stage(name, total, detail)
+        self._send("stage", name, total, detail)
+
+    def expect(self, total: int):
+        super().expect(total)
+        self._send("expect", total)
+
+    def advance(self, n: int = 1):
+        super().advance(n)
+        self._send("advance", n)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+
+class ProgressTracker:
+    """Progress of the latest analysis of each video."""
+
+    def __init__(self, retention: float = None):
+        """
+        Args:
+            retention: Seconds a finished run stays readable (defaults to PROGRESS_RETENTION)
+        """
+        self.retention = retention if retention is not None else settings.PROGRESS_RETENTION
+        self._runs: Dict[str, AnalysisProgress] = {}
+        self._lock = threading.Lock()
+
+    def start(self, video_id: str) -> AnalysisProgress:
+        """Begin tracking a new analysis of ``video_id`` (replaces the previous run)."""
+        progress = AnalysisProgress(video_id)
+        with self._lock:
+            self._prune()
+            self._runs[video_id] = progress
+        return progress
+
+    def get(self, video_id: str) -> Optional[AnalysisProgress]:
+        with self._lock:
+            return self._runs.get(video_id)
+
+    def runs(self) -> List[AnalysisProgress]:
+        """Tracked runs, oldest first (finished ones until they are pruned)."""
+        with self._lock:
+            self._prune()
+            return sorted(self._runs.values(), key=lambda run: run.started_at)
+
+    def cancel(self, video_id: str, reason: str = "Cancelled") -> bool:
+        """Cancel the video's running analysis; False if none is running."""
+        run = self.get(video_id)
+        if run is None or run.finished:
+            return False
+        run.cancel(reason)
+        return True
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        for video_id, run in list(self._runs.items()):
+            if run.finished_at is not None and run.finished_at < cutoff:
+                del self._runs[video_id]
+
+
+# Global instance
+progress_tracker = ProgressTracker()
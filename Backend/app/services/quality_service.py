@@ -0,0 +1,204 @@
+"""Deadline-aware quality tiers: coarser, faster analyses when the host is saturated"""
+from typing import Callable, Dict, Optional, Tuple
+import threading
+import logging
+
+from app.core.config import settings
+from app.ml.pipeline.frame_extractor import FrameExtractor
+from app.services.progress_service import AnalysisProgress, progress_tracker
+
+logger = logging.getLogger(__name__)
+
+# Stages whose cost grows with the number of sampled frames
+FRAME_STAGES = ("decode", "detect")
+
+
+class QualityTier:
+    """Analysis settings traded for speed: sampling rate, detector input size and model."""
+
+    def __init__(self, name: str, fps: int = None, imgsz: int = None, light: bool = False, cost: float = 1.0):
+        """
+        Args:
+            name: Reported in ``details.quality``
+            fps: Sampling rate (None = TARGET_FPS)
+            imgsz: Detector input size in px (None = the model's own)
+            light: Use the light (CASCADE_LIGHT_MODEL_PATH) model instead of the profile's detector
+            cost: Per-frame cost relative to "full", used until the tier's timings are observed
+
+        A tier caps the analysis profile it is applied to (see
+        ``AnalysisProfile.with_quality``); "full" leaves it unchanged.
+        """
+        self.name = name
+        self.fps = fps
+        self.imgsz = imgsz
+        self.light = light
+        self.cost = cost
+
+    @property
+    def target_fps(self) -> int:
+        return min(self.fps, settings.TARGET_FPS) if self.fps else settings.TARGET_FPS
+
+    def frame_extractor(self) -> FrameExtractor:
+        return FrameExtractor(target_fps=self.target_fps)
+
+    def describe(self) -> dict:
+        return {
+            "tier": self.name,
+            "sampleFps": self.target_fps,
+            "imageSize": self.imgsz or 640,
+            "model": "light" if self.light else "full",
+        }
+
+    def __repr__(self) -> str:
+        return f"QualityTier({self.name!r})"
+
+
+# Best first; the planner takes the first tier expected to meet the budget
+TIERS: Tuple[QualityTier, ...] = (
+    QualityTier("full"),
+    QualityTier("reduced", imgsz=480, light=True, cost=0.35),
+    QualityTier("minimal", fps=5, imgsz=320, light=True, cost=0.15),
+)
+
+
+def planned_frames(
+    meta: dict,
+    tier: QualityTier,
+    window: int,
+    long_video: bool = False,
+    two_pass: bool = False,
+    start_frame: int = None,
+    end_frame: int = None,
+) -> int:
+    """
+    Frames the detector will see at ``tier`` — a ``QualityTier`` or an
+    ``AnalysisProfile`` (``meta`` from ``FrameExtractor.probe``).
+
+    The default analysis stops after ``window`` samples; long-video mode
+    samples the whole range, and two-pass mode a coarse scan plus one
+    dense window per candidate.
+    """
+    start = start_frame or 0
+    end = meta['frame_count'] if end_frame is None else min(end_frame, meta['frame_count'])
+    raw = max(end - start, 0)
+    interval = tier.frame_extractor().sampling_interval(meta['fps'])
+    samples = -(-raw // interval)
+    if two_pass:
+        coarse = -(-raw // FrameExtractor(target_fps=settings.TWO_PASS_COARSE_FPS).sampling_interval(meta['fps']))
+        return coarse + min(samples, settings.TWO_PASS_CANDIDATES * window)
+    if long_video:
+        return samples
+    return min(samples, window)
+
+
+class QualityPlanner:
+    """
+    Pick the best quality tier expected to finish within a latency budget.
+
+    Costs are learned from finished analyses: an exponential moving
+    average of seconds per frame over the frame stages (decode + detect)
+    for each tier, and of the seconds spent in the remaining stages.
+    Before a tier has been observed its cost is scaled from an observed
+    tier by the tiers' relative ``cost`` (QUALITY_FRAME_COST seconds per
+    frame at full quality if nothing has been observed yet).  Costs are
+    kept per ``scope`` (the analysis profile), since profiles differ in
+    detector and input size.
+
+    The budget covers queueing: the time a run already waited is spent,
+    and a run with analyses queued behind it plans on its share of what is
+    left so the queue drains at the same pace.
+    """
+
+    def __init__(self, tiers: Tuple[QualityTier, ...] = TIERS, smoothing: float = 0.3):
+        """
+        Args:
+            tiers: Candidate tiers, best first
+            smoothing: Weight of the newest observation in the moving averages
+        """
+        self.tiers = tiers
+        self.smoothing = smoothing
+        self._frame_cost: Dict[str, float] = {}   # "scope/tier" → seconds per frame
+        self._fixed_cost: Dict[str, float] = {}   # Scope → seconds outside the frame stages
+        self._lock = threading.Lock()
+
+    def frame_cost(self, tier: QualityTier, scope: str = "") -> float:
+        with self._lock:
+            if f"{scope}/{tier.name}" in self._frame_cost:
+                return self._frame_cost[f"{scope}/{tier.name}"]
+            for known in self.tiers:
+                if f"{scope}/{known.name}" in self._frame_cost:
+                    return self._frame_cost[f"{scope}/{known.name}"] / known.cost * tier.cost
+        return settings.QUALITY_FRAME_COST * tier.cost
+
+    def estimate(self, tier: QualityTier, frames: int, scope: str = "") -> float:
+        """Expected seconds to analyse ``frames`` frames at ``tier``."""
+        return frames * self.frame_cost(tier, scope) + self._fixed_cost.get(scope, 0.0)
+
+    def plan(
+        self,
+        budget: float,
+        frames_for: Callable[[QualityTier], int],
+        waited: float = 0.0,
+        queued: int = 0,
+        scope: str = "",
+    ) -> Tuple[QualityTier, dict]:
+        """
+        Choose a tier for an analysis.
+
+        Args:
+            budget: Seconds the whole request may take
+            frames_for: Frames the analysis would detect at a given tier
+            waited: Seconds already spent queueing
+            queued: Analyses waiting behind this one
+            scope: Cost scope (analysis profile name)
+
+        Returns:
+            tuple: (tier, ``details.quality`` dict); the cheapest tier if none fits
+        """
+        time_left = max(budget - waited, 0.0) / (1 + queued / max(1, settings.ANALYSIS_WORKERS))
+        for tier in self.tiers:
+            estimate = self.estimate(tier, frames_for(tier), scope)
+            if estimate <= time_left:
+                break
+        return tier, {
+            **tier.describe(),
+            "budget": round(budget, 2),
+            "timeLeft": round(time_left, 2),
+            "estimate": round(estimate, 2),
+            "queued": queued,
+        }
+
+    def observe(self, tier: QualityTier, progress: AnalysisProgress, scope: str = ""):
+        """Learn from the stage timings of an analysis that ran at ``tier``."""
+        times = progress.stage_times()
+        frames = times.get("detect", (0.0, 0))[1]
+        if not frames:
+            return
+        frame_seconds = sum(times.get(name, (0.0, 0))[0] for name in FRAME_STAGES)
+        fixed_seconds = sum(s for name, (s, _) in times.items() if name not in FRAME_STAGES + ("queued",))
+        with self._lock:
+            key = f"{scope}/{tier.name}"
+            self._frame_cost[key] = self._smooth(self._frame_cost.get(key), frame_seconds / frames)
+            self._fixed_cost[scope] = self._smooth(self._fixed_cost.get(scope), fixed_seconds)
+
+    def _smooth(self, average: Optional[float], value: float) -> float:
+        return value if average is None else (1 - self.smoothing) * average + self.smoothing * value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "frameCost": {name: round(cost, 4) for name, cost in self._frame_cost.items()},
+                "fixedCost": {scope: round(cost, 3) for scope, cost in self._fixed_cost.items()},
+            }
+
+
+def queued_analyses(progress: AnalysisProgress) -> int:
+    """Tracked analyses still waiting for a worker, other than ``progress``."""
+    return sum(
+        1 for run in progress_tracker.runs()
+        if run is not progress and not run.finished and run.stage_name == "queued"
+    )
+
+
+# Global instance
+quality_planner = QualityPlanner()
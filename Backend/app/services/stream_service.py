@@ -0,0 +1,583 @@
+"""Live stream ingestion with rolling-window accident detection"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import threading
+import time
+import uuid
+import numpy as np
+import logging
+
+from app.core.config import settings
+from app.ml.models.yolo_detector import YOLODetector
+from app.ml.models.lstm_model import LSTMDetector
+from app.ml.pipeline.stream_reader import StreamReader
+from app.ml.pipeline.roi import RegionMask
+from app.services.physics_service import PhysicsScorer, filter_vehicles
+from app.services.inference_service import compute_frame_features, pad_sequence
+from app.services.frame_service import AccidentFrameService, _find_collision_peak, accident_frame_service
+from app.services.evidence_service import evidence_service
+
+logger = logging.getLogger(__name__)
+
+
+_shared_lstm: Optional[LSTMDetector] = None
+_shared_lstm_lock = threading.Lock()
+
+
+def get_shared_lstm() -> LSTMDetector:
+    """One LSTM instance shared by every stream (loaded on first use)."""
+    global _shared_lstm
+    with _shared_lstm_lock:
+        if _shared_lstm is None:
+            _shared_lstm = LSTMDetector(settings.LSTM_MODEL_PATH)
+        return _shared_lstm
+
+
+_evidence_pool: Optional[ThreadPoolExecutor] = None
+_evidence_pool_lock = threading.Lock()
+
+
+def get_evidence_pool() -> ThreadPoolExecutor:
+    """Threads that render stream event evidence, off the detection path (started on first use)."""
+    global _evidence_pool
+    with _evidence_pool_lock:
+        if _evidence_pool is None:
+            _evidence_pool = ThreadPoolExecutor(
+                max_workers=max(1, settings.STREAM_EVIDENCE_WORKERS), thread_name_prefix="stream-evidence"
+            )
+        return _evidence_pool
+
+
+def _render_event_evidence(event_id: str, frames: List[np.ndarray], detections: List[List[Dict]],
+                           per_frame_physics: List[float], peak_idx: int):
+    """Write an event's stills and put them under the evidence cache budget."""
+    try:
+        accident_frame_service.save_accident_frames(
+            video_id=event_id,
+            frames=frames,
+            event_frames=[(0, len(frames) - 1)],
+            detections_per_frame=detections,
+            per_frame_physics=per_frame_physics,
+            peak_idx=peak_idx,
+        )
+        # Under the evidence cache budget, so a long-running camera cannot fill the disk
+        evidence_service.retain(event_id)
+    except Exception as e:
+        logger.error(f"Evidence for stream event {event_id} failed: {e}", exc_info=True)
+
+
+class StreamMonitor:
+    """
+    Continuous accident detection on a single camera feed.
+
+    Every sampled frame is detected once and pushed into a rolling
+    ``STREAM_WINDOW_FRAMES`` feature window and a rolling PhysicsScorer.
+    Every ``STREAM_EVAL_STRIDE`` frames the same decision hierarchy as
+    ``analyze_video_file`` runs on the window (presence gate → physics gate
+    → LSTM), so an accident is raised at most ``stride / fps`` seconds plus
+    processing lag after it enters the window.
+
+    A monitor can run standalone (``run()`` with its own detector) or be
+    driven by ``StreamScheduler``, in which case its reader thread only
+    fills a one-frame mailbox and detection happens on the shared detector.
+    """
+
+    def __init__(
+        self,
+        stream_id: str,
+        source,
+        name: str = None,
+        realtime: bool = False,
+        target_fps: float = None,
+        detector: YOLODetector = None,
+        lstm_detector: LSTMDetector = None,
+        on_event: Callable[[Dict], None] = None,
+        roi: RegionMask = None,
+    ):
+        """
+        Args:
+            stream_id: Unique id for this stream
+            source: RTSP/HTTP URL, device index or local file path
+            name: Human-readable label (defaults to the source)
+            realtime: Pace file sources at native speed (camera stand-in)
+            target_fps: Sampling rate (defaults to settings.TARGET_FPS)
+            detector: YOLO detector for standalone ``run()`` (created lazily)
+            lstm_detector: LSTM detector (shared instance used if omitted)
+            on_event: Callback invoked with each accident event dict
+            roi: Region of interest; detection runs on its crop only
+        """
+        self.stream_id = stream_id
+        self.source = source
+        self.name = name or str(source)
+        self.reader = StreamReader(source, target_fps=target_fps, realtime=realtime)
+        self.nominal_fps = float(self.reader.target_fps)
+        self.detector = detector
+        self.lstm_detector = lstm_detector
+        self.on_event = on_event
+        self.roi = roi
+
+        self.window_size = settings.STREAM_WINDOW_FRAMES
+        self.eval_stride = max(1, settings.STREAM_EVAL_STRIDE)
+        self.cooldown = settings.STREAM_EVENT_COOLDOWN
+
+        self._features: deque = deque(maxlen=self.window_size)
+        self._frames: deque = deque(maxlen=settings.STREAM_EVIDENCE_FRAMES)
+        self._detections: deque = deque(maxlen=settings.STREAM_EVIDENCE_FRAMES)
+        self.physics: Optional[PhysicsScorer] = None
+        self.events: deque = deque(maxlen=settings.STREAM_MAX_EVENTS)
+
+        self.status = "created"   # created|running|stopped|finished|error
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.frames_processed = 0
+        self.frames_dropped = 0   # Sampled but overwritten before detection
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.last_event_latency = None
+        self._last_event_at = 0.0
+        self._process_times: deque = deque(maxlen=50)
+        self._thread: Optional[threading.Thread] = None
+
+        # Scheduler mailbox (guarded by the scheduler's condition)
+        self._cond: Optional[threading.Condition] = None
+        self._pending = None
+        self._feed_done = False
+        self._last_adapt = 0.0
+        self._dropped_at_adapt = 0
+
+    # ── Standalone mode ──────────────────────────────────────────────
+
+    def run(self):
+        """Blocking ingestion loop using this monitor's own detector."""
+        self.status = "running"
+        self.started_at = self.started_at or time.time()
+        try:
+            for captured_at, frame in self.reader.frames():
+                self.process_frame(frame, captured_at)
+            if self.status == "running":
+                self.status = "stopped" if self.reader.stopped else "finished"
+        except Exception as e:
+            logger.error(f"Stream {self.stream_id} failed: {e}", exc_info=True)
+            self.status = "error"
+            self.error = str(e)
+        finally:
+            if self.detector is not None:
+                self.detector.cleanup()
+            logger.info(
+                f"Stream {self.stream_id} ended ({self.status}): "
+                f"{self.frames_processed} frames, {len(self.events)} events"
+            )
+
+    # ── Scheduler mode ───────────────────────────────────────────────
+
+    def start_feed(self, cond: threading.Condition):
+        """Start the reader thread feeding this monitor's mailbox."""
+        self._cond = cond
+        self.status = "running"
+        self.started_at = time.time()
+        self._thread = threading.Thread(
+            target=self._feed_loop, name=f"stream-{self.stream_id}", daemon=True
+        )
+        self._thread.start()
+
+    def _feed_loop(self):
+        # Files (not paced) must not lose frames: block until the scheduler
+        # takes the previous one.  Live feeds keep only the newest frame.
+        lossless = not (self.reader.live or self.reader.realtime)
+        try:
+            for item in self.reader.frames():
+                with self._cond:
+                    if lossless:
+                        while self._pending is not None and not self.reader.stopped:
+                            self._cond.wait(0.5)
+                    elif self._pending is not None:
+                        self.frames_dropped += 1
+                    self._pending = item
+                    self._cond.notify_all()
+        except Exception as e:
+            logger.error(f"Stream {self.stream_id} reader failed: {e}", exc_info=True)
+            self.status = "error"
+            self.error = str(e)
+        finally:
+            with self._cond:
+                self._feed_done = True
+                self._cond.notify_all()
+
+    def take(self):
+        """Pop the pending (captured_at, frame) item. Caller holds the condition."""
+        item, self._pending = self._pending, None
+        return item
+
+    @property
+    def has_pending(self) -> bool:
+        return self._pending is not None
+
+    @property
+    def exhausted(self) -> bool:
+        """Reader finished and the mailbox is empty."""
+        return self._feed_done and self._pending is None
+
+    def adapt_rate(self):
+        """
+        Back off sampling when this feed cannot keep up, recover when it can.
+
+        Lag above ``STREAM_MAX_LAG`` or frames overwritten in the mailbox cut
+        the sampling rate by 25% (down to ``STREAM_MIN_FPS``); sustained low
+        lag raises it by 10% back towards the nominal rate.  Adjusted at most
+        once per second to avoid oscillation.
+        """
+        now = time.time()
+        if now - self._last_adapt < 1.0:
+            return
+        self._last_adapt = now
+
+        fps = float(self.reader.target_fps)
+        dropped = self.frames_dropped - self._dropped_at_adapt
+        self._dropped_at_adapt = self.frames_dropped
+
+        new_fps = fps
+        if self.last_lag > settings.STREAM_MAX_LAG or dropped > 0:
+            new_fps = max(fps * 0.75, settings.STREAM_MIN_FPS)
+        elif self.last_lag < settings.STREAM_MAX_LAG / 4 and fps < self.nominal_fps:
+            new_fps = min(fps * 1.1, self.nominal_fps)
+
+        if abs(new_fps - fps) > 1e-6:
+            self.reader.set_target_fps(new_fps)
+            logger.info(
+                f"Stream {self.stream_id}: sampling {fps:.2f} → {new_fps:.2f} fps "
+                f"(lag={self.last_lag:.2f}s, dropped={dropped})"
+            )
+
+    def stop(self, timeout: float = 5.0):
+        """Stop ingesting and wait for the reader thread to exit."""
+        self.reader.stop()
+        if self._cond is not None:
+            with self._cond:
+                self._cond.notify_all()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        if self.status == "running":
+            self.status = "stopped"
+
+    # ── Per-frame processing ─────────────────────────────────────────
+
+    def process_frame(self, frame: np.ndarray, captured_at: float = None) -> Optional[Dict]:
+        """
+        Detect, score and (every stride) evaluate one sampled frame.
+
+        Returns:
+            dict: The accident event if one was raised on this frame, else None
+        """
+        captured_at = captured_at or time.time()
+        if self.detector is None:
+            self.detector = YOLODetector()
+        if self.roi is not None:
+            dets = self.roi.restore(self.detector.detect(self.roi.crop(frame)), frame.shape[:2])
+        else:
+            dets = self.detector.detect(frame)
+        self.add_detections(frame, dets)
+        return self.finish_frame(captured_at)
+
+    def add_detections(self, frame: np.ndarray, dets: List[Dict]):
+        """Push one frame's detections into the rolling windows."""
+        if self.physics is None:
+            frame_h, frame_w = frame.shape[:2]
+            self.physics = PhysicsScorer(frame_size=(frame_h, frame_w), history=self.window_size)
+        vehicles = filter_vehicles(dets)
+        self.physics.push(vehicles)
+        self._features.append(compute_frame_features(vehicles))
+        self._frames.append(frame)
+        self._detections.append(dets)
+
+    def finish_frame(self, captured_at: float) -> Optional[Dict]:
+        """Update lag / throughput and evaluate the window on stride boundaries."""
+        self.frames_processed += 1
+        event = None
+        if self.frames_processed % self.eval_stride == 0:
+            event = self.evaluate(captured_at)
+
+        now = time.time()
+        self.last_lag = now - captured_at
+        self.max_lag = max(self.max_lag, self.last_lag)
+        self._process_times.append(now)
+        return event
+
+    def evaluate(self, captured_at: float) -> Optional[Dict]:
+        """Run gates + LSTM over the current window; raise an event if positive."""
+        if self.physics is None or not self.physics.passes_presence_gate():
+            return None
+
+        physics = self.physics.summary()
+        if not self.physics.passes_signal_gate(physics):
+            return None
+
+        if self.lstm_detector is None:
+            self.lstm_detector = get_shared_lstm()
+        lstm_confidence = self.lstm_detector.predict(pad_sequence(self._features, self.window_size))
+        if lstm_confidence < 0.5:
+            return None
+
+        if captured_at - self._last_event_at < self.cooldown:
+            logger.debug(f"Stream {self.stream_id}: accident within cooldown, suppressed")
+            return None
+        self._last_event_at = captured_at
+
+        return self._raise_event(captured_at, lstm_confidence, physics)
+
+    def _raise_event(self, captured_at: float, lstm_confidence: float, physics: Dict) -> Dict:
+        """
+        Record an event and hand its stills to the evidence pool.
+
+        Rendering (and the cache eviction that follows it) would otherwise
+        hold up every feed sharing the scheduler's detector, so the event
+        carries the still URLs the render will produce, as lazy evidence
+        does; they resolve once the render has finished.
+        """
+        event_id = f"{self.stream_id}-{int(captured_at * 1000)}"
+        frames = list(self._frames)
+        detections = [[dict(d) for d in dets] for dets in self._detections]
+        per_frame_physics = physics['per_frame_physics'][-len(frames):]
+
+        peak_idx = _find_collision_peak(frames, detections, per_frame_physics, [(0, len(frames) - 1)])
+        saved_frames = [
+            peak_idx + o for o in AccidentFrameService.STILL_OFFSETS if 0 <= peak_idx + o < len(frames)
+        ]
+        get_evidence_pool().submit(
+            _render_event_evidence, event_id, frames, detections, per_frame_physics, peak_idx
+        )
+        frame_urls = accident_frame_service.get_frame_urls(
+            video_id=event_id, saved_frames=saved_frames, limit=5
+        )
+        thumbnail_urls = accident_frame_service.get_frame_urls(
+            video_id=event_id, saved_frames=saved_frames, limit=5, thumb=True
+        )
+
+        latency = time.time() - captured_at
+        self.last_event_latency = latency
+        event = {
+            "event_id": event_id,
+            "stream_id": self.stream_id,
+            "detected_at": datetime.now().isoformat(),
+            "confidence": round(float(lstm_confidence), 4),
+            "physicsScore": round(float(physics['physics_score']), 4),
+            "overlapSpike": round(float(physics['overlap_spike']), 4),
+            "frameUrls": frame_urls,
+            "thumbnailUrls": thumbnail_urls,
+            "latency": round(latency, 3),
+        }
+        self.events.append(event)
+        logger.warning(
+            f"ACCIDENT on stream {self.stream_id} ({self.name}): "
+            f"lstm={lstm_confidence:.3f} physics={physics['physics_score']:.3f} "
+            f"latency={latency:.2f}s"
+        )
+
+        if self.on_event:
+            try:
+                self.on_event(event)
+            except Exception as e:
+                logger.error(f"Stream event callback failed: {e}")
+        return event
+
+    # ── Monitoring ───────────────────────────────────────────────────
+
+    @property
+    def throughput_fps(self) -> float:
+        """Processed frames per second over the recent sliding window."""
+        if len(self._process_times) < 2:
+            return 0.0
+        span = self._process_times[-1] - self._process_times[0]
+        return (len(self._process_times) - 1) / span if span > 0 else 0.0
+
+    def stats(self) -> Dict:
+        return {
+            "stream_id": self.stream_id,
+            "name": self.name,
+            "source": str(self.source),
+            "roi": self.roi.name if self.roi is not None else None,
+            "status": self.status,
+            "error": self.error,
+            "target_fps": float(self.reader.target_fps),
+            "throughput_fps": round(self.throughput_fps, 2),
+            "frames_read": self.reader.frames_read,
+            "frames_processed": self.frames_processed,
+            "frames_skipped": self.reader.frames_skipped,
+            "frames_dropped": self.frames_dropped,
+            "lag_seconds": round(self.last_lag, 3),
+            "max_lag_seconds": round(self.max_lag, 3),
+            "last_event_latency": (
+                round(self.last_event_latency, 3) if self.last_event_latency is not None else None
+            ),
+            "event_count": len(self.events),
+            "uptime_seconds": round(time.time() - self.started_at, 1) if self.started_at else 0.0,
+        }
+
+
+class StreamScheduler:
+    """
+    Multiplex many camera feeds onto one shared detector.
+
+    Each stream's reader thread only decodes and samples into a one-frame
+    mailbox.  A single worker thread visits streams round-robin (resuming
+    after the last stream served), takes at most one pending frame per
+    stream per round, and runs them through ``YOLODetector.detect_batch``
+    in batches of up to ``STREAM_BATCH_SIZE``.  Feeds that fall behind have
+    their sampling rate reduced (see ``StreamMonitor.adapt_rate``) instead
+    of accumulating latency.
+    """
+
+    def __init__(self, detector: YOLODetector = None, batch_size: int = None):
+        self.detector = detector or YOLODetector()
+        self.batch_size = max(1, batch_size or settings.STREAM_BATCH_SIZE)
+
+        self._streams: Dict[str, StreamMonitor] = {}
+        self._order: List[str] = []
+        self._cursor = 0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+        self.batches = 0
+        self.frames_detected = 0
+        self._batch_times: deque = deque(maxlen=50)
+
+    # ── Stream registry ──────────────────────────────────────────────
+
+    def start_stream(
+        self, source, name: str = None, realtime: bool = False, roi: RegionMask = None
+    ) -> StreamMonitor:
+        """Register ``source`` and start feeding it to the shared detector."""
+        stream_id = str(uuid.uuid4())
+        monitor = StreamMonitor(stream_id, source, name=name, realtime=realtime, roi=roi)
+        with self._cond:
+            self._streams[stream_id] = monitor
+            self._order.append(stream_id)
+        monitor.start_feed(self._cond)
+        self._ensure_worker()
+        logger.info(f"Started stream {stream_id}: {source} ({len(self._order)} active)")
+        return monitor
+
+    def get(self, stream_id: str) -> StreamMonitor | None:
+        return self._streams.get(stream_id)
+
+    def list(self) -> List[StreamMonitor]:
+        with self._cond:
+            return [self._streams[sid] for sid in self._order]
+
+    def stop_stream(self, stream_id: str) -> bool:
+        """Stop and unregister a stream. Returns False if it does not exist."""
+        with self._cond:
+            monitor = self._streams.pop(stream_id, None)
+            if monitor is None:
+                return False
+            idx = self._order.index(stream_id)
+            self._order.remove(stream_id)
+            if idx < self._cursor:
+                self._cursor -= 1
+        monitor.stop()
+        logger.info(f"Stopped stream {stream_id}")
+        return True
+
+    def stop_all(self):
+        for stream_id in [m.stream_id for m in self.list()]:
+            self.stop_stream(stream_id)
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._worker and self._worker.is_alive():
+            self._worker.join(5.0)
+        self._worker = None
+
+    # ── Worker ───────────────────────────────────────────────────────
+
+    def _ensure_worker(self):
+        if self._worker and self._worker.is_alive():
+            return
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, name="stream-scheduler", daemon=True)
+        self._worker.start()
+
+    def _next_batch(self) -> List[tuple]:
+        """Round-robin pick of at most one pending frame per stream. Holds the condition."""
+        batch = []
+        n = len(self._order)
+        start = self._cursor
+        for step in range(n):
+            if len(batch) >= self.batch_size:
+                break
+            idx = (start + step) % n
+            monitor = self._streams[self._order[idx]]
+            if monitor.has_pending:
+                batch.append((monitor, monitor.take()))
+                self._cursor = (idx + 1) % n
+        return batch
+
+    def _reap_finished(self):
+        """Mark monitors whose reader ended and whose mailbox is drained. Holds the condition."""
+        for sid in self._order:
+            monitor = self._streams[sid]
+            if monitor.status == "running" and monitor.exhausted:
+                monitor.status = "stopped" if monitor.reader.stopped else "finished"
+                logger.info(f"Stream {sid} finished: {monitor.frames_processed} frames")
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._cond:
+                batch = self._next_batch()
+                if not batch:
+                    self._reap_finished()
+                    self._cond.wait(0.5)
+                    continue
+                self._cond.notify_all()   # wake lossless readers waiting on an empty slot
+            self.process_batch(batch)
+
+    def process_batch(self, batch: List[tuple]):
+        """Detect a batch of (monitor, (captured_at, frame)) on the shared detector."""
+        started = time.time()
+        # Streams with an ROI contribute only its crop to the shared batch
+        frames = [
+            monitor.roi.crop(frame) if monitor.roi is not None else frame
+            for monitor, (_, frame) in batch
+        ]
+        try:
+            detections = self.detector.detect_batch(frames)
+        except Exception as e:
+            logger.error(f"Shared detector failed on batch of {len(frames)}: {e}")
+            return
+
+        for (monitor, (captured_at, frame)), dets in zip(batch, detections):
+            try:
+                if monitor.roi is not None:
+                    dets = monitor.roi.restore(dets, frame.shape[:2])
+                monitor.add_detections(frame, dets)
+                monitor.finish_frame(captured_at)
+                monitor.adapt_rate()
+            except Exception as e:
+                logger.error(f"Stream {monitor.stream_id} processing failed: {e}", exc_info=True)
+                monitor.status = "error"
+                monitor.error = str(e)
+                monitor.reader.stop()
+
+        self.batches += 1
+        self.frames_detected += len(batch)
+        self._batch_times.append((time.time() - started, len(batch)))
+
+    def stats(self) -> Dict:
+        recent = list(self._batch_times)
+        busy = sum(t for t, _ in recent)
+        return {
+            "active_streams": sum(1 for m in self.list() if m.status == "running"),
+            "total_streams": len(self._order),
+            "batch_size": self.batch_size,
+            "batches": self.batches,
+            "frames_detected": self.frames_detected,
+            "avg_batch_size": round(sum(n for _, n in recent) / len(recent), 2) if recent else 0.0,
+            "detector_fps": round(sum(n for _, n in recent) / busy, 2) if busy > 0 else 0.0,
+            "device": self.detector.get_device(),
+        }
+
+
+# Global instance
+stream_scheduler = StreamScheduler()
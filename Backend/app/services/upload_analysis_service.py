@@ -0,0 +1,154 @@
+"""Detection on a video while it is still being uploaded"""
+from pathlib import Path
+from typing import Callable, Optional
+import threading
+import cv2
+import logging
+
+from app.core.config import settings
+from app.ml.pipeline.frame_extractor import FrameExtractor
+
+logger = logging.getLogger(__name__)
+
+
+class UploadTail:
+    """
+    Follow a growing upload and run the detector on the sampled frames that
+    have already arrived, so detection overlaps with the transfer.
+
+    Every UPLOAD_TAIL_STEP new bytes the partial file is reopened, the
+    decoder seeks back to where the previous pass stopped, and newly
+    decodable frames on the analysis sampling grid are detected in batches.
+    The detector should be a ``MemoDetector``: the analysis that runs once
+    the upload completes re-decodes the finished file and only frames whose
+    pixels match a tailed frame reuse its detections, so a frame decoded
+    from a truncated packet costs a wasted detection, never a wrong result.
+
+    Streamable containers (MKV, fragmented or faststart MP4) are tailed as
+    they arrive; an MP4 whose index comes last cannot be opened until the
+    upload completes, and the analysis then simply detects everything.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        progress: Callable[[], int],
+        detector,
+        max_samples: Optional[int] = None,
+        frame_extractor: FrameExtractor = None,
+        step: int = None,
+        poll: float = None,
+        conf_threshold: float = None,
+    ):
+        """
+        Args:
+            path: Partial upload file
+            progress: Returns the number of bytes received so far
+            detector: Detector chain the analysis will use (memoizing, ROI-wrapped if any)
+            max_samples: Stop after this many sampled frames (None = whole video)
+            frame_extractor: Provides the sampling grid (defaults to TARGET_FPS)
+            step: New bytes between decode passes (defaults to UPLOAD_TAIL_STEP)
+            poll: Seconds between progress checks (defaults to UPLOAD_TAIL_POLL)
+            conf_threshold: Must match the analysis (defaults to DETECTION_CONF_THRESHOLD)
+        """
+        self.path = Path(path)
+        self.progress = progress
+        self.detector = detector
+        self.max_samples = max_samples
+        self.frame_extractor = frame_extractor or FrameExtractor()
+        self.step = step or settings.UPLOAD_TAIL_STEP
+        self.poll = poll or settings.UPLOAD_TAIL_POLL
+        self.conf_threshold = conf_threshold if conf_threshold is not None else settings.DETECTION_CONF_THRESHOLD
+
+        self.passes = 0
+        self.frames_detected = 0
+        self._next_frame = 0          # Raw frame index the next pass starts at
+        self._samples = 0             # Sampled frames completed before _next_frame
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def done(self) -> bool:
+        return self.max_samples is not None and self._samples >= self.max_samples
+
+    def start(self) -> "UploadTail":
+        self._thread = threading.Thread(target=self._run, name=f"upload-tail-{self.path.stem}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        """Stop after the batch in flight and wait for the thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        scanned = 0
+        while not self._stop.is_set() and not self.done:
+            received = self.progress()
+            if received - scanned >= self.step:
+                scanned = received
+                try:
+                    self.scan()
+                except Exception as e:
+                    # The analysis after the upload detects whatever was missed
+                    logger.warning(f"Upload tail of {self.path.name} stopped: {e}")
+                    return
+            self._stop.wait(self.poll)
+
+    def scan(self):
+        """One decode + detect pass over the bytes currently on disk."""
+        cap = cv2.VideoCapture(str(self.path))
+        try:
+            if not cap.isOpened():
+                return
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            if fps <= 0:
+                return
+            self.passes += 1
+            interval = self.frame_extractor.sampling_interval(fps)
+            frame_idx = self._next_frame
+            if frame_idx > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+
+            batch, last_sample, truncated = [], None, False
+            batch_size = max(1, settings.LONG_VIDEO_BATCH_SIZE)
+            while not self._stop.is_set() and not self.done:
+                if frame_idx % interval != 0:
+                    if not cap.grab():
+                        truncated = True
+                        break
+                    frame_idx += 1
+                    continue
+                ret, frame = cap.read()
+                if not ret or frame is None or frame.size == 0:
+                    truncated = True
+                    break
+                batch.append(frame)
+                last_sample = frame_idx
+                self._samples += 1
+                frame_idx += 1
+                if len(batch) >= batch_size:
+                    self._detect(batch)
+                    batch = []
+            if batch:
+                self._detect(batch)
+            if truncated and last_sample is not None:
+                # The last frame read may come from a truncated packet: the
+                # next pass decodes it again (a memo hit if it was whole)
+                self._next_frame = last_sample
+                self._samples -= 1
+            else:
+                self._next_frame = frame_idx
+        finally:
+            cap.release()
+
+    def _detect(self, batch):
+        self.detector.detect_batch(batch, self.conf_threshold)
+        self.frames_detected += len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "passes": self.passes,
+            "framesDetected": self.frames_detected,
+        }
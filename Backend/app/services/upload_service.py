@@ -0,0 +1,264 @@
+"""Chunked, resumable video uploads"""
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+import asyncio
+import hashlib
+import json
+import os
+import time
+import logging
+
+from app.core.config import settings
+from app.services.video_service import sanitize_filename, run_upload_io
+from app.utils.file_utils import validate_video_file
+
+logger = logging.getLogger(__name__)
+
+
+class UploadOffsetError(ValueError):
+    """A chunk was sent for an offset other than the upload's current one."""
+
+    def __init__(self, offset: int):
+        super().__init__(f"Upload is at offset {offset}")
+        self.offset = offset
+
+
+class UploadSizeError(ValueError):
+    """More bytes were sent than the upload declared."""
+
+
+class UploadSession:
+    """State of one in-progress upload (mirrored to a JSON sidecar)."""
+
+    def __init__(self, upload_id: str, filename: str, size: int, sha256: str = None,
+                 offset: int = 0, created_at: float = None):
+        self.upload_id = upload_id
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256.lower() if sha256 else None
+        self.offset = offset
+        self.created_at = created_at or time.time()
+        self.lock = asyncio.Lock()
+        self._hash = None
+
+    @property
+    def ext(self) -> str:
+        return Path(sanitize_filename(self.filename)).suffix.lower()
+
+    @property
+    def complete(self) -> bool:
+        return self.offset == self.size
+
+    def to_dict(self) -> dict:
+        return {
+            "upload_id": self.upload_id,
+            "filename": self.filename,
+            "size": self.size,
+            "sha256": self.sha256,
+            "created_at": self.created_at,
+        }
+
+
+class ChunkedUploadService:
+    """
+    Resumable uploads written straight to their final location.
+
+    Protocol: ``create`` (declared name, size and optional SHA-256) →
+    ``receive`` chunks at explicit offsets → ``complete``.  Bytes are
+    appended to ``UPLOAD_DIR/.partial/{id}{ext}`` as they arrive (no
+    spooling), hashed and size-checked incrementally, and the finished file
+    is renamed into ``UPLOAD_DIR`` - a rename on the same filesystem, never
+    a second copy.
+
+    The partial file's length *is* the resume offset, so after a dropped
+    connection (or a server restart) the client asks for the status and
+    continues from there; a chunk for any other offset is rejected with the
+    current one.  A restart only costs re-hashing the bytes already on disk.
+    """
+
+    def __init__(self, upload_dir: str = None, max_size: int = None):
+        """
+        Args:
+            upload_dir: Final upload directory (defaults to UPLOAD_DIR)
+            max_size: Largest accepted upload (defaults to MAX_UPLOAD_SIZE)
+        """
+        self._upload_dir = upload_dir
+        self.max_size = max_size if max_size is not None else settings.MAX_UPLOAD_SIZE
+        self._sessions: Dict[str, UploadSession] = {}
+
+    @property
+    def upload_dir(self) -> Path:
+        upload_dir = Path(self._upload_dir or settings.UPLOAD_DIR)
+        if not upload_dir.is_absolute():
+            upload_dir = (Path(os.getcwd()) / upload_dir).resolve()
+        return upload_dir
+
+    @property
+    def partial_dir(self) -> Path:
+        return self.upload_dir / ".partial"
+
+    def partial_path(self, session: UploadSession) -> Path:
+        """Where the bytes of an unfinished upload are written."""
+        return self.partial_dir / f"{session.upload_id}{session.ext}"
+
+    def _meta_path(self, upload_id: str) -> Path:
+        return self.partial_dir / f"{upload_id}.json"
+
+    def create(self, upload_id: str, filename: str, size: int, sha256: str = None) -> UploadSession:
+        """
+        Start an upload.
+
+        Raises:
+            ValueError: Unsupported file type, empty upload or bad checksum format
+            UploadSizeError: Declared size exceeds the limit
+        """
+        validation = validate_video_file(filename, 0)
+        if not validation["valid"]:
+            raise ValueError(validation["error"])
+        if size <= 0:
+            raise ValueError("Upload size must be positive")
+        if size > self.max_size:
+            raise UploadSizeError(f"File size exceeds {self.max_size / (1024 * 1024):.0f}MB limit")
+        if sha256 is not None and (len(sha256) != 64 or any(c not in "0123456789abcdefABCDEF" for c in sha256)):
+            raise ValueError("sha256 must be 64 hex characters")
+
+        session = UploadSession(upload_id, filename, size, sha256)
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        self.partial_path(session).touch()
+        self._meta_path(upload_id).write_text(json.dumps(session.to_dict()))
+        self._sessions[upload_id] = session
+        logger.info(f"Upload {upload_id} started: {filename} ({size} bytes)")
+        return session
+
+    def get(self, upload_id: str) -> Optional[UploadSession]:
+        """Session for ``upload_id``, reloaded from disk after a restart."""
+        session = self._sessions.get(upload_id)
+        if session is not None:
+            return session
+        meta = self._meta_path(upload_id)
+        if sanitize_filename(upload_id) != upload_id or not meta.exists():
+            return None
+        session = UploadSession(**json.loads(meta.read_text()))
+        partial = self.partial_path(session)
+        if not partial.exists():
+            return None
+        session.offset = partial.stat().st_size
+        self._sessions[upload_id] = session
+        return session
+
+    def _write(self, session: UploadSession, data: bytes):
+        """Append ``data`` at the session offset (runs on the upload I/O pool)."""
+        path = self.partial_path(session)
+        if session._hash is None:
+            # First write since a restart: re-hash what is already on disk
+            session._hash = hashlib.sha256()
+            with path.open("rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    session._hash.update(block)
+        with path.open("r+b") as f:
+            f.seek(session.offset)
+            f.write(data)
+            f.truncate()
+        session._hash.update(data)
+        session.offset += len(data)
+
+    async def receive(self, session: UploadSession, offset: int, body: AsyncIterator[bytes]) -> int:
+        """
+        Append a chunk streamed from ``body`` starting at ``offset``.
+
+        Data is written in UPLOAD_WRITE_BUFFER pieces as it arrives; if the
+        client disconnects mid-chunk, everything received so far is kept and
+        the upload resumes from there.
+
+        Returns:
+            int: New offset
+
+        Raises:
+            UploadOffsetError: ``offset`` is not the current offset, or another
+                               chunk of this upload is being received
+            UploadSizeError: The chunk runs past the declared size
+        """
+        if session.lock.locked() or offset != session.offset:
+            raise UploadOffsetError(session.offset)
+        async with session.lock:
+            buffer = bytearray()
+            try:
+                async for piece in body:
+                    if session.offset + len(buffer) + len(piece) > session.size:
+                        raise UploadSizeError(
+                            f"Chunk runs past the declared size of {session.size} bytes"
+                        )
+                    buffer += piece
+                    if len(buffer) >= settings.UPLOAD_WRITE_BUFFER:
+                        await run_upload_io(self._write, session, bytes(buffer))
+                        buffer.clear()
+            finally:
+                if buffer:
+                    await run_upload_io(self._write, session, bytes(buffer))
+        return session.offset
+
+    def complete(self, session: UploadSession) -> Path:
+        """
+        Verify a fully received upload and move it into the upload directory.
+
+        Returns:
+            Path: Final file path (``{upload_id}{ext}``)
+
+        Raises:
+            ValueError: Bytes are missing or the checksum does not match
+                        (a mismatching upload is discarded)
+        """
+        if not session.complete:
+            raise ValueError(f"Upload incomplete: {session.offset} of {session.size} bytes received")
+        if session.sha256 is not None:
+            if session._hash is None:
+                session._hash = hashlib.sha256()
+                with self.partial_path(session).open("rb") as f:
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        session._hash.update(block)
+            if session._hash.hexdigest() != session.sha256:
+                self.abort(session.upload_id)
+                raise ValueError("Checksum mismatch: upload discarded, please upload again")
+
+        final = self.upload_dir / f"{session.upload_id}{session.ext}"
+        os.replace(self.partial_path(session), final)
+        self._meta_path(session.upload_id).unlink(missing_ok=True)
+        self._sessions.pop(session.upload_id, None)
+        logger.info(f"Upload {session.upload_id} complete: {final.name}")
+        return final
+
+    def abort(self, upload_id: str) -> bool:
+        """Discard an upload. Returns False if it does not exist."""
+        session = self.get(upload_id)
+        if session is None:
+            return False
+        self.partial_path(session).unlink(missing_ok=True)
+        self._meta_path(upload_id).unlink(missing_ok=True)
+        self._sessions.pop(upload_id, None)
+        logger.info(f"Upload {upload_id} aborted")
+        return True
+
+    def expire(self, max_age: float = None) -> int:
+        """
+        Discard uploads started more than ``max_age`` seconds ago
+        (defaults to UPLOAD_SESSION_TTL).
+
+        Returns:
+            int: Bytes freed
+        """
+        max_age = settings.UPLOAD_SESSION_TTL if max_age is None else max_age
+        if not self.partial_dir.exists():
+            return 0
+        freed = 0
+        cutoff = time.time() - max_age
+        for meta in self.partial_dir.glob("*.json"):
+            session = self.get(meta.stem)
+            if session is None or session.created_at >= cutoff or session.lock.locked():
+                continue
+            freed += session.offset
+            self.abort(session.upload_id)
+        return freed
+
+
+# Global instance
+chunked_uploads = ChunkedUploadService()
@@ -1,12 +1,28 @@
 """Video handling service with input sanitization"""
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from fastapi import UploadFile
+import asyncio
 import shutil
 import os
 
 from app.core.config import settings
 
+# Upload disk I/O runs here, off the event loop; the pool size bounds how
+# many uploads write at once (the rest queue) without taking threads from
+# the shared request threadpool.
+_upload_io = ThreadPoolExecutor(
+    max_workers=settings.UPLOAD_WRITE_WORKERS, thread_name_prefix="upload-io"
+)
+
+
+async def run_upload_io(func, *args, **kwargs):
+    """Run blocking upload I/O on the bounded upload pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_upload_io, partial(func, *args, **kwargs))
+
 
 def sanitize_filename(filename: str) -> str:
     """
@@ -22,8 +38,21 @@ def sanitize_filename(filename: str) -> str:
     return filename or "unnamed_video"
 
 
+def _copy_upload(src, filepath: Path) -> int:
+    """Copy the spooled upload to ``filepath`` in large blocks; returns bytes written."""
+    src.seek(0)
+    with filepath.open("wb") as buffer:
+        shutil.copyfileobj(src, buffer, settings.UPLOAD_WRITE_BUFFER)
+        return buffer.tell()
+
+
 async def save_uploaded_video(video: UploadFile, video_id: str) -> Path:
-    """Save uploaded video to storage with sanitized filename"""
+    """
+    Save uploaded video to storage with sanitized filename.
+
+    The copy runs on the bounded upload pool so a large file never blocks
+    the event loop.
+    """
     upload_dir = Path(settings.UPLOAD_DIR)
     
     if not upload_dir.is_absolute():
@@ -38,8 +67,7 @@ async def save_uploaded_video(video: UploadFile, video_id: str) -> Path:
     ext = Path(safe_name).suffix
     filepath = upload_dir / f"{video_id}{ext}"
 
-    with filepath.open("wb") as buffer:
-        shutil.copyfileobj(video.file, buffer)
+    await run_upload_io(_copy_upload, video.file, filepath)
 
     return filepath
 
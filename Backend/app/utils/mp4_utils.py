@@ -0,0 +1,77 @@
+"""MP4 container utilities"""
+from pathlib import Path
+import os
+import struct
+
+# Atoms that are descended into on the way to the chunk offset tables
+_CONTAINERS = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+
+
+def _atoms(data, start: int, end: int):
+    """Yield (type, offset, size, header_size) of the atoms in data[start:end]."""
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack_from('>I4s', data, pos)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from('>Q', data, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            raise ValueError(f"Malformed MP4 atom {kind!r} at offset {pos}")
+        yield kind, pos, size, header
+        pos += size
+
+
+def _shift_chunk_offsets(moov: bytearray, start: int, end: int, delta: int):
+    for kind, pos, size, header in list(_atoms(moov, start, end)):
+        body = pos + header
+        if kind in _CONTAINERS:
+            _shift_chunk_offsets(moov, body, pos + size, delta)
+        elif kind in (b'stco', b'co64'):
+            fmt = 'I' if kind == b'stco' else 'Q'
+            count = struct.unpack_from('>I', moov, body + 4)[0]
+            offsets = [o + delta for o in struct.unpack_from(f'>{count}{fmt}', moov, body + 8)]
+            if fmt == 'I' and offsets and max(offsets) > 0xFFFFFFFF:
+                raise ValueError("Chunk offsets overflow 32 bits after moving moov")
+            struct.pack_into(f'>{count}{fmt}', moov, body + 8, *offsets)
+
+
+def faststart(path: Path) -> bool:
+    """
+    Move an MP4's ``moov`` atom in front of ``mdat`` (like ``ffmpeg
+    -movflags +faststart``) so players can start before the whole file has
+    downloaded.  The file is rewritten atomically.
+
+    Returns:
+        bool: True if the file was rewritten, False if moov already leads
+
+    Raises:
+        ValueError: If the file is not a well-formed MP4
+    """
+    path = Path(path)
+    data = path.read_bytes()
+    top = list(_atoms(data, 0, len(data)))
+    kinds = [kind for kind, *_ in top]
+    if b'moov' not in kinds or b'mdat' not in kinds:
+        raise ValueError(f"{path.name} has no moov/mdat atoms")
+
+    moov_i, mdat_i = kinds.index(b'moov'), kinds.index(b'mdat')
+    if moov_i < mdat_i:
+        return False
+
+    _, moov_pos, moov_size, moov_header = top[moov_i]
+    moov = bytearray(data[moov_pos:moov_pos + moov_size])
+    # Everything from mdat on moves back by the size of moov
+    _shift_chunk_offsets(moov, moov_header, moov_size, moov_size)
+
+    tmp = path.with_name(f".{path.name}.tmp")
+    with tmp.open("wb") as out:
+        for i, (_, pos, size, _) in enumerate(top):
+            if i == mdat_i:
+                out.write(moov)
+            if i != moov_i:
+                out.write(data[pos:pos + size])
+    os.replace(tmp, path)
+    return True
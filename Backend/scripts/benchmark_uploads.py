@@ -0,0 +1,209 @@
+"""
+Benchmark concurrent uploads and /health latency while they are in flight.
+
+N clients upload a synthetic video of the given size at the same time,
+through either the multipart /api/upload route or the chunked
+/api/uploads protocol, while a probe polls /health.  The script reports
+aggregate upload throughput and /health latency percentiles — the latter
+stay near their idle values only if upload I/O keeps off the event loop.
+
+By default the script starts a throwaway server under uvicorn (temporary
+storage and database) in a separate process; ``--url`` targets a running
+server instead.  ``--blocking`` swaps the old synchronous copy into the
+throwaway server for a before/after comparison.
+
+Usage:
+    python scripts/benchmark_uploads.py --clients 8 --size-mb 200
+    python scripts/benchmark_uploads.py --mode chunked --chunk-mb 8
+    python scripts/benchmark_uploads.py --blocking
+    python scripts/benchmark_uploads.py --url http://localhost:8000
+"""
+import sys
+import os
+import time
+import shutil
+import socket
+import asyncio
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _payload(size_mb: int) -> bytes:
+    return os.urandom(1024 * 1024) * size_mb
+
+
+async def _multipart_upload(client, payload: bytes, index: int):
+    response = await client.post(
+        "/api/upload", files={"video": (f"bench_{index}.mp4", payload, "video/mp4")}
+    )
+    response.raise_for_status()
+
+
+async def _chunked_upload(client, payload: bytes, index: int, chunk: int):
+    response = await client.post("/api/uploads", json={"filename": f"bench_{index}.mp4", "size": len(payload)})
+    response.raise_for_status()
+    upload_id = response.json()["upload_id"]
+    for offset in range(0, len(payload), chunk):
+        response = await client.put(
+            f"/api/uploads/{upload_id}", params={"offset": offset}, content=payload[offset:offset + chunk]
+        )
+        response.raise_for_status()
+    (await client.post(f"/api/uploads/{upload_id}/complete")).raise_for_status()
+
+
+async def _probe_health(client, stop: asyncio.Event, interval: float, latencies: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/health")
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def _run(client, args) -> dict:
+    payload = _payload(args.size_mb)
+    chunk = args.chunk_mb * 1024 * 1024
+
+    idle = []
+    for _ in range(10):
+        started = time.perf_counter()
+        await client.get("/health")
+        idle.append((time.perf_counter() - started) * 1000)
+
+    stop, loaded = asyncio.Event(), []
+    probe = asyncio.create_task(_probe_health(client, stop, args.probe_interval, loaded))
+    started = time.perf_counter()
+    if args.mode == "chunked":
+        uploads = [_chunked_upload(client, payload, i, chunk) for i in range(args.clients)]
+    else:
+        uploads = [_multipart_upload(client, payload, i) for i in range(args.clients)]
+    await asyncio.gather(*uploads)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+
+    total_mb = args.clients * args.size_mb
+    return {
+        "elapsed": elapsed,
+        "throughput": total_mb / elapsed,
+        "idle": idle,
+        "loaded": loaded or [float("nan")],
+    }
+
+
+def _blocking_save():
+    """The pre-offload ``save_uploaded_video``: copy on the event loop."""
+    from app.services import video_service
+
+    async def save_uploaded_video(video, video_id):
+        upload_dir = Path(video_service.settings.UPLOAD_DIR)
+        upload_dir.mkdir(parents=True, exist_ok=True)
+        filepath = upload_dir / f"{video_id}{Path(video.filename).suffix}"
+        with filepath.open("wb") as buffer:
+            shutil.copyfileobj(video.file, buffer)
+        return filepath
+
+    return save_uploaded_video
+
+
+def _serve(port: int, blocking: bool):
+    """Child process: run the app under uvicorn (optionally with the old copy)."""
+    import uvicorn
+    from app.main import app
+
+    if blocking:
+        patch("app.api.v1.routes.video.save_uploaded_video", _blocking_save()).start()
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _spawned(args) -> dict:
+    """Start a throwaway server (temporary storage + database) and benchmark it."""
+    workdir = tempfile.mkdtemp(prefix="upload-bench-")
+    port = _free_port()
+    env = {
+        **os.environ,
+        "UPLOAD_DIR": os.path.join(workdir, "uploads"),
+        "FRAMES_DIR": os.path.join(workdir, "frames"),
+        "CLIPS_DIR": os.path.join(workdir, "clips"),
+        "EVIDENCE_DIR": os.path.join(workdir, "evidence"),
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "DEBUG": "false",
+    }
+    command = [sys.executable, __file__, "--serve", "--port", str(port)]
+    if args.blocking:
+        command.append("--blocking")
+    server = subprocess.Popen(command, env=env, cwd=str(Path(__file__).parent.parent))
+    args.url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+            for _ in range(300):
+                try:
+                    await client.get("/")
+                    break
+                except httpx.TransportError:
+                    if server.poll() is not None:
+                        raise RuntimeError("Benchmark server failed to start")
+                    await asyncio.sleep(0.1)
+            return await _run(client, args)
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+async def _remote(args) -> dict:
+    async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+        return await _run(client, args)
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent uploads and /health latency")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent uploads")
+    parser.add_argument("--size-mb", type=int, default=100, help="Size of each upload")
+    parser.add_argument("--mode", choices=["multipart", "chunked"], default="multipart")
+    parser.add_argument("--chunk-mb", type=int, default=8, help="Chunk size for --mode chunked")
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="Seconds between /health probes")
+    parser.add_argument("--url", help="Benchmark a running server instead of a throwaway one")
+    parser.add_argument("--blocking", action="store_true",
+                        help="Spawned server only: use the old on-loop copy for comparison")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        _serve(args.port, args.blocking)
+        return
+    result = asyncio.run(_remote(args) if args.url else _spawned(args))
+
+    print(f"\n{'=' * 60}")
+    print(f"{args.clients} x {args.size_mb} MB {args.mode} uploads"
+          f"{' (blocking copy)' if args.blocking else ''}")
+    print(f"{'=' * 60}")
+    print(f"  Wall time            {result['elapsed']:8.2f} s")
+    print(f"  Aggregate throughput {result['throughput']:8.1f} MB/s")
+    for label, values in (("idle", result["idle"]), ("during uploads", result["loaded"])):
+        print(f"  /health {label:<15} p50 {statistics.median(values):7.1f} ms"
+              f"   p95 {_percentile(values, 0.95):7.1f} ms   max {max(values):7.1f} ms"
+              f"   (n={len(values)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Evaluate the detector cascade against the single-model baseline.
+
+For every video the default analysis runs twice — once with the heavy
+model on every frame, once with the cascade (sharing the same loaded heavy
+model) — and the script reports decision parity, confidence drift,
+detection time and how many frames were escalated.
+
+Usage:
+    python scripts/evaluate_cascade.py --videos clips/*.mp4
+    python scripts/evaluate_cascade.py --videos a.mp4 b.mp4 --light yolo11n.pt
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.ml.models.yolo_detector import YOLODetector
+from app.ml.models.cascade_detector import CascadeDetector
+from app.ml.models.lstm_model import LSTMDetector
+from app.ml.pipeline.frame_extractor import FrameExtractor
+from app.services.confidence_service import TemporalConfidenceAggregator
+from app.services.inference_service import _analyze_clip
+
+
+class _TimedDetector:
+    """Wrap a detector and accumulate time spent in detection."""
+
+    def __init__(self, detector):
+        self.detector = detector
+        self.seconds = 0.0
+
+    def detect(self, frame, conf_threshold=0.25):
+        started = time.time()
+        try:
+            return self.detector.detect(frame, conf_threshold)
+        finally:
+            self.seconds += time.time() - started
+
+
+def _run(video_path, detector, lstm):
+    aggregator = TemporalConfidenceAggregator(
+        window_size=settings.CONFIDENCE_WINDOW_SIZE,
+        spike_threshold=0.3,
+        consistency_threshold=0.65,
+    )
+    timed = _TimedDetector(detector)
+    analysis = _analyze_clip(video_path, FrameExtractor(), timed, lstm, aggregator, time.time())
+    return analysis, timed.seconds
+
+
+def evaluate(videos, light_path):
+    heavy = YOLODetector()
+    light = YOLODetector(light_path, fallback_weights='yolo11n.pt')
+    lstm = LSTMDetector(settings.LSTM_MODEL_PATH)
+    heavy.load_model()
+    light.load_model()
+
+    rows = []
+    for video in videos:
+        base, base_s = _run(video, heavy, lstm)
+        cascade = CascadeDetector(light=light, heavy=heavy)
+        casc, casc_s = _run(video, cascade, lstm)
+        rows.append({
+            'video': Path(video).name,
+            'base_accident': base['is_accident'],
+            'casc_accident': casc['is_accident'],
+            'conf_delta': abs(base['raw_confidence'] - casc['raw_confidence']),
+            'base_s': base_s,
+            'casc_s': casc_s,
+            'escalated': cascade.escalation_rate,
+        })
+        r = rows[-1]
+        print(
+            f"{r['video']:<32} baseline={'ACC' if r['base_accident'] else 'ok ':<3} "
+            f"cascade={'ACC' if r['casc_accident'] else 'ok ':<3} "
+            f"Δconf={r['conf_delta']:.3f}  det {r['base_s']:.2f}s → {r['casc_s']:.2f}s  "
+            f"escalated {r['escalated']:.0%}"
+        )
+
+    if not rows:
+        print("No videos given")
+        return
+
+    agree = sum(r['base_accident'] == r['casc_accident'] for r in rows)
+    base_total = sum(r['base_s'] for r in rows)
+    casc_total = sum(r['casc_s'] for r in rows)
+    print("\n" + "=" * 70)
+    print(f"Decision parity:   {agree}/{len(rows)} ({agree / len(rows):.0%})")
+    print(f"Max Δconfidence:   {max(r['conf_delta'] for r in rows):.3f}")
+    print(f"Detection time:    {base_total:.2f}s → {casc_total:.2f}s "
+          f"({base_total / max(casc_total, 1e-9):.2f}x)")
+    print(f"Mean escalation:   {sum(r['escalated'] for r in rows) / len(rows):.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare detector cascade with single-model baseline")
+    parser.add_argument('--videos', nargs='+', required=True, help='Video files to evaluate')
+    parser.add_argument('--light', default=settings.CASCADE_LIGHT_MODEL_PATH, help='Screening model weights')
+    args = parser.parse_args()
+    evaluate(args.videos, args.light)
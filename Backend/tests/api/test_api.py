@@ -86,6 +86,7 @@ class TestUploadEndpoint:
         data = response.json()
         assert "video_id" in data
         assert data["filename"] == "test.mp4"
+        assert data["size"] == len(b"fake video content")
 
 
 class TestAnalyzeEndpoint:
@@ -96,9 +97,529 @@ class TestAnalyzeEndpoint:
         )
         assert response.status_code == 404
 
+    def test_range_in_seconds_and_frames_rejected(self, client):
+        response = client.post(
+            "/api/analyze",
+            json={"video_id": "v1", "start_seconds": 5, "end_frame": 300}
+        )
+        assert response.status_code == 422
+
+    def test_inverted_range_rejected(self, client):
+        response = client.post(
+            "/api/analyze",
+            json={"video_id": "v1", "start_seconds": 20, "end_seconds": 10}
+        )
+        assert response.status_code == 422
+
+    def test_unknown_profile_rejected(self, client):
+        from app.db import crud
+        db = TestSessionLocal()
+        crud.create_video(db=db, video_id="v1", filename="a.mp4", filepath="a.mp4", size=1)
+        db.close()
+        response = client.post("/api/analyze", json={"video_id": "v1", "profile": "turbo"})
+        assert response.status_code == 400
+        assert "balanced" in response.json()["detail"]
+
+
+class TestROIEndpoints:
+    ROAD = [[[0.0, 0.5], [1.0, 0.5], [1.0, 1.0], [0.0, 1.0]]]
+
+    def test_create_list_delete(self, client):
+        response = client.post(
+            "/api/rois", json={"source": "cam-1", "name": "road", "polygons": self.ROAD}
+        )
+        assert response.status_code == 200
+        roi_id = response.json()["id"]
+
+        listed = client.get("/api/rois", params={"source": "cam-1"}).json()
+        assert [r["id"] for r in listed] == [roi_id]
+        assert client.get("/api/rois", params={"source": "cam-2"}).json() == []
+
+        assert client.delete(f"/api/rois/{roi_id}").status_code == 200
+        assert client.get(f"/api/rois/{roi_id}").status_code == 404
+
+    def test_invalid_polygon_rejected(self, client):
+        response = client.post(
+            "/api/rois", json={"source": "cam-1", "name": "bad", "polygons": [[[0, 0], [2, 2], [0, 1]]]}
+        )
+        assert response.status_code == 422
+
+    def test_analyze_with_unknown_roi(self, client):
+        from io import BytesIO
+        upload = client.post(
+            "/api/upload", files={"video": ("test.mp4", BytesIO(b"fake"), "video/mp4")}
+        ).json()
+        response = client.post(
+            "/api/analyze", json={"video_id": upload["video_id"], "roi_id": "missing"}
+        )
+        assert response.status_code == 404
+
 
 class TestExplanationEndpoint:
     def test_explanation_nonexistent_result(self, client):
         response = client.get("/api/explanation/nonexistent-id")
         # 404 if result not found; 500 if groq_service can't initialise
         assert response.status_code in (404, 500)
+
+
+class TestStreamEndpoints:
+    def test_list_streams(self, client):
+        response = client.get("/api/streams")
+        assert response.status_code == 200
+        assert isinstance(response.json(), list)
+
+    def test_stop_unknown_stream(self, client):
+        response = client.delete("/api/streams/nonexistent-id")
+        assert response.status_code == 404
+
+    def test_scheduler_stats(self, client):
+        response = client.get("/api/streams/scheduler")
+        assert response.status_code == 200
+        assert "detector_fps" in response.json()
+
+
+class TestEvidenceEndpoints:
+    @pytest.fixture
+    def evidence_dirs(self, tmp_path):
+        from app.services.frame_service import accident_frame_service
+        with patch.object(accident_frame_service, "frames_dir", tmp_path / "frames"), \
+             patch.object(accident_frame_service, "clips_dir", tmp_path / "clips"):
+            (tmp_path / "frames" / "stream-1").mkdir(parents=True)
+            (tmp_path / "clips").mkdir()
+            yield tmp_path
+
+    def test_serves_existing_frame(self, client, evidence_dirs):
+        (evidence_dirs / "frames" / "stream-1" / "frame_0003.webp").write_bytes(b"webp")
+        response = client.get("/frames/stream-1/frame_0003.webp")
+        assert response.status_code == 200
+        assert response.content == b"webp"
+        assert response.headers["content-type"] == "image/webp"
+        assert "max-age" in response.headers["cache-control"]
+
+        revalidated = client.get(
+            "/frames/stream-1/frame_0003.webp", headers={"If-None-Match": response.headers["etag"]}
+        )
+        assert revalidated.status_code == 304
+
+    def test_clip_range_request(self, client, evidence_dirs):
+        (evidence_dirs / "clips" / "stream-1_accident.mp4").write_bytes(bytes(range(100)))
+        response = client.get("/clips/stream-1_accident.mp4", headers={"Range": "bytes=10-19"})
+        assert response.status_code == 206
+        assert response.content == bytes(range(10, 20))
+        assert response.headers["content-range"] == "bytes 10-19/100"
+        assert response.headers["accept-ranges"] == "bytes"
+
+    def test_clip_open_and_suffix_ranges(self, client, evidence_dirs):
+        (evidence_dirs / "clips" / "stream-1_accident.mp4").write_bytes(bytes(range(100)))
+        tail = client.get("/clips/stream-1_accident.mp4", headers={"Range": "bytes=90-"})
+        assert tail.status_code == 206
+        assert tail.content == bytes(range(90, 100))
+        suffix = client.get("/clips/stream-1_accident.mp4", headers={"Range": "bytes=-5"})
+        assert suffix.headers["content-range"] == "bytes 95-99/100"
+        assert suffix.content == bytes(range(95, 100))
+
+    def test_unsatisfiable_range(self, client, evidence_dirs):
+        (evidence_dirs / "clips" / "stream-1_accident.mp4").write_bytes(bytes(range(100)))
+        response = client.get("/clips/stream-1_accident.mp4", headers={"Range": "bytes=100-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == "bytes */100"
+
+    def test_stale_if_range_serves_whole_file(self, client, evidence_dirs):
+        (evidence_dirs / "clips" / "stream-1_accident.mp4").write_bytes(bytes(range(100)))
+        response = client.get(
+            "/clips/stream-1_accident.mp4", headers={"Range": "bytes=10-19", "If-Range": '"stale"'}
+        )
+        assert response.status_code == 200
+        assert len(response.content) == 100
+
+    def test_missing_evidence(self, client, evidence_dirs):
+        assert client.get("/frames/stream-1/frame_0004.jpg").status_code == 404
+        assert client.get("/clips/unknown_accident.mp4").status_code == 404
+        assert client.get("/clips/notaclip.txt").status_code == 404
+
+
+class TestChunkedUpload:
+    PAYLOAD = bytes(range(256)) * 40
+
+    @pytest.fixture
+    def uploads(self, tmp_path):
+        from app.services.upload_service import chunked_uploads
+        with patch.object(chunked_uploads, "_upload_dir", str(tmp_path)), \
+             patch.object(chunked_uploads, "_sessions", {}):
+            yield tmp_path
+
+    def _init(self, client, **extra):
+        body = {"filename": "dashcam.mp4", "size": len(self.PAYLOAD), **extra}
+        return client.post("/api/uploads", json=body)
+
+    def test_chunks_resume_and_complete(self, client, uploads):
+        import hashlib
+        init = self._init(client, sha256=hashlib.sha256(self.PAYLOAD).hexdigest())
+        assert init.status_code == 201
+        upload_id = init.json()["upload_id"]
+
+        assert client.put(f"/api/uploads/{upload_id}?offset=0", content=self.PAYLOAD[:4000]).json()["offset"] == 4000
+        # A retried / out-of-order chunk is told where to resume
+        stale = client.put(f"/api/uploads/{upload_id}?offset=0", content=self.PAYLOAD[:4000])
+        assert stale.status_code == 409
+        assert stale.json()["offset"] == client.get(f"/api/uploads/{upload_id}").json()["offset"] == 4000
+
+        done = client.put(f"/api/uploads/{upload_id}?offset=4000", content=self.PAYLOAD[4000:])
+        assert done.json()["complete"] is True
+        response = client.post(f"/api/uploads/{upload_id}/complete")
+        assert response.status_code == 200
+        assert response.json()["video_id"] == upload_id
+        assert (uploads / f"{upload_id}.mp4").read_bytes() == self.PAYLOAD
+        assert not list((uploads / ".partial").iterdir())
+
+    def test_oversize_rejected_early(self, client, uploads):
+        from app.core.config import settings
+        assert self._init(client, size=settings.MAX_UPLOAD_SIZE + 1).status_code == 413
+
+        upload_id = self._init(client).json()["upload_id"]
+        response = client.put(f"/api/uploads/{upload_id}?offset=0", content=self.PAYLOAD + b"extra")
+        assert response.status_code == 413
+        assert client.get(f"/api/uploads/{upload_id}").json()["offset"] == 0
+
+    def test_incomplete_or_corrupt_upload_not_registered(self, client, uploads):
+        upload_id = self._init(client, sha256="0" * 64).json()["upload_id"]
+        client.put(f"/api/uploads/{upload_id}?offset=0", content=self.PAYLOAD[:100])
+        assert client.post(f"/api/uploads/{upload_id}/complete").status_code == 400
+
+        client.put(f"/api/uploads/{upload_id}?offset=100", content=self.PAYLOAD[100:])
+        response = client.post(f"/api/uploads/{upload_id}/complete")
+        assert response.status_code == 400
+        assert "Checksum" in response.json()["detail"]
+        assert client.get(f"/api/uploads/{upload_id}").status_code == 404
+
+    def test_invalid_extension_and_abort(self, client, uploads):
+        assert self._init(client, filename="notes.txt").status_code == 400
+        upload_id = self._init(client).json()["upload_id"]
+        assert client.delete(f"/api/uploads/{upload_id}").status_code == 200
+        assert client.delete(f"/api/uploads/{upload_id}").status_code == 404
+
+
+class TestUploadAndAnalyze:
+    RESULT = {
+        "id": "result-x", "status": "no_accident", "confidence": 12,
+        "timestamp": "2024-01-01T00:00:00", "details": {}, "inference_time": 1.0,
+    }
+
+    @pytest.fixture
+    def uploads(self, tmp_path):
+        from app.services.upload_service import chunked_uploads
+        with patch.object(chunked_uploads, "_upload_dir", str(tmp_path)), \
+             patch.object(chunked_uploads, "_sessions", {}), \
+             patch("app.services.profile_service.create_detector", MagicMock()):
+            yield tmp_path
+
+    def test_streams_upload_then_analyzes(self, client, uploads):
+        from app.ml.models.memo_detector import MemoDetector
+        analyze = AsyncMock(return_value=dict(self.RESULT))
+        with patch("app.services.analysis_service.analyze_video_file", analyze):
+            response = client.post("/api/analyze/upload?filename=dash.mkv", content=b"v" * 3000)
+
+        assert response.status_code == 200
+        assert response.json()["id"] == "result-x"
+        video_id = analyze.call_args[0][0]
+        assert (uploads / f"{video_id}.mkv").read_bytes() == b"v" * 3000
+        assert isinstance(analyze.call_args.kwargs["detector"], MemoDetector)
+
+    def test_short_body_is_discarded(self, client, uploads):
+        analyze = AsyncMock(return_value=dict(self.RESULT))
+        with patch("app.services.analysis_service.analyze_video_file", analyze):
+            response = client.post("/api/analyze/upload?filename=dash.mp4&size=5000", content=b"v" * 3000)
+
+        assert response.status_code == 400
+        assert not analyze.called
+        assert not list((uploads / ".partial").iterdir())
+
+    def test_unexpected_error_discards_upload(self, client, uploads):
+        from app.services.upload_service import chunked_uploads
+        with patch("app.services.profile_service.create_detector", side_effect=RuntimeError("no model")):
+            with pytest.raises(RuntimeError):
+                client.post("/api/analyze/upload?filename=dash.mp4", content=b"v" * 3000)
+
+        assert not chunked_uploads._sessions
+        assert not list((uploads / ".partial").iterdir())
+
+    def test_rejected_before_upload(self, client, uploads):
+        from app.core.config import settings
+        too_big = settings.MAX_UPLOAD_SIZE + 1
+        assert client.post(f"/api/analyze/upload?filename=a.mp4&size={too_big}", content=b"v").status_code == 413
+        assert client.post("/api/analyze/upload?filename=a.txt", content=b"v").status_code == 400
+
+
+class TestEventTimes:
+    RESULT = {
+        "id": "result-ev", "status": "accident", "confidence": 80, "timestamp": "2024-01-01T00:00:00",
+        "details": {"eventFrames": [[10, 20]]}, "inference_time": 1.0,
+    }
+
+    def _analyze(self, client, **body):
+        from app.db import crud
+        db = TestSessionLocal()
+        crud.create_video(db=db, video_id="v-ev", filename="a.mp4", filepath="a.mp4", size=1)
+        db.close()
+        with patch("app.services.inference_service._analyze_video_file", return_value=dict(self.RESULT)):
+            response = client.post("/api/analyze", json={"video_id": "v-ev", **body})
+        assert response.status_code == 200
+        db = TestSessionLocal()
+        try:
+            return [(e.start_time, e.end_time) for e in crud.get_accident_events_by_video(db, "v-ev")]
+        finally:
+            db.close()
+
+    def test_times_use_the_profile_rate(self, client):
+        # "fast" samples at 5 fps: sample 10 is 2 s into the video
+        assert self._analyze(client, profile="fast") == [(2.0, 4.0)]
+
+    def test_times_use_the_downgraded_rate(self, client):
+        from app.services.quality_service import TIERS
+        # Planned down to "minimal" (5 fps) to meet the latency budget
+        plan = {"tier": TIERS[-1].name}
+        with patch("app.services.inference_service._plan_quality", return_value=(TIERS[-1], plan)):
+            assert self._analyze(client, latency_budget=1.0) == [(2.0, 4.0)]
+
+    def test_times_use_the_real_sampling_rate(self, client, tmp_path):
+        import cv2
+        import numpy as np
+        from app.services import inference_service
+        # 25 fps sampled every 2nd frame (TARGET_FPS 10) is 12.5 samples/s, not 10
+        path = tmp_path / "v-ev.mp4"
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), 25.0, (160, 120))
+        for i in range(100):
+            writer.write(np.full((120, 160, 3), i, dtype=np.uint8))
+        writer.release()
+        detector = MagicMock()
+        detector.detect.return_value = []
+        detector.detect_batch.side_effect = lambda frames, conf_threshold=0.25: [[] for _ in frames]
+        real_clip = inference_service._analyze_clip
+
+        def clip_with_event(*args, **kwargs):
+            analysis = real_clip(*args, **kwargs)
+            analysis['aggregation_result']['event_frames'] = [(25, 50)]
+            return analysis
+
+        with patch.object(inference_service, "get_video_path", lambda video_id: path), \
+             patch.object(inference_service, "LSTMDetector", MagicMock()), \
+             patch.object(inference_service, "_analyze_clip", clip_with_event), \
+             patch("app.services.profile_service.create_detector", return_value=detector):
+            from app.db import crud
+            db = TestSessionLocal()
+            crud.create_video(db=db, video_id="v-ev", filename="a.mp4", filepath=str(path), size=1)
+            db.close()
+            response = client.post("/api/analyze", json={"video_id": "v-ev"})
+
+        assert response.status_code == 200
+        assert response.json()["details"]["sampleFps"] == 12.5
+        db = TestSessionLocal()
+        try:
+            events = crud.get_accident_events_by_video(db, "v-ev")
+            assert [(e.start_time, e.end_time) for e in events] == [(2.0, 4.0)]
+        finally:
+            db.close()
+
+
+class TestAnalysisProgressStream:
+    RESULT = TestUploadAndAnalyze.RESULT
+
+    @pytest.fixture(autouse=True)
+    def fast_polling(self):
+        from app.core.config import settings
+        with patch.object(settings, "PROGRESS_POLL_INTERVAL", 0.01), \
+             patch.object(settings, "PROGRESS_WAIT_START", 0.05):
+            yield
+
+    @staticmethod
+    def _events(response):
+        return [
+            block.split("\n")[0].removeprefix("event: ")
+            for block in response.text.split("\n\n") if block.startswith("event:")
+        ]
+
+    def _video(self):
+        from app.db import crud
+        db = TestSessionLocal()
+        crud.create_video(db=db, video_id="v-progress", filename="a.mp4", filepath="a.mp4", size=1)
+        db.close()
+
+    def test_unknown_video(self, client):
+        assert client.get("/api/analyze/missing/progress").status_code == 404
+
+    def test_idle_when_no_analysis_starts(self, client):
+        self._video()
+        response = client.get("/api/analyze/v-progress/progress")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert self._events(response) == ["idle"]
+
+    def test_analysis_reports_stages_then_completes(self, client):
+        import json
+        self._video()
+        stages = []
+
+        async def analyze(video_id, db, progress=None, **options):
+            progress.stage("detect", total=2)
+            progress.advance(2)
+            stages.append(progress.snapshot()["stage"])
+            return dict(self.RESULT)
+
+        with patch("app.services.analysis_service.analyze_video_file", analyze):
+            assert client.post("/api/analyze", json={"video_id": "v-progress"}).status_code == 200
+
+        assert stages == ["detect"]
+        response = client.get("/api/analyze/v-progress/progress")
+        assert self._events(response) == ["completed"]
+        data = json.loads(response.text.split("data: ")[1])
+        assert data["resultId"] == "result-x"
+        assert data["stage"] == "persist"
+
+    def test_failed_analysis(self, client):
+        self._video()
+        analyze = AsyncMock(side_effect=RuntimeError("Analysis failed: decoder"))
+        with patch("app.services.analysis_service.analyze_video_file", analyze):
+            assert client.post("/api/analyze", json={"video_id": "v-progress"}).status_code == 500
+
+        response = client.get("/api/analyze/v-progress/progress")
+        assert self._events(response) == ["failed"]
+        assert "decoder" in response.text
+
+
+class TestJobs:
+    @pytest.fixture
+    def tracker(self):
+        from app.services.progress_service import ProgressTracker
+        tracker = ProgressTracker(retention=60)
+        with patch("app.api.v1.routes.jobs.progress_tracker", tracker), \
+             patch("app.api.v1.routes.video.progress_tracker", tracker), \
+             patch("app.services.flight_service.progress_tracker", tracker):
+            yield tracker
+
+    def test_list_and_get(self, client, tracker):
+        tracker.start("v1").stage("detect", total=10)
+        jobs = client.get("/api/jobs").json()
+        assert jobs["count"] == 1
+        assert jobs["jobs"][0]["videoId"] == "v1"
+        assert client.get("/api/jobs/v1").json()["stage"] == "detect"
+        assert client.get("/api/jobs/v2").status_code == 404
+
+    def test_cancel_running_job(self, client, tracker):
+        run = tracker.start("v1")
+        response = client.delete("/api/jobs/v1")
+        assert response.status_code == 202
+        assert response.json()["cancelRequested"] is True
+        assert run.cancelled
+
+        run.fail("Cancelled by request")
+        assert client.delete("/api/jobs/v1").status_code == 409
+        assert client.delete("/api/jobs/v2").status_code == 404
+
+    def test_cancelled_analysis_returns_409(self, client, tracker):
+        from app.db import crud
+        from app.services.progress_service import AnalysisCancelled
+        db = TestSessionLocal()
+        crud.create_video(db=db, video_id="v-cancel", filename="a.mp4", filepath="a.mp4", size=1)
+
+        async def analyze(video_id, db, progress=None, **options):
+            # Cancelled (e.g. by DELETE /jobs) while the analysis runs
+            assert tracker.cancel(video_id, "Cancelled by request")
+            progress.check()
+
+        with patch("app.services.analysis_service.analyze_video_file", analyze):
+            response = client.post("/api/analyze", json={"video_id": "v-cancel"})
+        assert response.status_code == 409
+        assert tracker.get("v-cancel").status == "cancelled"
+        db.expire_all()
+        assert crud.get_video(db, "v-cancel").status == "cancelled"
+        db.close()
+
+
+class TestBulkAnalysis:
+    RESULT = TestUploadAndAnalyze.RESULT
+
+    @pytest.fixture
+    def bulk_client(self):
+        """Client whose event loop outlives requests, so the background job can run."""
+        from app.core.config import settings
+        from app.services.bulk_service import BulkTracker
+        with patch("app.api.v1.routes.bulk.SessionLocal", TestSessionLocal), \
+             patch("app.api.v1.routes.bulk.bulk_jobs", BulkTracker()), \
+             patch("app.services.profile_service.create_detector", MagicMock()), \
+             patch("app.services.bulk_service.get_shared_lstm", MagicMock()), \
+             patch.object(settings, "PROGRESS_POLL_INTERVAL", 0.01), \
+             TestClient(app) as client:
+            yield client
+
+    def _videos(self, *video_ids, status="pending"):
+        from app.db import crud
+        db = TestSessionLocal()
+        for video_id in video_ids:
+            crud.create_video(db=db, video_id=video_id, filename="a.mp4", filepath="a.mp4", size=1)
+            crud.update_video_status(db, video_id, status)
+        db.close()
+
+    def _wait(self, client, batch_id):
+        import time
+        for _ in range(200):
+            job = client.get(f"/api/analyze/bulk/{batch_id}").json()
+            if job["status"] not in ("queued", "running"):
+                return job
+            time.sleep(0.01)
+        raise AssertionError("bulk job did not finish")
+
+    def test_selection_is_validated(self, bulk_client):
+        self._videos("v1")
+        assert bulk_client.post("/api/analyze/bulk", json={}).status_code == 422
+        assert bulk_client.post("/api/analyze/bulk", json={"video_ids": ["v1"], "status": "pending"}).status_code == 422
+        assert bulk_client.post("/api/analyze/bulk", json={"video_ids": ["v1", "nope"]}).status_code == 404
+        assert bulk_client.post("/api/analyze/bulk", json={"status": "failed"}).status_code == 404
+        assert bulk_client.post("/api/analyze/bulk", json={"video_ids": ["v1"], "profile": "x"}).status_code == 400
+        assert bulk_client.get("/api/analyze/bulk/missing").status_code == 404
+
+    def test_pending_videos_analysed_and_streamed(self, bulk_client):
+        import json
+        self._videos("p1", "p2")
+        self._videos("done", status="completed")
+        shared = []
+
+        async def analyze(video_id, db, progress=None, detector=None, lstm_detector=None, executor=None, **options):
+            shared.append((detector, lstm_detector, executor))
+            return dict(self.RESULT, id=f"result-{video_id}")
+
+        with patch("app.services.analysis_service.analyze_video_file", analyze):
+            response = bulk_client.post("/api/analyze/bulk", json={"status": "pending", "profile": "fast"})
+            assert response.status_code == 202
+            batch_id = response.json()["batchId"]
+            job = self._wait(bulk_client, batch_id)
+
+        assert job["status"] == "completed" and job["profile"] == "fast"
+        assert (job["total"], job["completed"], job["failed"]) == (2, 2, 0)
+        assert {r["resultId"] for r in job["results"]} == {"result-p1", "result-p2"}
+        assert len(set(map(lambda s: tuple(map(id, s)), shared))) == 1 and shared[0][0] is not None
+
+        events = bulk_client.get(f"/api/analyze/bulk/{batch_id}/events").text.split("\n\n")
+        names = [block.split("\n")[0].removeprefix("event: ") for block in events if block.startswith("event:")]
+        assert names == ["result", "result", "completed"]
+        first = json.loads(events[0].split("data: ")[1])
+        assert first["result"]["id"] == first["resultId"]
+
+    def test_failed_video_does_not_stop_the_job(self, bulk_client):
+        from app.db import crud
+        self._videos("good", "bad")
+
+        async def analyze(video_id, db, **options):
+            if video_id == "bad":
+                raise FileNotFoundError(video_id)
+            return dict(self.RESULT, id=f"result-{video_id}")
+
+        with patch("app.services.analysis_service.analyze_video_file", analyze):
+            batch_id = bulk_client.post("/api/analyze/bulk", json={"video_ids": ["good", "bad"]}).json()["batchId"]
+            job = self._wait(bulk_client, batch_id)
+
+        assert (job["completed"], job["failed"]) == (1, 1)
+        assert [r["error"] for r in job["results"] if r["status"] == "failed"] == ["Video file not found on disk"]
+        db = TestSessionLocal()
+        assert crud.get_video(db, "bad").status == "failed"
+        db.close()
+        assert bulk_client.delete(f"/api/analyze/bulk/{batch_id}").status_code == 409
@@ -0,0 +1,75 @@
+"""Tests for the cross-caller batching detector wrapper"""
+import threading
+import time
+import numpy as np
+import pytest
+from app.ml.models.batching_detector import BatchingDetector
+
+
+class _SlowDetector:
+    """Labels each frame with its fill value; every call takes a moment."""
+
+    def __init__(self, delay=0.05, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = []
+
+    def detect_batch(self, frames, conf_threshold=0.25):
+        self.calls.append((len(frames), conf_threshold))
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [[{'class_name': 'car', 'value': int(f[0, 0, 0])}] for f in frames]
+
+
+def _frame(value):
+    return np.full((4, 4, 3), value, dtype=np.uint8)
+
+
+def _concurrently(fn, args):
+    results, threads = [None] * len(args), []
+    for i, arg in enumerate(args):
+        threads.append(threading.Thread(target=lambda i=i, arg=arg: results.__setitem__(i, fn(*arg))))
+        threads[-1].start()
+        time.sleep(0.005)
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestBatchingDetector:
+    def test_concurrent_calls_share_a_batch(self):
+        inner = _SlowDetector()
+        detector = BatchingDetector(inner, max_batch=32)
+        results = _concurrently(
+            lambda frames: detector.detect_batch(frames),
+            [([_frame(i), _frame(i + 100)],) for i in range(5)],
+        )
+        # Each caller gets its own frames back, in order
+        assert [[dets[0]['value'] for dets in r] for r in results] == [[i, i + 100] for i in range(5)]
+        # The first call ran alone; the others queued behind it and ran together
+        assert len(inner.calls) < 5
+        stats = detector.stats()
+        assert stats["framesDetected"] == 10 and stats["avgBatchSize"] > 2
+
+    def test_max_batch_and_thresholds_split_batches(self):
+        inner = _SlowDetector()
+        detector = BatchingDetector(inner, max_batch=2)
+        _concurrently(
+            lambda value, conf: detector.detect(_frame(value), conf),
+            [(0, 0.25), (1, 0.25), (2, 0.25), (3, 0.5), (4, 0.25)],
+        )
+        assert all(size <= 2 for size, _ in inner.calls)
+        assert sum(size for size, conf in inner.calls if conf == 0.5) == 1
+        assert sum(size for size, _ in inner.calls) == 5
+
+    def test_errors_reach_every_caller_in_the_batch(self):
+        detector = BatchingDetector(_SlowDetector(error=RuntimeError("CUDA out of memory")))
+
+        def detect(value):
+            with pytest.raises(RuntimeError, match="out of memory"):
+                detector.detect(_frame(value))
+            return True
+
+        assert _concurrently(detect, [(i,) for i in range(3)]) == [True] * 3
+        assert detector.stats()["batches"] == 0
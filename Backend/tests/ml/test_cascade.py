@@ -0,0 +1,99 @@
+"""Tests for the light/heavy detector cascade"""
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+from app.ml.models.cascade_detector import CascadeDetector, create_detector
+from app.ml.models.yolo_detector import YOLODetector
+
+
+def _car(x1, y1, x2, y2, conf=0.6):
+    return {'bbox': [x1, y1, x2, y2], 'confidence': conf, 'class_id': 2, 'class_name': 'car'}
+
+
+def _fake(per_frame):
+    """Detector whose detect_batch returns ``per_frame(i)`` for the i-th frame seen."""
+    seen = {'n': 0}
+    detector = MagicMock()
+
+    def detect_batch(frames, conf_threshold=0.25):
+        out = []
+        for _ in frames:
+            out.append(per_frame(seen['n']))
+            seen['n'] += 1
+        return out
+
+    detector.detect_batch.side_effect = detect_batch
+    return detector
+
+
+@pytest.fixture
+def frames():
+    return [np.zeros((480, 640, 3), dtype=np.uint8) for _ in range(4)]
+
+
+class TestEscalation:
+    def test_quiet_frames_stay_on_light_model(self, frames):
+        light = _fake(lambda i: [_car(0, 0, 50, 50), _car(300, 300, 350, 350)])
+        heavy = _fake(lambda i: [])
+        cascade = CascadeDetector(light=light, heavy=heavy, physics_threshold=0.15)
+
+        dets = cascade.detect_batch(frames)
+        assert heavy.detect_batch.call_count == 0
+        assert all(len(d) == 2 for d in dets)
+        assert cascade.frames_screened == 4
+        assert cascade.escalation_rate == 0.0
+
+    def test_overlapping_vehicles_escalate(self, frames):
+        light = _fake(lambda i: [_car(0, 0, 100, 100), _car(50, 0, 150, 100)] if i == 2 else [])
+        heavy = _fake(lambda i: [_car(0, 0, 100, 100, 0.95), _car(60, 0, 160, 100, 0.95)])
+        cascade = CascadeDetector(light=light, heavy=heavy)
+
+        dets = cascade.detect_batch(frames)
+        heavy.detect_batch.assert_called_once()
+        assert len(heavy.detect_batch.call_args[0][0]) == 1
+        assert dets[2][0]['confidence'] == 0.95
+        assert dets[0] == []
+        assert cascade.frames_escalated == 1
+
+    def test_sudden_motion_escalates(self, frames):
+        # One tracked car lurches 60px (7.5% of the diagonal) between screened frames
+        light = _fake(lambda i: [_car(0, 0, 50, 50)] if i < 2 else [_car(60, 0, 110, 50)])
+        heavy = _fake(lambda i: [_car(60, 0, 110, 50, 0.9)])
+        cascade = CascadeDetector(light=light, heavy=heavy, physics_threshold=0.15)
+
+        cascade.detect_batch(frames)
+        assert cascade.frames_escalated == 1
+
+    def test_motion_history_is_per_thread(self, frames):
+        import threading
+        # Two callers each see a steady car, a lurch apart from each other
+        light = MagicMock()
+        light.detect_batch.side_effect = lambda fs, conf_threshold=0.25: [
+            [_car(0, 0, 50, 50)] if threading.current_thread().name == "left" else [_car(60, 0, 110, 50)]
+            for _ in fs
+        ]
+        cascade = CascadeDetector(light=light, heavy=_fake(lambda i: []), physics_threshold=0.15)
+        lock = threading.Lock()
+
+        def feed():
+            for frame in frames:
+                with lock:
+                    cascade.detect_batch([frame])
+
+        threads = [threading.Thread(target=feed, name=name) for name in ("left", "right")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert cascade.frames_screened == 8
+        assert cascade.frames_escalated == 0
+
+    def test_detect_single_frame(self, frames):
+        cascade = CascadeDetector(light=_fake(lambda i: []), heavy=_fake(lambda i: []))
+        assert cascade.detect(frames[0]) == []
+        assert cascade.stats()["frames_screened"] == 1
+
+
+class TestFactory:
+    def test_single_model_by_default(self):
+        assert isinstance(create_detector(), YOLODetector)
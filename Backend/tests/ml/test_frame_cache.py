@@ -0,0 +1,74 @@
+"""Tests for the memory-mapped decoded-frame cache"""
+import os
+import time
+import cv2
+import numpy as np
+import pytest
+from app.ml.pipeline.frame_cache import FrameCache
+from app.ml.pipeline.frame_extractor import FrameExtractor
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    path = tmp_path / "vid-1.mp4"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), 30.0, (160, 120))
+    for i in range(60):
+        writer.write(np.full((120, 160, 3), (i * 8) % 256, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def _frames(n, value=0):
+    return [np.full((12, 16, 3), value + i, dtype=np.uint8) for i in range(n)]
+
+
+class TestFrameCache:
+    def test_roundtrip_is_read_only(self, tmp_path):
+        cache = FrameCache(tmp_path / "cache", max_bytes=10 * 1024 * 1024)
+        assert cache.get("vid__a") is None
+        assert cache.put("vid__a", _frames(5))
+        frames = cache.get("vid__a")
+        assert len(frames) == 5
+        assert frames[3][0, 0, 0] == 3
+        assert not frames[0].flags.writeable
+        assert cache.stats()["hits"] == 1
+
+    def test_lru_eviction(self, tmp_path):
+        entry = 5 * 12 * 16 * 3
+        cache = FrameCache(tmp_path / "cache", max_bytes=int(entry * 2.5))
+        cache.put("v1__a", _frames(5))
+        cache.put("v2__a", _frames(5))
+        old = time.time() - 100
+        os.utime(cache._path("v1__a"), (old, old))
+        os.utime(cache._path("v2__a"), (old + 1, old + 1))
+        cache.get("v1__a")                 # v1 becomes most recent
+        cache.put("v3__a", _frames(5))
+        remaining = {p.stem for p in cache.entries()}
+        assert remaining == {"v1__a", "v3__a"}
+
+    def test_evict_video(self, tmp_path):
+        cache = FrameCache(tmp_path / "cache", max_bytes=10 * 1024 * 1024)
+        cache.put("v1__a", _frames(2))
+        cache.put("v1__b", _frames(2))
+        cache.put("v2__a", _frames(2))
+        assert cache.evict_video("v1") > 0
+        assert [p.stem for p in cache.entries()] == ["v2__a"]
+
+    def test_key_depends_on_params(self, video_file):
+        assert FrameCache.key(video_file, 10, 150) != FrameCache.key(video_file, 5, 150)
+        assert FrameCache.key(video_file, 10, 150).startswith("vid-1__")
+
+
+class TestCachedExtraction:
+    def test_second_extraction_hits_cache(self, tmp_path, video_file):
+        cache = FrameCache(tmp_path / "cache", max_bytes=50 * 1024 * 1024)
+        extractor = FrameExtractor(target_fps=10, cache=cache)
+        first = extractor.extract_frames(video_file, start_frame=3)
+        second = extractor.extract_frames(video_file, start_frame=3)
+        assert cache.stats()["entries"] == 1
+        assert cache.hits == 1
+        assert len(first) == len(second)
+        assert all(np.array_equal(a, b) for a, b in zip(first, second))
+        # A different range is a different entry
+        extractor.extract_frames(video_file, start_frame=30)
+        assert cache.stats()["entries"] == 2
@@ -161,3 +161,51 @@ class TestGetVideoInfo:
         extractor = FrameExtractor()
         with pytest.raises(ValueError, match="Cannot open"):
             extractor.get_video_info(Path("bad.mp4"))
+
+
+def _write_video(path, n_frames=90, fps=30.0):
+    """Sample k (raw frame 3k) is a flat image of brightness 8k — robust to encoding."""
+    import cv2
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), fps, (64, 48))
+    for i in range(n_frames):
+        writer.write(np.full((48, 64, 3), 8 * (i // 3), dtype=np.uint8))
+    writer.release()
+    return path
+
+
+class TestIterFrames:
+    def test_seek_matches_sequential_samples(self, tmp_path):
+        video = _write_video(tmp_path / "v.mp4")
+        extractor = FrameExtractor(target_fps=10)
+
+        full = [idx for idx, _ in extractor.iter_frames(video)]
+        assert full == list(range(0, 90, 3))
+
+        # Start off-grid → rounded up to the next sampled frame
+        part = list(extractor.iter_frames(video, start_frame=31, end_frame=60))
+        assert [idx for idx, _ in part] == list(range(33, 60, 3))
+        assert round(part[0][1].mean() / 8) == 11
+
+    def test_probe(self, tmp_path):
+        video = _write_video(tmp_path / "v.mp4", n_frames=91)
+        info = FrameExtractor(target_fps=10).probe(video)
+        assert info["interval"] == 3
+        assert info["sample_count"] == 31
+
+
+class TestRanges:
+    def test_extract_frames_seeks_to_range(self, tmp_path):
+        video = _write_video(tmp_path / "v.mp4")
+        frames = FrameExtractor(target_fps=10).extract_frames(video, start_frame=30, end_frame=60)
+        assert len(frames) == 10
+        assert round(frames[0].mean() / 8) == 10
+
+    def test_resolve_seconds(self, tmp_path):
+        video = _write_video(tmp_path / "v.mp4")
+        assert FrameExtractor().resolve_range(video, start_seconds=1.0) == (30, 90)
+        assert FrameExtractor().resolve_range(video, start_frame=15, end_frame=500) == (15, 90)
+
+    def test_resolve_past_end_raises(self, tmp_path):
+        video = _write_video(tmp_path / "v.mp4")
+        with pytest.raises(ValueError, match="past the end"):
+            FrameExtractor().resolve_range(video, start_seconds=10.0)
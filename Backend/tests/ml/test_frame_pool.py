@@ -0,0 +1,102 @@
+"""Tests for pooled frame buffers"""
+import time
+from unittest.mock import MagicMock, patch
+import cv2
+import numpy as np
+import pytest
+from app.ml.pipeline.frame_pool import FramePool
+from app.ml.pipeline.frame_extractor import FrameExtractor
+from app.services import inference_service
+from app.services.frame_service import _draw_annotated_frame
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    path = tmp_path / "clip.mp4"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), 30.0, (160, 120))
+    for i in range(90):
+        writer.write(np.full((120, 160, 3), (i * 8) % 256, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+class TestFramePool:
+    def test_reuses_released_block(self):
+        pool = FramePool(max_bytes=10 * 1024 * 1024)
+        block = pool.acquire((120, 160, 3), 10)
+        assert block.shape == (10, 120, 160, 3)
+        assert pool.release(list(block[:4]))
+        again = pool.acquire((120, 160, 3), 8)
+        assert again is block
+        assert pool.stats()["reuses"] == 1
+
+    def test_other_geometry_allocates(self):
+        pool = FramePool(max_bytes=10 * 1024 * 1024)
+        pool.release(pool.acquire((120, 160, 3), 10))
+        other = pool.acquire((240, 320, 3), 2)
+        assert other.shape == (2, 240, 320, 3)
+        assert pool.stats()["allocations"] == 2
+
+    def test_idle_memory_is_bounded(self):
+        block_bytes = 10 * 120 * 160 * 3
+        pool = FramePool(max_bytes=int(block_bytes * 1.5))
+        first = pool.acquire((120, 160, 3), 10)
+        second = pool.acquire((120, 160, 3), 10)
+        pool.release(first)
+        pool.release(second)
+        assert pool.stats()["idle_blocks"] == 1
+        assert pool.idle_bytes <= pool.max_bytes
+
+    def test_foreign_arrays_ignored(self):
+        pool = FramePool(max_bytes=1024)
+        assert pool.release([np.zeros((4, 4, 3), dtype=np.uint8)]) is False
+        assert pool.release([]) is False
+
+
+class TestPooledExtraction:
+    def test_frames_are_views_of_one_block(self, video_file):
+        pool = FramePool(max_bytes=50 * 1024 * 1024)
+        frames = FrameExtractor(target_fps=10, pool=pool).extract_frames(video_file)
+        assert len(frames) == 30
+        assert all(f.base is frames[0].base for f in frames)
+        assert pool.release(frames)
+
+        # Second job reuses the block instead of allocating
+        FrameExtractor(target_fps=10, pool=pool).extract_frames(video_file)
+        stats = pool.stats()
+        assert stats["allocations"] == 1
+        assert stats["reuses"] == 1
+
+    def test_same_frames_as_unpooled(self, video_file):
+        pooled = FrameExtractor(target_fps=10, pool=FramePool(max_bytes=50 * 1024 * 1024))
+        plain = FrameExtractor(target_fps=10, pool=FramePool(max_bytes=0))
+        a = pooled.extract_frames(video_file, start_frame=7, end_frame=80)
+        b = plain.extract_frames(video_file, start_frame=7, end_frame=80)
+        assert len(a) == len(b)
+        assert all(np.array_equal(x, y) for x, y in zip(a, b))
+
+
+class TestRenderCanvas:
+    def test_source_frame_untouched(self):
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        canvas = np.empty_like(frame)
+        dets = [{'bbox': [10, 10, 60, 60], 'confidence': 0.9, 'class_name': 'car'}]
+        out = _draw_annotated_frame(frame, dets, is_impact=True, frame_label="IMPACT", out=canvas)
+        assert out is canvas
+        assert frame.max() == 0
+        assert canvas.max() > 0
+
+
+class TestAnalysisReleasesFrames:
+    def test_failed_analysis_returns_block(self, video_file):
+        pool = FramePool(max_bytes=50 * 1024 * 1024)
+        detector = MagicMock()
+        detector.detect.side_effect = TimeoutError("Inference timed out during YOLO detection")
+        with patch.object(inference_service, "frame_pool", pool), \
+             patch.object(inference_service.settings, "ADAPTIVE_SAMPLING", False):
+            with pytest.raises(TimeoutError):
+                inference_service._analyze_clip(
+                    video_file, FrameExtractor(target_fps=10, pool=pool), detector, MagicMock(),
+                    MagicMock(), time.time(),
+                )
+        assert pool.stats()["idle_blocks"] == 1
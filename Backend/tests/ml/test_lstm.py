@@ -119,6 +119,22 @@ class TestLSTMDetector:
         for c in confidences:
             assert 0.0 <= c <= 1.0
 
+    def test_predict_batch_matches_single(self):
+        detector = LSTMDetector(model_path=None)
+        detector.model = AccidentLSTM().to(detector.device)
+        detector.model.eval()
+
+        features = np.random.rand(4, 30, 3).astype(np.float32)
+        batched = detector.predict_batch(features)
+        assert len(batched) == 4
+        for seq, conf in zip(features, batched):
+            assert conf == pytest.approx(detector.predict(seq), abs=1e-5)
+
+    def test_predict_batch_empty(self):
+        detector = LSTMDetector(model_path=None)
+        detector.model = AccidentLSTM().to(detector.device)
+        assert detector.predict_batch(np.zeros((0, 30, 3))) == []
+
 
 # ─── GPU Fallback ──────────────────────────────────────────────────────────
 
@@ -0,0 +1,40 @@
+"""Tests for the detection-memoizing detector wrapper"""
+import numpy as np
+from unittest.mock import MagicMock
+from app.ml.models.memo_detector import MemoDetector
+
+
+def _inner():
+    inner = MagicMock()
+    inner.detect_batch.side_effect = lambda frames, conf_threshold=0.25: [
+        [{'bbox': [0, 0, int(f[0, 0, 0]), 10], 'class_name': 'car'}] for f in frames
+    ]
+    return inner
+
+
+class TestMemoDetector:
+    def test_repeat_frames_skip_the_detector(self):
+        inner = _inner()
+        detector = MemoDetector(inner)
+        frames = [np.full((20, 30, 3), i, dtype=np.uint8) for i in range(4)]
+        first = detector.detect_batch(frames[:3])
+
+        again = detector.detect_batch([f.copy() for f in frames])
+        assert again[:3] == first
+        assert len(inner.detect_batch.call_args[0][0]) == 1     # only the new frame
+        assert detector.stats() == {"frames_memoized": 4, "hits": 3, "misses": 4}
+
+    def test_changed_pixels_or_threshold_miss(self):
+        detector = MemoDetector(_inner())
+        frame = np.zeros((20, 30, 3), dtype=np.uint8)
+        detector.detect(frame)
+        frame[5, 5, 1] = 1
+        detector.detect(frame)
+        detector.detect(frame, conf_threshold=0.5)
+        assert detector.misses == 3 and detector.hits == 0
+
+    def test_returned_detections_are_copies(self):
+        detector = MemoDetector(_inner())
+        frame = np.full((20, 30, 3), 7, dtype=np.uint8)
+        detector.detect(frame)[0]['track_id'] = 1
+        assert 'track_id' not in detector.detect(frame)[0]
@@ -0,0 +1,76 @@
+"""Tests for region-of-interest masks and the cropping detector"""
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+from app.ml.pipeline.roi import RegionMask
+from app.ml.models.roi_detector import ROIDetector
+
+
+def _car(x1, y1, x2, y2):
+    return {'bbox': [x1, y1, x2, y2], 'confidence': 0.8, 'class_id': 2, 'class_name': 'car'}
+
+
+# Lower half of the frame only (road), as a single rectangle
+ROAD = [[[0.0, 0.5], [1.0, 0.5], [1.0, 1.0], [0.0, 1.0]]]
+
+
+class TestRegionMask:
+    def test_bounds_and_crop_view(self):
+        roi = RegionMask(ROAD)
+        frame = np.zeros((100, 200, 3), dtype=np.uint8)
+        assert roi.bounds((100, 200)) == (0, 50, 200, 100)
+        crop = roi.crop(frame)
+        assert crop.shape == (50, 200, 3)
+        assert np.shares_memory(crop, frame)
+        assert roi.coverage((100, 200)) == pytest.approx(0.5)
+
+    def test_restore_shifts_and_filters(self):
+        # Triangle over the left half of the lower band
+        roi = RegionMask([[[0.0, 0.5], [0.5, 0.5], [0.0, 1.0]]])
+        x1, y1, _, _ = roi.bounds((100, 200))
+        kept = roi.restore([_car(0, 0, 20, 10), _car(80, 40, 100, 50)], (100, 200))
+        assert len(kept) == 1
+        assert kept[0]['bbox'] == [x1 + 0, y1 + 0, x1 + 20, y1 + 10]
+
+    def test_rejects_bad_polygons(self):
+        with pytest.raises(ValueError, match="3"):
+            RegionMask([[[0.0, 0.0], [1.0, 1.0]]])
+        with pytest.raises(ValueError, match="normalised"):
+            RegionMask([[[0, 0], [640, 0], [640, 480]]])
+        with pytest.raises(ValueError):
+            RegionMask([])
+
+
+class TestROIDetector:
+    def test_detects_on_crop_and_maps_back(self):
+        inner = MagicMock()
+        inner.detect_batch.side_effect = lambda frames, conf_threshold=0.25: [
+            [_car(10, 10, 30, 30)] for _ in frames
+        ]
+        detector = ROIDetector(inner, RegionMask(ROAD, name="road"))
+        frames = [np.zeros((100, 200, 3), dtype=np.uint8) for _ in range(3)]
+
+        dets = detector.detect_batch(frames)
+        seen = inner.detect_batch.call_args[0][0]
+        assert all(f.shape == (50, 200, 3) for f in seen)
+        assert dets[0][0]['bbox'] == [10, 60, 30, 80]
+        stats = detector.stats()
+        assert stats["name"] == "road"
+        assert stats["frames"] == 3
+        assert stats["cropCoverage"] == 0.5
+
+    def test_counts_dropped_detections(self):
+        roi = RegionMask([[[0.0, 0.0], [0.5, 0.0], [0.0, 0.5]]])
+        inner = MagicMock()
+        # Second box sits in the rectangle but outside the triangle
+        inner.detect_batch.return_value = [[_car(0, 0, 10, 10), _car(80, 40, 100, 50)]]
+        detector = ROIDetector(inner, roi)
+
+        assert len(detector.detect(np.zeros((100, 200, 3), dtype=np.uint8))) == 1
+        assert detector.detections_dropped == 1
+
+    def test_empty_frame_passes_through(self):
+        inner = MagicMock()
+        inner.detect_batch.return_value = [[_car(0, 0, 10, 10)]]
+        detector = ROIDetector(inner, RegionMask(ROAD))
+        assert detector.detect_batch([None]) == [[]]
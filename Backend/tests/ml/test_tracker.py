@@ -0,0 +1,81 @@
+"""Tests for the IoU / centroid multi-object tracker"""
+import pytest
+import numpy as np
+from unittest.mock import patch
+from app.ml.pipeline import tracker as tracker_module
+from app.ml.pipeline.tracker import IoUTracker, iou_matrix, match
+from app.services.physics_service import assign_track_ids
+
+
+def _car(x1, y1, x2, y2):
+    return {'bbox': [x1, y1, x2, y2], 'confidence': 0.8, 'class_name': 'car'}
+
+
+class TestIoUMatrix:
+    def test_matches_scalar_iou(self):
+        a = np.array([[0, 0, 100, 100], [200, 200, 300, 300]])
+        b = np.array([[50, 0, 150, 100]])
+        iou = iou_matrix(a, b)
+        assert iou.shape == (2, 1)
+        assert iou[0, 0] == pytest.approx(1 / 3)
+        assert iou[1, 0] == 0.0
+
+    def test_empty(self):
+        assert iou_matrix(np.zeros((0, 4)), np.zeros((3, 4))).shape == (0, 3)
+
+
+class TestMatch:
+    def test_greedy_fallback_agrees_on_clear_case(self):
+        cost = np.array([[0.1, 0.9], [0.8, 0.2], [1e6, 1e6]])
+        with patch.object(tracker_module, "linear_sum_assignment", None):
+            assert sorted(match(cost)) == [(0, 0), (1, 1)]
+
+
+class TestIoUTracker:
+    def test_ids_stable_under_reordering(self):
+        tracker = IoUTracker(frame_size=(480, 640))
+        a, b = _car(0, 0, 100, 100), _car(300, 200, 400, 300)
+        first = tracker.update([a, b])
+        second = tracker.update([_car(305, 200, 405, 300), _car(5, 0, 105, 100)])
+        assert [r['track_id'] for r in second] == [first[1]['track_id'], first[0]['track_id']]
+        assert all(r['continued'] for r in second)
+        assert second[0]['speed'] == pytest.approx(5 / 800)
+
+    def test_centroid_gate_links_fast_movers(self):
+        tracker = IoUTracker(frame_size=(480, 640), max_distance=0.1)
+        first = tracker.update([_car(0, 0, 20, 20)])
+        # No overlap, but 40px (< 80px gate) away
+        second = tracker.update([_car(40, 0, 60, 20)])
+        assert second[0]['track_id'] == first[0]['track_id']
+        # Far jump starts a new track
+        third = tracker.update([_car(500, 400, 520, 420)])
+        assert third[0]['track_id'] != first[0]['track_id']
+        assert third[0]['continued'] is False
+
+    def test_tracks_survive_short_gaps(self):
+        tracker = IoUTracker(frame_size=(480, 640), max_missed=2)
+        tid = tracker.update([_car(0, 0, 100, 100)])[0]['track_id']
+        tracker.update([])
+        again = tracker.update([_car(0, 0, 100, 100)])
+        assert again[0]['track_id'] == tid
+        for _ in range(3):
+            tracker.update([])
+        assert tracker.tracks == []
+
+    def test_per_track_series(self):
+        tracker = IoUTracker(frame_size=(480, 640))
+        for x in (0, 10, 20):
+            tid = tracker.update([_car(x, 0, x + 100, 100)])[0]['track_id']
+        track = tracker.get(tid)
+        assert track.velocities.tolist() == [[10.0, 0.0], [10.0, 0.0]]
+        assert track.area_changes.tolist() == [0.0, 0.0]
+
+
+class TestAssignTrackIds:
+    def test_labels_vehicles_only(self):
+        person = {'bbox': [0, 0, 5, 5], 'confidence': 0.9, 'class_name': 'person'}
+        frames = [[_car(0, 0, 50, 50), person], [person, _car(2, 0, 52, 50)]]
+        labelled = assign_track_ids(frames, (480, 640))
+        assert labelled[0][0]['track_id'] == labelled[1][1]['track_id']
+        assert 'track_id' not in labelled[0][1]
+        assert 'track_id' not in frames[0][0]   # input untouched
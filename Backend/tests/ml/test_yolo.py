@@ -86,6 +86,39 @@ class TestDetectWithMock:
             frame, conf=0.5, verbose=False
         )
 
+    def test_input_size_passed_to_model(self, detector_with_mock):
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        detector_with_mock.imgsz = 320
+        detector_with_mock.detect(frame)
+        detector_with_mock.model.assert_called_once_with(
+            frame, conf=0.25, verbose=False, imgsz=320
+        )
+
+
+class TestDetectBatch:
+    def test_batch_maps_results_to_frames(self):
+        detector = YOLODetector()
+        mock_box = MagicMock()
+        mock_box.xyxy = [MagicMock()]
+        mock_box.xyxy[0].cpu.return_value.numpy.return_value.tolist.return_value = [1, 2, 3, 4]
+        mock_box.conf = [MagicMock()]
+        mock_box.conf[0].__float__ = lambda self: 0.9
+        mock_box.cls = [MagicMock()]
+        mock_box.cls[0].__int__ = lambda self: 2
+        mock_result = MagicMock()
+        mock_result.boxes = [mock_box]
+        mock_result.names = {2: "car"}
+        detector.model = MagicMock(return_value=[mock_result, mock_result])
+
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        detections = detector.detect_batch([frame, None, frame])
+
+        assert len(detections) == 3
+        assert detections[1] == []
+        assert detections[0][0]["class_name"] == "car"
+        # Only the valid frames are sent to the model, in one call
+        assert len(detector.model.call_args[0][0]) == 2
+
 
 class TestDetectErrorHandling:
     def test_detect_raises_on_critical_error(self):
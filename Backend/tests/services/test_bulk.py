@@ -0,0 +1,138 @@
+"""Tests for bulk analysis jobs"""
+import asyncio
+from unittest.mock import MagicMock, patch
+import pytest
+from app.services.bulk_service import BulkJob, BulkTracker
+from app.services.profile_service import resolve_profile
+from app.services.progress_service import AnalysisCancelled, ProgressTracker
+
+
+@pytest.fixture(autouse=True)
+def shared_models():
+    """No real models: the job's shared detector and LSTM are mocks."""
+    tracker = ProgressTracker()
+    with patch("app.services.profile_service.create_detector", MagicMock()), \
+         patch("app.services.bulk_service.get_shared_lstm", MagicMock()), \
+         patch("app.services.bulk_service.progress_tracker", tracker):
+        yield tracker
+
+
+def _run(job, analyze, during=None):
+    async def main():
+        tracker = BulkTracker()
+        tracker.submit(job, analyze)
+        if during is not None:
+            await during(job)
+        while not job.finished:
+            await asyncio.sleep(0.01)
+    asyncio.run(main())
+    return job.snapshot()
+
+
+class TestBulkJob:
+    def test_every_video_is_analysed_with_shared_resources(self):
+        seen = []
+
+        async def analyze(job, video_id):
+            seen.append((video_id, job.video_detector(), job.lstm_detector, job.executor))
+            await asyncio.sleep(0.01)
+            return {"id": f"result-{video_id}", "isAccident": video_id == "b", "confidence": 95}
+
+        snapshot = _run(BulkJob(["a", "b", "c", "a"], resolve_profile(), concurrency=2), analyze)
+        assert sorted(video_id for video_id, *_ in seen) == ["a", "b", "c"]
+        assert len({tuple(map(id, shared)) for _, *shared in seen}) == 1
+        assert snapshot["status"] == "completed"
+        assert (snapshot["total"], snapshot["completed"], snapshot["pending"]) == (3, 3, 0)
+        assert snapshot["percent"] == 100.0
+        assert {r["videoId"]: r["isAccident"] for r in snapshot["results"]} == {"a": False, "b": True, "c": False}
+
+    def test_cascade_gating_is_per_video(self):
+        from app.ml.models.cascade_detector import CascadeDetector
+        cascade = CascadeDetector(light=MagicMock(), heavy=MagicMock(), physics_threshold=0.4)
+        with patch("app.services.profile_service.create_detector", return_value=cascade):
+            job = BulkJob(["a", "b"], resolve_profile())
+            job.open()
+        try:
+            first, second = job.video_detector(), job.video_detector()
+            assert first is not second and cascade not in (first, second)
+            assert first.light is second.light is job.models["light"]
+            assert first.heavy is second.heavy is job.models["heavy"]
+            assert first.physics_threshold == 0.4
+            assert set(job.snapshot()["detector"]) == {"light", "heavy"}
+        finally:
+            job.close()
+
+    def test_failures_are_recorded_per_video(self):
+        async def analyze(job, video_id):
+            if video_id == "bad":
+                raise RuntimeError("Video file not found on disk")
+            return {"id": f"result-{video_id}"}
+
+        job = BulkJob(["ok", "bad"], resolve_profile())
+        snapshot = _run(job, analyze)
+        assert snapshot["status"] == "completed"
+        assert (snapshot["completed"], snapshot["failed"]) == (1, 1)
+        failed = [r for r in job.results_since(0) if r["status"] == "failed"]
+        assert failed[0]["error"] == "Video file not found on disk" and failed[0]["result"] is None
+
+    def test_cancel_skips_pending_and_stops_running(self, shared_models):
+        started = []
+
+        async def analyze(job, video_id):
+            started.append(video_id)
+            progress = shared_models.start(video_id)
+            while True:
+                progress.check()
+                await asyncio.sleep(0.01)
+
+        async def cancel_soon(job):
+            while not started:
+                await asyncio.sleep(0.01)
+            assert job.cancel("Bulk job cancelled")
+
+        job = BulkJob([f"v{i}" for i in range(5)], resolve_profile(), concurrency=1)
+        snapshot = _run(job, analyze, during=cancel_soon)
+        assert started == ["v0"]
+        assert snapshot["status"] == "cancelled"
+        assert snapshot["cancelled"] == 5
+        assert not job.cancel()
+
+    def test_model_load_failure_fails_the_job(self):
+        async def analyze(job, video_id):
+            raise AssertionError("not reached")
+
+        with patch("app.services.bulk_service.get_shared_lstm", MagicMock(side_effect=FileNotFoundError("lstm.pth"))):
+            snapshot = _run(BulkJob(["a"], resolve_profile()), analyze)
+        assert snapshot["status"] == "failed"
+        assert "lstm.pth" in snapshot["error"]
+        assert snapshot["cancelled"] == 1
+
+    def test_worker_error_fails_the_job(self):
+        async def analyze(job, video_id):
+            return {"id": f"result-{video_id}"}
+
+        job = BulkJob(["a", "b"], resolve_profile())
+        with patch.object(job, "take", side_effect=RuntimeError("queue broken")):
+            snapshot = _run(job, analyze)
+        assert snapshot["status"] == "failed"
+        assert snapshot["error"] == "queue broken"
+        assert snapshot["cancelled"] == 2
+
+    def test_cancelled_task_cancels_the_job(self):
+        async def analyze(job, video_id):
+            await asyncio.sleep(10)
+
+        job = BulkJob(["a", "b"], resolve_profile(), concurrency=1)
+
+        async def main():
+            tracker = BulkTracker()
+            tracker.submit(job, analyze)
+            while not job.running:
+                await asyncio.sleep(0.01)
+            tracker._tasks[job.id].cancel()
+            while not job.finished:
+                await asyncio.sleep(0.01)
+        asyncio.run(main())
+        snapshot = job.snapshot()
+        assert snapshot["status"] == "cancelled"
+        assert snapshot["cancelled"] == 2
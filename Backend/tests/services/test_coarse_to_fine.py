@@ -0,0 +1,105 @@
+"""Tests for two-pass (coarse-to-fine) analysis"""
+import pytest
+import cv2
+import numpy as np
+from unittest.mock import MagicMock
+from app.ml.pipeline.frame_extractor import FrameExtractor
+from app.services.confidence_service import TemporalConfidenceAggregator
+from app.services.coarse_to_fine_service import find_candidates, analyze_coarse_to_fine
+
+
+def _write_video(path, n_frames=1200, fps=30.0):
+    """Raw frame i encodes k = i // 3 (its 10fps sample index) as two brightness levels."""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), fps, (160, 120))
+    for i in range(n_frames):
+        k = i // 3
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        frame[:, :80] = (k // 32) * 8
+        frame[:, 80:] = (k % 32) * 8
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def _detector(collision_from=None, vehicles=True):
+    """Two cars per frame that overlap from 10fps sample ``collision_from``."""
+    calls = {'frames': 0}
+
+    def detect_batch(frames, conf_threshold=0.25):
+        out = []
+        for frame in frames:
+            calls['frames'] += 1
+            if not vehicles:
+                out.append([])
+                continue
+            k = round(frame[40:80, 20:60].mean() / 8) * 32 + round(frame[40:80, 100:140].mean() / 8)
+            shift = 90 if collision_from is not None and k >= collision_from else 0
+            out.append([
+                {'bbox': [0, 0, 50, 50], 'confidence': 0.9, 'class_id': 2, 'class_name': 'car'},
+                {'bbox': [100 - shift, 0, 150 - shift, 50], 'confidence': 0.9,
+                 'class_id': 2, 'class_name': 'car'},
+            ])
+        return out
+
+    detector = MagicMock()
+    detector.detect_batch.side_effect = detect_batch
+    detector.calls = calls
+    return detector
+
+
+def _lstm(score):
+    lstm = MagicMock()
+    lstm.predict_batch.side_effect = lambda seqs: [score] * len(seqs)
+    return lstm
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    # 1200 frames @ 30fps = 40s → 400 samples @ 10fps, 80 @ 2fps
+    return _write_video(tmp_path / "long.mp4")
+
+
+class TestFindCandidates:
+    def _steps(self, overlaps):
+        return [{'overlap': o, 'physics': o * 0.55} for o in overlaps]
+
+    def test_picks_overlap_rise(self):
+        steps = self._steps([0, 0, 0, 0.6, 0.6, 0, 0, 0, 0, 0])
+        assert find_candidates(steps, max_candidates=2, min_separation=3) == [3]
+
+    def test_candidates_kept_apart(self):
+        steps = self._steps([0, 0.5, 0.5, 0.8, 0, 0, 0, 0.4, 0, 0])
+        assert find_candidates(steps, max_candidates=2, min_separation=4) == [1, 7]
+
+    def test_no_rise_falls_back_to_physics_peak(self):
+        steps = self._steps([0.3, 0.2, 0.1])
+        assert find_candidates(steps, max_candidates=2, min_separation=1) == [0]
+
+
+class TestAnalyzeCoarseToFine:
+    def test_refines_around_late_collision(self, video_file):
+        detector = _detector(collision_from=300)
+        lstm = _lstm(0.8)
+        result = analyze_coarse_to_fine(
+            video_file, FrameExtractor(target_fps=10), detector, lstm,
+            TemporalConfidenceAggregator(),
+        )
+        details = result["details"]
+        assert result["is_accident"]
+        lstm.predict_batch.assert_called_once()
+        # Refined window surrounds the collision onset at sample 300
+        assert result["sample_offset"] <= 300 < result["sample_offset"] + result["total_frames"]
+        assert details["fullScanFrames"] == 400
+        assert detector.calls['frames'] == details["detectorFrames"] < 400
+        assert len(result["frames"]) == result["total_frames"]
+
+    def test_presence_gate_stops_after_coarse_pass(self, video_file):
+        detector = _detector(vehicles=False)
+        lstm = _lstm(0.9)
+        result = analyze_coarse_to_fine(
+            video_file, FrameExtractor(target_fps=10), detector, lstm,
+            TemporalConfidenceAggregator(),
+        )
+        assert not result["is_accident"]
+        lstm.predict_batch.assert_not_called()
+        assert detector.calls['frames'] == result["details"]["coarseFrames"] == 80
@@ -0,0 +1,242 @@
+"""Tests for accident evidence rendering (stills + clip, eager and lazy)"""
+import json
+import pytest
+import cv2
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from app.ml.pipeline.frame_extractor import FrameExtractor
+from app.services import frame_service
+from app.services.evidence_service import EvidenceService
+from app.services.frame_service import AccidentFrameService, _draw_annotated_frame, _sprite_indices
+
+
+def _scene(n=40):
+    frames = [np.full((120, 160, 3), i * 5, dtype=np.uint8) for i in range(n)]
+    dets = [
+        [
+            {'bbox': [10 + i, 20, 50 + i, 60], 'confidence': 0.9, 'class_id': 2, 'class_name': 'car'},
+            {'bbox': [110 - i, 20, 150 - i, 60], 'confidence': 0.8, 'class_id': 2, 'class_name': 'car'},
+        ]
+        for i in range(n)
+    ]
+    physics = [0.0] * n
+    physics[25] = 1.0
+    return frames, dets, physics
+
+
+@pytest.fixture
+def service(tmp_path):
+    svc = AccidentFrameService()
+    svc.frames_dir = tmp_path / "frames"
+    svc.clips_dir = tmp_path / "clips"
+    svc.clips_dir.mkdir()
+    return svc
+
+
+class TestRenderEvidence:
+    def test_stills_and_clip_in_one_pass(self, service):
+        frames, dets, physics = _scene()
+        with patch.object(frame_service, "_find_collision_peak", wraps=frame_service._find_collision_peak) as peak, \
+             patch.object(frame_service, "assign_track_ids", wraps=frame_service.assign_track_ids) as tracks:
+            result = service.render_evidence("vid", frames, [(24, 26)], fps=2.0,
+                                             detections_per_frame=dets, per_frame_physics=physics,
+                                             frame_offset=100)
+
+        assert peak.call_count == 1
+        assert tracks.call_count == 1
+        assert result['peak_frame'] == 125
+        assert result['saved_frames'] == [123, 124, 125, 126, 127]
+        assert sorted(p.name for p in (service.frames_dir / "vid").iterdir()) == sorted(
+            [f"frame_{i:04d}.webp" for i in range(123, 128)] + [f"thumb_{i:04d}.webp" for i in range(123, 128)]
+            + ["sprite.json", "sprite.webp"]
+        )
+        cap = cv2.VideoCapture(result['clip_path'])
+        assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 13   # ±3s at 2 fps
+        cap.release()
+        data = open(result['clip_path'], "rb").read()
+        assert data.index(b"moov") < data.index(b"mdat")      # faststart
+
+    def test_thumbnails_are_downscaled(self, service):
+        frames = [np.zeros((720, 1280, 3), dtype=np.uint8)] * 10
+        service.render_evidence("big", frames, [(4, 6)], clip=False)
+
+        thumb = cv2.imread(str(service.frames_dir / "big" / "thumb_0005.webp"))
+        full = cv2.imread(str(service.frames_dir / "big" / "frame_0005.webp"))
+        assert thumb.shape == (180, 320, 3)
+        assert full.shape == (720, 1280, 3)
+        assert service.get_frame_urls("big", [5], thumb=True) == ["/frames/big/thumb_0005.webp"]
+
+    def test_stills_match_single_frame_annotation(self, service):
+        frames, dets, physics = _scene()
+        result = service.render_evidence("vid", frames, [(24, 26)], detections_per_frame=dets,
+                                         per_frame_physics=physics)
+        tracked = frame_service.assign_track_ids(dets, frames[0].shape[:2])
+        expected = _draw_annotated_frame(frames[25], tracked[25], is_impact=True, frame_label="IMPACT")
+        ok, encoded = cv2.imencode(".webp", expected, frame_service._still_params("webp"))
+
+        assert (service.frames_dir / "vid" / "frame_0025.webp").read_bytes() == encoded.tobytes()
+        assert result['clip_path']
+
+    def test_wrappers_split_the_pass(self, service):
+        frames, dets, physics = _scene()
+        saved = service.save_accident_frames("vid", frames, [(24, 26)], dets, physics)
+        clip = service.generate_accident_clip("vid", frames, [(24, 26)], 2.0, dets, physics)
+
+        assert saved['total_count'] == 5
+        assert 'clip_path' not in saved
+        assert clip.endswith("vid_accident.mp4")
+        assert not (service.frames_dir / "vid" / "sprite.json").exists()
+
+    def test_no_events_skips_stills_only(self, service):
+        frames, _, _ = _scene()
+        result = service.render_evidence("vid", frames, [], fps=2.0)
+
+        assert result['total_count'] == 0
+        assert not list((service.frames_dir / "vid").glob("frame_*"))
+        assert result['clip_path']
+
+    def test_failed_still_is_not_reported(self, service):
+        frames, dets, physics = _scene()
+        with patch.object(frame_service, "_write_still", side_effect=lambda path, *a: path.name != "frame_0024.webp"):
+            result = service.render_evidence("vid", frames, [(24, 26)], detections_per_frame=dets,
+                                             per_frame_physics=physics, clip=False)
+
+        assert result['saved_frames'] == [23, 25, 26, 27]
+        assert result['clip_path'] == ""
+
+
+class TestContactSheet:
+    def test_index_addresses_every_tile(self, service):
+        frames, dets, physics = _scene()
+        result = service.render_evidence("vid", frames, [(24, 26)], fps=2.0, detections_per_frame=dets,
+                                         per_frame_physics=physics, frame_offset=100, sample_fps=10.0)
+        index = json.loads(open(result['sprite_path']).read())
+        sheet = cv2.imread(str(service.frames_dir / "vid" / "sprite.webp"))
+
+        assert index['image'] == "/frames/vid/sprite.webp"
+        assert [t['frame'] for t in index['tiles']] == list(range(119, 132))   # ±3s at 2 fps
+        assert [t['frame'] for t in index['tiles'] if t['peak']] == [125] == [index['peakFrame']]
+        assert index['tiles'][0]['time'] == 11.9
+        assert sheet.shape == (index['rows'] * index['tileHeight'], index['columns'] * index['tileWidth'], 3)
+        last = index['tiles'][-1]
+        assert (last['x'], last['y']) == (2 * index['tileWidth'], index['tileHeight'])
+
+    def test_scope_all_is_strided_around_peak(self, service):
+        frames, dets, physics = _scene()
+        with patch.object(frame_service.settings, "EVIDENCE_SPRITE_SCOPE", "all"), \
+             patch.object(frame_service.settings, "EVIDENCE_SPRITE_MAX_TILES", 8):
+            result = service.render_evidence("vid", frames, [(24, 26)], fps=2.0, detections_per_frame=dets,
+                                             per_frame_physics=physics, stills=False, clip=False)
+        index = json.loads(open(result['sprite_path']).read())
+
+        assert [t['frame'] for t in index['tiles']] == [0, 5, 10, 15, 20, 25, 30, 35]
+        assert index['tiles'][0]['time'] is None
+        assert result['total_count'] == 0 and result['clip_path'] == ""
+
+    def test_sprite_indices_keep_peak(self):
+        assert _sprite_indices(list(range(10)), 5, 20) == list(range(10))
+        assert _sprite_indices(list(range(10)), 3, 4) == [0, 3, 6, 9]
+        picked = _sprite_indices(list(range(100)), 97, 10)
+        assert len(picked) == 10 and 97 in picked
+
+
+def _write_video(path, n_frames=120, fps=30.0):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), fps, (160, 120))
+    for i in range(n_frames):
+        writer.write(np.full((120, 160, 3), (i * 2) % 255, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+@pytest.fixture
+def lazy(tmp_path, service):
+    video = _write_video(tmp_path / "vid.mp4")
+    frames = FrameExtractor().extract_frames(video)
+    evidence = EvidenceService(manifest_dir=str(tmp_path / "evidence"), frame_service=service)
+    _, dets, physics = _scene(len(frames))
+    physics[25] = 1.0
+    result = evidence.register("vid", video, frames, [(24, 26)], interval=3, fps=2.0,
+                               detections_per_frame=dets, per_frame_physics=physics)
+    return evidence, frames, dets, physics, result
+
+
+class TestLazyEvidence:
+    def test_register_does_not_render(self, lazy, service):
+        evidence, _, _, _, result = lazy
+
+        assert result['saved_frames'] == [23, 24, 25, 26, 27]
+        assert result['peak_frame'] == 25
+        assert not (service.frames_dir / "vid").exists()
+        assert evidence.get_clip_url("vid") == "/clips/vid_accident.mp4"
+
+    def test_first_request_renders_same_evidence(self, lazy, service, tmp_path):
+        evidence, frames, dets, physics, _ = lazy
+        path = evidence.resolve("vid", "frame_0025.webp")
+        lazy_bytes = path.read_bytes()
+
+        eager = AccidentFrameService()
+        eager.frames_dir, eager.clips_dir = tmp_path / "eager", tmp_path / "eager"
+        eager.render_evidence("vid", frames, [(24, 26)], fps=2.0, detections_per_frame=dets,
+                              per_frame_physics=physics, clip=False)
+
+        assert lazy_bytes == (tmp_path / "eager" / "vid" / "frame_0025.webp").read_bytes()
+        assert evidence.resolve("vid") == service.clips_dir / "vid_accident.mp4"
+        assert evidence.renders == 1
+
+    def test_concurrent_requests_render_once(self, lazy):
+        evidence = lazy[0]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            paths = list(pool.map(lambda _: evidence.resolve("vid", "frame_0024.webp"), range(8)))
+
+        assert all(p is not None for p in paths)
+        assert evidence.renders == 1
+
+    def test_evicted_evidence_is_rendered_again(self, lazy, service):
+        evidence = lazy[0]
+        evidence.resolve("vid")
+        evidence.max_bytes = 0
+        assert evidence.evict() > 0
+        assert not (service.frames_dir / "vid").exists()
+
+        assert evidence.resolve("vid", "frame_0023.webp") is not None
+        assert evidence.renders == 2
+
+    def test_failed_clip_is_not_rendered_again(self, lazy):
+        evidence = lazy[0]
+        # Every codec failed: the writer produced nothing
+        with patch.object(frame_service._ClipWriter, "close", return_value=0):
+            assert evidence.resolve("vid", "frame_0025.webp") is not None
+        assert evidence.resolve("vid") is None
+        assert evidence.resolve("vid", "frame_0024.webp") is not None
+        assert evidence.get_clip_url("vid") == ""
+        assert evidence.renders == 1
+
+    def test_evict_video_forgets_manifest(self, lazy, service):
+        evidence = lazy[0]
+        evidence.resolve("vid")
+
+        assert evidence.evict_video("vid") > 0
+        assert evidence.resolve("vid", "frame_0025.webp") is None
+        assert evidence.get_clip_url("vid") == ""
+
+    def test_retained_stream_evidence_is_evicted_for_good(self, lazy, service, tmp_path):
+        evidence, frames, dets, physics, _ = lazy
+        service.save_accident_frames("s1-1000", frames, [(24, 26)], detections_per_frame=dets,
+                                     per_frame_physics=physics)
+        evidence.retain("s1-1000")
+        assert evidence.resolve("s1-1000", "frame_0025.webp") is not None
+        assert "s1-1000" in dict(evidence.cached())
+
+        evidence.max_bytes = 0
+        assert evidence.evict() > 0
+        assert not (service.frames_dir / "s1-1000").exists()
+        assert not evidence.has_manifest("s1-1000")
+        assert evidence.resolve("s1-1000", "frame_0025.webp") is None
+        assert evidence.renders == 0
+
+    def test_unknown_or_unsafe_names(self, lazy):
+        evidence = lazy[0]
+        assert evidence.resolve("vid", "frame_9999.webp") is None
+        assert evidence.resolve("..", "vid") is None
+        assert evidence.resolve("other", "frame_0025.webp") is None
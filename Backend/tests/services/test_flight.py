@@ -0,0 +1,168 @@
+"""Tests for single-flight analyses"""
+import asyncio
+from unittest.mock import patch
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.models import Base
+from app.db import crud
+from app.services.flight_service import AnalysisFlights, flight_key
+from app.services.progress_service import AnalysisCancelled, ProgressTracker
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    """Session factory on a file database, so separate sessions act like separate workers."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'flights.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    opened = []
+
+    def open_session():
+        opened.append(Session())
+        return opened[-1]
+
+    yield open_session
+    for session in opened:
+        session.close()
+
+
+@pytest.fixture(autouse=True)
+def tracker():
+    tracker = ProgressTracker()
+    with patch("app.services.flight_service.progress_tracker", tracker):
+        yield tracker
+
+
+def _compute(calls, response=None, delay=0.05, error=None):
+    async def compute(progress):
+        calls.append(progress)
+        for _ in range(int(delay / 0.01)):
+            progress.check()
+            await asyncio.sleep(0.01)
+        if error is not None:
+            raise error
+        return response or {"id": "result-v"}
+    return compute
+
+
+class _Client:
+    """Request stand-in whose client has gone away."""
+
+    async def is_disconnected(self):
+        return True
+
+
+class TestFlightKey:
+    def test_same_parameters_same_key(self):
+        assert flight_key("v", two_pass=True, roi_id=None) == flight_key("v", roi_id=None, two_pass=True)
+
+    def test_parameters_and_video_change_the_key(self):
+        assert flight_key("v", two_pass=True) != flight_key("v", two_pass=False)
+        assert flight_key("v", two_pass=True) != flight_key("w", two_pass=True)
+
+
+class TestClaims:
+    def test_live_claim_blocks_others(self, sessions):
+        a, b = sessions(), sessions()
+        assert crud.claim_analysis_flight(a, "v:1", "v", "owner-a", lease=30)
+        assert not crud.claim_analysis_flight(b, "v:1", "v", "owner-b", lease=30)
+
+        crud.finish_analysis_flight(a, "v:1", "owner-a", "completed", response={"id": "r"})
+        assert crud.get_analysis_flight(b, "v:1").response == {"id": "r"}
+        assert crud.claim_analysis_flight(b, "v:1", "v", "owner-b", lease=30)
+
+    def test_lapsed_claim_can_be_taken_over(self, sessions):
+        a, b = sessions(), sessions()
+        assert crud.claim_analysis_flight(a, "v:1", "v", "owner-a", lease=-1)
+        assert crud.claim_analysis_flight(b, "v:1", "v", "owner-b", lease=30)
+        # The old owner can no longer renew or finish it
+        assert not crud.renew_analysis_flight(a, "v:1", "owner-a", lease=30)
+        assert crud.get_analysis_flight(b, "v:1").owner == "owner-b"
+
+
+class TestAnalysisFlights:
+    def test_concurrent_requests_share_one_run(self, sessions):
+        flights, calls = AnalysisFlights(poll=0.01), []
+
+        async def main():
+            db = sessions()
+            return await asyncio.gather(*[
+                flights.run(db, "v:1", "v", _compute(calls)) for _ in range(3)
+            ])
+
+        assert asyncio.run(main()) == [{"id": "result-v"}] * 3
+        assert len(calls) == 1
+
+    def test_different_parameters_run_separately(self, sessions):
+        flights, calls = AnalysisFlights(poll=0.01), []
+
+        async def main():
+            db = sessions()
+            await asyncio.gather(
+                flights.run(db, "v:1", "v", _compute(calls)),
+                flights.run(db, "v:2", "v", _compute(calls)),
+            )
+
+        asyncio.run(main())
+        assert len(calls) == 2
+
+    def test_failure_reaches_every_waiter_then_clears(self, sessions):
+        flights, calls = AnalysisFlights(poll=0.01), []
+        db = sessions()
+
+        async def main():
+            return await asyncio.gather(*[
+                flights.run(db, "v:1", "v", _compute(calls, error=RuntimeError("decoder"))) for _ in range(2)
+            ], return_exceptions=True)
+
+        assert [str(e) for e in asyncio.run(main())] == ["decoder", "decoder"]
+        assert crud.get_analysis_flight(db, "v:1").status == "failed"
+        # A later request runs the analysis again
+        asyncio.run(flights.run(db, "v:1", "v", _compute(calls)))
+        assert len(calls) == 2
+
+    def test_other_worker_waits_for_the_owner(self, sessions):
+        worker_a, worker_b = AnalysisFlights(poll=0.01), AnalysisFlights(poll=0.01)
+        calls_a, calls_b = [], []
+
+        async def main():
+            owner = asyncio.create_task(
+                worker_a.run(sessions(), "v:1", "v", _compute(calls_a, {"id": "from-a"}, delay=0.2))
+            )
+            await asyncio.sleep(0.05)
+            joined = await worker_b.run(sessions(), "v:1", "v", _compute(calls_b))
+            return await owner, joined
+
+        assert asyncio.run(main()) == ({"id": "from-a"}, {"id": "from-a"})
+        assert len(calls_a) == 1 and calls_b == []
+
+    def test_abandoned_claim_is_run_again(self, sessions):
+        crud.claim_analysis_flight(sessions(), "v:1", "v", "dead-worker", lease=-1)
+        calls = []
+        assert asyncio.run(AnalysisFlights(poll=0.01).run(sessions(), "v:1", "v", _compute(calls))) == {"id": "result-v"}
+        assert len(calls) == 1
+
+    def test_run_is_cancelled_when_every_client_leaves(self, sessions, tracker):
+        flights, calls = AnalysisFlights(poll=0.01), []
+
+        async def main():
+            db = sessions()
+            return await asyncio.gather(*[
+                flights.run(db, "v:1", "v", _compute(calls, delay=5), request=_Client()) for _ in range(2)
+            ], return_exceptions=True)
+
+        with patch("app.services.flight_service.settings.PROGRESS_POLL_INTERVAL", 0.01):
+            results = asyncio.run(main())
+        assert all(isinstance(r, AnalysisCancelled) for r in results)
+        assert calls[0].cancel_reason == "Client disconnected"
+
+    def test_unkeyed_runs_are_not_shared(self, sessions):
+        flights, calls = AnalysisFlights(poll=0.01), []
+
+        async def main():
+            db = sessions()
+            await asyncio.gather(*[flights.run(db, None, "v", _compute(calls)) for _ in range(2)])
+
+        asyncio.run(main())
+        assert len(calls) == 2
@@ -0,0 +1,200 @@
+"""Tests for full-length windowed video analysis"""
+import pytest
+import cv2
+import numpy as np
+from unittest.mock import MagicMock
+from app.ml.pipeline.frame_extractor import FrameExtractor
+from app.services.confidence_service import TemporalConfidenceAggregator
+from app.services.long_video_service import window_starts, detect_video, analyze_long_video
+from app.services.progress_service import AnalysisCancelled, AnalysisProgress
+
+
+def _write_video(path, n_frames=600, fps=30.0):
+    """Sample k (raw frame 3k) encodes k as two coarse brightness levels."""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), fps, (160, 120))
+    for i in range(n_frames):
+        k = i // 3
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        frame[:, :80] = (k // 16) * 16
+        frame[:, 80:] = (k % 16) * 16
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def _detector(collision_from=None):
+    """Two cars per frame; they overlap from sampled frame ``collision_from``."""
+    seen = []
+
+    def detect_batch(frames, conf_threshold=0.25):
+        out = []
+        for frame in frames:
+            idx = round(frame[40:80, 20:60].mean() / 16) * 16 + round(frame[40:80, 100:140].mean() / 16)
+            seen.append(idx)
+            shift = 90 if collision_from is not None and idx >= collision_from else 0
+            out.append([
+                {'bbox': [0, 0, 50, 50], 'confidence': 0.9, 'class_id': 2, 'class_name': 'car'},
+                {'bbox': [100 - shift, 0, 150 - shift, 50], 'confidence': 0.9,
+                 'class_id': 2, 'class_name': 'car'},
+            ])
+        return out
+
+    detector = MagicMock()
+    detector.detect_batch.side_effect = detect_batch
+    detector.seen = seen
+    return detector
+
+
+def _lstm(score):
+    lstm = MagicMock()
+    lstm.predict_batch.side_effect = lambda seqs: [score] * len(seqs)
+    return lstm
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    # 600 frames @ 30fps = 20s → 200 sampled frames @ 10fps
+    return _write_video(tmp_path / "long.mp4")
+
+
+class TestWindowStarts:
+    def test_short_video_single_window(self):
+        assert window_starts(80, window=150, stride=75) == [0]
+
+    def test_last_window_aligned_to_end(self):
+        assert window_starts(400, window=150, stride=75) == [0, 75, 150, 225, 250]
+
+    def test_exact_fit(self):
+        assert window_starts(300, window=150, stride=75) == [0, 75, 150]
+
+
+class TestDetectVideo:
+    def test_every_frame_detected_once(self, video_file):
+        detector = _detector()
+        dets, frame_size, meta = detect_video(
+            video_file, FrameExtractor(target_fps=10), detector, workers=3, batch_size=7
+        )
+        assert len(dets) == 200
+        assert frame_size == (120, 160)
+        assert meta["interval"] == 3
+        assert sorted(detector.seen) == list(range(200))
+
+    def test_adaptive_sampling_reuses_static_frames(self, tmp_path):
+        # Flat grey video: every frame after each segment's first is a duplicate
+        path = tmp_path / "static.mp4"
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), 30.0, (160, 120))
+        for _ in range(150):
+            writer.write(np.full((120, 160, 3), 128, dtype=np.uint8))
+        writer.release()
+
+        detector = _detector()
+        dets, _, meta = detect_video(
+            path, FrameExtractor(target_fps=10), detector, workers=2, adaptive=True,
+        )
+        assert len(dets) == 50
+        assert all(len(d) == 2 for d in dets)
+        assert meta["frames_reused"] > 30
+        assert len(detector.seen) == 50 - meta["frames_reused"]
+
+    def test_cascade_gates_each_segment_on_its_own_motion(self, video_file):
+        from app.ml.models.cascade_detector import CascadeDetector
+
+        def moving_car(frames, conf_threshold=0.25):
+            # One car, nearly still within each half of the video but 15 px
+            # apart between them: a lurch only if the halves are compared
+            out = []
+            for frame in frames:
+                idx = round(frame[40:80, 20:60].mean() / 16) * 16 + round(frame[40:80, 100:140].mean() / 16)
+                x = (15 if idx >= 100 else 0) + (idx % 100) * 0.02
+                out.append([{'bbox': [x, 40, x + 40, 80], 'confidence': 0.9,
+                             'class_id': 2, 'class_name': 'car'}])
+            return out
+
+        light, heavy = MagicMock(), MagicMock()
+        light.detect_batch.side_effect = heavy.detect_batch.side_effect = moving_car
+        cascade = CascadeDetector(light=light, heavy=heavy, physics_threshold=0.15)
+        # Two segments' batches interleave on the shared cascade
+        dets, _, _ = detect_video(video_file, FrameExtractor(target_fps=10), cascade, workers=2, batch_size=2)
+        assert len(dets) == 200
+        assert cascade.frames_screened == 200
+        assert cascade.frames_escalated == 0
+
+    def test_range_only_decodes_requested_frames(self, video_file):
+        detector = _detector()
+        dets, _, meta = detect_video(
+            video_file, FrameExtractor(target_fps=10), detector,
+            workers=2, start_frame=301, end_frame=450,
+        )
+        assert meta["first_sample"] == 101
+        assert len(dets) == 49
+        assert sorted(detector.seen) == list(range(101, 150))
+
+    def test_confidence_threshold_reaches_detector(self, video_file):
+        detector = _detector()
+        detect_video(video_file, FrameExtractor(target_fps=10), detector, workers=1, conf_threshold=0.4)
+        assert {call.args[1] for call in detector.detect_batch.call_args_list} == {0.4}
+
+    def test_progress_counts_every_sample(self, video_file):
+        progress = AnalysisProgress("v")
+        progress.stage("detect")
+        detect_video(
+            video_file, FrameExtractor(target_fps=10), _detector(),
+            workers=3, batch_size=7, adaptive=True, progress=progress,
+        )
+        # Reused (adaptive) frames count as done as well as detected ones
+        assert progress.total == progress.done == 200
+
+    def test_cancellation_stops_decoding(self, video_file):
+        progress = AnalysisProgress("v")
+        detector = _detector()
+        detect_batch = detector.detect_batch.side_effect
+
+        def cancel_after_first_batch(frames, conf_threshold=0.25):
+            progress.cancel("Cancelled by request")
+            return detect_batch(frames, conf_threshold)
+
+        detector.detect_batch.side_effect = cancel_after_first_batch
+        with pytest.raises(AnalysisCancelled):
+            detect_video(
+                video_file, FrameExtractor(target_fps=10), detector,
+                workers=1, batch_size=10, progress=progress,
+            )
+        assert len(detector.seen) == 10
+
+
+class TestAnalyzeLongVideo:
+    def test_collision_late_in_video_is_found(self, video_file):
+        lstm = _lstm(0.8)
+        result = analyze_long_video(
+            video_file, FrameExtractor(target_fps=10), _detector(collision_from=170),
+            lstm, TemporalConfidenceAggregator(),
+        )
+        # 200 samples → windows at 0 and 50; scored in one batched call
+        lstm.predict_batch.assert_called_once()
+        assert result["details"]["windowCount"] == 2
+        assert result["is_accident"]
+        assert result["total_frames"] == 200
+        # Peak is searched over the whole video, not the first 150 frames
+        assert result["peak_idx"] >= 150
+        lo = result["frame_offset"]
+        assert lo <= result["peak_idx"] < lo + len(result["frames"])
+
+    def test_progress_passes_through_stages(self, video_file):
+        progress = AnalysisProgress("v")
+        seen = []
+        stage = progress.stage
+        progress.stage = lambda name, *a, **kw: (seen.append(name), stage(name, *a, **kw))
+        analyze_long_video(
+            video_file, FrameExtractor(target_fps=10), _detector(),
+            _lstm(0.2), TemporalConfidenceAggregator(), progress=progress,
+        )
+        assert seen == ["detect", "physics", "lstm"]
+
+    def test_low_lstm_score_is_not_accident(self, video_file):
+        result = analyze_long_video(
+            video_file, FrameExtractor(target_fps=10), _detector(collision_from=170),
+            _lstm(0.2), TemporalConfidenceAggregator(),
+        )
+        assert not result["is_accident"]
+        assert result["frames"] == []
+        assert not any(w["positive"] for w in result["details"]["timeline"])
@@ -0,0 +1,54 @@
+"""Tests for MP4 container utilities"""
+import pytest
+import cv2
+import numpy as np
+from app.utils.mp4_utils import faststart, _atoms
+
+
+def _top_level(path):
+    data = path.read_bytes()
+    return [kind for kind, *_ in _atoms(data, 0, len(data))]
+
+
+def _decode(path):
+    cap = cv2.VideoCapture(str(path))
+    frames = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return np.array(frames)
+
+
+@pytest.fixture
+def clip(tmp_path):
+    path = tmp_path / "clip.mp4"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), 10.0, (160, 120))
+    for i in range(20):
+        writer.write(np.full((120, 160, 3), i * 10, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+class TestFaststart:
+    def test_moves_moov_before_mdat(self, clip):
+        before = _decode(clip)
+        assert faststart(clip) is True
+
+        atoms = _top_level(clip)
+        assert atoms.index(b'moov') < atoms.index(b'mdat')
+        np.testing.assert_array_equal(_decode(clip), before)
+
+    def test_already_faststart_is_untouched(self, clip):
+        faststart(clip)
+        data = clip.read_bytes()
+        assert faststart(clip) is False
+        assert clip.read_bytes() == data
+
+    def test_not_an_mp4_raises(self, tmp_path):
+        path = tmp_path / "bad.mp4"
+        path.write_bytes(b"\x00\x00\x00\x10ftypisom\x00\x00\x00\x00")
+        with pytest.raises(ValueError):
+            faststart(path)
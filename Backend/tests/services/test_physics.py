@@ -0,0 +1,210 @@
+"""Tests for incremental physics scoring"""
+import pytest
+import numpy as np
+from app.services.physics_service import PhysicsScorer, filter_vehicles
+
+
+def _batch_reference(per_frame_vehicles, frame_size):
+    """
+    Original whole-video computation from analyze_video_file.
+
+    Motion and size change here use nearest-center / list-index pairing,
+    which the tracker replaced; only the overlap signals keep parity.
+    """
+    overlap_scores, motion_scores, size_change_scores = [], [], []
+    prev_centers, prev_areas = [], []
+    frame_h, frame_w = frame_size
+    frame_diag = (frame_w**2 + frame_h**2) ** 0.5
+
+    for vehicles in per_frame_vehicles:
+        bboxes  = [v['bbox'] for v in vehicles]
+        areas   = [(b[2]-b[0])*(b[3]-b[1]) for b in bboxes]
+        centers = [((b[0]+b[2])/2, (b[1]+b[3])/2) for b in bboxes]
+        frame_overlap = 0.0
+        for i in range(len(bboxes)):
+            for j in range(i+1, len(bboxes)):
+                b1, b2 = bboxes[i], bboxes[j]
+                ix1 = max(b1[0], b2[0]); iy1 = max(b1[1], b2[1])
+                ix2 = min(b1[2], b2[2]); iy2 = min(b1[3], b2[3])
+                if ix2 > ix1 and iy2 > iy1:
+                    inter = (ix2-ix1) * (iy2-iy1)
+                    union = areas[i] + areas[j] - inter
+                    frame_overlap = max(frame_overlap, inter / max(union, 1))
+        overlap_scores.append(frame_overlap)
+        if prev_centers and centers:
+            dists = []
+            for c in centers:
+                nearest = min(prev_centers, key=lambda p: (p[0]-c[0])**2+(p[1]-c[1])**2)
+                d = ((nearest[0]-c[0])**2 + (nearest[1]-c[1])**2) ** 0.5
+                dists.append(d / frame_diag)
+            motion_scores.append(float(np.mean(dists)))
+        if prev_areas and areas:
+            min_len = min(len(prev_areas), len(areas))
+            pct = [abs(areas[k] - prev_areas[k]) / max(prev_areas[k], 1) for k in range(min_len)]
+            size_change_scores.append(float(np.mean(pct)))
+        prev_centers, prev_areas = centers, areas
+
+    overlap_arr = np.array(overlap_scores) if overlap_scores else np.array([0.0])
+    if len(overlap_arr) > 5:
+        smoothed = np.convolve(overlap_arr, np.ones(5) / 5, mode='valid')
+        overlap_spike = float(np.max(np.diff(smoothed)))
+        abs_max = float(np.max(overlap_arr))
+        overlap_score = min(max(overlap_spike, 0.0) / 0.50, 1.0) * 0.90 + min(abs_max, 1.0) * 0.10
+    else:
+        overlap_score = float(np.max(overlap_arr))
+        overlap_spike = 0.0
+    motion_arr = np.array(motion_scores) if motion_scores else np.array([0.0])
+    motion_score = min(float(np.percentile(motion_arr, 90)) / 0.15, 1.0)
+    size_arr = np.array(size_change_scores) if size_change_scores else np.array([0.0])
+    size_score = min(float(np.percentile(size_arr, 90)) / 1.5, 1.0)
+
+    n = len(per_frame_vehicles)
+    motion_padded = [0.0] + motion_scores + [0.0] * max(0, n - len(motion_scores) - 1)
+    size_padded   = [0.0] + size_change_scores + [0.0] * max(0, n - len(size_change_scores) - 1)
+    per_frame_physics = [
+        overlap_scores[i] * 0.55 +
+        min(motion_padded[i] / 0.10, 1.0) * 0.30 +
+        min(size_padded[i]   / 1.5,  1.0) * 0.15
+        for i in range(min(n, len(overlap_scores)))
+    ]
+    physics_score = overlap_score * 0.70 + motion_score * 0.20 + size_score * 0.10
+    return {
+        'physics_score': physics_score,
+        'overlap_spike': overlap_spike,
+        'per_frame_physics': per_frame_physics,
+    }
+
+
+def _random_video(rng, n_frames):
+    video = []
+    for _ in range(n_frames):
+        vehicles = []
+        for _ in range(rng.integers(0, 4)):
+            x1, y1 = rng.uniform(0, 500), rng.uniform(0, 400)
+            vehicles.append({
+                'bbox': [x1, y1, x1 + rng.uniform(20, 200), y1 + rng.uniform(20, 150)],
+                'confidence': 0.8,
+                'class_name': 'car',
+            })
+        video.append(vehicles)
+    return video
+
+
+@pytest.fixture
+def scorer():
+    return PhysicsScorer(frame_size=(480, 640))
+
+
+class TestFilterVehicles:
+    def test_keeps_vehicle_classes_only(self):
+        dets = [{'class_name': 'car'}, {'class_name': 'person'}, {'class_name': 'bus'}]
+        assert [d['class_name'] for d in filter_vehicles(dets)] == ['car', 'bus']
+
+
+class TestPush:
+    def test_empty_frame(self, scorer):
+        out = scorer.push([])
+        assert out['frame_index'] == 0
+        assert out['overlap'] == 0.0
+        assert out['overlap_spike'] == 0.0
+
+    def test_overlap_detected(self, scorer):
+        out = scorer.push([
+            {'bbox': [0, 0, 100, 100], 'class_name': 'car'},
+            {'bbox': [50, 0, 150, 100], 'class_name': 'car'},
+        ])
+        assert out['overlap'] == pytest.approx(1 / 3)
+
+    def test_spike_needs_more_than_window(self, scorer):
+        pair = [
+            {'bbox': [0, 0, 100, 100], 'class_name': 'car'},
+            {'bbox': [0, 0, 100, 100], 'class_name': 'car'},
+        ]
+        for _ in range(5):
+            scorer.push([])
+        assert scorer.overlap_spike == 0.0
+        out = scorer.push(pair)
+        assert out['overlap_spike'] == pytest.approx(0.2)
+
+    def test_reordered_boxes_are_not_size_change(self, scorer):
+        small = {'bbox': [0, 0, 20, 20], 'class_name': 'car'}
+        large = {'bbox': [300, 200, 500, 400], 'class_name': 'truck'}
+        scorer.push([small, large])
+        out = scorer.push([large, small])
+        assert out['size_change'] == 0.0
+        assert out['motion'] == 0.0
+
+    def test_motion_follows_each_vehicle(self, scorer):
+        a = {'bbox': [0, 0, 100, 100], 'class_name': 'car'}
+        b = {'bbox': [400, 300, 500, 400], 'class_name': 'car'}
+        scorer.push([a, b])
+        moved = {'bbox': [400 + 40, 300, 500 + 40, 400], 'class_name': 'car'}
+        out = scorer.push([moved, a])
+        # One vehicle moved 40px, the other stayed put
+        assert out['motion'] == pytest.approx(20 / 800)
+
+    def test_vehicle_stats(self, scorer):
+        scorer.push([{'bbox': [0, 0, 10, 10], 'class_name': 'car'}])
+        scorer.push([])
+        assert scorer.total_vehicles == 1
+        assert scorer.vehicle_coverage == 0.5
+
+
+class TestBatchParity:
+    @pytest.mark.parametrize("seed,n_frames", [(0, 3), (1, 6), (2, 40), (3, 150)])
+    def test_overlap_identical_to_batch(self, seed, n_frames):
+        rng = np.random.default_rng(seed)
+        video = _random_video(rng, n_frames)
+        scorer = PhysicsScorer(frame_size=(480, 640))
+        for vehicles in video:
+            scorer.push(vehicles)
+
+        expected = _batch_reference(video, (480, 640))
+        summary = scorer.summary()
+        assert summary['overlap_spike'] == expected['overlap_spike']
+        assert len(summary['per_frame_physics']) == len(expected['per_frame_physics'])
+
+    def test_static_scene_matches_batch(self):
+        # Nothing moves, so tracked and nearest-center pairing agree exactly
+        frame = [
+            {'bbox': [0, 0, 100, 100], 'class_name': 'car'},
+            {'bbox': [60, 0, 160, 100], 'class_name': 'car'},
+        ]
+        video = [[] for _ in range(3)] + [frame] * 10
+        scorer = PhysicsScorer(frame_size=(480, 640))
+        for vehicles in video:
+            scorer.push(vehicles)
+        expected = _batch_reference(video, (480, 640))
+        summary = scorer.summary()
+        assert summary['physics_score'] == expected['physics_score']
+        assert summary['per_frame_physics'] == expected['per_frame_physics']
+
+    def test_reset_clears_state(self, scorer):
+        scorer.push([{'bbox': [0, 0, 10, 10], 'class_name': 'car'}])
+        scorer.reset()
+        assert scorer.frame_count == 0
+        assert scorer.summary()['physics_score'] == 0.0
+
+
+class TestRollingHistory:
+    def test_window_matches_fresh_scorer(self):
+        rng = np.random.default_rng(7)
+        video = _random_video(rng, 60)
+        rolling = PhysicsScorer(frame_size=(480, 640), history=20)
+        for vehicles in video:
+            rolling.push(vehicles)
+
+        fresh = PhysicsScorer(frame_size=(480, 640))
+        for vehicles in video[-20:]:
+            fresh.push(vehicles)
+
+        assert rolling.window_frames == 20
+        assert rolling.total_vehicles == fresh.total_vehicles
+        assert rolling.overlap_spike == pytest.approx(fresh.overlap_spike)
+        assert rolling.summary()['overlap_scores'] == fresh.summary()['overlap_scores']
+
+    def test_gates(self, scorer):
+        for _ in range(10):
+            scorer.push([])
+        assert not scorer.passes_presence_gate()
+        assert not scorer.passes_signal_gate(scorer.summary())
@@ -0,0 +1,92 @@
+"""Tests for analysis profiles"""
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+from app.core.config import settings
+from app.ml.models.cascade_detector import CascadeDetector
+from app.ml.models.yolo_detector import YOLODetector
+from app.services import inference_service
+from app.services.profile_service import AnalysisProfile, resolve_profile
+from app.services.progress_service import AnalysisProgress
+from app.services.quality_service import TIERS
+
+
+class TestResolveProfile:
+    def test_default_profile_is_the_configured_analysis(self):
+        profile = resolve_profile()
+        assert profile.name == settings.ANALYSIS_PROFILE
+        assert profile.target_fps == settings.TARGET_FPS
+        assert profile.conf_threshold == settings.DETECTION_CONF_THRESHOLD
+        assert profile.evidence
+
+    def test_named_profile(self):
+        fast = resolve_profile("fast")
+        assert fast.target_fps == 5
+        assert not fast.evidence
+        assert fast.describe()["detector"] == "light"
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError, match="available"):
+            resolve_profile("turbo")
+
+    def test_misconfigured_profile(self):
+        with patch.dict(settings.ANALYSIS_PROFILES, {"bad": {"frames_per_second": 5}}), \
+             pytest.raises(ValueError, match="misconfigured"):
+            resolve_profile("bad")
+        with pytest.raises(ValueError, match="detector"):
+            AnalysisProfile("bad", detector="rcnn")
+
+
+class TestProfileDetector:
+    def test_configured_detector_by_default(self):
+        with patch("app.services.profile_service.create_detector") as create:
+            AnalysisProfile("p").create_detector()
+        assert create.called
+
+    def test_light_model_at_input_size(self):
+        detector = AnalysisProfile("p", detector="light", imgsz=320).create_detector()
+        assert isinstance(detector, YOLODetector)
+        assert detector.model_path == Path(settings.CASCADE_LIGHT_MODEL_PATH)
+        assert detector.imgsz == 320
+
+    def test_cascade_models_share_input_size(self):
+        detector = AnalysisProfile("p", detector="cascade", imgsz=480).create_detector()
+        assert isinstance(detector, CascadeDetector)
+        assert detector.light.imgsz == detector.heavy.imgsz == 480
+
+
+class TestWithQuality:
+    def test_full_tier_keeps_the_profile(self):
+        profile = AnalysisProfile("p", imgsz=960)
+        assert profile.with_quality(TIERS[0]) is profile
+        assert profile.with_quality(None) is profile
+
+    def test_lower_tier_caps_the_profile(self):
+        degraded = AnalysisProfile("p", fps=8, imgsz=960, conf=0.3, evidence=False).with_quality(TIERS[-1])
+        assert degraded.target_fps == min(TIERS[-1].fps, 8)
+        assert degraded.imgsz == TIERS[-1].imgsz
+        assert degraded.detector == "light"
+        # Settings a tier does not trade keep the profile's values
+        assert degraded.conf == 0.3 and not degraded.evidence
+
+
+class TestProfileInResult:
+    def test_profile_and_stage_times_are_recorded(self):
+        seen = {}
+
+        def analyze(video_id, detector=None, progress=None, quality=None, profile=None, **options):
+            seen["profile"] = profile
+            progress.stage("detect", total=10)
+            progress.advance(10)
+            progress.stage("lstm")
+            return {"details": {}}
+
+        options = dict(long_video=True, start_frame=None, end_frame=None, two_pass=False, roi=None,
+                       profile=resolve_profile("fast"))
+        with patch.object(inference_service, "_analyze_video_file", analyze):
+            result = inference_service._run_analysis("v", AnalysisProgress("v"), None, 0, options)
+
+        recorded = result["details"]["profile"]
+        assert seen["profile"].name == recorded["name"] == "fast"
+        assert recorded["longVideo"] is True        # The request's choice wins
+        assert set(recorded["stageTimes"]) == {"queued", "detect", "lstm"}
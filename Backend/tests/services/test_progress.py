@@ -0,0 +1,166 @@
+"""Tests for analysis progress tracking and cancellation"""
+import threading
+import time
+from unittest.mock import patch
+import pytest
+from app.core.config import settings
+from app.services.progress_service import (
+    AnalysisCancelled, AnalysisProgress, ProgressTracker, STAGES,
+)
+
+
+# Subprocess analysis targets (module level so a spawned child can import them)
+def _counts_to(video_id, progress, frames=3):
+    progress.stage("detect", total=frames)
+    for _ in range(frames):
+        progress.check()
+        progress.advance()
+    return {"id": f"result-{video_id}"}
+
+
+def _cooperative(video_id, progress):
+    progress.stage("detect")
+    while True:
+        progress.check()
+        time.sleep(0.01)
+
+
+def _stuck(video_id, progress):
+    progress.stage("detect")
+    while True:
+        time.sleep(0.01)    # e.g. a decoder that never returns
+
+
+def _broken(video_id, progress):
+    raise FileNotFoundError(f"Video not found: {video_id}")
+
+
+class TestAnalysisProgress:
+    def test_snapshot_reports_stage_and_counts(self):
+        progress = AnalysisProgress("v1")
+        assert progress.snapshot()["stage"] == "queued"
+        assert progress.snapshot()["stageIndex"] == -1
+
+        progress.stage("detect", total=150)
+        progress.advance(30)
+        snapshot = progress.snapshot()
+        assert snapshot["stage"] == "detect"
+        assert snapshot["stageIndex"] == STAGES.index("detect")
+        assert snapshot["stageCount"] == len(STAGES)
+        assert (snapshot["done"], snapshot["total"]) == (30, 150)
+        assert snapshot["status"] == "running"
+        assert snapshot["stageEta"] is not None and snapshot["stageEta"] >= 0
+
+    def test_new_stage_resets_counts(self):
+        progress = AnalysisProgress("v1")
+        progress.stage("detect", total=10)
+        progress.advance(10)
+        progress.stage("physics")
+        snapshot = progress.snapshot()
+        assert (snapshot["done"], snapshot["total"], snapshot["stageEta"]) == (0, None, None)
+
+    def test_every_change_bumps_version(self):
+        progress = AnalysisProgress("v1")
+        versions = [progress.version]
+        for change in (lambda: progress.stage("decode"), lambda: progress.expect(5),
+                       lambda: progress.advance(), lambda: progress.finish("result-v1")):
+            change()
+            versions.append(progress.version)
+        assert versions == sorted(set(versions))
+
+    def test_finish_and_fail(self):
+        done = AnalysisProgress("v1")
+        done.finish("result-v1")
+        assert done.finished
+        assert done.snapshot()["status"] == "completed"
+        assert done.snapshot()["resultId"] == "result-v1"
+
+        failed = AnalysisProgress("v2")
+        failed.fail("Video not found")
+        assert failed.finished
+        assert failed.snapshot()["status"] == "failed"
+        assert failed.snapshot()["error"] == "Video not found"
+
+    def test_cancel_stops_at_next_check(self):
+        progress = AnalysisProgress("v1")
+        progress.check()
+        progress.cancel("Client disconnected")
+        with pytest.raises(AnalysisCancelled, match="Client disconnected"):
+            progress.check()
+        progress.fail("Client disconnected")
+        assert progress.snapshot()["status"] == "cancelled"
+
+    def test_finished_run_cannot_be_cancelled(self):
+        progress = AnalysisProgress("v1")
+        progress.finish("result-v1")
+        progress.cancel()
+        progress.check()
+        assert not progress.cancelled
+
+    def test_deadline_checked_inside_stages(self):
+        progress = AnalysisProgress("v1")
+        progress.stage("detect")
+        progress.deadline = time.time() - 1
+        with pytest.raises(TimeoutError, match="during detect"):
+            progress.check()
+
+
+class TestProgressTracker:
+    def test_start_replaces_previous_run(self):
+        tracker = ProgressTracker(retention=60)
+        first = tracker.start("v1")
+        first.finish("result-v1")
+        second = tracker.start("v1")
+        assert tracker.get("v1") is second
+        assert tracker.get("v2") is None
+
+    def test_finished_runs_pruned_after_retention(self):
+        tracker = ProgressTracker(retention=0)
+        old = tracker.start("old")
+        old.finish("result-old")
+        running = tracker.start("running")
+        time.sleep(0.01)
+        tracker.start("new")
+        assert tracker.get("old") is None
+        assert tracker.get("running") is running
+
+    def test_cancel_only_running_runs(self):
+        tracker = ProgressTracker(retention=60)
+        assert not tracker.cancel("missing")
+        run = tracker.start("v1")
+        assert tracker.cancel("v1")
+        assert run.cancelled
+        run.fail("Cancelled")
+        assert not tracker.cancel("v1")
+
+
+class TestAnalysisSubprocess:
+    @pytest.fixture(autouse=True)
+    def fast_grace(self):
+        with patch.object(settings, "ANALYSIS_CANCEL_GRACE", 0.3), \
+             patch.object(settings, "PROGRESS_POLL_INTERVAL", 0.02):
+            yield
+
+    def _run(self, target, progress, options=None):
+        from app.services.inference_service import _analyze_in_subprocess
+        return _analyze_in_subprocess("v1", progress, options or {}, target=target)
+
+    def test_result_and_progress_relayed(self):
+        progress = AnalysisProgress("v1")
+        assert self._run(_counts_to, progress, {"frames": 4}) == {"id": "result-v1"}
+        assert (progress.stage_name, progress.done, progress.total) == ("detect", 4, 4)
+
+    def test_child_exception_propagates(self):
+        with pytest.raises(FileNotFoundError, match="Video not found"):
+            self._run(_broken, AnalysisProgress("v1"))
+
+    @pytest.mark.parametrize("target", [_cooperative, _stuck])
+    def test_cancelled_child_stops_or_is_killed(self, target):
+        progress = AnalysisProgress("v1")
+        timer = threading.Timer(0.5, progress.cancel, args=("Cancelled by request",))
+        timer.start()
+        started = time.time()
+        with pytest.raises(AnalysisCancelled):
+            self._run(target, progress)
+        timer.join()
+        assert time.time() - started < 15
@@ -0,0 +1,128 @@
+"""Tests for deadline-aware quality tiers"""
+import time
+from unittest.mock import patch
+from app.core.config import settings
+from app.services import inference_service
+from app.services.profile_service import resolve_profile
+from app.services.progress_service import AnalysisProgress, ProgressTracker
+from app.services.quality_service import (
+    QualityPlanner, TIERS, planned_frames, queued_analyses,
+)
+
+# 20s @ 30fps
+META = {'fps': 30.0, 'frame_count': 600}
+
+
+def _observed(stage_seconds, frames):
+    """A finished run whose stages took ``stage_seconds`` and detected ``frames`` frames."""
+    progress = AnalysisProgress("v")
+    progress._stage_log = {name: (seconds, frames if name == "detect" else 0)
+                           for name, seconds in stage_seconds.items()}
+    progress.status = "completed"
+    return progress
+
+
+class TestPlannedFrames:
+    def test_default_analysis_stops_after_one_window(self):
+        assert planned_frames(META, TIERS[0], window=150) == 150
+
+    def test_long_video_samples_the_whole_range(self):
+        assert planned_frames(META, TIERS[0], window=150, long_video=True) == 200
+        assert planned_frames(META, TIERS[0], window=150, long_video=True, start_frame=300) == 100
+
+    def test_lower_sampling_rate_sees_fewer_frames(self):
+        minimal = TIERS[-1]
+        assert minimal.target_fps == 5
+        assert planned_frames(META, minimal, window=150, long_video=True) == 100
+
+
+class TestQualityPlanner:
+    def test_generous_budget_keeps_full_quality(self):
+        planner = QualityPlanner()
+        tier, plan = planner.plan(1000, lambda t: 150)
+        assert tier is TIERS[0]
+        assert plan["tier"] == "full" and plan["model"] == "full"
+
+    def test_tight_budget_drops_to_a_cheaper_tier(self):
+        planner = QualityPlanner()
+        full = 150 * settings.QUALITY_FRAME_COST
+        tier, plan = planner.plan(full * 0.5, lambda t: 150)
+        assert tier.name == "reduced"
+        assert plan["estimate"] <= plan["timeLeft"]
+
+    def test_unreachable_budget_uses_the_cheapest_tier(self):
+        tier, plan = QualityPlanner().plan(0.001, lambda t: 150)
+        assert tier is TIERS[-1]
+        assert plan["estimate"] > plan["timeLeft"]
+
+    def test_waiting_and_queue_shrink_the_budget(self):
+        planner = QualityPlanner()
+        _, plan = planner.plan(10, lambda t: 1, waited=4, queued=2)
+        assert plan["timeLeft"] == round(6 / (1 + 2 / settings.ANALYSIS_WORKERS), 2)
+        assert plan["queued"] == 2
+
+    def test_observed_timings_replace_the_default_cost(self):
+        planner = QualityPlanner()
+        planner.observe(TIERS[0], _observed({"decode": 1.0, "detect": 9.0, "lstm": 2.0}, frames=100))
+        assert planner.frame_cost(TIERS[0]) == 0.1
+        # Unobserved tiers scale from the observed one
+        assert planner.frame_cost(TIERS[1]) == 0.1 * TIERS[1].cost
+        assert planner.estimate(TIERS[0], 50) == 5.0 + 2.0
+
+    def test_observations_are_smoothed(self):
+        planner = QualityPlanner(smoothing=0.5)
+        planner.observe(TIERS[0], _observed({"detect": 10.0}, frames=100))
+        planner.observe(TIERS[0], _observed({"detect": 30.0}, frames=100))
+        assert planner.frame_cost(TIERS[0]) == 0.2
+
+    def test_runs_without_detections_are_ignored(self):
+        planner = QualityPlanner()
+        planner.observe(TIERS[0], _observed({"decode": 1.0}, frames=0))
+        assert planner.stats() == {"frameCost": {}, "fixedCost": {}}
+
+
+class TestQueuedAnalyses:
+    def test_counts_runs_waiting_for_a_worker(self):
+        tracker = ProgressTracker()
+        running = tracker.start("a")
+        running.stage("detect")
+        waiting = tracker.start("b")
+        tracker.start("c")
+        with patch("app.services.quality_service.progress_tracker", tracker):
+            assert queued_analyses(running) == 2
+            assert queued_analyses(waiting) == 1
+
+
+class TestAnalysisWithBudget:
+    def _run(self, budget, planner):
+        seen = {}
+
+        def analyze(video_id, detector=None, progress=None, quality=None, **options):
+            seen["quality"] = quality
+            progress.stage("detect", total=150)
+            progress.advance(150)
+            return {"details": {}}
+
+        with patch.object(inference_service, "_analyze_video_file", analyze), \
+             patch.object(inference_service, "quality_planner", planner), \
+             patch.object(inference_service.FrameExtractor, "probe", lambda self, path: META), \
+             patch.object(inference_service, "get_video_path", lambda video_id: video_id):
+            result = inference_service._run_analysis(
+                "v", AnalysisProgress("v"), None, budget,
+                dict(long_video=False, start_frame=None, end_frame=None, two_pass=False, roi=None,
+                     profile=resolve_profile("balanced")),
+            )
+        return result, seen["quality"]
+
+    def test_tier_is_recorded_in_details(self):
+        result, quality = self._run(0.001, QualityPlanner())
+        assert quality is TIERS[-1]
+        assert result["details"]["quality"]["tier"] == "minimal"
+
+    def test_no_budget_runs_as_configured(self):
+        planner = QualityPlanner()
+        result, quality = self._run(0, planner)
+        assert quality is None
+        assert "quality" not in result["details"]
+        # Still learns full-quality timings
+        assert "balanced/full" in planner.stats()["frameCost"]
@@ -0,0 +1,82 @@
+"""Tests for motion-adaptive sampling and duplicate-frame reuse"""
+import pytest
+import numpy as np
+from app.ml.pipeline.frame_extractor import frame_signature, frame_difference
+from app.services.sampling_service import AdaptiveSampler, ReuseFiller, fill_reused, sampling_details
+
+
+def _frame(value):
+    return np.full((240, 320, 3), value, dtype=np.uint8)
+
+
+def _car(x, cls='car'):
+    return {'bbox': [x, 0.0, x + 10.0, 10.0], 'confidence': 0.8, 'class_id': 2, 'class_name': cls}
+
+
+class TestFrameDifference:
+    def test_identical_frames(self):
+        sig = frame_signature(_frame(100))
+        assert frame_difference(sig, sig) == 0.0
+
+    def test_scales_to_unit_range(self):
+        assert frame_difference(frame_signature(_frame(0)), frame_signature(_frame(255))) == 1.0
+
+
+class TestAdaptiveSampler:
+    def test_static_frames_are_reused(self):
+        sampler = AdaptiveSampler(diff_threshold=0.02, max_reuse=10)
+        decisions = [sampler.should_detect(_frame(50)) for _ in range(5)]
+        assert decisions == [True, False, False, False, False]
+        assert sampler.stats()["savedWorkRatio"] == 0.8
+
+    def test_motion_forces_detection(self):
+        sampler = AdaptiveSampler(diff_threshold=0.02, max_reuse=10)
+        decisions = [sampler.should_detect(_frame(v)) for v in (0, 40, 80, 120)]
+        assert all(decisions)
+
+    def test_max_reuse_bounds_runs(self):
+        sampler = AdaptiveSampler(diff_threshold=0.02, max_reuse=2)
+        decisions = [sampler.should_detect(_frame(50)) for _ in range(6)]
+        assert decisions == [True, False, False, True, False, False]
+
+    def test_drift_measured_against_last_detected_frame(self):
+        # Each step changes by ~1% but the drift accumulates past the threshold
+        sampler = AdaptiveSampler(diff_threshold=0.02, max_reuse=10)
+        decisions = [sampler.should_detect(_frame(v)) for v in (0, 3, 6, 9)]
+        assert decisions == [True, False, True, False]
+
+
+class TestFillReused:
+    def test_copies_previous(self):
+        filled = fill_reused([[_car(0)], None, None], interpolate=False)
+        assert [f[0]['bbox'][0] for f in filled] == [0.0, 0.0, 0.0]
+
+    def test_interpolates_between_detected_frames(self):
+        filled = fill_reused([[_car(0)], None, None, [_car(30)]], interpolate=True)
+        assert [f[0]['bbox'][0] for f in filled] == pytest.approx([0.0, 10.0, 20.0, 30.0])
+
+    def test_class_mismatch_falls_back_to_copy(self):
+        filled = fill_reused([[_car(0)], None, [_car(30, 'truck')]], interpolate=True)
+        assert filled[1][0]['bbox'][0] == 0.0
+
+    def test_sequence_length_preserved(self):
+        dets = [[_car(0)]] + [None] * 149
+        assert len(fill_reused(dets)) == 150
+
+    def test_incremental_release(self):
+        copier = ReuseFiller(interpolate=False)
+        assert len(copier.add([_car(0)])) == 1
+        assert len(copier.add(None)) == 1          # copies are known right away
+
+        blender = ReuseFiller(interpolate=True)
+        assert len(blender.add([_car(0)])) == 1
+        assert blender.add(None) == [] and blender.add(None) == []
+        released = blender.add([_car(30)])
+        assert [f[0]['bbox'][0] for f in released] == pytest.approx([10.0, 20.0, 30.0])
+        blender.add(None)
+        assert [f[0]['bbox'][0] for f in blender.flush()] == [30.0]
+
+    def test_details(self):
+        assert sampling_details(150, 30) == {
+            "framesDetected": 120, "framesReused": 30, "savedWorkRatio": 0.2,
+        }
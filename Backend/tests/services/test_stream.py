@@ -0,0 +1,241 @@
+"""Tests for live stream ingestion"""
+import pytest
+import cv2
+import numpy as np
+from unittest.mock import patch, MagicMock
+from app.ml.pipeline.stream_reader import StreamReader, parse_source, is_live_source
+import time
+from app.services.stream_service import StreamMonitor, StreamScheduler
+
+
+def _write_video(path, n_frames=60, fps=30.0, size=(160, 120)):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+    for i in range(n_frames):
+        writer.write(np.full((size[1], size[0], 3), i % 255, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def _colliding_detector():
+    """Two cars that start overlapping halfway through the stream."""
+    calls = {'n': 0}
+
+    def detect(frame, conf_threshold=0.25):
+        calls['n'] += 1
+        offset = 0 if calls["n"] < 8 else 90
+        return [
+            {'bbox': [0, 0, 50, 50], 'confidence': 0.9, 'class_id': 2, 'class_name': 'car'},
+            {'bbox': [100 - offset, 0, 150 - offset, 50], 'confidence': 0.9,
+             'class_id': 2, 'class_name': 'car'},
+        ]
+
+    detector = MagicMock()
+    detector.detect.side_effect = detect
+    return detector
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    return _write_video(tmp_path / "cam.mp4")
+
+
+class TestSourceParsing:
+    def test_device_index(self):
+        assert parse_source("0") == 0
+        assert is_live_source("1")
+
+    def test_rtsp_is_live(self):
+        assert is_live_source("rtsp://camera.local/stream")
+
+    def test_file_is_not_live(self):
+        assert not is_live_source("/videos/cam.mp4")
+
+
+class TestStreamReader:
+    def test_samples_at_target_fps(self, video_file):
+        reader = StreamReader(str(video_file), target_fps=10)
+        frames = list(reader.frames())
+        # 60 frames @ 30fps = 2s → 20 samples @ 10fps
+        assert len(frames) == 20
+        assert reader.frames_read == 60
+        assert reader.frames_skipped == 40
+
+    def test_stop_ends_iteration(self, video_file):
+        reader = StreamReader(str(video_file), target_fps=10)
+        seen = 0
+        for _ in reader.frames():
+            seen += 1
+            reader.stop()
+        assert seen == 1
+
+    def test_unopenable_source_raises(self, tmp_path):
+        reader = StreamReader(str(tmp_path / "missing.mp4"))
+        with pytest.raises(ValueError, match="Cannot open"):
+            list(reader.frames())
+
+
+class TestStreamMonitor:
+    @patch("app.services.stream_service.evidence_service")
+    @patch("app.services.stream_service.accident_frame_service")
+    def test_raises_event_on_collision(self, mock_frames, mock_evidence, video_file):
+        mock_frames.save_accident_frames.return_value = {'saved_frames': [3, 4, 5]}
+        mock_frames.get_frame_urls.return_value = ["/frames/x/frame_0003.jpg"]
+        lstm = MagicMock()
+        lstm.predict.return_value = 0.9
+
+        monitor = StreamMonitor(
+            "s1", str(video_file), target_fps=10,
+            detector=_colliding_detector(), lstm_detector=lstm,
+        )
+        monitor.eval_stride = 5
+        monitor.run()
+
+        assert monitor.status == "finished"
+        assert monitor.frames_processed == 20
+        assert len(monitor.events) == 1   # cooldown suppresses repeats
+        event = monitor.events[0]
+        assert event["stream_id"] == "s1"
+        assert event["latency"] >= 0
+        assert _wait_for(lambda: mock_evidence.retain.called)
+        mock_frames.save_accident_frames.assert_called_once()
+        mock_evidence.retain.assert_called_once_with(event["event_id"])
+
+    @patch("app.services.stream_service.evidence_service")
+    def test_event_does_not_wait_for_its_stills(self, mock_evidence, video_file, tmp_path):
+        import threading
+        from app.services.stream_service import accident_frame_service
+        release = threading.Event()
+        rendered = threading.Event()
+        render = accident_frame_service.save_accident_frames
+
+        def slow_render(*args, **kwargs):
+            release.wait(10)
+            try:
+                return render(*args, **kwargs)
+            finally:
+                rendered.set()
+
+        lstm = MagicMock()
+        lstm.predict.return_value = 0.9
+        monitor = StreamMonitor("s6", str(video_file), detector=_colliding_detector(), lstm_detector=lstm)
+        monitor.eval_stride = 5
+        with patch.object(accident_frame_service, "frames_dir", tmp_path / "frames"), \
+             patch.object(accident_frame_service, "save_accident_frames", side_effect=slow_render):
+            monitor.run()
+            # The feed finished while the render was still blocked
+            assert monitor.status == "finished" and len(monitor.events) == 1
+            assert not mock_evidence.retain.called
+            release.set()
+            assert rendered.wait(10)
+
+        event = monitor.events[0]
+        stills = sorted(p.name for p in (tmp_path / "frames" / event["event_id"]).glob("frame_*"))
+        assert [url.rsplit("/", 1)[1] for url in event["frameUrls"]] == stills
+        assert _wait_for(lambda: mock_evidence.retain.called)
+        mock_evidence.retain.assert_called_once_with(event["event_id"])
+
+    def test_presence_gate_blocks_lstm(self, video_file):
+        detector = MagicMock()
+        detector.detect.return_value = []
+        lstm = MagicMock()
+
+        monitor = StreamMonitor("s2", str(video_file), detector=detector, lstm_detector=lstm)
+        monitor.eval_stride = 5
+        monitor.run()
+
+        lstm.predict.assert_not_called()
+        assert len(monitor.events) == 0
+
+    def test_stats_keys(self, video_file):
+        monitor = StreamMonitor("s3", str(video_file), detector=MagicMock())
+        stats = monitor.stats()
+        for key in ("throughput_fps", "lag_seconds", "frames_processed", "event_count"):
+            assert key in stats
+
+
+def _batch_detector():
+    detector = MagicMock()
+    detector.detect_batch.side_effect = lambda frames, conf_threshold=0.25: [[] for _ in frames]
+    detector.get_device.return_value = "cpu"
+    return detector
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class TestStreamScheduler:
+    def test_multiplexes_streams_on_shared_detector(self, tmp_path):
+        scheduler = StreamScheduler(detector=_batch_detector(), batch_size=4)
+        try:
+            monitors = [
+                scheduler.start_stream(str(_write_video(tmp_path / f"cam{i}.mp4")))
+                for i in range(3)
+            ]
+            assert _wait_for(lambda: all(m.status == "finished" for m in monitors))
+            assert all(m.frames_processed == 20 for m in monitors)
+            assert scheduler.frames_detected == 60
+            assert scheduler.stats()["avg_batch_size"] >= 1
+        finally:
+            scheduler.stop_all()
+
+    def test_round_robin_is_fair(self):
+        scheduler = StreamScheduler(detector=_batch_detector(), batch_size=2)
+        fakes = {}
+        for sid in ("a", "b", "c"):
+            m = MagicMock()
+            m.has_pending = True
+            m.take.return_value = (0.0, sid)
+            fakes[sid] = m
+        scheduler._streams = fakes
+        scheduler._order = ["a", "b", "c"]
+
+        first = [item for _, (_, item) in scheduler._next_batch()]
+        second = [item for _, (_, item) in scheduler._next_batch()]
+        assert first == ["a", "b"]
+        assert second == ["c", "a"]
+
+    def test_roi_streams_send_crops(self, tmp_path):
+        from app.ml.pipeline.roi import RegionMask
+        detector = _batch_detector()
+        scheduler = StreamScheduler(detector=detector, batch_size=4)
+        try:
+            roi = RegionMask([[[0.0, 0.5], [1.0, 0.5], [1.0, 1.0], [0.0, 1.0]]], name="road")
+            monitor = scheduler.start_stream(str(_write_video(tmp_path / "cam.mp4")), roi=roi)
+            assert _wait_for(lambda: monitor.status == "finished")
+            shapes = {f.shape for call in detector.detect_batch.call_args_list for f in call[0][0]}
+            assert shapes == {(60, 160, 3)}
+            assert monitor.stats()["roi"] == "road"
+        finally:
+            scheduler.stop_all()
+
+    def test_remove_stream_at_runtime(self, tmp_path):
+        scheduler = StreamScheduler(detector=_batch_detector())
+        try:
+            monitor = scheduler.start_stream(str(_write_video(tmp_path / "cam.mp4")), realtime=True)
+            assert scheduler.stop_stream(monitor.stream_id) is True
+            assert scheduler.get(monitor.stream_id) is None
+            assert scheduler.stop_stream(monitor.stream_id) is False
+            assert monitor.status == "stopped"
+        finally:
+            scheduler.stop_all()
+
+
+class TestAdaptiveRate:
+    def test_backs_off_when_lagging(self, video_file):
+        monitor = StreamMonitor("s4", str(video_file), target_fps=10)
+        monitor.last_lag = 10.0
+        monitor.adapt_rate()
+        assert monitor.reader.target_fps == pytest.approx(7.5)
+
+    def test_recovers_towards_nominal(self, video_file):
+        monitor = StreamMonitor("s5", str(video_file), target_fps=10)
+        monitor.reader.set_target_fps(5)
+        monitor.last_lag = 0.0
+        monitor.adapt_rate()
+        assert monitor.reader.target_fps == pytest.approx(5.5)
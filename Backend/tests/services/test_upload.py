@@ -0,0 +1,197 @@
+"""Tests for chunked, resumable uploads"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from io import BytesIO
+from unittest.mock import patch
+import cv2
+import numpy as np
+import pytest
+from starlette.datastructures import UploadFile
+from app.services import video_service
+from app.ml.models.memo_detector import MemoDetector
+from app.ml.pipeline.frame_extractor import FrameExtractor
+from app.services.upload_analysis_service import UploadTail
+from app.services.upload_service import ChunkedUploadService, UploadOffsetError, UploadSizeError
+
+
+async def _body(*pieces):
+    for piece in pieces:
+        yield piece
+
+
+async def _dropped(*pieces):
+    for piece in pieces:
+        yield piece
+    raise ConnectionResetError("link dropped")
+
+
+@pytest.fixture
+def service(tmp_path):
+    return ChunkedUploadService(upload_dir=str(tmp_path), max_size=10_000)
+
+
+class TestChunkedUploadService:
+    def test_partial_chunk_kept_on_disconnect(self, service):
+        session = service.create("u1", "clip.mp4", 300)
+        with pytest.raises(ConnectionResetError):
+            asyncio.run(service.receive(session, 0, _dropped(b"a" * 100, b"b" * 50)))
+
+        assert session.offset == 150
+        assert asyncio.run(service.receive(session, 150, _body(b"c" * 150))) == 300
+
+    def test_resume_after_restart_rehashes(self, service, tmp_path):
+        data = os.urandom(3000)
+        session = service.create("u2", "clip.mov", len(data), hashlib.sha256(data).hexdigest())
+        asyncio.run(service.receive(session, 0, _body(data[:1000])))
+
+        restarted = ChunkedUploadService(upload_dir=str(tmp_path), max_size=10_000)
+        resumed = restarted.get("u2")
+        assert resumed.offset == 1000
+        asyncio.run(restarted.receive(resumed, 1000, _body(data[1000:])))
+
+        path = restarted.complete(resumed)
+        assert path == tmp_path / "u2.mov"
+        assert path.read_bytes() == data
+
+    def test_wrong_offset_and_overrun(self, service):
+        session = service.create("u3", "clip.mp4", 100)
+        with pytest.raises(UploadOffsetError) as exc:
+            asyncio.run(service.receive(session, 10, _body(b"x")))
+        assert exc.value.offset == 0
+
+        with pytest.raises(UploadSizeError):
+            asyncio.run(service.receive(session, 0, _body(b"x" * 60, b"y" * 60)))
+        assert session.offset == 60     # Bytes within the declared size are kept
+
+    def test_limits_and_expiry(self, service):
+        with pytest.raises(UploadSizeError):
+            service.create("big", "clip.mp4", 10_001)
+        with pytest.raises(ValueError):
+            service.create("bad", "clip.mp4", 10, sha256="nothex")
+        with pytest.raises(ValueError):
+            service.create("txt", "notes.txt", 10)
+
+        session = service.create("old", "clip.mp4", 100)
+        asyncio.run(service.receive(session, 0, _body(b"z" * 40)))
+        session.created_at = time.time() - 10
+        assert service.expire(max_age=60) == 0
+        assert service.expire(max_age=5) == 40
+        assert service.get("old") is None
+
+
+class TestSaveUploadedVideo:
+    def test_copy_runs_off_the_event_loop(self, tmp_path):
+        threads = []
+        copy = video_service._copy_upload
+
+        def spy(src, path):
+            threads.append(threading.current_thread().name)
+            return copy(src, path)
+
+        upload = UploadFile(BytesIO(b"v" * 5000), filename="../clip.MP4")
+        with patch.object(video_service.settings, "UPLOAD_DIR", str(tmp_path)), \
+             patch.object(video_service, "_copy_upload", spy):
+            path = asyncio.run(video_service.save_uploaded_video(upload, "vid"))
+
+        assert path == tmp_path / "vid.MP4"
+        assert path.read_bytes() == b"v" * 5000
+        assert threads[0].startswith("upload-io")
+
+    def test_concurrent_writes_are_bounded(self):
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def write():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+        async def many():
+            await asyncio.gather(*(video_service.run_upload_io(write) for _ in range(12)))
+
+        asyncio.run(many())
+        assert peak[0] <= video_service.settings.UPLOAD_WRITE_WORKERS
+
+
+class _CountingDetector:
+    def __init__(self):
+        self.frames = 0
+
+    def detect_batch(self, frames, conf_threshold=0.25):
+        self.frames += len(frames)
+        return [[{'bbox': [0, 0, 10, 10], 'class_name': 'car'}] for _ in frames]
+
+
+def _write_video(path, fourcc, n_frames=120):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*fourcc), 30.0, (160, 120))
+    for i in range(n_frames):
+        frame = np.full((120, 160, 3), (i * 2) % 255, dtype=np.uint8)
+        cv2.putText(frame, str(i), (20, 80), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 2)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def _tail_growing(tmp_path, src, steps=8, **kwargs):
+    """Tail a copy of ``src`` that grows in ``steps`` pieces."""
+    data = src.read_bytes()
+    partial = tmp_path / f"partial{src.suffix}"
+    partial.touch()
+    inner = _CountingDetector()
+    memo = MemoDetector(inner)
+    tail = UploadTail(partial, lambda: 0, memo, **kwargs)
+    for k in range(1, steps + 1):
+        partial.write_bytes(data[: len(data) * k // steps])
+        tail.scan()
+    return tail, memo, inner
+
+
+class TestUploadTail:
+    def test_streamable_upload_is_detected_while_it_arrives(self, tmp_path):
+        src = _write_video(tmp_path / "src.mkv", "mp4v")
+        tail, memo, inner = _tail_growing(tmp_path, src)
+        tailed = inner.frames
+
+        frames = FrameExtractor().extract_frames(src)
+        hits = memo.hits
+        memo.detect_batch(frames)
+        assert tail.passes > 1
+        assert len(frames) == 40                      # 30 fps sampled at 10
+        assert memo.hits - hits == len(frames)        # final analysis detects nothing new
+        assert inner.frames == tailed
+
+    def test_stops_at_max_samples(self, tmp_path):
+        src = _write_video(tmp_path / "src.avi", "MJPG")
+        tail, memo, inner = _tail_growing(tmp_path, src, max_samples=10)
+
+        assert tail.done
+        frames = FrameExtractor().extract_frames(src, max_frames=10)
+        hits = memo.hits
+        memo.detect_batch(frames)
+        assert memo.hits - hits == 10
+
+    def test_index_last_mp4_waits_for_completion(self, tmp_path):
+        src = _write_video(tmp_path / "src.mp4", "mp4v")
+        tail, _, inner = _tail_growing(tmp_path, src)
+
+        assert tail.passes == 1                       # only the finished file opens
+        assert inner.frames == 40
+
+    def test_thread_follows_progress_and_stops(self, tmp_path):
+        src = _write_video(tmp_path / "src.mkv", "mp4v")
+        partial = tmp_path / "partial.mkv"
+        partial.write_bytes(src.read_bytes())
+        inner = _CountingDetector()
+        tail = UploadTail(partial, lambda: partial.stat().st_size, MemoDetector(inner), step=1, poll=0.01)
+        tail.start()
+        deadline = time.time() + 10
+        while inner.frames < 40 and time.time() < deadline:
+            time.sleep(0.01)
+        tail.stop()
+
+        assert inner.frames == 40
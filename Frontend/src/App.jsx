@@ -17,7 +17,7 @@ function App() {
     const [analysisResult, setAnalysisResult] = useState(null)
     const [error, setError] = useState(null)
     const { showToast, ToastContainer } = useToast()
-    const { uploadAndAnalyze } = useVideoUpload()
+    const { uploadAndAnalyze, uploadProgress, analysisProgress } = useVideoUpload()
 
     const handleFileUpload = async (file) => {
         setUploadedFile(file)
@@ -74,6 +74,8 @@ function App() {
                 return (
                     <ProcessingState
                         fileName={uploadedFile?.name}
+                        uploadProgress={uploadProgress}
+                        analysisProgress={analysisProgress}
                         onComplete={() => { }} // Handled by uploadAndAnalyze callback
                         onError={() => { }} // Handled by uploadAndAnalyze callback
                     />
@@ -1,57 +1,81 @@
 import { useState, useEffect } from 'react'
 import ProgressBar from '../ui/ProgressBar'
 import { PROCESSING_STAGES } from '../../utils/constants'
-import { useVideoUpload } from '../../hooks/useVideoUpload'
 
-const ProcessingState = ({ fileName, onComplete, onError }) => {
-    const [currentStage, setCurrentStage] = useState(0)
-    const [progress, setProgress] = useState(0)
-    const { uploadAndAnalyze, uploadProgress } = useVideoUpload()
+// Share of the bar per step; upload and analysis progress fill it in order
+const STAGE_SHARE = 100 / PROCESSING_STAGES.length
 
+/**
+ * Map live upload / analysis progress to a step and overall percentage
+ */
+const liveProgress = (uploadProgress, analysisProgress) => {
+    if (!analysisProgress) {
+        return { stage: 0, percent: (uploadProgress / 100) * STAGE_SHARE }
+    }
+
+    const { stage, done, total, status } = analysisProgress
+    if (status === 'completed') {
+        return { stage: PROCESSING_STAGES.length - 1, percent: 100 }
+    }
+    const index = Math.max(0, PROCESSING_STAGES.findIndex((s) => s.analysisStages.includes(stage)))
+    const fraction = total ? Math.min(done / total, 1) : 0
+    return { stage: index, percent: (index + fraction) * STAGE_SHARE }
+}
+
+const ProcessingState = ({ fileName, uploadProgress = 0, analysisProgress = null }) => {
+    const [animatedStage, setAnimatedStage] = useState(0)
+    const [animatedProgress, setAnimatedProgress] = useState(0)
+    const live = Boolean(analysisProgress) || uploadProgress > 0
+
+    // Without live progress (e.g. an older backend) animate through the stages
     useEffect(() => {
-        let stageIndex = 0
+        if (live) return
+        let cancelled = false
+
+        const animateProgress = (start, end, duration) => {
+            return new Promise((resolve) => {
+                const startTime = Date.now()
+                const range = end - start
+
+                const updateProgress = () => {
+                    if (cancelled) return resolve()
+                    const elapsed = Date.now() - startTime
+                    const progress = Math.min(elapsed / duration, 1)
+                    const currentProgress = start + (range * progress)
+
+                    setAnimatedProgress(currentProgress)
+
+                    if (progress < 1) {
+                        requestAnimationFrame(updateProgress)
+                    } else {
+                        resolve()
+                    }
+                }
+
+                updateProgress()
+            })
+        }
 
         const processStages = async () => {
-            for (const stage of PROCESSING_STAGES) {
-                setCurrentStage(stageIndex)
+            for (const [stageIndex, stage] of PROCESSING_STAGES.entries()) {
+                if (cancelled) return
+                setAnimatedStage(stageIndex)
 
                 // Animate progress for this stage
-                const startProgress = (stageIndex / PROCESSING_STAGES.length) * 100
-                const endProgress = ((stageIndex + 1) / PROCESSING_STAGES.length) * 100
+                const startProgress = stageIndex * STAGE_SHARE
+                const endProgress = (stageIndex + 1) * STAGE_SHARE
 
                 await animateProgress(startProgress, endProgress, stage.duration)
-                stageIndex++
             }
-
-            // Complete processing - trigger callback
-            setProgress(100)
         }
 
         processStages()
-    }, [onComplete, onError])
-
-    const animateProgress = (start, end, duration) => {
-        return new Promise((resolve) => {
-            const startTime = Date.now()
-            const range = end - start
-
-            const updateProgress = () => {
-                const elapsed = Date.now() - startTime
-                const progress = Math.min(elapsed / duration, 1)
-                const currentProgress = start + (range * progress)
-
-                setProgress(currentProgress)
+        return () => { cancelled = true }
+    }, [live])
 
-                if (progress < 1) {
-                    requestAnimationFrame(updateProgress)
-                } else {
-                    resolve()
-                }
-            }
-
-            updateProgress()
-        })
-    }
+    const { stage: currentStage, percent: progress } = live
+        ? liveProgress(uploadProgress, analysisProgress)
+        : { stage: animatedStage, percent: animatedProgress }
 
     return (
         <div className="text-center space-y-8">
@@ -91,6 +115,12 @@ const ProcessingState = ({ fileName, onComplete, onError }) => {
                 <p className="text-lg font-semibold text-blue-400">
                     {PROCESSING_STAGES[currentStage]?.name}
                 </p>
+                {analysisProgress?.total > 0 && analysisProgress.status === 'running' && (
+                    <p className="text-sm text-gray-400">
+                        {analysisProgress.done} / {analysisProgress.total} frames
+                        {analysisProgress.stageEta != null && ` · about ${Math.ceil(analysisProgress.stageEta)}s left`}
+                    </p>
+                )}
 
                 {/* Stage Timeline - Horizontal */}
                 <div className="max-w-4xl mx-auto px-8">
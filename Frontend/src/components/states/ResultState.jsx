@@ -328,7 +328,7 @@ const ResultState = ({ result, file, onViewExplanation, onReset }) => {
                                             onClick={() => setZoomedImage(`${BASE_URL}${url}`)}
                                         >
                                             <img
-                                                src={`${BASE_URL}${url}`}
+                                                src={`${BASE_URL}${result.details.accidentThumbnailUrls?.[idx] ?? url}`}
                                                 alt={`Frame ${frameLabels[idx]}`}
                                                 style={{ width: '100%', display: 'block' }}
                                             />
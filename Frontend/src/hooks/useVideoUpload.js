@@ -1,10 +1,11 @@
 import { useState, useCallback } from 'react'
 import { validateVideoFile } from '../utils/fileValidation'
-import { uploadVideo, analyzeVideo } from '../services/api'
+import { uploadVideo, analyzeVideo, watchAnalysisProgress } from '../services/api'
 
 export const useVideoUpload = () => {
     const [isUploading, setIsUploading] = useState(false)
     const [uploadProgress, setUploadProgress] = useState(0)
+    const [analysisProgress, setAnalysisProgress] = useState(null)
     const [error, setError] = useState(null)
 
     const uploadAndAnalyze = useCallback(async (file, onSuccess, onError) => {
@@ -19,6 +20,8 @@ export const useVideoUpload = () => {
         setIsUploading(true)
         setError(null)
         setUploadProgress(0)
+        setAnalysisProgress(null)
+        let stopWatching = () => { }
 
         try {
             // Upload video
@@ -30,8 +33,10 @@ export const useVideoUpload = () => {
                 throw new Error(uploadResult.error || 'Upload failed')
             }
 
-            // Analyze video
+            // Analyze video (subscribe first so no stage is missed)
+            stopWatching = watchAnalysisProgress(uploadResult.videoId, setAnalysisProgress)
             const analysisResult = await analyzeVideo(uploadResult.videoId)
+            stopWatching()
 
             if (!analysisResult.success) {
                 throw new Error(analysisResult.error || 'Analysis failed')
@@ -42,6 +47,7 @@ export const useVideoUpload = () => {
             onSuccess?.(analysisResult.data)
 
         } catch (err) {
+            stopWatching()
             setIsUploading(false)
             setError(err.message)
             onError?.(err.message)
@@ -51,12 +57,14 @@ export const useVideoUpload = () => {
     const reset = useCallback(() => {
         setIsUploading(false)
         setUploadProgress(0)
+        setAnalysisProgress(null)
         setError(null)
     }, [])
 
     return {
         isUploading,
         uploadProgress,
+        analysisProgress,
         error,
         uploadAndAnalyze,
         reset
@@ -70,6 +70,33 @@ export const analyzeVideo = async (videoId) => {
     }
 }
 
+/**
+ * Follow the progress of a running analysis (server-sent events)
+ * @param {string} videoId - ID of the video being analyzed
+ * @param {Function} onProgress - Called with each progress snapshot
+ * @returns {Function} - Stops watching
+ */
+export const watchAnalysisProgress = (videoId, onProgress) => {
+    if (typeof EventSource === 'undefined') {
+        return () => { }
+    }
+
+    const source = new EventSource(`${API_BASE_URL}/analyze/${videoId}/progress`)
+    const handle = (event) => onProgress?.(JSON.parse(event.data))
+
+    source.addEventListener('progress', handle)
+    for (const last of ['completed', 'failed', 'cancelled', 'idle']) {
+        source.addEventListener(last, (event) => {
+            handle(event)
+            source.close()
+        })
+    }
+    // Progress is informational: the analysis request reports the outcome
+    source.onerror = () => source.close()
+
+    return () => source.close()
+}
+
 /**
  * Get AI explanation for analysis result
  * @param {string} resultId - ID of analysis result
@@ -48,11 +48,12 @@ export const TOAST_TYPES = {
     WARNING: 'warning'
 }
 
-// Processing Stages
+// Processing Stages (analysisStages: backend progress stages shown as this step;
+// duration: fallback animation when no live progress is available)
 export const PROCESSING_STAGES = [
-    { id: 1, name: 'Uploading Video', duration: 2000 },
-    { id: 2, name: 'Extracting Frames', duration: 3000 },
-    { id: 3, name: 'Analyzing Spatial Features', duration: 4000 },
-    { id: 4, name: 'Analyzing Temporal Features', duration: 4000 },
-    { id: 5, name: 'Generating Results', duration: 2000 }
+    { id: 1, name: 'Uploading Video', duration: 2000, analysisStages: ['queued'] },
+    { id: 2, name: 'Extracting Frames', duration: 3000, analysisStages: ['decode'] },
+    { id: 3, name: 'Analyzing Spatial Features', duration: 4000, analysisStages: ['detect'] },
+    { id: 4, name: 'Analyzing Temporal Features', duration: 4000, analysisStages: ['physics', 'lstm'] },
+    { id: 5, name: 'Generating Results', duration: 2000, analysisStages: ['render', 'persist'] }
 ]